@@ -0,0 +1,484 @@
+"""
+This file is part of the meshRW package
+---
+This file includes the benchmark suite of the readers and writers on synthetic meshes.
+----
+Luc Laurent - luc.laurent@lecnam.net -- 2021
+"""
+
+import importlib
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Optional, Union
+
+import numpy as np
+from loguru import logger as Logger
+
+from . import __version__, msh, multi, vtk
+
+# numbers of cells of the synthetic meshes
+DFLT_SIZES: tuple = (int(1e3), int(1e4), int(1e5), int(1e6), int(1e7))
+# kinds of synthetic meshes
+DFLT_KINDS: tuple = ('TET4', 'HEX8', 'mixed')
+# decomposition of a hexahedron (VTK ordering of the vertices) in 6 tetrahedra sharing the diagonal 0-6
+DFLT_HEX_TO_TET: list = [[0, 1, 2, 6], [0, 2, 3, 6], [0, 3, 7, 6], [0, 7, 4, 6], [0, 4, 5, 6], [0, 5, 1, 6]]
+# relative slowdown reported as a regression by compareResults
+DFLT_TOLERANCE: float = 0.1
+
+
+def structuredMesh(nbCells: int, kind: str='TET4')-> tuple:
+    """
+    Build a structured mesh of the unit cube with about `nbCells` cells.
+
+    The cube is split in hexahedra; each hexahedron gives one `HEX8` ('HEX8'), six `TET4`
+    ('TET4') or, for 'mixed', the first half of the hexahedra are kept and the others are
+    split in tetrahedra.
+
+    Args:
+        nbCells (int): The target number of cells.
+        kind (str, optional): The kind of mesh ('TET4', 'HEX8' or 'mixed'). Defaults to 'TET4'.
+
+    Returns:
+        tuple: The coordinates of the nodes (nbNodes, 3) and the list of the element blocks
+        (dictionaries with 'type' and 'connectivity', numbering of the nodes from 0).
+
+    Raises:
+        ValueError: If the kind of mesh is unknown.
+    """
+    if kind not in DFLT_KINDS:
+        raise ValueError(f'Kind of mesh {kind} not supported (ALLOWED: {" ".join(DFLT_KINDS)})')
+    nbHex = nbCells / {'TET4': 6, 'HEX8': 1, 'mixed': 3.5}[kind]
+    nx = max(1, round(nbHex ** (1 / 3)))
+    ny = nx
+    nz = max(1, round(nbHex / nx / ny))
+    # nodes
+    x, y, z = np.meshgrid(np.linspace(0, 1, nx + 1), np.linspace(0, 1, ny + 1), np.linspace(0, 1, nz + 1),
+                          indexing='ij')
+    nodes = np.column_stack((x.ravel(), y.ravel(), z.ravel()))
+    # hexahedra
+    ids = np.arange(nodes.shape[0]).reshape(nx + 1, ny + 1, nz + 1)
+    corners = [ids[:-1, :-1, :-1], ids[1:, :-1, :-1], ids[1:, 1:, :-1], ids[:-1, 1:, :-1],
+               ids[:-1, :-1, 1:], ids[1:, :-1, 1:], ids[1:, 1:, 1:], ids[:-1, 1:, 1:]]
+    hexa = np.column_stack([c.ravel() for c in corners])
+    elements = []
+    if kind == 'mixed':
+        nbKept = hexa.shape[0] // 2
+        elements.append({'type': 'HEX8', 'connectivity': hexa[:nbKept]})
+        hexa = hexa[nbKept:]
+    if kind == 'HEX8':
+        elements.append({'type': 'HEX8', 'connectivity': hexa})
+    elif hexa.shape[0] > 0:
+        elements.append({'type': 'TET4', 'connectivity': hexa[:, DFLT_HEX_TO_TET].reshape(-1, 4)})
+    return nodes, elements
+
+
+def transientField(nodes: np.ndarray, nbSteps: int, name: str='U')-> dict:
+    """
+    Build a nodal vector field with several steps.
+
+    Args:
+        nodes (np.ndarray): The coordinates of the nodes.
+        nbSteps (int): The number of steps.
+        name (str, optional): The name of the field. Defaults to 'U'.
+
+    Returns:
+        dict: The field in the format of the writers.
+    """
+    return {'name': name, 'type': 'nodal', 'dim': 3, 'nbsteps': nbSteps, 'steps': list(range(nbSteps)),
+            'data': [nodes * (1 + 0.01 * it) for it in range(nbSteps)]}
+
+
+def getInputs(nodes: np.ndarray, elements: list, fields: list, offset: int)-> dict:
+    """
+    Build the arguments of a writer.
+
+    Args:
+        nodes (np.ndarray): The coordinates of the nodes.
+        elements (list): The element blocks (numbering of the nodes from 0).
+        fields (list): The fields.
+        offset (int): The first index of the nodes expected by the writer (0 or 1).
+
+    Returns:
+        dict: The keyword arguments of the writer.
+    """
+    elems = [{'type': e['type'], 'connectivity': e['connectivity'] + offset, 'physgrp': [1 + it, 1 + it]}
+             for it, e in enumerate(elements)]
+    return {'nodes': nodes, 'elements': elems, 'fields': fields}
+
+
+def writeMsh(filename: Path, nodes: np.ndarray, elements: list, fields: list)-> None:
+    """Write the mesh with `msh.MSHWriter`."""
+    msh.mshWriter(filename=filename.with_suffix('.msh'), **getInputs(nodes, elements, fields, 1))
+
+
+def writeMsh2(filename: Path, nodes: np.ndarray, elements: list, fields: list)-> None:
+    """Write the mesh with `msh2.MSHWriter` (gmsh API)."""
+    from . import msh2
+
+    msh2.mshWriter(filename=filename.with_suffix('.msh'), **getInputs(nodes, elements, fields, 1))
+
+
+def writeVtk(filename: Path, nodes: np.ndarray, elements: list, fields: list)-> None:
+    """Write the mesh with `vtk.VTKWriter`."""
+    vtk.vtkWriter(filename=filename.with_suffix('.vtk'), **getInputs(nodes, elements, fields, 0))
+
+
+def writeVtk2(filename: Path, nodes: np.ndarray, elements: list, fields: list)-> None:
+    """Write the mesh with `vtk2.VTKWriter` (VTK library)."""
+    from . import vtk2
+
+    vtk2.vtkWriter(filename=filename.with_suffix('.vtu'), **getInputs(nodes, elements, fields, 0))
+
+
+def readMsh(filename: Path)-> None:
+    """Read the mesh with `msh.MSHReader`."""
+    msh.mshReader(filename=filename.with_suffix('.msh'))
+
+
+# benchmarked cases: writers (nodes, elements and fields written in the file) or readers
+# (file written by `setup` before the timing), with the module and the backends (imported
+# on first use by the module) required by the case
+DFLT_CASES: dict = {
+    'msh.MSHWriter': {'write': writeMsh, 'module': 'msh'},
+    'msh2.MSHWriter': {'write': writeMsh2, 'module': 'msh2', 'backends': ['gmsh']},
+    'vtk.VTKWriter': {'write': writeVtk, 'module': 'vtk'},
+    'vtk2.VTKWriter': {'write': writeVtk2, 'module': 'vtk2', 'backends': ['vtk', 'lxml.etree']},
+    'msh.MSHReader': {'read': readMsh, 'setup': writeMsh, 'module': 'msh'},
+}
+# modules whose import time is measured and heavy backends which must not be loaded by them
+DFLT_IMPORTS: tuple = ('meshRW.msh', 'meshRW.msh4', 'meshRW.vtk', 'meshRW.vtu')
+DFLT_BACKENDS: tuple = ('gmsh', 'vtk', 'vtkmodules', 'lxml')
+# output files of the benchmark of the fan-out writer (see benchmarkMulti)
+DFLT_MULTI_TARGETS: tuple = ('bench.msh', 'bench.vtk', 'bench.vtu')
+
+
+def isAvailable(case: str)-> bool:
+    """
+    Check if the module and the backends required by a case can be imported (e.g. `msh2`
+    requires gmsh).
+
+    Args:
+        case (str): The name of the case (key of DFLT_CASES).
+
+    Returns:
+        bool: True if the case can be run.
+    """
+    try:
+        importlib.import_module(f'{__package__}.{DFLT_CASES[case]["module"]}')
+        for backend in DFLT_CASES[case].get('backends', []):
+            importlib.import_module(backend)
+    except (ImportError, OSError) as err:
+        Logger.warning(f'Case {case} not available: {err}')
+        return False
+    return True
+
+
+def getDirectorySize(directory: Path)-> int:
+    """
+    Get the size of the files in a directory.
+
+    Args:
+        directory (Path): The directory.
+
+    Returns:
+        int: The size of the files (bytes).
+    """
+    return sum(f.stat().st_size for f in directory.rglob('*') if f.is_file())
+
+
+def measure(func: Callable, repeat: int=1, memory: bool=True)-> tuple:
+    """
+    Measure the wall time and the peak of memory of a function.
+
+    The time is the best of `repeat` calls; the peak of memory (allocations traced by
+    `tracemalloc`, NumPy arrays included) is measured on an additional call so that the
+    tracing does not affect the time.
+
+    Args:
+        func (Callable): The function to call (without argument).
+        repeat (int, optional): The number of timed calls. Defaults to 1.
+        memory (bool, optional): Measure the peak of memory. Defaults to True.
+
+    Returns:
+        tuple: The wall time (s) and the peak of memory (bytes, None if not measured).
+    """
+    elapsed = np.inf
+    for _ in range(repeat):
+        tic = time.perf_counter()
+        func()
+        elapsed = min(elapsed, time.perf_counter() - tic)
+    peak = None
+    if memory:
+        tracing = tracemalloc.is_tracing()
+        if not tracing:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        start = tracemalloc.get_traced_memory()[0]
+        func()
+        peak = tracemalloc.get_traced_memory()[1] - start
+        if not tracing:
+            tracemalloc.stop()
+    return elapsed, peak
+
+
+def runCase(case: str,
+            nbCells: int,
+            kind: str='TET4',
+            nbSteps: int=0,
+            repeat: int=1,
+            memory: bool=True,
+            mesh: Optional[tuple]=None)-> dict:
+    """
+    Benchmark a reader or a writer on a synthetic mesh.
+
+    Args:
+        case (str): The name of the case (key of DFLT_CASES).
+        nbCells (int): The target number of cells.
+        kind (str, optional): The kind of mesh (see `structuredMesh`). Defaults to 'TET4'.
+        nbSteps (int, optional): The number of steps of the transient nodal field (0: no field).
+            Defaults to 0.
+        repeat (int, optional): The number of timed runs (the best time is kept). Defaults to 1.
+        memory (bool, optional): Measure the peak of memory. Defaults to True.
+        mesh (Optional[tuple], optional): The nodes and elements (built if None). Defaults to None.
+
+    Returns:
+        dict: The result with keys 'case', 'kind', 'cells', 'nodes', 'steps', 'time' (s),
+        'size' (bytes written or read), 'MBs', 'cellsPerSec' and 'peakMemory' (bytes).
+
+    Raises:
+        ValueError: If the case is unknown.
+    """
+    if case not in DFLT_CASES:
+        raise ValueError(f'Case {case} not supported (ALLOWED: {" ".join(DFLT_CASES)})')
+    nodes, elements = mesh if mesh is not None else structuredMesh(nbCells, kind)
+    fields = [transientField(nodes, nbSteps)] if nbSteps > 0 else []
+    spec = DFLT_CASES[case]
+    with tempfile.TemporaryDirectory(prefix='meshrw-bench-') as tmpDir:
+        filename = Path(tmpDir) / 'bench'
+        if 'write' in spec:
+            elapsed, peak = measure(lambda: spec['write'](filename, nodes, elements, fields), repeat, memory)
+            size = getDirectorySize(Path(tmpDir))
+        else:
+            spec['setup'](filename, nodes, elements, fields)
+            size = getDirectorySize(Path(tmpDir))
+            elapsed, peak = measure(lambda: spec['read'](filename), repeat, memory)
+    nbElems = sum(e['connectivity'].shape[0] for e in elements)
+    return {'case': case, 'kind': kind, 'cells': nbElems, 'nodes': nodes.shape[0], 'steps': nbSteps,
+            'time': elapsed, 'size': size, 'MBs': size / 1024**2 / elapsed, 'cellsPerSec': nbElems / elapsed,
+            'peakMemory': peak}
+
+
+def benchmarkMulti(nbCells: int,
+                   kind: str='TET4',
+                   targets: Optional[list]=None,
+                   nbSteps: int=0,
+                   repeat: int=1,
+                   mesh: Optional[tuple]=None)-> dict:
+    """
+    Compare the fan-out writer (`multi.MultiWriter`, one call for all the targets) with the
+    writers of the targets called one after the other on the same synthetic mesh.
+
+    The connectivity numbered from 1 used by the separate MSH writers is built before the
+    timing, so that the difference only comes from the data and the encoded sections shared
+    by the fan-out writer.
+
+    Args:
+        nbCells (int): The target number of cells.
+        kind (str, optional): The kind of mesh (see `structuredMesh`). Defaults to 'TET4'.
+        targets (Optional[list], optional): The names of the output files (writer chosen from
+            the extension, see `multi.getTarget`, default: DFLT_MULTI_TARGETS).
+        nbSteps (int, optional): The number of steps of the transient nodal field (0: no field).
+            Defaults to 0.
+        repeat (int, optional): The number of timed runs (the best time is kept). Defaults to 1.
+        mesh (Optional[tuple], optional): The nodes and elements (built if None). Defaults to None.
+
+    Returns:
+        dict: The result with keys 'kind', 'cells', 'nodes', 'steps', 'targets', 'separate'
+        (time of the separate writers, s), 'multi' (time of the fan-out writer, s) and
+        'speedup' (ratio of the times).
+    """
+    nodes, elements = mesh if mesh is not None else structuredMesh(nbCells, kind)
+    fields = [transientField(nodes, nbSteps)] if nbSteps > 0 else []
+    targets = list(targets or DFLT_MULTI_TARGETS)
+    inputs = {offset: getInputs(nodes, elements, fields, offset) for offset in (0, 1)}
+    with tempfile.TemporaryDirectory(prefix='meshrw-bench-') as tmpDir:
+        descs = [multi.getTarget(Path(tmpDir) / 'separate' / t) for t in targets]
+
+        def writeSeparate()-> None:
+            for desc in descs:
+                module = importlib.import_module(f'.{desc["writer"]}', __package__)
+                module.writer(filename=desc['filename'], opts=desc['opts'],
+                              **inputs[multi.DFLT_WRITER_OFFSETS[desc['writer']]])
+
+        def writeMulti()-> None:
+            multi.MultiWriter([Path(tmpDir) / 'multi' / t for t in targets], offset=0, **inputs[0])
+
+        separate, _ = measure(writeSeparate, repeat, memory=False)
+        fanOut, _ = measure(writeMulti, repeat, memory=False)
+    nbElems = sum(e['connectivity'].shape[0] for e in elements)
+    return {'kind': kind, 'cells': nbElems, 'nodes': nodes.shape[0], 'steps': nbSteps, 'targets': targets,
+            'separate': separate, 'multi': fanOut, 'speedup': separate / fanOut}
+
+
+def getMetadata()-> dict:
+    """
+    Get the description of the environment of a benchmark (versions and git commit).
+
+    Returns:
+        dict: The metadata.
+    """
+    commit = None
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=Path(__file__).parent, capture_output=True,
+                                text=True, check=True, timeout=10).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        pass
+    return {'version': __version__, 'commit': commit, 'python': platform.python_version(),
+            'numpy': np.__version__, 'platform': platform.platform(), 'date': time.strftime('%Y-%m-%dT%H:%M:%S')}
+
+
+def measureImport(module: str, repeat: int=5)-> dict:
+    """
+    Measure the time to import a module in a new interpreter.
+
+    Args:
+        module (str): The name of the module (e.g. 'meshRW.vtk').
+        repeat (int, optional): The number of interpreters (the best time is kept). Defaults to 5.
+
+    Returns:
+        dict: The result with keys 'module', 'time' (s) and 'backends' (heavy backends of
+        DFLT_BACKENDS loaded by the import).
+    """
+    code = ('import sys, time, json\n'
+            'tic = time.perf_counter()\n'
+            f'import {module}\n'
+            'elapsed = time.perf_counter() - tic\n'
+            f'print(json.dumps([elapsed, [b for b in {list(DFLT_BACKENDS)!r} if b in sys.modules]]))')
+    best = float('inf')
+    backends = []
+    for _ in range(max(repeat, 1)):
+        out = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True,
+                             cwd=Path(__file__).parent.parent).stdout
+        elapsed, backends = json.loads(out.splitlines()[-1])
+        best = min(best, elapsed)
+    return {'module': module, 'time': best, 'backends': backends}
+
+
+def benchmarkImports(modules: Optional[list]=None, repeat: int=5)-> list:
+    """
+    Measure the import time of the modules of meshRW (see `measureImport`).
+
+    Args:
+        modules (Optional[list], optional): The modules (default: DFLT_IMPORTS).
+        repeat (int, optional): The number of interpreters per module. Defaults to 5.
+
+    Returns:
+        list: The results.
+    """
+    results = []
+    for module in modules or DFLT_IMPORTS:
+        res = measureImport(module, repeat)
+        Logger.info(f'import {module}: {res["time"]:.3g}s (backends: {", ".join(res["backends"]) or "none"})')
+        results.append(res)
+    return results
+
+
+def runBenchmark(cases: Optional[list]=None,
+                 sizes: Optional[list]=None,
+                 kinds: Optional[list]=None,
+                 nbSteps: int=0,
+                 repeat: int=1,
+                 memory: bool=True)-> dict:
+    """
+    Run the benchmark suite.
+
+    The cases whose module cannot be imported (e.g. `msh2` without gmsh) are skipped.
+
+    Args:
+        cases (Optional[list], optional): The cases (default: all the cases of DFLT_CASES).
+        sizes (Optional[list], optional): The numbers of cells (default: DFLT_SIZES).
+        kinds (Optional[list], optional): The kinds of meshes (default: DFLT_KINDS).
+        nbSteps (int, optional): The number of steps of the transient field. Defaults to 0.
+        repeat (int, optional): The number of timed runs. Defaults to 1.
+        memory (bool, optional): Measure the peak of memory. Defaults to True.
+
+    Returns:
+        dict: The metadata ('meta') and the list of the results ('results', see `runCase`).
+    """
+    results = []
+    cases = [case for case in cases or list(DFLT_CASES) if isAvailable(case)]
+    for kind in kinds or DFLT_KINDS:
+        for nbCells in sizes or DFLT_SIZES:
+            mesh = structuredMesh(int(nbCells), kind)
+            for case in cases:
+                res = runCase(case, int(nbCells), kind, nbSteps, repeat, memory, mesh)
+                Logger.info(f'{case} {kind} {res["cells"]} cells: {res["time"]:.3g}s '
+                            f'({res["MBs"]:.3g} MB/s, {res["cellsPerSec"]:.3g} cells/s)')
+                results.append(res)
+    return {'meta': getMetadata(), 'results': results}
+
+
+def saveResults(results: dict, filename: Union[str, Path])-> None:
+    """
+    Save the results of a benchmark in a JSON file.
+
+    Args:
+        results (dict): The results (see `runBenchmark`).
+        filename (Union[str, Path]): The path to the JSON file.
+    """
+    Path(filename).write_text(json.dumps(results, indent=1))
+
+
+def loadResults(filename: Union[str, Path])-> dict:
+    """
+    Load the results of a benchmark from a JSON file.
+
+    Args:
+        filename (Union[str, Path]): The path to the JSON file.
+
+    Returns:
+        dict: The results (see `runBenchmark`).
+    """
+    return json.loads(Path(filename).read_text())
+
+
+def compareResults(reference: dict, current: dict, tolerance: float=DFLT_TOLERANCE)-> list:
+    """
+    Compare the results of two benchmarks (e.g. two commits).
+
+    The results are matched by case, kind of mesh, number of cells and number of steps.
+
+    Args:
+        reference (dict): The reference results (see `runBenchmark`).
+        current (dict): The new results.
+        tolerance (float, optional): The relative increase of time reported as a regression.
+            Defaults to DFLT_TOLERANCE.
+
+    Returns:
+        list: One dictionary per common benchmark with keys 'case', 'kind', 'cells', 'steps',
+        'timeRef', 'time', 'ratio' (time / timeRef), 'memoryRatio' (None if not measured)
+        and 'regression'.
+    """
+    def key(res):
+        return (res['case'], res['kind'], res['cells'], res['steps'])
+
+    refs = {key(res): res for res in reference['results']}
+    comparison = []
+    for res in current['results']:
+        ref = refs.get(key(res))
+        if ref is None:
+            continue
+        ratio = res['time'] / ref['time']
+        memoryRatio = None
+        if res['peakMemory'] and ref['peakMemory']:
+            memoryRatio = res['peakMemory'] / ref['peakMemory']
+        comparison.append({'case': res['case'], 'kind': res['kind'], 'cells': res['cells'], 'steps': res['steps'],
+                           'timeRef': ref['time'], 'time': res['time'], 'ratio': ratio,
+                           'memoryRatio': memoryRatio, 'regression': ratio > 1 + tolerance})
+    return comparison
@@ -0,0 +1,470 @@
+"""
+This file is part of the meshRW package
+---
+This file includes the command line interface `meshrw` (batch conversion, information and benchmark of mesh files).
+----
+Luc Laurent - luc.laurent@lecnam.net -- 2021
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Optional, Union
+
+from loguru import logger as Logger
+
+from . import __version__, benchmark, convert, fileio, msh4, precision, vtk, vtu
+
+# extensions of the source files found in the directories
+DFLT_SOURCE_SUFFIXES: tuple = ('.msh',)
+# readers used by `meshrw info` (by extension)
+DFLT_INFO_READERS: dict = {
+    '.msh': msh4.mshReader,
+    '.vtk': vtk.vtkReader,
+    '.vtu': vtu.vtuReader,
+}
+# name of the file storing the hashes of the converted sources (in the output directory)
+DFLT_MANIFEST: str = '.meshrw-manifest.json'
+# size of the blocks read to compute the hash of the files
+DFLT_HASH_BLOCK_SIZE: int = 1 << 20
+
+
+def getSuffix(filename: Union[str, Path])-> str:
+    """
+    Get the extension of a mesh file without the extension of the compression codec.
+
+    Args:
+        filename (Union[str, Path]): The path to the file.
+
+    Returns:
+        str: The extension of the mesh file (e.g. '.msh' for 'mesh.msh.gz').
+    """
+    path = Path(filename)
+    if fileio.getCodecFromExtension(path) is not None:
+        path = path.with_suffix('')
+    return path.suffix
+
+
+def parsePrecision(value: str)-> Union[str, int]:
+    """
+    Convert the `--precision` argument (name of a policy or number of significant digits).
+
+    Args:
+        value (str): The argument.
+
+    Returns:
+        Union[str, int]: The precision policy (see `precision.getPolicy`).
+
+    Raises:
+        argparse.ArgumentTypeError: If the policy is unknown.
+    """
+    policy = int(value) if value.isdigit() else value
+    try:
+        precision.getPolicy(policy)
+    except ValueError as err:
+        raise argparse.ArgumentTypeError(str(err)) from err
+    return policy
+
+
+def findFiles(inputs: list, suffixes: tuple=DFLT_SOURCE_SUFFIXES)-> list:
+    """
+    Find the files matching a list of globs, files or directories.
+
+    Directories are searched recursively for the files with one of the `suffixes`
+    (possibly compressed).
+
+    Args:
+        inputs (list): Globs, files or directories.
+        suffixes (tuple, optional): Extensions of the files found in the directories.
+            Defaults to DFLT_SOURCE_SUFFIXES.
+
+    Returns:
+        list: Tuples (file, root) where root is the directory given as input or the part of
+        the glob without wildcards (None for files), without duplicates.
+    """
+    files = {}
+    for item in inputs:
+        path = Path(item)
+        if path.is_dir():
+            for filename in sorted(path.rglob('*')):
+                if filename.is_file() and getSuffix(filename) in suffixes:
+                    files.setdefault(filename.resolve(), (filename, path))
+            continue
+        matches = sorted(glob.glob(str(item), recursive=True)) or ([item] if path.is_file() else [])
+        if not matches:
+            Logger.warning(f'No file matching {item}')
+        root = None
+        if glob.has_magic(str(item)):
+            root = Path(*path.parts[:next(i for i, p in enumerate(path.parts) if glob.has_magic(p))])
+        for filename in matches:
+            if Path(filename).is_file():
+                files.setdefault(Path(filename).resolve(), (Path(filename), root))
+    return list(files.values())
+
+
+def getTarget(source: Path, root: Optional[Path], outputDir: Optional[Path], extension: str)-> Path:
+    """
+    Build the path of the converted file.
+
+    Args:
+        source (Path): The path to the source file.
+        root (Optional[Path]): The directory in which the source has been found (the
+            subdirectories are kept in the output directory).
+        outputDir (Optional[Path]): The output directory (None: directory of the source).
+        extension (str): The extension of the converted file (e.g. '.vtu').
+
+    Returns:
+        Path: The path to the converted file.
+    """
+    name = source.name
+    if fileio.getCodecFromExtension(source) is not None:
+        name = Path(name).stem
+    name = Path(name).stem + extension
+    if outputDir is None:
+        return source.parent / name
+    if root is not None:
+        return outputDir / source.parent.relative_to(root) / name
+    return outputDir / name
+
+
+def hashFile(filename: Union[str, Path])-> str:
+    """
+    Compute the SHA-256 digest of a file.
+
+    Args:
+        filename (Union[str, Path]): The path to the file.
+
+    Returns:
+        str: The hexadecimal digest.
+    """
+    digest = hashlib.sha256()
+    with open(filename, 'rb') as hf:
+        for block in iter(lambda: hf.read(DFLT_HASH_BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def setLogger(level: str)-> None:
+    """
+    Set the level of the messages displayed by loguru (also used to initialize the workers).
+
+    Args:
+        level (str): The minimal level of the messages (e.g. 'WARNING').
+    """
+    Logger.remove()
+    Logger.add(sys.stderr, level=level)
+
+
+def convertFile(task: dict)-> dict:
+    """
+    Convert a file (run in the workers).
+
+    The conversion is skipped if the target is up to date: more recent than the source
+    ('mtime' check) or converted from a source with the same digest ('hash' check).
+
+    Args:
+        task (dict): The conversion with keys 'source', 'target', 'check' ('mtime' or 'hash'),
+            'force' (always convert), 'hash' (digest of the previous source), 'chunkSize' and
+            'opts' (options of the writer).
+
+    Returns:
+        dict: The result with keys 'source', 'target', 'status' ('converted', 'skipped'
+        or 'failed'), 'size' (bytes of the source), 'nbNodes', 'nbElems', 'elapsed',
+        'hash' and 'error'.
+    """
+    source, target = Path(task['source']), Path(task['target'])
+    result = {'source': str(source), 'target': str(target), 'status': 'skipped', 'size': source.stat().st_size,
+              'nbNodes': 0, 'nbElems': 0, 'elapsed': 0.0, 'hash': task.get('hash'), 'error': None}
+    check = task.get('check')
+    if check == 'hash':
+        result['hash'] = hashFile(source)
+    if target.exists() and not task.get('force'):
+        if check == 'mtime' and target.stat().st_mtime >= source.stat().st_mtime:
+            return result
+        if check == 'hash' and result['hash'] == task.get('hash'):
+            return result
+    target.parent.mkdir(parents=True, exist_ok=True)
+    # written next to the target (same extensions) and renamed once complete: a failed
+    # conversion does not leave a truncated target seen as up to date by the next run
+    partial = target.with_name(f'.{os.getpid()}-{target.name}')
+    tic = time.perf_counter()
+    try:
+        stats = convert.convert(source, partial, chunkSize=task['chunkSize'], opts=task.get('opts'))
+        os.replace(partial, target)
+    except Exception as err:  # noqa: BLE001 - reported in the summary of the batch
+        partial.unlink(missing_ok=True)
+        result.update(status='failed', error=f'{type(err).__name__}: {err}', hash=None)
+        return result
+    result.update(status='converted', nbNodes=stats['nbNodes'], nbElems=stats['nbElems'],
+                  elapsed=time.perf_counter() - tic)
+    return result
+
+
+def loadManifest(filename: Path)-> dict:
+    """
+    Load the digests of the converted sources.
+
+    Args:
+        filename (Path): The path to the manifest.
+
+    Returns:
+        dict: The digests of the sources (keys are the paths to the targets).
+    """
+    if not filename.exists():
+        return {}
+    try:
+        return json.loads(filename.read_text())
+    except ValueError:
+        Logger.warning(f'Manifest {filename} not readable: ignored')
+        return {}
+
+
+def runConvert(args: argparse.Namespace)-> int:
+    """
+    Run the `convert` command.
+
+    Args:
+        args (argparse.Namespace): The arguments of the command.
+
+    Returns:
+        int: The exit code (1 if a conversion failed).
+    """
+    outputDir = Path(args.output) if args.output else None
+    extension = f'.{args.format}'
+    tasks = []
+    manifests = {}
+    for source, root in findFiles(args.inputs):
+        target = getTarget(source, root, outputDir, extension)
+        manifestFile = target.parent.resolve() / DFLT_MANIFEST
+        if args.check == 'hash' and manifestFile not in manifests:
+            manifests[manifestFile] = loadManifest(manifestFile)
+        tasks.append({'source': str(source), 'target': str(target),
+                      'check': args.check, 'force': args.force,
+                      'hash': manifests.get(manifestFile, {}).get(target.name),
+                      'chunkSize': args.chunk_size,
+                      'opts': {'binary': args.binary, 'precision': args.precision}})
+    if not tasks:
+        Logger.error('No file to convert')
+        return 1
+    tic = time.perf_counter()
+    results = []
+    if args.jobs == 1:
+        results = [convertFile(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=args.jobs, initializer=setLogger, initargs=(args.log_level,)) as pool:
+            futures = [pool.submit(convertFile, task) for task in tasks]
+            for future in as_completed(futures):
+                results.append(future.result())
+    elapsed = time.perf_counter() - tic
+    # results sorted as the inputs
+    order = {task['source']: it for it, task in enumerate(tasks)}
+    results.sort(key=lambda r: order[r['source']])
+    for result in results:
+        if result['status'] == 'failed':
+            print(f'failed     {result["source"]}: {result["error"]}')
+        else:
+            print(f'{result["status"]:<10} {result["source"]} -> {result["target"]}')
+    # update the digests of the sources
+    if args.check == 'hash':
+        for result in results:
+            target = Path(result['target'])
+            manifest = manifests.setdefault(target.parent.resolve() / DFLT_MANIFEST, {})
+            if result['hash'] is None:
+                manifest.pop(target.name, None)
+            else:
+                manifest[target.name] = result['hash']
+        for manifestFile, manifest in manifests.items():
+            if manifestFile.parent.exists():
+                manifestFile.write_text(json.dumps(manifest, indent=1, sort_keys=True))
+    converted = [r for r in results if r['status'] == 'converted']
+    nbFailed = sum(r['status'] == 'failed' for r in results)
+    size = sum(r['size'] for r in converted) / 1024**2
+    nbElems = sum(r['nbElems'] for r in converted)
+    print(f'{len(converted)} converted, {len(results) - len(converted) - nbFailed} skipped, {nbFailed} failed '
+          f'in {elapsed:.3g}s: {size:.3g} MB ({size / elapsed:.3g} MB/s), '
+          f'{nbElems} elements ({nbElems / elapsed:.3g} elements/s)')
+    return int(nbFailed > 0)
+
+
+def runInfo(args: argparse.Namespace)-> int:
+    """
+    Run the `info` command: display the nodes, elements and fields of the files.
+
+    Args:
+        args (argparse.Namespace): The arguments of the command.
+
+    Returns:
+        int: The exit code (1 if an input does not match any file or if a file cannot be read).
+    """
+    status = 0
+    for item in args.inputs:
+        if not Path(item).exists() and not glob.glob(str(item), recursive=True):
+            Logger.error(f'No file matching {item}')
+            status = 1
+    for filename, _ in findFiles(args.inputs, tuple(DFLT_INFO_READERS)):
+        suffix = getSuffix(filename)
+        if suffix not in DFLT_INFO_READERS:
+            Logger.error(f'Extension of {filename} not supported')
+            status = 1
+            continue
+        try:
+            mesh = DFLT_INFO_READERS[suffix](filename=filename)
+            if suffix == '.msh':
+                types = {k: v.shape[0] for k, v in mesh.elems.items()}
+                fields = mesh.getFields()
+            else:
+                types = {e['type']: e['connectivity'].shape[0] for e in mesh.getElements()}
+                fields = [f['name'] for f in mesh.getFields()]
+        except Exception as err:  # noqa: BLE001 - reported, the other files are displayed
+            Logger.error(f'Unable to read {filename}: {type(err).__name__}: {err}')
+            status = 1
+            continue
+        print(f'{filename}: {mesh.getNodes().shape[0]} nodes, {sum(types.values())} elements')
+        for elemType, nb in types.items():
+            print(f'  {elemType}: {nb}')
+        if fields:
+            print(f'  fields: {", ".join(fields)}')
+    return status
+
+
+def runBench(args: argparse.Namespace)-> int:
+    """
+    Run the `bench` command: compression ratio and throughputs of the codecs on the files,
+    without file, benchmark suite of the readers and writers on synthetic meshes or, with
+    `--imports`, import time of the modules or, with `--multi`, fan-out writer against the
+    separate writers.
+
+    Args:
+        args (argparse.Namespace): The arguments of the command.
+
+    Returns:
+        int: The exit code (1 if a regression is found with `--compare`).
+    """
+    if args.imports:
+        for res in benchmark.benchmarkImports(repeat=max(args.repeat, 5)):
+            print(f'import {res["module"]:<12} {res["time"]:8.3g}s backends: {", ".join(res["backends"]) or "none"}')
+        return 0
+    if args.multi:
+        for kind in args.kinds or ['TET4']:
+            for nbCells in args.sizes or [1e5]:
+                res = benchmark.benchmarkMulti(int(nbCells), kind, nbSteps=args.steps, repeat=args.repeat)
+                print(f'{kind:<5} {res["cells"]:>9} cells {" ".join(res["targets"])}: separate {res["separate"]:8.3g}s '
+                      f'multi {res["multi"]:8.3g}s x{res["speedup"]:.3g}')
+        return 0
+    if not args.inputs:
+        return runSuite(args)
+    for filename, _ in findFiles(args.inputs, tuple(DFLT_INFO_READERS)):
+        print(f'{filename}:')
+        for res in fileio.benchmarkCodecs(filename, codecs=args.codecs, repeat=args.repeat):
+            print(f'  {res["codec"]:<6} level {res["level"]!s:<4} ratio {res["ratio"]:6.3g} '
+                  f'compression {res["compressMBs"]:8.3g} MB/s decompression {res["decompressMBs"]:8.3g} MB/s')
+    return 0
+
+
+def runSuite(args: argparse.Namespace)-> int:
+    """
+    Run the benchmark suite of the readers and writers (`meshrw bench` without file).
+
+    Args:
+        args (argparse.Namespace): The arguments of the command.
+
+    Returns:
+        int: The exit code (1 if a regression is found with `--compare`).
+    """
+    results = benchmark.runBenchmark(cases=args.cases, sizes=args.sizes, kinds=args.kinds, nbSteps=args.steps,
+                                     repeat=args.repeat, memory=not args.no_memory)
+    for res in results['results']:
+        memory = f'{res["peakMemory"] / 1024**2:8.3g} MB' if res['peakMemory'] is not None else ''
+        print(f'{res["case"]:<15} {res["kind"]:<5} {res["cells"]:>9} cells {res["time"]:8.3g}s '
+              f'{res["MBs"]:8.3g} MB/s {res["cellsPerSec"]:8.3g} cells/s {memory}')
+    if args.output:
+        benchmark.saveResults(results, args.output)
+    if not args.compare:
+        return 0
+    comparison = benchmark.compareResults(benchmark.loadResults(args.compare), results, args.tolerance)
+    for res in comparison:
+        flag = 'REGRESSION' if res['regression'] else ''
+        print(f'{res["case"]:<15} {res["kind"]:<5} {res["cells"]:>9} cells x{res["ratio"]:.3g} {flag}')
+    return int(any(res['regression'] for res in comparison))
+
+
+def getParser()-> argparse.ArgumentParser:
+    """
+    Build the parser of the arguments of `meshrw`.
+
+    Returns:
+        argparse.ArgumentParser: The parser.
+    """
+    parser = argparse.ArgumentParser(prog='meshrw', description='Batch tools for msh and VTK mesh files')
+    parser.add_argument('--version', action='version', version=f'%(prog)s {__version__}')
+    parser.add_argument('--log-level', default='WARNING', help='level of the log messages (default: WARNING)')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    # convert
+    parserConvert = subparsers.add_parser('convert', help='convert msh files to VTK files')
+    parserConvert.add_argument('inputs', nargs='+', help='msh files, globs or directories')
+    parserConvert.add_argument('-o', '--output', help='output directory (default: directory of the sources)')
+    parserConvert.add_argument('-f', '--format', choices=['vtu', 'vtk'], default='vtu', help='output format')
+    parserConvert.add_argument('--binary', action='store_true', help='binary legacy VTK files')
+    parserConvert.add_argument('--precision', type=parsePrecision, default=convert.DFLT_PRECISION,
+                               help='precision of the coordinates in ASCII legacy VTK files: '
+                                    f'{", ".join(precision.POLICIES)} or number of significant digits '
+                                    f'(default: {convert.DFLT_PRECISION})')
+    parserConvert.add_argument('-j', '--jobs', type=int, default=os.cpu_count(),
+                               help='number of processes (default: number of CPUs)')
+    parserConvert.add_argument('--chunk-size', type=int, default=convert.DFLT_CHUNK_SIZE,
+                               help='number of nodes/elements converted at once')
+    parserConvert.add_argument('--check', choices=['mtime', 'hash'], default='mtime',
+                               help='skip the sources not modified since the last conversion')
+    parserConvert.add_argument('--force', action='store_true', help='convert all the sources')
+    parserConvert.set_defaults(func=runConvert)
+    # info
+    parserInfo = subparsers.add_parser('info', help='display the contents of mesh files')
+    parserInfo.add_argument('inputs', nargs='+', help='mesh files (.msh, .vtk, .vtu), globs or directories')
+    parserInfo.set_defaults(func=runInfo)
+    # bench
+    parserBench = subparsers.add_parser('bench', help='benchmark the compression codecs on mesh files '
+                                        'or (without file) the readers and writers on synthetic meshes')
+    parserBench.add_argument('inputs', nargs='*', help='mesh files, globs or directories')
+    parserBench.add_argument('--codecs', nargs='+', help='codecs to benchmark (default: all)')
+    parserBench.add_argument('--repeat', type=int, default=1, help='number of repetitions')
+    parserBench.add_argument('--cases', nargs='+', choices=list(benchmark.DFLT_CASES),
+                             help='readers/writers to benchmark (default: all)')
+    parserBench.add_argument('--sizes', nargs='+', type=float, help='numbers of cells (default: 1e3 to 1e7)')
+    parserBench.add_argument('--kinds', nargs='+', choices=benchmark.DFLT_KINDS, help='kinds of meshes')
+    parserBench.add_argument('--steps', type=int, default=0, help='number of steps of the transient field')
+    parserBench.add_argument('--no-memory', action='store_true', help='do not measure the peak of memory')
+    parserBench.add_argument('--output', help='JSON file of the results')
+    parserBench.add_argument('--compare', help='JSON file of reference results')
+    parserBench.add_argument('--tolerance', type=float, default=benchmark.DFLT_TOLERANCE,
+                             help='relative slowdown reported as a regression')
+    parserBench.add_argument('--imports', action='store_true',
+                             help='measure the import time of the modules (and the backends they load)')
+    parserBench.add_argument('--multi', action='store_true',
+                             help='compare the fan-out writer with the separate writers (default size: 1e5 cells)')
+    parserBench.set_defaults(func=runBench)
+    return parser
+
+
+def main(argv: Optional[list]=None)-> int:
+    """
+    Entry point of `meshrw`.
+
+    Args:
+        argv (Optional[list], optional): The arguments (default: arguments of the command line).
+
+    Returns:
+        int: The exit code.
+    """
+    args = getParser().parse_args(argv)
+    setLogger(args.log_level)
+    return args.func(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
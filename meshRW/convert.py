@@ -0,0 +1,667 @@
+"""
+This file is part of the meshRW package
+---
+This file includes the conversion of msh files to VTK files (legacy .vtk or .vtu) by chunks.
+----
+Luc Laurent - luc.laurent@lecnam.net -- 2021
+"""
+
+import shutil
+import tempfile
+from itertools import islice
+from pathlib import Path
+from typing import IO, Iterator, Optional, Union, cast
+
+import numpy as np
+from loguru import logger as Logger
+
+from . import configMESH, dbelem, dbmsh, dbvtk, fileio, msh, msh4, precision
+
+# default number of nodes/elements read and written at once
+DFLT_CHUNK_SIZE: int = 100000
+# default precision of the coordinates in ASCII files (exact round trip, see `precision.getPolicy`)
+DFLT_PRECISION: str = 'repr'
+# permutations of the nodes from the msh ordering to the VTK ordering
+DFLT_MSH_TO_VTK_ORDER: dict = {
+    'TET10': [0, 1, 2, 3, 4, 5, 6, 7, 9, 8],
+    'HEX20': [0, 1, 2, 3, 4, 5, 6, 7, 8, 11, 13, 9, 16, 18, 19, 17, 10, 12, 14, 15],
+}
+
+
+class NodeMap:
+    """
+    Map the tags of the nodes to their indexes (order of the nodes in the file).
+
+    Contiguous tags (1, 2, ..., N in the order of the file) do not require any storage;
+    a lookup table (size of the largest tag) is only built for other numberings.
+
+    Attributes:
+        nbNodes (int): The number of nodes registered.
+        lookup (Optional[np.ndarray]): The index of each tag (-1 for unused tags), None for
+            contiguous tags.
+    """
+
+    def __init__(self)-> None:
+        """
+        Initializes an empty map.
+        """
+        self.nbNodes = 0
+        self.lookup = None
+
+    def add(self, tags: np.ndarray)-> None:
+        """
+        Register the tags of the next nodes of the file.
+
+        Args:
+            tags (np.ndarray): The tags of the nodes.
+        """
+        nb = tags.shape[0]
+        if self.lookup is None:
+            if np.array_equal(tags, np.arange(self.nbNodes + 1, self.nbNodes + 1 + nb)):
+                self.nbNodes += nb
+                return
+            Logger.debug('Non contiguous tags of nodes: use a lookup table')
+            self.lookup = np.arange(-1, self.nbNodes, dtype=np.int64)
+        if nb and tags.max() >= self.lookup.shape[0]:
+            lookup = np.full(int(tags.max()) + 1, -1, dtype=np.int64)
+            lookup[:self.lookup.shape[0]] = self.lookup
+            self.lookup = lookup
+        self.lookup[tags] = np.arange(self.nbNodes, self.nbNodes + nb)
+        self.nbNodes += nb
+
+    def index(self, tags: np.ndarray)-> np.ndarray:
+        """
+        Get the indexes of nodes from their tags.
+
+        Args:
+            tags (np.ndarray): The tags of the nodes.
+
+        Returns:
+            np.ndarray: The indexes of the nodes (from 0).
+        """
+        if self.lookup is None:
+            return tags - 1
+        return self.lookup[tags]
+
+
+class MSHChunkReader(msh4.MSHReader):
+    """
+    Read msh files (v2.2 ASCII or v4.1 ASCII/binary) by chunks of nodes and elements.
+
+    The file is read sequentially and only `chunkSize` nodes or elements are converted
+    at once (with NumPy): `iterChunks` yields the chunks in the order of the file. The
+    parsers of the `$Entities` section are inherited from `msh4.MSHReader`.
+
+    Attributes:
+        chunkSize (int): The number of nodes/elements per chunk.
+    """
+
+    def __init__(self,
+                 filename: Union[str, Path],
+                 chunkSize: int=DFLT_CHUNK_SIZE)-> None:
+        """
+        Initializes the reader and reads the header of the file.
+
+        Args:
+            filename (Union[str, Path]): The path to the msh file.
+            chunkSize (int, optional): The number of nodes/elements per chunk.
+                Defaults to DFLT_CHUNK_SIZE.
+
+        Raises:
+            ValueError: If the format of the file is not supported.
+        """
+        self.initContent()
+        self.filename = filename
+        self.chunkSize = max(int(chunkSize), 1)
+        self.version = ''
+        self.binary = False
+        self.endian = '<'
+        self.entities = {}
+        self.objFile = fileio.fileHandler(filename=filename, right='rb', safeMode=False)
+        self.fhandle = cast(IO[bytes], self.objFile.getHandler())
+        try:
+            self.readStreamHeader()
+        except Exception:
+            self.objFile.close()
+            raise
+
+    def readStreamHeader(self)-> None:
+        """
+        Read the `$MeshFormat` section.
+
+        Raises:
+            ValueError: If the section is missing or if the format is not supported.
+        """
+        line = self.fhandle.readline()
+        while line and line.strip() != dbmsh.DFLT_FILE_OPEN_CLOSE['open'].encode():
+            line = self.fhandle.readline()
+        if not line:
+            raise ValueError(f'{dbmsh.DFLT_FILE_OPEN_CLOSE["open"]} section not found')
+        version, fileType, _ = self.fhandle.readline().split()
+        self.version = version.decode()
+        self.binary = int(fileType) == 1
+        if self.binary and not self.version.startswith('4'):
+            raise ValueError(f'Binary msh files of version {self.version} not supported')
+        if self.binary:
+            # integer 1 written in binary mode to detect the endianness
+            self.endian = '<' if np.frombuffer(self.fhandle.read(4), '<i4')[0] == 1 else '>'
+        self.skipSection(dbmsh.DFLT_FILE_OPEN_CLOSE['close'])
+
+    def skipSection(self, closeTag: str)-> bytes:
+        """
+        Read the file up to the closing tag of a section.
+
+        Args:
+            closeTag (str): The closing tag.
+
+        Returns:
+            bytes: The content read before the closing tag.
+        """
+        content = []
+        for line in self.fhandle:
+            if line.startswith(closeTag.encode()):
+                break
+            content.append(line)
+        return b''.join(content)
+
+    def readLines(self, nb: int)-> bytes:
+        """
+        Read lines of the file.
+
+        Args:
+            nb (int): The number of lines.
+
+        Returns:
+            bytes: The lines.
+
+        Raises:
+            ValueError: If the end of the file is reached before.
+        """
+        lines = list(islice(self.fhandle, nb))
+        if len(lines) < nb:
+            raise ValueError(f'Unexpected end of file ({len(lines)} lines read, {nb} expected)')
+        return b''.join(lines)
+
+    def readRows(self, nb: int, nbCols: int, dtype: str)-> np.ndarray:
+        """
+        Read rows of values (one line per row in ASCII mode).
+
+        Args:
+            nb (int): The number of rows.
+            nbCols (int): The number of values per row.
+            dtype (str): The type of the values in binary mode ('u8' or 'f8').
+
+        Returns:
+            np.ndarray: The values (nb x nbCols), int64 or float64.
+        """
+        if self.binary:
+            values = np.frombuffer(self.fhandle.read(nb * nbCols * 8), self.endian + dtype)
+        else:
+            values = np.fromstring(self.readLines(nb).decode('ascii'), sep=' ')
+        values = values.reshape(nb, nbCols)
+        return values.astype(np.int64) if dtype == 'u8' else values.astype(np.float64)
+
+    def readBlockHeader(self)-> tuple:
+        """
+        Read the header of a block of nodes/elements (v4.1).
+
+        Returns:
+            tuple: The dimension and the tag of the entity, the parameter/type and the number
+            of nodes/elements.
+        """
+        if self.binary:
+            dimE, tagE, param = np.frombuffer(self.fhandle.read(12), self.endian + 'i4').astype(int)
+            nb = int(np.frombuffer(self.fhandle.read(8), self.endian + 'u8')[0])
+            return int(dimE), int(tagE), int(param), nb
+        dimE, tagE, param, nb = self.fhandle.readline().split()
+        return int(dimE), int(tagE), int(param), int(nb)
+
+    def readSectionHeader(self)-> tuple:
+        """
+        Read the header of the `$Nodes`/`$Elements` sections.
+
+        Returns:
+            tuple: The number of blocks (1 for v2.2 files) and the number of nodes/elements.
+        """
+        if self.binary:
+            nbBlocks, nb = np.frombuffer(self.fhandle.read(32), self.endian + 'u8')[:2]
+            return int(nbBlocks), int(nb)
+        values = self.fhandle.readline().split()
+        if not self.version.startswith('4'):
+            return 1, int(values[0])
+        return int(values[0]), int(values[1])
+
+    def iterChunks(self)-> Iterator[tuple]:
+        """
+        Read the file by chunks.
+
+        Yields:
+            tuple: The events in the order of the file:
+                - ('nodes', number of nodes),
+                - ('nodeTags', tags of the next nodes),
+                - ('nodeCoords', coordinates of the next nodes),
+                - ('elements', number of elements),
+                - ('elementChunk', type of the elements, connectivity (tags of the nodes),
+                  physical group of each element (-1 without physical group)).
+        """
+        for line in self.fhandle:
+            name = line.strip().decode('utf-8', errors='replace')
+            if not name.startswith('$'):
+                continue
+            if name == dbmsh.DFLT_ENTITIES_OPEN_CLOSE['open']:
+                self.readEntities(self.skipSection(dbmsh.DFLT_ENTITIES_OPEN_CLOSE['close']))
+            elif name == dbmsh.DFLT_NODES_OPEN_CLOSE['open']:
+                yield from self.iterNodes()
+                self.skipSection(dbmsh.DFLT_NODES_OPEN_CLOSE['close'])
+            elif name == dbmsh.DFLT_ELEMS_OPEN_CLOSE['open']:
+                yield from self.iterElements()
+                self.skipSection(dbmsh.DFLT_ELEMS_OPEN_CLOSE['close'])
+            else:
+                Logger.debug(f'Skip section {name}')
+                self.skipSection('$End' + name[1:])
+        self.objFile.close()
+
+    def iterNodes(self)-> Iterator[tuple]:
+        """
+        Read the `$Nodes` section by chunks.
+
+        Yields:
+            tuple: The events ('nodes', number of nodes), ('nodeTags', tags) and
+            ('nodeCoords', coordinates).
+        """
+        nbBlocks, nbNodes = self.readSectionHeader()
+        yield ('nodes', nbNodes)
+        if not self.version.startswith('4'):
+            nb = nbNodes
+            for i0 in range(0, nb, self.chunkSize):
+                values = self.readRows(min(self.chunkSize, nb - i0), 4, 'f8')
+                yield ('nodeTags', values[:, 0].astype(np.int64))
+                yield ('nodeCoords', values[:, 1:])
+            return
+        for _ in range(nbBlocks):
+            dimE, _, param, nb = self.readBlockHeader()
+            for i0 in range(0, nb, self.chunkSize):
+                yield ('nodeTags', self.readRows(min(self.chunkSize, nb - i0), 1, 'u8')[:, 0])
+            nbCoor = 3 + (dimE if param else 0)
+            for i0 in range(0, nb, self.chunkSize):
+                yield ('nodeCoords', self.readRows(min(self.chunkSize, nb - i0), nbCoor, 'f8')[:, :3])
+
+    def iterElements(self)-> Iterator[tuple]:
+        """
+        Read the `$Elements` section by chunks.
+
+        Yields:
+            tuple: The events ('elements', number of elements) and ('elementChunk', type,
+            connectivity, physical groups).
+
+        Raises:
+            ValueError: If a type of element is not supported.
+        """
+        nbBlocks, nbElems = self.readSectionHeader()
+        yield ('elements', nbElems)
+        if not self.version.startswith('4'):
+            nb = nbElems
+            for i0 in range(0, nb, self.chunkSize):
+                yield from self.splitElementsV2(self.readLines(min(self.chunkSize, nb - i0)))
+            return
+        for _ in range(nbBlocks):
+            dimE, tagE, mshType, nb = self.readBlockHeader()
+            elemType = dbelem.MSH_TO_TYPE.get(mshType)
+            nbNodes = int(dbelem.getNumberNodesFromMSH(mshType))
+            if not nbNodes:
+                raise ValueError(f'Element type {mshType} not supported')
+            physical = self.entities.get((dimE, tagE)) or [-1]
+            for i0 in range(0, nb, self.chunkSize):
+                values = self.readRows(min(self.chunkSize, nb - i0), 1 + nbNodes, 'u8')
+                yield ('elementChunk', elemType, values[:, 1:], np.full(values.shape[0], physical[0]))
+
+    def splitElementsV2(self, content: bytes)-> Iterator[tuple]:
+        """
+        Convert lines of elements (v2.2) and split them by runs of elements of the same
+        type and number of tags.
+
+        Args:
+            content (bytes): The lines.
+
+        Yields:
+            tuple: The events ('elementChunk', type, connectivity, physical groups).
+
+        Raises:
+            ValueError: If a type of element is not supported.
+        """
+        values = np.fromstring(content.decode('ascii'), sep=' ', dtype=np.int64)
+        for elemType, nbTags, block in msh.splitElements(values):
+            physgrp = block[:, 3] if nbTags > 0 else np.full(block.shape[0], -1)
+            yield ('elementChunk', elemType, block[:, 3 + nbTags:], physgrp)
+
+
+class ChunkWriter:
+    """
+    Base class of the writers of VTK files by chunks.
+
+    The nodes are written (or spooled) as they come; the cells, their types and their
+    physical groups are spooled in temporary files (next to the output file) and copied
+    into the output file when it is closed, once their numbers are known.
+
+    Attributes:
+        filename (Path): The path to the output file.
+        nbNodes (int): The number of nodes written.
+        nbElems (int): The number of elements written.
+        nbConnectivity (int): The number of nodes in the connectivity of the elements.
+    """
+
+    def __init__(self, filename: Union[str, Path], opts: Optional[dict]=None)-> None:
+        """
+        Initializes the writer.
+
+        Args:
+            filename (Union[str, Path]): The path to the output file.
+            opts (Optional[dict], optional): The options of the writer. Defaults to None.
+        """
+        self.filename = Path(filename)
+        self.opts = opts or {}
+        self.nbNodes = 0
+        self.nbElems = 0
+        self.nbConnectivity = 0
+        self.spools = {}
+
+    def getSpool(self, name: str)-> IO[bytes]:
+        """
+        Get a temporary file used to spool data.
+
+        Args:
+            name (str): The name of the data.
+
+        Returns:
+            IO[bytes]: The temporary file.
+        """
+        if name not in self.spools:
+            self.spools[name] = tempfile.TemporaryFile(dir=self.filename.parent)
+        return self.spools[name]
+
+    def copySpool(self, name: str, fileHandle: IO[bytes])-> None:
+        """
+        Copy the content of a temporary file into the output file and delete it.
+
+        Args:
+            name (str): The name of the data.
+            fileHandle (IO[bytes]): The output file.
+        """
+        spool = self.spools.pop(name, None)
+        if spool is None:
+            return
+        spool.seek(0)
+        shutil.copyfileobj(spool, fileHandle, fileio.DFLT_BUFFER_SIZE)
+        spool.close()
+
+    def setNodes(self, nbNodes: int)-> None:
+        """
+        Declare the number of nodes (before the chunks of nodes).
+
+        Args:
+            nbNodes (int): The number of nodes.
+        """
+        _ = nbNodes
+
+    def writeNodes(self, coordinates: np.ndarray)-> None:
+        """
+        Write a chunk of nodes.
+
+        Args:
+            coordinates (np.ndarray): The coordinates of the nodes.
+        """
+        raise NotImplementedError
+
+    def writeElements(self, vtkType: int, connectivity: np.ndarray, physgrp: np.ndarray)-> None:
+        """
+        Write a chunk of elements of the same type.
+
+        Args:
+            vtkType (int): The VTK type of the elements.
+            connectivity (np.ndarray): The connectivity (indexes of the nodes from 0).
+            physgrp (np.ndarray): The physical group of each element (-1 without physical group).
+        """
+        raise NotImplementedError
+
+    def close(self)-> None:
+        """
+        Write the spooled data and close the output file.
+        """
+        raise NotImplementedError
+
+    def release(self)-> None:
+        """
+        Close the temporary files and the output file without writing the spooled data
+        (after a failure, no effect once the writer is closed).
+        """
+        for spool in self.spools.values():
+            spool.close()
+        self.spools = {}
+
+
+class VTKChunkWriter(ChunkWriter):
+    """
+    Write legacy VTK files (ASCII or binary with opts={'binary': True}) by chunks.
+    """
+
+    def __init__(self, filename: Union[str, Path], opts: Optional[dict]=None)-> None:
+        """
+        Initializes the writer and writes the header of the file.
+
+        Args:
+            filename (Union[str, Path]): The path to the output file.
+            opts (Optional[dict], optional): The options of the writer: 'binary' and
+                'precision' (ASCII files, see `precision.getPolicy`, defaults to
+                DFLT_PRECISION), 'title' and the compression options (see
+                `fileio.compressionOptions`). Defaults to None.
+        """
+        super().__init__(filename, opts)
+        self.binary = bool(self.opts.get('binary', False))
+        self.policy = precision.getPolicy(self.opts.get('precision', DFLT_PRECISION), 'nodes')
+        self.objFile = fileio.fileHandler(filename=self.filename, right='wb', safeMode=False,
+                                          **fileio.compressionOptions(self.opts))
+        self.fhandle = cast(IO[bytes], self.objFile.getHandler())
+        dataType = dbvtk.DFLT_TYPE_BINARY if self.binary else dbvtk.DFLT_TYPE_ASCII
+        self.writeText(f'{dbvtk.DFLT_HEADER_VERSION}\n{self.opts.get("title", "")}\n'
+                       f'{dataType}\n{dbvtk.DFLT_TYPE_MESH}\n')
+
+    def writeText(self, txt: str)-> None:
+        """
+        Write text in the output file.
+
+        Args:
+            txt (str): The text.
+        """
+        self.fhandle.write(txt.encode('utf-8'))
+
+    def writeArray(self, fileHandle: IO[bytes], values: np.ndarray, dtype: str)-> None:
+        """
+        Write an array (big-endian values in binary mode, rows of text in ASCII mode).
+
+        Args:
+            fileHandle (IO[bytes]): The file.
+            values (np.ndarray): The values.
+            dtype (str): The binary type of the values.
+        """
+        if self.binary:
+            fileHandle.write(np.ascontiguousarray(values, dtype=dtype).tobytes())
+            return
+        for chunk in precision.formatRows(values, self.policy):
+            fileHandle.write(chunk.encode('ascii'))
+
+    def setNodes(self, nbNodes: int)-> None:
+        self.writeText(f'{dbvtk.DFLT_NODES} {nbNodes:d} {dbvtk.DFLT_DOUBLE}\n')
+
+    def writeNodes(self, coordinates: np.ndarray)-> None:
+        self.writeArray(self.fhandle, coordinates, '>f8')
+        self.nbNodes += coordinates.shape[0]
+
+    def writeElements(self, vtkType: int, connectivity: np.ndarray, physgrp: np.ndarray)-> None:
+        nb, nbNodes = connectivity.shape
+        cells = np.column_stack((np.full(nb, nbNodes, dtype=np.int64), connectivity))
+        self.writeArray(self.getSpool('cells'), cells, '>i4')
+        self.writeArray(self.getSpool('types'), np.full(nb, vtkType, dtype=np.int64), '>i4')
+        self.writeArray(self.getSpool('physgrp'), physgrp.astype(np.int64), '>i4')
+        self.nbElems += nb
+        self.nbConnectivity += cells.size
+
+    def close(self)-> None:
+        end = '\n' if self.binary else ''
+        self.writeText(f'{end}\n{dbvtk.DFLT_ELEMS} {self.nbElems:d} {self.nbConnectivity:d}\n')
+        self.copySpool('cells', self.fhandle)
+        self.writeText(f'{end}\n{dbvtk.DFLT_ELEMS_TYPE} {self.nbElems:d}\n')
+        self.copySpool('types', self.fhandle)
+        self.writeText(f'{end}\n{dbvtk.DFLT_ELEMS_DATA} {self.nbElems:d}\n')
+        self.writeText(f'{dbvtk.DFLT_SCALARS} {configMESH.DFLT_PHYS_GRP} {dbvtk.DFLT_INT} 1\n')
+        self.writeText(f'{dbvtk.DFLT_TABLE} {dbvtk.DFLT_TABLE_DEFAULT}\n')
+        self.copySpool('physgrp', self.fhandle)
+        self.writeText(end)
+        self.objFile.close()
+
+    def release(self)-> None:
+        super().release()
+        self.objFile.close()
+
+
+class VTUChunkWriter(ChunkWriter):
+    """
+    Write VTU files (raw appended data, uncompressed, UInt64 headers) by chunks.
+    """
+
+    # arrays of the file: name, section, VTK type, NumPy type and number of components
+    ARRAYS: tuple = (
+        ('Points', 'Points', 'Float64', '<f8', 3),
+        ('connectivity', 'Cells', 'Int64', '<i8', 1),
+        ('offsets', 'Cells', 'Int64', '<i8', 1),
+        ('types', 'Cells', 'UInt8', '<u1', 1),
+        (configMESH.DFLT_PHYS_GRP, 'CellData', 'Int32', '<i4', 1),
+    )
+
+    def writeNodes(self, coordinates: np.ndarray)-> None:
+        self.getSpool('Points').write(np.ascontiguousarray(coordinates, dtype='<f8').tobytes())
+        self.nbNodes += coordinates.shape[0]
+
+    def writeElements(self, vtkType: int, connectivity: np.ndarray, physgrp: np.ndarray)-> None:
+        nb, nbNodes = connectivity.shape
+        offsets = self.nbConnectivity + nbNodes * np.arange(1, nb + 1, dtype=np.int64)
+        self.getSpool('connectivity').write(np.ascontiguousarray(connectivity, dtype='<i8').tobytes())
+        self.getSpool('offsets').write(offsets.astype('<i8').tobytes())
+        self.getSpool('types').write(np.full(nb, vtkType, dtype='<u1').tobytes())
+        self.getSpool(configMESH.DFLT_PHYS_GRP).write(physgrp.astype('<i4').tobytes())
+        self.nbElems += nb
+        self.nbConnectivity += connectivity.size
+
+    def close(self)-> None:
+        # XML header (offsets of the arrays in the appended data)
+        offset = 0
+        sections = {'Points': [], 'Cells': [], 'CellData': []}
+        sizes = {}
+        for name, section, vtkType, dtype, nbComp in self.ARRAYS:
+            spool = self.getSpool(name)
+            sizes[name] = spool.seek(0, 2)
+            sections[section].append(f'        <DataArray type="{vtkType}" Name="{name}" '
+                                     f'NumberOfComponents="{nbComp}" format="appended" offset="{offset}"/>')
+            offset += 8 + sizes[name]
+            _ = dtype
+        lines = ['<?xml version="1.0"?>',
+                 '<VTKFile type="UnstructuredGrid" version="1.0" byte_order="LittleEndian" header_type="UInt64">',
+                 '  <UnstructuredGrid>',
+                 f'    <Piece NumberOfPoints="{self.nbNodes}" NumberOfCells="{self.nbElems}">']
+        for section, arrays in sections.items():
+            lines += [f'      <{section}>', *arrays, f'      </{section}>']
+        lines += ['    </Piece>', '  </UnstructuredGrid>', '  <AppendedData encoding="raw">', '   _']
+        objFile = fileio.fileHandler(filename=self.filename, right='wb', safeMode=False,
+                                     **fileio.compressionOptions(self.opts))
+        fhandle = cast(IO[bytes], objFile.getHandler())
+        fhandle.write('\n'.join(lines).encode('utf-8'))
+        # appended data: size (UInt64) followed by the data of each array
+        for name, *_ in self.ARRAYS:
+            fhandle.write(np.array([sizes[name]], dtype='<u8').tobytes())
+            self.copySpool(name, fhandle)
+        fhandle.write(b'\n  </AppendedData>\n</VTKFile>\n')
+        objFile.close()
+
+
+def getChunkWriter(filename: Union[str, Path], opts: Optional[dict]=None)-> ChunkWriter:
+    """
+    Get the chunk writer depending on the extension of the output file.
+
+    Args:
+        filename (Union[str, Path]): The path to the output file (.vtk or .vtu, possibly
+            followed by a compression extension).
+        opts (Optional[dict], optional): The options of the writer. Defaults to None.
+
+    Returns:
+        ChunkWriter: The writer.
+
+    Raises:
+        ValueError: If the extension is not supported.
+    """
+    suffixes = [s.lower() for s in Path(filename).suffixes]
+    if '.vtu' in suffixes:
+        return VTUChunkWriter(filename, opts)
+    if '.vtk' in suffixes:
+        return VTKChunkWriter(filename, opts)
+    raise ValueError(f'Extension of {filename} not supported (.vtk or .vtu)')
+
+
+def convert(source: Union[str, Path],
+            target: Union[str, Path],
+            chunkSize: int=DFLT_CHUNK_SIZE,
+            opts: Optional[dict]=None)-> dict:
+    """
+    Convert a msh file to a VTK file (legacy .vtk or .vtu) by chunks.
+
+    The nodes and the elements are read, converted (VTK types and ordering of the nodes,
+    indexes of the nodes from 0) and written by chunks of `chunkSize` nodes/elements:
+    the memory used does not depend on the size of the mesh (except the lookup table of
+    the tags of the nodes if they are not numbered 1, 2, ..., N). The physical groups are
+    written as the `physgrp` cell field; the fields of the msh file are not converted.
+
+    Args:
+        source (Union[str, Path]): The path to the msh file (v2.2 ASCII or v4.1).
+        target (Union[str, Path]): The path to the VTK file.
+        chunkSize (int, optional): The number of nodes/elements per chunk.
+            Defaults to DFLT_CHUNK_SIZE.
+        opts (Optional[dict], optional): The options of the writer (see `VTKChunkWriter`).
+            Defaults to None.
+
+    Returns:
+        dict: The number of nodes ('nbNodes') and elements ('nbElems') written and the
+        number of elements per type ('types').
+    """
+    Logger.info(f'Convert {source} to {target} (chunks of {chunkSize} items)')
+    nodeMap = NodeMap()
+    types = {}
+    vtkTypes = {str(k): int(c) for k, c, n in zip(dbelem.TYPES, dbelem.VTK_CODES, dbelem.NODES) if c >= 0 and n > 0}
+    reader = MSHChunkReader(source, chunkSize)
+    try:
+        writer = getChunkWriter(target, opts)
+    except Exception:
+        reader.objFile.close()
+        raise
+    try:
+        for event, *data in reader.iterChunks():
+            if event == 'nodes':
+                writer.setNodes(data[0])
+            elif event == 'nodeTags':
+                nodeMap.add(data[0])
+            elif event == 'nodeCoords':
+                writer.writeNodes(data[0])
+            elif event == 'elementChunk':
+                elemType, connectivity, physgrp = data
+                vtkType = vtkTypes.get(elemType)
+                if vtkType is None:
+                    Logger.warning(f'Elements {elemType} not supported by VTK: ignored')
+                    continue
+                connectivity = nodeMap.index(connectivity)
+                if elemType in DFLT_MSH_TO_VTK_ORDER:
+                    connectivity = connectivity[:, DFLT_MSH_TO_VTK_ORDER[elemType]]
+                writer.writeElements(vtkType, connectivity, physgrp)
+                types[elemType] = types.get(elemType, 0) + connectivity.shape[0]
+        writer.close()
+    finally:
+        reader.objFile.close()
+        writer.release()
+    Logger.info(f'{writer.nbNodes} nodes and {writer.nbElems} elements written in {target}')
+    return {'nbNodes': writer.nbNodes, 'nbElems': writer.nbElems, 'types': types}
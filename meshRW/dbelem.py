@@ -0,0 +1,252 @@
+"""
+This file is part of the meshRW package
+---
+This file includes the registry of the types of elements shared by the MSH (`dbmsh`) and
+VTK (`dbvtk`) formats: codes, numbers of nodes, dimensions and dense lookup arrays to
+resolve arrays of codes without loop on the elements.
+Documentation available here:
+https://gmsh.info/doc/texinfo/gmsh.html#MSH-file-format
+https://vtk.org/doc/nightly/html/vtkCellType_8h.html
+----
+Luc Laurent - luc.laurent@lecnam.net -- 2021
+
+"""
+from typing import Union
+
+import numpy as np
+
+# types of elements: Gmsh code, VTK code, number of nodes (-1 for variable), dimension and
+# VTK class (None if the type is not available in the format)
+DFLT_ELEMENTS: dict = {
+    # 2-nodes line
+    'LIN2': (1, 3, 2, 1, 'vtkLine'),
+    # 3-nodes second order line
+    'LIN3': (8, 21, 3, 1, 'vtkQuadraticEdge'),
+    # 4-nodes third order line
+    'LIN4': (None, None, 4, 1, None),
+    # 3-nodes triangle
+    'TRI3': (2, 5, 3, 2, 'vtkTriangle'),
+    # 6-nodes second order triangle (3 vertices, 3 on edges)
+    'TRI6': (9, 22, 6, 2, 'vtkQuadraticTriangle'),
+    # 9-nodes cubic order triangle (3 vertices, 3 on edges and 3 inside)
+    'TRI9': (None, None, 9, 2, None),
+    # 10-nodes higher order triangle (3 vertices, 6 on edges and 1 inside)
+    'TRI10': (None, None, 10, 2, None),
+    # 12-nodes higher order triangle (3 vertices and 9 on edges)
+    'TRI12': (None, None, 12, 2, None),
+    # 15-nodes higher order triangle (3 vertices, 9 on edges and 3 inside)
+    'TRI15': (None, None, 15, 2, None),
+    # 4-nodes quadrangle
+    'QUA4': (3, 9, 4, 2, 'vtkQuad'),
+    # 8-nodes second order quadrangle (4 vertices and 4 on edges)
+    'QUA8': (16, 23, 8, 2, 'vtkQuadraticQuad'),
+    # 9-nodes higher order quadrangle (4 vertices, 4 on edges and 1 inside)
+    'QUA9': (10, None, 9, 2, None),
+    # 4-nodes tetrahedron
+    'TET4': (4, 10, 4, 3, 'vtkTetra'),
+    # 10-nodes second order tetrahedron (4 vertices and 6 on edges)
+    'TET10': (11, 24, 10, 3, 'vtkQuadraticTetra'),
+    # 8-nodes hexahedron
+    'HEX8': (5, 12, 8, 3, 'vtkHexahedron'),
+    # 20-nodes second order hexahedron (8 vertices and 12 on edges)
+    'HEX20': (17, 25, 20, 3, 'vtkQuadraticHexahedron'),
+    # 27-nodes higher order hexahedron (8 vertices, 12 on edges, 6 on faces and 1 inside)
+    'HEX27': (12, None, 27, 3, None),
+    # 6-nodes prism
+    'PRI6': (6, 13, 6, 3, 'vtkWedge'),
+    # 15-nodes second order prism (6 vertices and 9 on edges)
+    'PRI15': (18, None, 15, 3, None),
+    # 18-nodes higher order prism (6 vertices, 9 on edges and 3 on faces)
+    'PRI18': (13, None, 18, 3, None),
+    # 5-node pyramid
+    'PYR5': (7, 14, 5, 3, 'vtkPyramid'),
+    # 13-nodes second order pyramid (5 edges and 8 on edges)
+    'PYR13': (19, None, 13, 3, None),
+    # 14-nodes higher order pyramid (5 edges, 8 on edges and 1 inside)
+    'PYR14': (14, None, 14, 3, None),
+    # 1-node point
+    'NOD1': (15, 1, 1, 0, 'vtkVertex'),
+    # many nodes
+    'NODN': (None, 2, -1, 0, 'vtkPolyVertex'),
+    # many lines (poly-lines)
+    'LINEN': (None, 4, -1, 1, 'vtkPolyLine'),
+    # many stripped triangles
+    'TRIN': (None, 6, -1, 2, 'vtkTriangleStrip'),
+    # polygons
+    'POLY': (None, 7, -1, 2, 'vtkPolygon'),
+    # pixel
+    'PIXEL': (None, 8, -1, 2, 'vtkPixel'),
+    # voxel
+    'VOXEL': (None, 11, -1, 3, 'vtkVoxel'),
+}
+
+# names of the types (the index of a type in TYPES is its identifier in the lookup arrays)
+TYPES: np.ndarray = np.array(list(DFLT_ELEMENTS), dtype=object)
+# properties of the types (-1 if not available)
+MSH_CODES: np.ndarray = np.array([-1 if v[0] is None else v[0] for v in DFLT_ELEMENTS.values()], dtype=np.int64)
+VTK_CODES: np.ndarray = np.array([-1 if v[1] is None else v[1] for v in DFLT_ELEMENTS.values()], dtype=np.int64)
+NODES: np.ndarray = np.array([v[2] for v in DFLT_ELEMENTS.values()], dtype=np.int64)
+DIMS: np.ndarray = np.array([v[3] for v in DFLT_ELEMENTS.values()], dtype=np.int64)
+
+
+def buildLookup(codes: np.ndarray)-> np.ndarray:
+    """
+    Build the dense array giving the identifier of the type (index in TYPES) of each code.
+
+    Args:
+        codes (np.ndarray): The code of each type (-1 if not available).
+
+    Returns:
+        np.ndarray: The identifiers indexed by the codes (-1 for unknown codes).
+    """
+    lookup = np.full(codes.max() + 1, -1, dtype=np.int64)
+    valid = np.flatnonzero(codes >= 0)
+    lookup[codes[valid]] = valid
+    return lookup
+
+
+# identifiers of the types indexed by the Gmsh and VTK codes
+MSH_TO_ID: np.ndarray = buildLookup(MSH_CODES)
+VTK_TO_ID: np.ndarray = buildLookup(VTK_CODES)
+# names of the types indexed by the codes (scalar lookups)
+MSH_TO_TYPE: dict = {int(c): str(TYPES[i]) for c, i in enumerate(MSH_TO_ID) if i >= 0}
+VTK_TO_TYPE: dict = {int(c): str(TYPES[i]) for c, i in enumerate(VTK_TO_ID) if i >= 0}
+
+
+def getIds(codes: Union[np.ndarray, list, int], lookup: np.ndarray)-> np.ndarray:
+    """
+    Get the identifiers of the types (index in TYPES) of an array of codes.
+
+    Args:
+        codes (Union[np.ndarray, list, int]): The codes.
+        lookup (np.ndarray): The lookup array (MSH_TO_ID or VTK_TO_ID).
+
+    Returns:
+        np.ndarray: The identifiers (-1 for unknown codes).
+    """
+    codes = np.asarray(codes, dtype=np.int64)
+    ids = np.full(codes.shape, -1, dtype=np.int64)
+    valid = (codes >= 0) & (codes < lookup.size)
+    ids[valid] = lookup[codes[valid]]
+    return ids
+
+
+def getTable(ids: np.ndarray, table: np.ndarray, default: object=-1)-> np.ndarray:
+    """
+    Get the values of a property for an array of identifiers of types.
+
+    Args:
+        ids (np.ndarray): The identifiers (-1 for unknown types).
+        table (np.ndarray): The property (TYPES, MSH_CODES, VTK_CODES, NODES or DIMS).
+        default (object, optional): The value for the unknown types. Defaults to -1.
+
+    Returns:
+        np.ndarray: The values.
+    """
+    return np.where(ids >= 0, table[np.maximum(ids, 0)], default).astype(table.dtype)
+
+
+def getTypesFromMSH(codes: Union[np.ndarray, list, int])-> np.ndarray:
+    """
+    Get the names of the types of an array of Gmsh codes.
+
+    Args:
+        codes (Union[np.ndarray, list, int]): The Gmsh codes.
+
+    Returns:
+        np.ndarray: The names (None for unknown codes).
+    """
+    return getTable(getIds(codes, MSH_TO_ID), TYPES, None)
+
+
+def getTypesFromVTK(codes: Union[np.ndarray, list, int])-> np.ndarray:
+    """
+    Get the names of the types of an array of VTK codes.
+
+    Args:
+        codes (Union[np.ndarray, list, int]): The VTK codes.
+
+    Returns:
+        np.ndarray: The names (None for unknown codes).
+    """
+    return getTable(getIds(codes, VTK_TO_ID), TYPES, None)
+
+
+def getNumberNodesFromMSH(codes: Union[np.ndarray, list, int])-> np.ndarray:
+    """
+    Get the numbers of nodes of an array of Gmsh codes.
+
+    Args:
+        codes (Union[np.ndarray, list, int]): The Gmsh codes.
+
+    Returns:
+        np.ndarray: The numbers of nodes (0 for unknown codes).
+    """
+    return getTable(getIds(codes, MSH_TO_ID), NODES, 0)
+
+
+def getNumberNodesFromVTK(codes: Union[np.ndarray, list, int])-> np.ndarray:
+    """
+    Get the numbers of nodes of an array of VTK codes.
+
+    Args:
+        codes (Union[np.ndarray, list, int]): The VTK codes.
+
+    Returns:
+        np.ndarray: The numbers of nodes (-1 for types with a variable number of nodes, 0
+        for unknown codes).
+    """
+    return getTable(getIds(codes, VTK_TO_ID), NODES, 0)
+
+
+def getDimFromMSH(codes: Union[np.ndarray, list, int])-> np.ndarray:
+    """
+    Get the dimensions of an array of Gmsh codes.
+
+    Args:
+        codes (Union[np.ndarray, list, int]): The Gmsh codes.
+
+    Returns:
+        np.ndarray: The dimensions (-1 for unknown codes).
+    """
+    return getTable(getIds(codes, MSH_TO_ID), DIMS)
+
+
+def getDimFromVTK(codes: Union[np.ndarray, list, int])-> np.ndarray:
+    """
+    Get the dimensions of an array of VTK codes.
+
+    Args:
+        codes (Union[np.ndarray, list, int]): The VTK codes.
+
+    Returns:
+        np.ndarray: The dimensions (-1 for unknown codes).
+    """
+    return getTable(getIds(codes, VTK_TO_ID), DIMS)
+
+
+def convertMSHToVTK(codes: Union[np.ndarray, list, int])-> np.ndarray:
+    """
+    Translate an array of Gmsh codes to VTK codes.
+
+    Args:
+        codes (Union[np.ndarray, list, int]): The Gmsh codes.
+
+    Returns:
+        np.ndarray: The VTK codes (-1 for types not available in VTK).
+    """
+    return getTable(getIds(codes, MSH_TO_ID), VTK_CODES)
+
+
+def convertVTKToMSH(codes: Union[np.ndarray, list, int])-> np.ndarray:
+    """
+    Translate an array of VTK codes to Gmsh codes.
+
+    Args:
+        codes (Union[np.ndarray, list, int]): The VTK codes.
+
+    Returns:
+        np.ndarray: The Gmsh codes (-1 for types not available in Gmsh).
+    """
+    return getTable(getIds(codes, VTK_TO_ID), MSH_CODES)
+
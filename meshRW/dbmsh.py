@@ -12,6 +12,9 @@ Luc Laurent - luc.laurent@lecnam.net -- 2021
 from typing import Union
 from loguru import logger as Logger
 
+from . import dbelem
+
+
 def loadElementDict()-> dict:
     """
     Load a dictionary mapping element types to their corresponding properties.
@@ -26,62 +29,19 @@ def loadElementDict()-> dict:
     Some element types may have a value of `None`, indicating that their 
     properties are not defined.
 
+    Notes:
+        The dictionary is built from the registry `dbelem.DFLT_ELEMENTS` (shared with
+        `dbvtk`); the lookups of this module do not rebuild it.
+
     Returns:
         dict: A dictionary mapping element type strings to their properties.
     """
+    return {k: None if v[0] is None else {'code': v[0], 'nodes': v[2], 'dim': v[3]}
+            for k, v in dbelem.DFLT_ELEMENTS.items() if v[0] is not None or v[1] is None}
 
-    elementDict = {
-        # 2-nodes line
-        'LIN2': {'code': 1, 'nodes': 2, 'dim': 1},
-        # 3-nodes second order line
-        'LIN3': {'code': 8, 'nodes': 3, 'dim': 1},
-        # 4-nodes third order line
-        'LIN4': None,
-        # 3-nodes triangle
-        'TRI3': {'code': 2, 'nodes': 3, 'dim': 2},
-        # 6-nodes second order triangle (3 vertices, 3 on edges)
-        'TRI6': {'code': 9, 'nodes': 6, 'dim': 2},
-        # 9-nodes cubic order triangle (3 vertices, 3 on edges and 3 inside)
-        'TRI9': None,
-        # 10-nodes higher order triangle (3 vertices, 6 on edges and 1 inside)
-        'TRI10': None,
-        # 12-nodes higher order triangle (3 vertices and 9 on edges)
-        'TRI12': None,
-        # 15-nodes higher order triangle (3 vertices, 9 on edges and 3 inside)
-        'TRI15': None,
-        # 4-nodes quadrangle
-        'QUA4': {'code': 3, 'nodes': 4, 'dim': 2},
-        # 8-nodes second order quadrangle (4 vertices and 4 on edges)
-        'QUA8': {'code': 16, 'nodes': 8, 'dim': 2},
-        # 9-nodes higher order quadrangle (4 vertices, 4 on edges and 1 inside)
-        'QUA9': {'code': 10, 'nodes': 9, 'dim': 2},
-        # 4-nodes tetrahedron
-        'TET4': {'code': 4, 'nodes': 4, 'dim': 3},
-        # 10-nodes second order tetrahedron (4 vertices and 6 on edges)
-        'TET10': {'code': 11, 'nodes': 10, 'dim': 3},
-        # 8-nodes hexahedron
-        'HEX8': {'code': 5, 'nodes': 8, 'dim': 3},
-        # 20-nodes second order hexahedron (8 vertices and 12 on edges)
-        'HEX20': {'code': 17, 'nodes': 20, 'dim': 3},
-        # 27-nodes higher order hexahedron
-        # (8 vertices, 12 on edges, 6 on faces and 1 inside)
-        'HEX27': {'code': 12, 'nodes': 27, 'dim': 3},
-        # 6-nodes prism
-        'PRI6': {'code': 6, 'nodes': 6, 'dim': 3},
-        # 15-nodes second order prism (6 vertices and 9 on edges)
-        'PRI15': {'code': 18, 'nodes': 15, 'dim': 3},
-        # 18-nodes higher order prism (6 vertices, 9 on edges and 3 on faces)
-        'PRI18': {'code': 13, 'nodes': 18, 'dim': 3},
-        # 5-node pyramid
-        'PYR5': {'code': 7, 'nodes': 5, 'dim': 3},
-        # 13-nodes second order pyramid (5 edges and 8 on edges)
-        'PYR13': {'code': 19, 'nodes': 13, 'dim': 3},
-        # 14-nodes higher order pyramid (5 edges, 8 on edges and 1 inside)
-        'PYR14': {'code': 14, 'nodes': 14, 'dim': 3},
-        # 1-node point
-        'NOD1': {'code': 15, 'nodes': 1, 'dim': 0},
-    }
-    return elementDict
+
+# precomputed dictionary of the elements (see `loadElementDict`)
+ELEMENT_DICT: dict = loadElementDict()
 
 
 def getMSHElemType(txtElemType: Union[str, int])-> int:
@@ -107,15 +67,13 @@ def getMSHElemType(txtElemType: Union[str, int])-> int:
     Note:
         Refer to the Gmsh documentation for the numbering scheme of element types.
     """
-    element_dict = loadElementDict()
-
     # depending on the type of txtElemType
     # - if int: return txtElemType
-    # - else get the number from the dictionary
+    # - else get the number from the registry
     if isinstance(txtElemType, int):
         element_num = txtElemType
     else:
-        element_num = element_dict[txtElemType.upper()].get('code', None)
+        element_num = dbelem.DFLT_ELEMENTS[txtElemType.upper()][0]
     # show error if the type is not available
     if not element_num:
         Logger.error(f'Element type {txtElemType} not implemented')
@@ -127,8 +85,8 @@ def getElemTypeFromMSH(elementNum: int) -> str|None:
     Get the global name of an element type based on its numerical ID as defined in Gmsh.
 
     This function retrieves the element type name corresponding to the given numerical ID 
-    from a dictionary of element types. The dictionary is loaded using the `load_element_dict` 
-    function. If the ID is not found, an error is logged.
+    from the registry of the types of elements (`dbelem.MSH_TO_TYPE`). If the ID is not
+    found, an error is logged. See `dbelem.getTypesFromMSH` for arrays of IDs.
 
     Args:
         elementNum (int): The numerical ID of the element type as defined in Gmsh.
@@ -139,15 +97,7 @@ def getElemTypeFromMSH(elementNum: int) -> str|None:
     Raises:
         Logs an error if the element type ID is not found in the dictionary.
     """
-    # load the dictionary
-    element_dict = loadElementDict()
-    globalName = None
-    # get the name of the element using the integer iD along the dictionary
-    for k, v in element_dict.items():
-        if v:
-            if v.get('code', None) == elementNum:
-                globalName = k
-                break
+    globalName = dbelem.MSH_TO_TYPE.get(elementNum)
     # if the name of the element if not available show error
     if globalName is None:
         Logger.error(f'Element type not found with id {elementNum}')
@@ -173,8 +123,7 @@ def getNumberNodes(txtElemtype: str|None) -> int:
     Raises:
         Logs an error message if the specified element type is not defined in the dictionary.
     """
-    # load the dictionary
-    elementDict = loadElementDict()
+    elementDict = ELEMENT_DICT
     nb_nodes = 0
     # check if the type of element exists
     if txtElemtype in elementDict:
@@ -204,8 +153,7 @@ def getDim(txtElemtype: str) -> int:
         None: This function does not raise exceptions but logs an error 
         if the element type is undefined.
     """
-    # load the dictionary
-    elementDict = loadElementDict()
+    elementDict = ELEMENT_DICT
     nbNodes = 0
     # check if the type of element exists
     if txtElemtype in elementDict:
@@ -238,11 +186,13 @@ def getNumberNodesFromNum(elementNum: int) -> int:
 
 
 # DEFAULT VALUES
-ALLOWED_EXTENSIONS = ['.msh', '.msh.bz2', '.msh.gz']
+ALLOWED_EXTENSIONS = ['.msh', '.msh.bz2', '.msh.gz', '.msh.xz', '.msh.zst']
 
 # Keywords MSH
 DFLT_FILE_OPEN_CLOSE = {'open': '$MeshFormat', 'close': '$EndMeshFormat'}
 DFLT_FILE_VERSION = '2.2 0 8'
+DFLT_FILE_VERSION_4 = '4.1'
+DFLT_ENTITIES_OPEN_CLOSE = {'open': '$Entities', 'close': '$EndEntities'}
 DFLT_NODES_OPEN_CLOSE = {'open': '$Nodes', 'close': '$EndNodes'}
 DFLT_ELEMS_OPEN_CLOSE = {'open': '$Elements', 'close': '$EndElements'}
 DFLT_FIELDS_NODES_OPEN_CLOSE = {'open': '$NodeData', 'close': '$EndNodeData'}
@@ -8,12 +8,25 @@ Luc Laurent - luc.laurent@lecnam.net -- 2021
 
 """
 from typing import Union
-import vtk  # type: ignore[attr-defined]
 from loguru import logger as Logger
 
+from . import dbelem, various
 
-def _vtk(name: str):
-    ctor = getattr(vtk, name, None)
+# VTK classes of the cells (imported on the first call to `getVTKObj`)
+vtkDataModel = various.LazyModule('vtkmodules.vtkCommonDataModel')
+
+
+def getVTKClass(name: str)-> object:
+    """
+    Create an instance of a cell class of libvtk (libvtk is imported on the first call).
+
+    Args:
+        name (str): The name of the class (e.g. 'vtkTetra').
+
+    Returns:
+        object: The VTK object or None if the class is not available.
+    """
+    ctor = getattr(vtkDataModel, name, None)
     if callable(ctor):
         return ctor()
     return None
@@ -35,81 +48,48 @@ def loadElementDict()-> dict:
                     'code': int,          # VTK code for the element type
                     'nodes': int,         # Number of nodes in the element (-1 for variable)
                     'dim': int,           # Dimensionality of the element (0, 1, 2, or 3)
-                    'vtkobj': vtkObject   # Corresponding VTK object
+                    'vtkclass': str       # Name of the corresponding VTK class
                 },
                 ...
 
     Notes:
         - Some element types are defined but have a value of `None`, indicating
           that they are not yet implemented or supported.
-        - The VTK objects (e.g., vtk.vtkLine, vtk.vtkTriangle) must be imported
-          from the VTK library for this function to work.
+        - The table is pure data built from the registry `dbelem.DFLT_ELEMENTS` (shared
+          with `dbmsh`): the VTK classes (e.g., 'vtkLine', 'vtkTriangle') are given by name
+          and created by `getVTKObj` (libvtk is not imported here).
     """
-    elementDict = {
-        # 2-nodes line
-        'LIN2': {'code': 3, 'nodes': 2, 'dim': 1, 'vtkobj': _vtk('vtkLine')},
-        # 3-nodes second order line
-        'LIN3': {'code': 21, 'nodes': 3, 'dim': 1, 'vtkobj': _vtk('vtkQuadraticEdge')},
-        # 4-nodes third order line
-        'LIN4': None,
-        # 3-nodes triangle
-        'TRI3': {'code': 5, 'nodes': 3, 'dim': 2, 'vtkobj': _vtk('vtkTriangle')},
-        # 6-nodes second order triangle (3 vertices, 3 on edges)
-        'TRI6': {'code': 22, 'nodes': 6, 'dim': 2, 'vtkobj': _vtk('vtkQuadraticTriangle')},
-        # 9-nodes cubic order triangle (3 vertices, 3 on edges and 3 inside)
-        'TRI9': None,
-        # 10-nodes higher order triangle (3 vertices, 6 on edges and 1 inside)
-        'TRI10': None,
-        # 12-nodes higher order triangle (3 vertices and 9 on edges)
-        'TRI12': None,
-        # 15-nodes higher order triangle (3 vertices, 9 on edges and 3 inside)
-        'TRI15': None,
-        # 4-nodes quadrangle
-        'QUA4': {'code': 9, 'nodes': 4, 'dim': 2, 'vtkobj': _vtk('vtkQuad')},
-        # 8-nodes second order quadrangle (4 vertices and 4 on edges)
-        'QUA8': {'code': 23, 'nodes': 8, 'dim': 2, 'vtkobj': _vtk('vtkQuadraticQuad')},
-        # 9-nodes higher order quadrangle (4 vertices, 4 on edges and 1 inside)
-        'QUA9': None,
-        # 4-nodes tetrahedron
-        'TET4': {'code': 10, 'nodes': 4, 'dim': 3, 'vtkobj': _vtk('vtkTetra')},
-        # 10-nodes second order tetrahedron (4 vertices and 6 on edges)
-        'TET10': {'code': 24, 'nodes': 10, 'dim': 3, 'vtkobj': _vtk('vtkQuadraticTetra')},
-        # 8-nodes hexahedron
-        'HEX8': {'code': 12, 'nodes': 8, 'dim': 3, 'vtkobj': _vtk('vtkHexahedron')},
-        # 20-nodes second order hexahedron (8 vertices and 12 on edges)
-        'HEX20': {'code': 25, 'nodes': 20, 'dim': 3, 'vtkobj': _vtk('vtkQuadraticHexahedron')},
-        # 27-nodes higher order hexahedron (8 vertices,
-        # 12 on edges, 6 on faces and 1 inside)
-        'HEX27': None,
-        # 6-nodes prism
-        'PRI6': {'code': 13, 'nodes': 6, 'dim': 3, 'vtkobj': _vtk('vtkWedge')},
-        # 15-nodes second order prism (6 vertices and 9 on edges)
-        'PRI15': None,
-        # 18-nodes higher order prism (6 vertices, 9 on edges and 3 on faces)
-        'PRI18': None,
-        # 5-node pyramid
-        'PYR5': {'code': 14, 'nodes': 5, 'dim': 3, 'vtkobj': _vtk('vtkPyramid')},
-        # 13-nodes second order pyramid (5 edges and 8 on edges)
-        'PYR13': None,
-        # 14-nodes higher order pyramid (5 edges, 8 on edges and 1 inside)
-        'PYR14': None,
-        # 1-node point
-        'NOD1': {'code': 1, 'nodes': 1, 'dim': 0, 'vtkobj': _vtk('vtkVertex')},
-        #
-        # many nodes
-        'NODN': {'code': 2, 'nodes': -1, 'dim': 0, 'vtkobj': _vtk('vtkPolyVertex')},
-        # many lines (poly-lines)
-        'LINEN': {'code': 4, 'nodes': -1, 'dim': 1, 'vtkobj': _vtk('vtkPolyLine')},
-        # many stripped triangles
-        'TRIN': {'code': 6, 'nodes': -1, 'dim': 2, 'vtkobj': _vtk('vtkTriangleStrip')},
-        # polygons
-        'POLY': {'code': 7, 'nodes': -1, 'dim': 2, 'vtkobj': _vtk('vtkPolygon')},
-        # pixel
-        'PIXEL': {'code': 8, 'nodes': -1, 'dim': 2, 'vtkobj': _vtk('vtkPixel')},
-        # voxel
-        'VOXEL': {'code': 11, 'nodes': -1, 'dim': 3, 'vtkobj': _vtk('vtkVoxel')},
-    }
-    return elementDict
+    return {k: None if v[1] is None else {'code': v[1], 'nodes': v[2], 'dim': v[3], 'vtkclass': v[4]}
+            for k, v in dbelem.DFLT_ELEMENTS.items()}
+
+
+# precomputed dictionary of the elements (see `loadElementDict`)
+ELEMENT_DICT: dict = loadElementDict()
+
+
+# names of the VTK types of cells
+VTK_TO_ELEM: dict = {
+    'VTK_VERTEX': 'NOD1',
+    'VTK_LINE': 'LIN2',
+    'VTK_TRIANGLE': 'TRI3',
+    'VTK_QUAD': 'QUA4',
+    'VTK_TETRA': 'TET4',
+    'VTK_HEXAHEDRON': 'HEX8',
+    'VTK_WEDGE': 'PRI6',
+    'VTK_PYRAMID': 'PYR5',
+    'VTK_QUADRATIC_EDGE': 'LIN3',
+    'VTK_QUADRATIC_TRIANGLE': 'TRI6',
+    'VTK_QUADRATIC_QUAD': 'QUA8',
+    'VTK_QUADRATIC_TETRA': 'TET10',
+    'VTK_QUADRATIC_HEXAHEDRON': 'HEX20',
+    #
+    'VTK_POLY_VERTEX': 'NODN',
+    'VTK_POLY_LINE': 'LINEN',
+    'VTK_TRIANGLE_STRIP': 'TRIN',
+    'VTK_POLYGON': 'POLY',
+    'VTK_PIXEL': 'PIXEL',
+    'VTK_VOXEL': 'VOXEL',
+}
 
 
 def getVTKtoElem()-> dict:
@@ -125,30 +105,7 @@ def getVTKtoElem()-> dict:
                 (e.g., 'VTK_VERTEX', 'VTK_TRIANGLE') and the values are
                 corresponding element type codes (e.g., 'NOD1', 'TRI3').
     """
-
-    VTKtoElem = {
-        'VTK_VERTEX': 'NOD1',
-        'VTK_LINE': 'LIN2',
-        'VTK_TRIANGLE': 'TRI3',
-        'VTK_QUAD': 'QUAD4',
-        'VTK_TETRA': 'TET4',
-        'VTK_HEXAHEDRON': 'HEX8',
-        'VTK_WEDGE': 'PRI6',
-        'VTK_PYRAMID': 'PYR5',
-        'VTK_QUADRATIC_EDGE': 'LIN3',
-        'VTK_QUADRATIC_TRIANGLE': 'TRI6',
-        'VTK_QUADRATIC_QUAD': 'QUA8',
-        'VTK_QUADRATIC_TETRA': 'TET10',
-        'VTK_QUADRATIC_HEXAHEDRON': 'HEX20',
-        #
-        'VTK_POLY_VERTEX': 'NODN',
-        'VTK_POLY_LINE': 'LINEN',
-        'VTK_TRIANGLE_STRIP': 'TRIN',
-        'VTK_POLYGON': 'POLY',
-        'VTK_PIXEL': 'PIXEL',
-        'VTK_VOXEL': 'VOXEL',
-    }
-    return VTKtoElem
+    return dict(VTK_TO_ELEM)
 
 
 def getVTKObj(txtElemtype: str) -> tuple:
@@ -161,18 +118,18 @@ def getVTKObj(txtElemtype: str) -> tuple:
         txtElemtype: element declared using VTK string 
         (if number is used the function wil return it)
     output:
-        vtk class for the requested element
+        vtk object for the requested element (libvtk is imported on the first call)
         number of nodes on element
     """
 
-    VTKtoElem = getVTKtoElem()
-    elementDict = loadElementDict()
+    VTKtoElem = VTK_TO_ELEM
+    elementDict = ELEMENT_DICT
 
     # depending on the type of txtElemtype
     numPerElement = -1
     if txtElemtype.upper() in VTKtoElem:
         txtElemtype = VTKtoElem[txtElemtype]
-    vtkobj = elementDict[txtElemtype.upper()].get('vtkobj', None)
+    vtkobj = getVTKClass(elementDict[txtElemtype.upper()].get('vtkclass', ''))
     numPerElement = getNumberNodes(txtElemtype.upper())
     if not vtkobj:
         Logger.error(f'Element type {txtElemtype} not implemented')
@@ -205,8 +162,8 @@ def getVTKElemType(txtElemtype: str|int)-> tuple:
         - Refer to the VTK documentation for the numbering and details of element types.
     """
 
-    VTKtoElem = getVTKtoElem()
-    elementDict = loadElementDict()
+    VTKtoElem = VTK_TO_ELEM
+    elementDict = ELEMENT_DICT
 
     # depending on the type of txtElemtype
     numPerElement = -1
@@ -234,8 +191,8 @@ def getElemTypeFromVTK(elementNum: int) -> Union[str, None]:
     Get the global name of an element type based on its numerical ID as defined in Gmsh.
 
     This function retrieves the element type name corresponding to the given numerical ID
-    by searching through a dictionary of element definitions. The dictionary is loaded
-    using the `loadElementDict` function. If the ID is not found, an error is logged.
+    from the registry of the types of elements (`dbelem.VTK_TO_TYPE`). If the ID is not
+    found, an error is logged. See `dbelem.getTypesFromVTK` for arrays of IDs.
 
     Args:
         elementNum (int): The numerical ID of the element type as defined in Gmsh.
@@ -246,15 +203,7 @@ def getElemTypeFromVTK(elementNum: int) -> Union[str, None]:
     Raises:
         Logs an error if the element type ID is not found in the dictionary.
     """
-    # load the dictionary
-    elementDict = loadElementDict()
-    globalName = None
-    # get the name of the element using the integer iD along the dictionary
-    for k, v in elementDict.items():
-        if v:
-            if v.get('code', None) == elementNum:
-                globalName = k
-                break
+    globalName = dbelem.VTK_TO_TYPE.get(elementNum)
     # if the name of the element if not available show error
     if globalName is None:
         Logger.error(f'Element type not found with id {elementNum}')
@@ -278,11 +227,11 @@ def getNumberNodes(txtElemtype: str|None) -> int:
         element dictionary.
 
     Notes:
-        The function relies on `loadElementDict()` to retrieve the dictionary
-        of element types and their properties.
+        The function relies on the precomputed dictionary `ELEMENT_DICT` (see
+        `loadElementDict()`) of element types and their properties.
     """
 
-    elementDict = loadElementDict()
+    elementDict = ELEMENT_DICT
     nbNodes = 0
     # check if the type of element exists
     if txtElemtype in elementDict:
@@ -321,9 +270,13 @@ ALLOWED_EXTENSIONS: list = [
     '.vtk',
     '.vtk.bz2',
     '.vtk.gz',
+    '.vtk.xz',
+    '.vtk.zst',
     '.vtu',
     '.vtu.bz2',
     '.vtu.gz',
+    '.vtu.xz',
+    '.vtu.zst',
 ]
 
 
@@ -344,3 +297,41 @@ DFLT_FIELD: str = 'FIELD'
 DFLT_SCALARS: str = 'SCALARS'
 DFLT_TABLE: str = 'LOOKUP_TABLE'
 DFLT_TABLE_DEFAULT: str = 'default'
+DFLT_TYPE_BINARY: str = 'BINARY'
+DFLT_VECTORS: str = 'VECTORS'
+DFLT_NORMALS: str = 'NORMALS'
+DFLT_TENSORS: str = 'TENSORS'
+DFLT_METADATA: str = 'METADATA'
+DFLT_ELEMS_OFFSETS: str = 'OFFSETS'
+DFLT_ELEMS_CONNECTIVITY: str = 'CONNECTIVITY'
+
+# NumPy types of the data types of legacy VTK files (binary data are big-endian)
+DFLT_DATA_TYPES: dict = {
+    'unsigned_char': '>u1',
+    'char': '>i1',
+    'unsigned_short': '>u2',
+    'short': '>i2',
+    'unsigned_int': '>u4',
+    'int': '>i4',
+    'unsigned_long': '>u8',
+    'long': '>i8',
+    'float': '>f4',
+    'double': '>f8',
+    'vtktypeint32': '>i4',
+    'vtktypeint64': '>i8',
+    'vtkidtype': '>i8',
+}
+
+# NumPy types of the data types of XML VTK files
+DFLT_XML_DATA_TYPES: dict = {
+    'Int8': 'i1',
+    'UInt8': 'u1',
+    'Int16': 'i2',
+    'UInt16': 'u2',
+    'Int32': 'i4',
+    'UInt32': 'u4',
+    'Int64': 'i8',
+    'UInt64': 'u8',
+    'Float32': 'f4',
+    'Float64': 'f8',
+}
@@ -6,16 +6,618 @@ This file includes the definition and tools to manipulate files
 Luc Laurent - luc.laurent@lecnam.net -- 2021
 """
 # pylint: disable=unspecified-encoding
-from typing import IO, Optional, Union, cast
+from typing import IO, Callable, Optional, Union, cast
 import gzip
 import bz2 as bz2lib
+import io
+import json
+import lzma
+import struct
 import time
+import zlib
+from bisect import bisect_right
 from pathlib import Path
 
 from loguru import logger as Logger
 
 from . import various
 
+# optional zstd support (stdlib module from Python 3.14 or `zstandard` package)
+try:
+    from compression import zstd as zstdlib  # type: ignore[import-not-found]
+except ImportError:  # pragma: no cover - depends on the Python version
+    zstdlib = None
+try:
+    import zstandard  # type: ignore[import-not-found]
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+# default compression level of zstd
+DFLT_ZSTD_LEVEL: int = 3
+# default size of the buffer used on top of compressed streams (in bytes)
+DFLT_BUFFER_SIZE: int = 1024 * 1024
+
+# BGZF (blocked gzip) parameters
+DFLT_BGZF_BLOCK_SIZE: int = 0xff00  # maximum size of uncompressed data per block
+DFLT_BGZF_MAX_BLOCK: int = 0x10000  # maximum size of a compressed block
+DFLT_BGZF_EOF: bytes = bytes.fromhex('1f8b08040000000000ff0600424302001b0003000000000000000000')
+DFLT_INDEX_EXTENSION: str = '.idx'
+DFLT_INDEX_FORMAT: str = 'meshRW-bgzf-index'
+
+# registry of compression codecs (filled by `registerCodec`)
+CODECS: dict = {}
+
+
+def registerCodec(name: str,
+                  extensions: Union[list, tuple],
+                  opener: Callable,
+                  compress: Callable,
+                  decompress: Callable,
+                  level: Optional[int] = None,
+                  levelRange: tuple = (None, None))-> None:
+    """
+    Register a compression codec usable by `FileHandler`.
+
+    Args:
+        name (str): Name of the codec (used in `compression` arguments and writers `opts`).
+        extensions (Union[list, tuple]): File extensions associated with the codec. The first
+            one is appended to filenames when the codec is requested explicitly.
+        opener (Callable): Function `opener(filename, mode, level)` returning a binary stream.
+        compress (Callable): Function `compress(data, level)` used by benchmarks.
+        decompress (Callable): Function `decompress(data)` used by benchmarks.
+        level (Optional[int], optional): Default compression level. Defaults to None.
+        levelRange (tuple, optional): Minimum and maximum allowed levels. Defaults to (None, None).
+    """
+    CODECS[name] = {
+        'name': name,
+        'extensions': tuple(extensions),
+        'open': opener,
+        'compress': compress,
+        'decompress': decompress,
+        'level': level,
+        'levelRange': levelRange,
+    }
+
+
+def getCodec(name: str)-> dict:
+    """
+    Get a registered codec from its name.
+
+    Args:
+        name (str): Name of the codec.
+
+    Returns:
+        dict: The codec declaration.
+
+    Raises:
+        ValueError: If the codec is not registered (or not available on this system).
+    """
+    codec = CODECS.get(name)
+    if codec is None:
+        raise ValueError(f'Compression codec {name} not available (ALLOWED: {" ".join(CODECS)})')
+    return codec
+
+
+def listCodecs()-> list:
+    """
+    List the names of the available compression codecs.
+
+    Returns:
+        list: Names of the registered codecs.
+    """
+    return list(CODECS.keys())
+
+
+def getCodecFromExtension(filename: Union[str, Path])-> Optional[str]:
+    """
+    Find the codec associated with the extension of a filename.
+
+    Args:
+        filename (Union[str, Path]): The filename to analyse.
+
+    Returns:
+        Optional[str]: The name of the codec or None if the file is not compressed.
+    """
+    suffix = Path(filename).suffix
+    for name, codec in CODECS.items():
+        if suffix in codec['extensions']:
+            return name
+    return None
+
+
+def compressionOptions(opts: Optional[dict])-> dict:
+    """
+    Extract the compression settings from writer/reader options.
+
+    Supported keys are 'compression' (name of the codec), 'compressionLevel'
+    and 'bufferSize'.
+
+    Args:
+        opts (Optional[dict]): Options of a writer or reader.
+
+    Returns:
+        dict: Keyword arguments for `FileHandler`.
+    """
+    opts = opts or {}
+    return {
+        'compression': opts.get('compression', None),
+        'level': opts.get('compressionLevel', None),
+        'bufferSize': opts.get('bufferSize', None),
+    }
+
+
+def _getZstdLevel(level: Optional[int]) -> int:
+    # registered default level of the codec if no level is given
+    if level is None:
+        return CODECS.get('zstd', {}).get('level', DFLT_ZSTD_LEVEL)
+    return level
+
+
+def _openZstd(filename: Path, mode: str, level: Optional[int]) -> IO[bytes]:
+    level = _getZstdLevel(level)
+    if zstdlib is not None:
+        if 'r' in mode:
+            return zstdlib.open(filename, mode)
+        return zstdlib.open(filename, mode, level=level)
+    assert zstandard is not None
+    if 'r' in mode:
+        return zstandard.open(filename, mode)
+    return zstandard.open(filename, mode, cctx=zstandard.ZstdCompressor(level=level))
+
+
+def _compressZstd(data: bytes, level: Optional[int]) -> bytes:
+    level = _getZstdLevel(level)
+    if zstdlib is not None:
+        return zstdlib.compress(data, level=level)
+    assert zstandard is not None
+    return zstandard.ZstdCompressor(level=level).compress(data)
+
+
+def _decompressZstd(data: bytes) -> bytes:
+    if zstdlib is not None:
+        return zstdlib.decompress(data)
+    assert zstandard is not None
+    return zstandard.ZstdDecompressor().decompress(data)
+
+
+def getIndexFilename(filename: Union[str, Path])-> Path:
+    """
+    Get the name of the sidecar index file associated with a blocked gzip file.
+
+    Args:
+        filename (Union[str, Path]): The name of the compressed file.
+
+    Returns:
+        Path: The name of the index file (compressed filename with `.idx` appended).
+    """
+    filename = Path(filename)
+    return filename.with_name(filename.name + DFLT_INDEX_EXTENSION)
+
+
+def loadIndex(filename: Union[str, Path])-> Optional[dict]:
+    """
+    Load the sidecar index of a blocked gzip file.
+
+    Args:
+        filename (Union[str, Path]): The name of the compressed file.
+
+    Returns:
+        Optional[dict]: The index (keys 'blocks', 'size' and 'sections') or None if the
+        file has no valid index (missing or not matching the size of the compressed file).
+    """
+    indexFile = getIndexFilename(filename)
+    if not indexFile.exists():
+        return None
+    with indexFile.open('r', encoding='utf-8') as f:
+        index = json.load(f)
+    if index.get('format') != DFLT_INDEX_FORMAT:
+        Logger.warning(f'{indexFile.name} is not a valid index file')
+        return None
+    filename = Path(filename)
+    if not filename.exists() or filename.stat().st_size != index.get('compressedSize'):
+        Logger.warning(f'{indexFile.name} is outdated (ignored)')
+        return None
+    return index
+
+
+def scanBlocks(filename: Union[str, Path])-> tuple:
+    """
+    Build the block index of a BGZF file by reading the headers of the blocks.
+
+    Only the headers and the trailers of the blocks are read: no data is decompressed.
+
+    Args:
+        filename (Union[str, Path]): The name of the compressed file.
+
+    Returns:
+        tuple: The list of blocks as (compressed offset, uncompressed offset) and the
+        total uncompressed size.
+
+    Raises:
+        ValueError: If the file is not a BGZF file.
+    """
+    blocks = []
+    cOffset = uOffset = 0
+    with open(filename, 'rb') as f:
+        while True:
+            header = f.read(18)
+            if len(header) == 0:
+                break
+            if len(header) < 18 or header[:4] != b'\x1f\x8b\x08\x04' or header[12:14] != b'BC':
+                raise ValueError(f'{Path(filename).name} is not a BGZF file')
+            blockSize = struct.unpack('<H', header[16:18])[0] + 1
+            f.seek(cOffset + blockSize - 4)
+            dataSize = struct.unpack('<I', f.read(4))[0]
+            if dataSize > 0:
+                blocks.append([cOffset, uOffset])
+            cOffset += blockSize
+            uOffset += dataSize
+    return blocks, uOffset
+
+
+class BGZFWriter(io.BufferedIOBase):
+    """
+    Binary stream writing blocked gzip (BGZF) files.
+
+    Data are split into independent gzip members of at most `DFLT_BGZF_BLOCK_SIZE`
+    bytes carrying their compressed size in the 'BC' extra field (as in the BGZF
+    format used by samtools/htslib). The file is therefore readable by any gzip reader
+    while allowing random access. The offsets of the blocks and of the sections declared
+    with `openSection`/`closeSection` are stored in a sidecar JSON index on closing.
+
+    Attributes:
+        filename (Path): The name of the compressed file.
+        level (int): The compression level.
+        blocks (list): List of blocks as (compressed offset, uncompressed offset).
+        sections (list): List of the sections (dictionaries with 'name', 'offset' and 'end').
+    """
+
+    def __init__(self,
+                 filename: Union[str, Path],
+                 mode: str = 'wb',
+                 level: Optional[int] = None,
+                 blockSize: int = DFLT_BGZF_BLOCK_SIZE)-> None:
+        """
+        Open a BGZF file for writing.
+
+        Args:
+            filename (Union[str, Path]): The name of the file.
+            mode (str, optional): 'wb' to create the file or 'ab' to append to an existing
+                BGZF file. Defaults to 'wb'.
+            level (Optional[int], optional): Compression level (0-9). Defaults to None (6).
+            blockSize (int, optional): Size of the uncompressed data per block.
+                Defaults to DFLT_BGZF_BLOCK_SIZE.
+        """
+        super().__init__()
+        self.filename = Path(filename)
+        self.level = 6 if level is None else level
+        self.blockSize = min(blockSize, DFLT_BGZF_BLOCK_SIZE)
+        self.blocks = []
+        self.sections = []
+        self.currentSection = None
+        self.buffer = bytearray()
+        self.uOffset = 0
+        if 'a' in mode and self.filename.exists():
+            self._loadExisting()
+            self.fhandle = self.filename.open('r+b')
+            # remove the EOF marker
+            self.fhandle.seek(0, io.SEEK_END)
+            size = self.fhandle.tell()
+            if size >= len(DFLT_BGZF_EOF):
+                self.fhandle.seek(size - len(DFLT_BGZF_EOF))
+                if self.fhandle.read() == DFLT_BGZF_EOF:
+                    size -= len(DFLT_BGZF_EOF)
+            self.fhandle.seek(size)
+            self.fhandle.truncate()
+        else:
+            self.fhandle = self.filename.open('wb')
+        # size of the uncompressed data already written in blocks
+        self.writtenSize = self.uOffset
+
+    def _loadExisting(self)-> None:
+        index = loadIndex(self.filename)
+        if index is not None:
+            self.blocks = index['blocks']
+            self.sections = index['sections']
+            self.uOffset = index['size']
+        else:
+            self.blocks, self.uOffset = scanBlocks(self.filename)
+
+    def writable(self)-> bool:
+        return True
+
+    def write(self, data: bytes)-> int:  # type: ignore[override]
+        """
+        Write data (compressed by blocks).
+
+        Args:
+            data (bytes): The data to write.
+
+        Returns:
+            int: The number of bytes written.
+        """
+        self.buffer.extend(data)
+        while len(self.buffer) >= self.blockSize:
+            self._writeBlock(bytes(self.buffer[:self.blockSize]))
+            del self.buffer[:self.blockSize]
+        self.uOffset += len(data)
+        return len(data)
+
+    def tell(self)-> int:
+        """
+        Returns:
+            int: The current position in the uncompressed data.
+        """
+        return self.uOffset
+
+    def _writeBlock(self, data: bytes)-> None:
+        compressor = zlib.compressobj(self.level, zlib.DEFLATED, -15)
+        cdata = compressor.compress(data) + compressor.flush()
+        blockSize = 18 + len(cdata) + 8
+        if blockSize > DFLT_BGZF_MAX_BLOCK:
+            # incompressible data: split the block
+            half = len(data) // 2
+            self._writeBlock(data[:half])
+            self._writeBlock(data[half:])
+            return
+        self.blocks.append([self.fhandle.tell(), self.writtenSize])
+        self.writtenSize += len(data)
+        header = b'\x1f\x8b\x08\x04\x00\x00\x00\x00\x00\xff\x06\x00BC\x02\x00'
+        self.fhandle.write(header + struct.pack('<H', blockSize - 1))
+        self.fhandle.write(cdata)
+        self.fhandle.write(struct.pack('<II', zlib.crc32(data), len(data)))
+
+    def flush(self)-> None:
+        """
+        Compress the pending data into a block (to be used before declaring a section).
+        """
+        if self.buffer:
+            self._writeBlock(bytes(self.buffer))
+            self.buffer.clear()
+        if not self.fhandle.closed:
+            self.fhandle.flush()
+
+    def openSection(self, name: str, **meta: object)-> None:
+        """
+        Declare the start of a section at the current position.
+
+        Args:
+            name (str): The name of the section (e.g. '$Nodes').
+            **meta: Additional information stored in the index (e.g. name of a field, step...).
+        """
+        self.closeSection()
+        self.currentSection = {'name': name, 'offset': self.uOffset, 'end': None}
+        self.currentSection.update(meta)
+        self.sections.append(self.currentSection)
+
+    def closeSection(self)-> None:
+        """
+        Declare the end of the current section at the current position.
+        """
+        if self.currentSection is not None:
+            self.currentSection['end'] = self.uOffset
+            self.currentSection = None
+
+    def close(self)-> None:
+        """
+        Write the remaining data, the EOF marker and the sidecar index.
+        """
+        if self.closed:
+            return
+        self.closeSection()
+        self.flush()
+        self.fhandle.write(DFLT_BGZF_EOF)
+        compressedSize = self.fhandle.tell()
+        self.fhandle.close()
+        index = {
+            'format': DFLT_INDEX_FORMAT,
+            'version': 1,
+            'compressedSize': compressedSize,
+            'size': self.uOffset,
+            'blocks': self.blocks,
+            'sections': self.sections,
+        }
+        with getIndexFilename(self.filename).open('w', encoding='utf-8') as f:
+            json.dump(index, f)
+        super().close()
+
+
+class BGZFReader(io.BufferedIOBase):
+    """
+    Binary stream reading blocked gzip (BGZF) files with random access.
+
+    The block index is loaded from the sidecar index (or rebuilt from the headers of
+    the blocks) so that only the blocks containing the requested data are decompressed.
+
+    Attributes:
+        filename (Path): The name of the compressed file.
+        blocks (list): List of blocks as (compressed offset, uncompressed offset).
+        size (int): Size of the uncompressed data.
+        sections (list): List of the sections declared at writing.
+    """
+
+    def __init__(self, filename: Union[str, Path], mode: str = 'rb')-> None:
+        """
+        Open a BGZF file for reading.
+
+        Args:
+            filename (Union[str, Path]): The name of the file.
+            mode (str, optional): Unused (only reading is supported). Defaults to 'rb'.
+        """
+        super().__init__()
+        _ = mode
+        self.filename = Path(filename)
+        index = loadIndex(self.filename)
+        if index is not None:
+            self.blocks = index['blocks']
+            self.size = index['size']
+            self.sections = index['sections']
+        else:
+            self.blocks, self.size = scanBlocks(self.filename)
+            self.sections = []
+        self.uStarts = [b[1] for b in self.blocks]
+        self.fhandle = self.filename.open('rb')
+        self.position = 0
+        self.cacheId = -1
+        self.cacheData = b''
+
+    def readable(self)-> bool:
+        return True
+
+    def seekable(self)-> bool:
+        return True
+
+    def tell(self)-> int:
+        return self.position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET)-> int:
+        if whence == io.SEEK_CUR:
+            offset += self.position
+        elif whence == io.SEEK_END:
+            offset += self.size
+        self.position = max(0, min(offset, self.size))
+        return self.position
+
+    def _loadBlock(self, iBlock: int)-> bytes:
+        if iBlock != self.cacheId:
+            cOffset = self.blocks[iBlock][0]
+            self.fhandle.seek(cOffset)
+            header = self.fhandle.read(18)
+            blockSize = struct.unpack('<H', header[16:18])[0] + 1
+            cdata = self.fhandle.read(blockSize - 26)
+            self.cacheData = zlib.decompress(cdata, -15)
+            self.cacheId = iBlock
+        return self.cacheData
+
+    def read(self, size: Optional[int] = -1)-> bytes:  # type: ignore[override]
+        """
+        Read data from the current position (only the necessary blocks are decompressed).
+
+        Args:
+            size (Optional[int], optional): Number of bytes to read (all if negative).
+
+        Returns:
+            bytes: The data.
+        """
+        if size is None or size < 0:
+            size = self.size - self.position
+        end = min(self.position + size, self.size)
+        chunks = []
+        while self.position < end:
+            iBlock = bisect_right(self.uStarts, self.position) - 1
+            data = self._loadBlock(iBlock)
+            start = self.position - self.uStarts[iBlock]
+            chunk = data[start:start + end - self.position]
+            if not chunk:
+                break
+            chunks.append(chunk)
+            self.position += len(chunk)
+        return b''.join(chunks)
+
+    def read1(self, size: int = -1)-> bytes:
+        return self.read(size)
+
+    def readinto(self, buffer: Union[bytearray, memoryview])-> int:  # type: ignore[override]
+        data = self.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+    def readRange(self, start: int, end: int)-> bytes:
+        """
+        Read the uncompressed data between two offsets.
+
+        Args:
+            start (int): The first offset.
+            end (int): The last offset (excluded).
+
+        Returns:
+            bytes: The data.
+        """
+        self.seek(start)
+        return self.read(end - start)
+
+    def getSections(self, name: Optional[str] = None, **meta: object)-> list:
+        """
+        Get the sections declared at writing.
+
+        Args:
+            name (Optional[str], optional): Keep only the sections with this name. Defaults to None.
+            **meta: Keep only the sections with this additional information (e.g. step=3).
+
+        Returns:
+            list: The sections (dictionaries with at least 'name', 'offset' and 'end').
+        """
+        sections = []
+        for section in self.sections:
+            if name is not None and section['name'] != name:
+                continue
+            if any(section.get(k) != v for k, v in meta.items()):
+                continue
+            sections.append(section)
+        return sections
+
+    def readSection(self, section: dict)-> bytes:
+        """
+        Read the data of a section (only the blocks of the section are decompressed).
+
+        Args:
+            section (dict): The section (see `getSections`).
+
+        Returns:
+            bytes: The data of the section.
+        """
+        end = section['end'] if section.get('end') is not None else self.size
+        return self.readRange(section['offset'], end)
+
+    def close(self)-> None:
+        if not self.closed:
+            self.fhandle.close()
+        super().close()
+
+
+def _openBGZF(filename: Path, mode: str, level: Optional[int])-> io.BufferedIOBase:
+    if 'r' in mode:
+        return BGZFReader(filename, mode)
+    return BGZFWriter(filename, mode, level)
+
+
+registerCodec('gz',
+              extensions=('.gz',),
+              opener=lambda f, m, lvl: gzip.GzipFile(f, m, compresslevel=9 if lvl is None else lvl),
+              compress=lambda d, lvl: gzip.compress(d, compresslevel=9 if lvl is None else lvl),
+              decompress=gzip.decompress,
+              level=9,
+              levelRange=(0, 9))
+registerCodec('bz2',
+              extensions=('.bz2',),
+              opener=lambda f, m, lvl: bz2lib.BZ2File(f, m, compresslevel=9 if lvl is None else lvl),
+              compress=lambda d, lvl: bz2lib.compress(d, compresslevel=9 if lvl is None else lvl),
+              decompress=bz2lib.decompress,
+              level=9,
+              levelRange=(1, 9))
+registerCodec('xz',
+              extensions=('.xz', '.lzma'),
+              opener=lambda f, m, lvl: lzma.LZMAFile(f, m, preset=lvl if 'w' in m or 'a' in m else None),
+              compress=lambda d, lvl: lzma.compress(d, preset=lvl),
+              decompress=lzma.decompress,
+              level=6,
+              levelRange=(0, 9))
+registerCodec('bgzf',
+              extensions=('.gz', '.bgz'),
+              opener=_openBGZF,
+              compress=lambda d, lvl: gzip.compress(d, compresslevel=6 if lvl is None else lvl),
+              decompress=gzip.decompress,
+              level=6,
+              levelRange=(0, 9))
+if zstdlib is not None or zstandard is not None:
+    registerCodec('zstd',
+                  extensions=('.zst',),
+                  opener=_openZstd,
+                  compress=_compressZstd,
+                  decompress=_decompressZstd,
+                  level=DFLT_ZSTD_LEVEL,
+                  levelRange=(-7, 22))
+
 
 class FileHandler:
     """
@@ -28,12 +630,14 @@ class FileHandler:
     Methods:
         __init__(filename: Union[str, Path]=None, append: Optional[bool]=None, 
                  right: str='w', gz: bool=False, bz2: bool=False, 
-                 safeMode: bool=False) -> None:
+                 safeMode: bool=False, compression: Optional[str]=None,
+                 level: Optional[int]=None, bufferSize: Optional[int]=None) -> None:
             Initializes the FileHandler class with the specified parameters.
 
-        get_filename(filename: Path, gz: bool=False, bz2: bool=False) -> None:
+        get_filename(filename: Path, gz: bool=False, bz2: bool=False,
+                     compression: Optional[str]=None) -> None:
             Determines the appropriate filename and compression type based on the 
-            provided file path and optional compression flags.
+            provided file path, optional compression flags and the codec registry.
 
         open(safeMode: bool=False) -> object:
 
@@ -61,7 +665,10 @@ class FileHandler:
                 right: str='w',
                 flagGZ: bool=False,
                 flagBZ2: bool=False,
-                safeMode: bool=False)-> None:
+                safeMode: bool=False,
+                compression: Optional[str]=None,
+                level: Optional[int]=None,
+                bufferSize: Optional[int]=None)-> None:
         """
         Initializes the file handling class.
 
@@ -77,6 +684,12 @@ class FileHandler:
             Defaults to False.
             safeMode (bool, optional): If True, prevents overwriting of existing files. 
             Defaults to False.
+            compression (Optional[str], optional): Name of a registered codec ('gz', 'bz2', 'xz',
+            'zstd' if available...). Overrides the detection based on the extension. Defaults to None.
+            level (Optional[int], optional): Compression level (codec default if None).
+            Defaults to None.
+            bufferSize (Optional[int], optional): Size (in bytes) of the buffer used on top of
+            compressed streams. Defaults to None (`DFLT_BUFFER_SIZE`).
 
         Attributes:
             filename (Optional[Path]): The resolved file path.
@@ -84,20 +697,28 @@ class FileHandler:
             fhandle (Optional[IO]): The file handle for the opened file.
             right (str): The mode used to open the file.
             append (Optional[bool]): Indicates if the file is opened in append mode.
-            compress (Optional[str]): The compression method used ('gz', 'bz2', or None).
+            compress (Optional[str]): The name of the codec used (None without compression).
+            level (Optional[int]): The compression level.
+            bufferSize (int): The size of the buffer used on top of compressed streams.
+            rawHandle (Optional[IO]): The binary stream provided by the codec.
             startTime (float): The timestamp when the file operation starts.
+            nbBytes (int): The number of bytes (characters in text mode) written with `write`.
 
         Raises:
-            ValueError: If 'filename' is not provided or if neither 'right' nor 'append' 
-            is specified.
+            ValueError: If 'filename' is not provided, if neither 'right' nor 'append' 
+            is specified, or if the codec/level is not available.
         """
         self.filename = None
         self.dirname = None
         self.fhandle = None
+        self.rawHandle = None
         self.right: str = right
         self.append = None
         self.compress = None
+        self.level = level
+        self.bufferSize = bufferSize or DFLT_BUFFER_SIZE
         self.startTime = 0
+        self.nbBytes = 0
         #
         self.fixRight(append=append, right=right)
 
@@ -108,14 +729,19 @@ class FileHandler:
             Logger.error('Right(s) not provided')
         # load the filename
         if filename is not None:
-            self.getFilename(Path(filename), flagGZ=flagGZ, flagBZ2=flagBZ2)
+            self.getFilename(Path(filename), flagGZ=flagGZ, flagBZ2=flagBZ2, compression=compression)
+            self.checkLevel()
         # open the file
         self.open(safeMode)
 
-    def getFilename(self, filename: Path, flagGZ: bool=False, flagBZ2: bool=False)-> None:
+    def getFilename(self,
+                    filename: Path,
+                    flagGZ: bool=False,
+                    flagBZ2: bool=False,
+                    compression: Optional[str]=None)-> None:
         """
         Determines the appropriate filename and compression type based on the provided
-        file path and optional compression flags.
+        file path, optional compression flags and the codec registry.
 
         Args:
             filename (Path): The input file path.
@@ -123,36 +749,56 @@ class FileHandler:
                 if no compression is detected. Defaults to False.
             flagBZ2 (bool, optional): If True, appends a '.bz2' extension to the filename 
                 if no compression is detected. Defaults to False.
+            compression (Optional[str], optional): Name of a registered codec. If the
+                extension of the file does not belong to the codec, its first extension
+                is appended. Defaults to None.
 
         Attributes Set:
-            self.compress (str or None): The compression type ('gz', 'bz2', or None).
+            self.compress (str or None): The name of the codec (None without compression).
             self.basename (str): The name of the file (including extension).
             self.dirname (Path): The absolute parent directory of the file.
             self.filename (Path): The full file path.
 
         Notes:
-            - If the file already has a '.gz' or '.bz2' extension, the corresponding 
-              compression type is set, and the filename remains unchanged.
+            - If the file already has the extension of a registered codec ('.gz', '.bz2',
+              '.xz'...), the corresponding codec is used and the filename remains unchanged.
             - If no compression is detected and `flagGZ` or `flagBZ2` is True, the respective 
               extension is appended to the filename, and the compression type is set.
         """
         self.compress = None
+        if compression is None:
+            if flagGZ:
+                compression = 'gz'
+            elif flagBZ2:
+                compression = 'bz2'
         # check extension for compression
-        if filename.suffix == '.gz':
-            self.compress = 'gz'
-        elif filename.suffix == '.bz2':
-            self.compress = 'bz2'
-        elif flagGZ:
-            filename.with_suffix(filename.suffix + '.gz')
-            self.compress = 'gz'
-        elif flagBZ2:
-            filename.with_suffix(filename.suffix + '.bz2')
-            self.compress = 'bz2'
+        self.compress = getCodecFromExtension(filename)
+        if compression is not None:
+            codec = getCodec(compression)
+            if filename.suffix not in codec['extensions']:
+                if self.compress is None:
+                    filename = filename.with_suffix(filename.suffix + codec['extensions'][0])
+                else:
+                    Logger.warning(f'{filename.name}: extension does not match with {compression} compression')
+            self.compress = compression
         # extract information about filename
         self.basename = filename.name
         self.dirname = filename.absolute().parent
         self.filename = filename
 
+    def checkLevel(self)-> None:
+        """
+        Check the compression level against the range allowed by the codec.
+
+        Raises:
+            ValueError: If the level is out of the range of the codec.
+        """
+        if self.compress is None or self.level is None:
+            return
+        lmin, lmax = getCodec(self.compress)['levelRange']
+        if (lmin is not None and self.level < lmin) or (lmax is not None and self.level > lmax):
+            raise ValueError(f'Compression level {self.level} out of range [{lmin}, {lmax}] for {self.compress}')
+
     def open(self, safeMode: bool=False) -> Optional[object]:
         """
         Opens a file with specified access rights and optional safe mode.
@@ -169,7 +815,7 @@ class FileHandler:
               and adjusts the access rights to disable append mode.
             - If `safeMode` is True and the file exists, prevents overwriting and logs a warning.
             - If `safeMode` is False and the file exists, allows overwriting and logs a warning.
-            - Supports opening files with optional compression (`gz` or `bz2`).
+            - Supports opening files with optional compression (any registered codec).
             - Logs debug information about the file opening process.
             - Records the timestamp when the file is opened.
         """
@@ -189,20 +835,9 @@ class FileHandler:
             #
             Logger.debug(f'Open {self.basename} in {self.dirname} with right {self.right}')
             # open file
-            if self.compress == 'gz':
-                Logger.debug('Use GZ lib')
-
-                if 'b' in self.right:
-                    self.fhandle = gzip.open(self.filename, self.right)
-                else:
-                    self.fhandle = gzip.open(self.filename, self.right, encoding='utf-8')
-            elif self.compress == 'bz2':
-                Logger.debug('Use BZ2 lib')
-
-                if 'b' in self.right:
-                    self.fhandle = bz2lib.open(self.filename, self.right)
-                else:
-                    self.fhandle = bz2lib.open(self.filename, self.right, encoding='utf-8')
+            if self.compress is not None:
+                Logger.debug(f'Use {self.compress} codec (level {self.level}, buffer {self.bufferSize})')
+                self.fhandle = self.openCompressed()
             else:
                 if 'b' in self.right:
                     self.fhandle = self.filename.open(mode=self.right)
@@ -212,6 +847,29 @@ class FileHandler:
         self.startTime = time.perf_counter()
         return self.fhandle
 
+    def openCompressed(self)-> IO:
+        """
+        Open the file through the selected codec.
+
+        The binary stream provided by the codec is wrapped into a buffer of size
+        `bufferSize` (to limit the number of calls to the compressor) and into a
+        text layer if the file is not opened in binary mode.
+
+        Returns:
+            IO: The file handle.
+        """
+        codec = getCodec(cast(str, self.compress))
+        modeBin = self.right.replace('t', '').replace('b', '') + 'b'
+        raw = codec['open'](self.filename, modeBin, self.level)
+        self.rawHandle = raw
+        if 'r' in modeBin:
+            stream = io.BufferedReader(raw, buffer_size=self.bufferSize)
+        else:
+            stream = io.BufferedWriter(raw, buffer_size=self.bufferSize)
+        if 'b' in self.right:
+            return stream
+        return io.TextIOWrapper(stream, encoding='utf-8')
+
     def close(self)-> None:
         """
         Closes the currently opened file.
@@ -226,11 +884,36 @@ class FileHandler:
         if self.fhandle and self.filename:
             self.fhandle.close()
             self.fhandle = None
+            self.rawHandle = None
             txt = f'Close file {self.basename} with elapsed time '
             txt += f'{time.perf_counter()-self.startTime:g}s'
             txt += f'- size {various.convert_size(self.filename.stat().st_size)}'
             Logger.info(txt)
 
+    def openSection(self, name: str, **meta: object)-> None:
+        """
+        Declare the start of a section (e.g. '$Nodes' or a step of a field) at the current
+        position. Sections are stored in the index of seekable compressed files (codec
+        'bgzf') and ignored otherwise.
+
+        Args:
+            name (str): The name of the section.
+            **meta: Additional information stored in the index.
+        """
+        if self.fhandle is None or not hasattr(self.rawHandle, 'openSection'):
+            return
+        self.fhandle.flush()
+        self.rawHandle.openSection(name, **meta)  # type: ignore[union-attr]
+
+    def closeSection(self)-> None:
+        """
+        Declare the end of the current section (see `openSection`).
+        """
+        if self.fhandle is None or not hasattr(self.rawHandle, 'closeSection'):
+            return
+        self.fhandle.flush()
+        self.rawHandle.closeSection()  # type: ignore[union-attr]
+
     def getHandler(self)-> object:
         """
         Retrieves the file handler associated with the current instance.
@@ -262,12 +945,16 @@ class FileHandler:
         if isinstance(txt, bytes):
             if 'b' not in self.right:
                 raise TypeError('Binary data requires a binary file mode')
-            return cast(IO[bytes], self.fhandle).write(txt)
+            nb = cast(IO[bytes], self.fhandle).write(txt)
+            self.nbBytes += nb
+            return nb
 
         if isinstance(txt, str):
             if 'b' in self.right:
                 raise TypeError('Text data requires a text file mode')
-            return cast(IO[str], self.fhandle).write(txt)
+            nb = cast(IO[str], self.fhandle).write(txt)
+            self.nbBytes += nb
+            return nb
 
         raise TypeError('Only str and bytes are supported')
 
@@ -294,10 +981,12 @@ class FileHandler:
         """
         if append is not None:
             self.append = append
+            # keep the binary mode
+            binary = 'b' if 'b' in (self.right or '') else ''
             if append:
-                self.right = 'a'
+                self.right = 'a' + binary
             else:
-                self.right = 'w'
+                self.right = 'w' + binary
         else:
             resolved_right = right or ''
             self.right = resolved_right
@@ -333,3 +1022,66 @@ class fileHandler(FileHandler):
             safeMode=safeMode,
             **kwargs,
         )
+
+
+def benchmarkCodecs(source: Union[str, Path, bytes],
+                    codecs: Optional[list] = None,
+                    levels: Optional[Union[list, dict]] = None,
+                    repeat: int = 1)-> list:
+    """
+    Benchmark the registered codecs on the contents of a mesh file (or raw data).
+
+    For each codec and level, the data are compressed and decompressed in memory
+    and the compression ratio and the throughputs are reported.
+
+    Args:
+        source (Union[str, Path, bytes]): Mesh file (read as is, compressed files are
+            decompressed first) or raw data to compress.
+        codecs (Optional[list], optional): Names of the codecs to benchmark. Defaults to all
+            the available codecs.
+        levels (Optional[Union[list, dict]], optional): Levels to benchmark, as a list used for
+            all codecs or a dictionary of lists per codec. Defaults to the default level of each codec.
+        repeat (int, optional): Number of repetitions (the best time is kept). Defaults to 1.
+
+    Returns:
+        list: One dictionary per (codec, level) with keys 'codec', 'level', 'size',
+        'compressedSize', 'ratio', 'compressMBs' and 'decompressMBs'.
+    """
+    if isinstance(source, bytes):
+        data = source
+    else:
+        objFile = FileHandler(filename=source, right='rb', safeMode=False)
+        data = cast(IO[bytes], objFile.getHandler()).read()
+        objFile.close()
+    size = len(data)
+    report = []
+    for name in codecs or listCodecs():
+        codec = getCodec(name)
+        if isinstance(levels, dict):
+            levelsCodec = levels.get(name, [codec['level']])
+        else:
+            levelsCodec = levels or [codec['level']]
+        for level in levelsCodec:
+            timeC = timeD = float('inf')
+            compressed = b''
+            for _ in range(max(repeat, 1)):
+                start = time.perf_counter()
+                compressed = codec['compress'](data, level)
+                timeC = min(timeC, time.perf_counter() - start)
+                start = time.perf_counter()
+                codec['decompress'](compressed)
+                timeD = min(timeD, time.perf_counter() - start)
+            result = {
+                'codec': name,
+                'level': level,
+                'size': size,
+                'compressedSize': len(compressed),
+                'ratio': size / max(len(compressed), 1),
+                'compressMBs': size / 1024**2 / max(timeC, 1e-12),
+                'decompressMBs': size / 1024**2 / max(timeD, 1e-12),
+            }
+            Logger.info(f"{name} (level {level}): ratio {result['ratio']:.2f} "
+                        f"- compression {result['compressMBs']:.1f} MB/s "
+                        f"- decompression {result['decompressMBs']:.1f} MB/s")
+            report.append(result)
+    return report
@@ -0,0 +1,210 @@
+"""
+This file is part of the meshRW package
+---
+Mesh container shared by the readers and the writers: the inputs are adapted once and the
+data derived from the element blocks (counts, physical groups, types, offsets of the blocks,
+cells of the VTK writers) are computed on first use and cached, so repeated exports of the
+same mesh skip the analysis. The encoded sections of the text writers can also be kept and
+reused by the next writers (see `getEncoded`).
+"""
+
+from typing import Callable, Iterable, Optional, Union
+
+import numpy as np
+from loguru import logger as Logger
+
+from . import configMESH, writerClass
+
+
+class Mesh:
+    """
+    Container of the nodes, element blocks and fields of a mesh, accepted by the writers
+    (argument `mesh`) and returned by the readers (`getMesh`).
+
+    The content is adapted once (see `writerClass.adaptInputs`) and must not be modified
+    in place afterwards (or `clearCache` must be called).
+
+    Attributes:
+        nodes (np.ndarray): The coordinates of the nodes (one row per node).
+        elements (list): The element blocks [{'connectivity': table, 'type': 'TRI3',
+            'physgrp': groups}, ...].
+        fields (Optional[list]): The fields [{'data': array, 'type': 'nodal', 'dim': 3,
+            'name': 'U'}, ...].
+        offset (int): The index of the first node in the connectivity (0 for the VTK
+            formats, 1 for the MSH formats).
+        cache (dict): The derived data already computed.
+        keepEncoded (bool): Whether the encoded sections of the text writers are kept in the
+            cache and reused by the next writers (see `getEncoded`).
+    """
+
+    def __init__(self,
+                 nodes: Union[list, np.ndarray],
+                 elements: Union[list, dict],
+                 fields: Union[list, dict, None]=None,
+                 offset: int=0)-> None:
+        """
+        Initialize the mesh container.
+
+        Args:
+            nodes (Union[list, np.ndarray]): The coordinates of the nodes (2 or 3 per node).
+            elements (Union[list, dict]): The element blocks.
+            fields (Union[list, dict, None], optional): The fields. Defaults to None.
+            offset (int, optional): The index of the first node in the connectivity (0 for
+                the VTK formats, 1 for the MSH formats). Defaults to 0.
+
+        Raises:
+            ValueError: If the nodes or the elements are missing.
+        """
+        if nodes is None or elements is None:
+            raise ValueError('nodes and elements are required')
+        self.nodes, self.elements, self.fields = writerClass.adaptInputs(nodes, elements, fields)
+        self.offset = offset
+        self.cache = {}
+        self.keepEncoded = False
+
+    @property
+    def nbNodes(self)-> int:
+        """
+        Number of nodes.
+        """
+        return self.nodes.shape[0]
+
+    @property
+    def nbElems(self)-> int:
+        """
+        Number of elements (all the blocks).
+        """
+        return self.getAnalysis()['nbElems']
+
+    def clearCache(self)-> None:
+        """
+        Clear the derived data (to be called if the content is modified).
+        """
+        self.cache = {}
+
+    def cachedValue(self, key: tuple, compute: Callable)-> object:
+        """
+        Get a derived data, computed on first use.
+
+        Args:
+            key (tuple): The key of the data.
+            compute (Callable): The function computing the data.
+
+        Returns:
+            object: The data.
+        """
+        if key not in self.cache:
+            self.cache[key] = compute()
+        return self.cache[key]
+
+    def getAnalysis(self)-> dict:
+        """
+        Get the statistics of the elements used by the writers (see `writerClass.analyseElements`).
+
+        Returns:
+            dict: The statistics (number of elements, elements per type and per physical
+            group, names of the groups, list of the groups and new global group).
+        """
+        return self.cachedValue(('analysis',), lambda: writerClass.analyseElements(self.elements))
+
+    def getTypes(self)-> list:
+        """
+        Get the types of the elements (order of the blocks, without duplicates).
+
+        Returns:
+            list: The types of the elements.
+        """
+        return self.cachedValue(('types',),
+                                lambda: list(dict.fromkeys(e[configMESH.DFLT_TYPE_ELEM] for e in self.elements)))
+
+    def getBlockOffsets(self)-> np.ndarray:
+        """
+        Get the index of the first element of each block in the numbering of all the elements.
+
+        Returns:
+            np.ndarray: The offsets (one more value than blocks, the last one is the number
+            of elements).
+        """
+        def compute()-> np.ndarray:
+            sizes = [np.shape(e[configMESH.DFLT_MESH])[0] for e in self.elements]
+            return np.concatenate(([0], np.cumsum(sizes, dtype=np.int64)))
+        return self.cachedValue(('blockOffsets',), compute)
+
+    def getPhysGrpData(self)-> Optional[np.ndarray]:
+        """
+        Get the physical group of each element (see `writerClass.getPhysGrpData`).
+
+        Returns:
+            Optional[np.ndarray]: The physical groups (int32), None without physical group.
+        """
+        return self.cachedValue(('physGrpData',), lambda: writerClass.getPhysGrpData(self.elements))
+
+    def getCellArrays(self)-> tuple:
+        """
+        Get the cells of the VTK writers (see `writerClass.getCellArrays`).
+
+        Returns:
+            tuple: The VTK types (uint8), the offsets (int64) and the connectivity (int64,
+            numbered from 0) of the cells.
+        """
+        return self.cachedValue(('cellArrays',), lambda: writerClass.getCellArrays(self.getElements(0)))
+
+    def getEncoded(self, key: tuple, encode: Callable)-> Iterable:
+        """
+        Get an encoded section of a text file (chunks of text given by `encode`): kept in
+        the cache and reused by the next writers if `keepEncoded` is set (e.g. targets with
+        the same encoding such as `.msh` and `.msh.gz`), generated on the fly otherwise.
+
+        Args:
+            key (tuple): The key of the section (format, section and encoding parameters).
+            encode (Callable): The function returning the chunks of text.
+
+        Returns:
+            Iterable: The chunks of text.
+        """
+        if not self.keepEncoded:
+            return encode()
+        return self.cachedValue(('encoded',) + key, lambda: list(encode()))
+
+    def clearEncoded(self)-> None:
+        """
+        Remove the encoded sections from the cache (see `getEncoded`).
+        """
+        self.cache = {k: v for k, v in self.cache.items() if k[0] != 'encoded'}
+
+    def getElements(self, offset: Optional[int]=None)-> list:
+        """
+        Get the element blocks with the connectivity starting at `offset` (the shifted
+        tables are cached).
+
+        Args:
+            offset (Optional[int], optional): The index of the first node in the connectivity
+                (offset of the mesh if None). Defaults to None.
+
+        Returns:
+            list: The element blocks (shallow copies of the blocks of the mesh).
+        """
+        if offset is None or offset == self.offset:
+            return [dict(e) for e in self.elements]
+
+        def compute()-> list:
+            shift = offset - self.offset
+            Logger.debug(f'Shift the connectivity of the mesh ({shift:+d})')
+            return [np.asarray(e[configMESH.DFLT_MESH]) + shift for e in self.elements]
+        tables = self.cachedValue(('connectivity', offset), compute)
+        return [dict(e, **{configMESH.DFLT_MESH: t}) for e, t in zip(self.elements, tables)]
+
+    def getInputs(self, offset: Optional[int]=None)-> tuple:
+        """
+        Get the nodes, element blocks and fields in the structures used by the writers.
+
+        Args:
+            offset (Optional[int], optional): The index of the first node in the connectivity
+                (offset of the mesh if None). Defaults to None.
+
+        Returns:
+            tuple: The nodes, the element blocks (see `getElements`) and the fields (list of
+            the fields of the mesh, None without fields).
+        """
+        fields = [dict(f) for f in self.fields] if self.fields is not None else None
+        return self.nodes, self.getElements(offset), fields
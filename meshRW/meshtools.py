@@ -0,0 +1,658 @@
+"""
+This file is part of the meshRW package
+---
+This file includes tools to prepare the meshes before their export: renumbering of the
+nodes and elements to improve the locality of the data (reverse Cuthill-McKee ordering
+of the nodes or space-filling curves) and merging of the coincident nodes (grid hashing).
+----
+Luc Laurent - luc.laurent@lecnam.net -- 2021
+"""
+
+from typing import Optional, Union
+
+import numpy as np
+from loguru import logger as Logger
+
+from . import configMESH
+
+# reordering methods
+DFLT_REORDER_METHODS: tuple = ('rcm', 'morton', 'hilbert')
+# number of bits per coordinate of the keys of the space-filling curves
+DFLT_CURVE_BITS: int = 16
+# tolerance of the merging of the coincident nodes
+DFLT_MERGE_TOL: float = 1e-8
+# multipliers of the hash of the cells of the grid
+HASH_PRIMES: np.ndarray = np.array([0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F, 0x165667B19E3779F9], dtype=np.uint64)
+# multipliers of the finalizer of the hashes (splitmix64)
+HASH_MIX: np.ndarray = np.array([0xBF58476D1CE4E5B9, 0x94D049BB133111EB], dtype=np.uint64)
+
+
+def invertPermutation(order: np.ndarray)-> np.ndarray:
+    """
+    Invert a permutation.
+
+    Args:
+        order (np.ndarray): The permutation (new index -> old index).
+
+    Returns:
+        np.ndarray: The inverse permutation (old index -> new index).
+    """
+    inverse = np.empty(order.size, dtype=np.int64)
+    inverse[order] = np.arange(order.size, dtype=np.int64)
+    return inverse
+
+
+def getBlocks(elements: Union[list, dict, None])-> list:
+    """
+    Get the element blocks as a list.
+
+    Args:
+        elements (Union[list, dict, None]): The element blocks (dictionaries with the keys
+            'connectivity', 'type' and optionally 'physgrp').
+
+    Returns:
+        list: The blocks.
+    """
+    if elements is None:
+        return []
+    if isinstance(elements, dict):
+        return [elements]
+    return list(elements)
+
+
+def buildIncidence(nbNodes: int, elements: list, offset: int=0)-> tuple:
+    """
+    Build the incidence of the nodes and the elements (compressed sparse rows).
+
+    Args:
+        nbNodes (int): The number of nodes.
+        elements (list): The element blocks.
+        offset (int, optional): The index of the first node in the connectivity (0 or 1).
+            Defaults to 0.
+
+    Returns:
+        tuple: The pointers and the nodes of the elements (elements of all the blocks in
+        their order), and the pointers and the elements of the nodes.
+    """
+    conns = [np.asarray(e[configMESH.DFLT_MESH], dtype=np.int64) for e in elements]
+    conns = [c.reshape(c.shape[0], -1) - offset for c in conns if c.size]
+    sizes = np.concatenate([np.full(c.shape[0], c.shape[1], dtype=np.int64) for c in conns]) if conns \
+        else np.zeros(0, dtype=np.int64)
+    elemPtr = np.concatenate(([0], np.cumsum(sizes)))
+    elemNodes = np.concatenate([c.ravel() for c in conns]) if conns else np.zeros(0, dtype=np.int64)
+    # elements of each node
+    order = np.argsort(elemNodes, kind='stable')
+    nodeElems = np.repeat(np.arange(sizes.size, dtype=np.int64), sizes)[order]
+    nodePtr = np.concatenate(([0], np.cumsum(np.bincount(elemNodes, minlength=nbNodes))))
+    return elemPtr, elemNodes, nodePtr, nodeElems
+
+
+def gatherRows(ptr: np.ndarray, values: np.ndarray, rows: np.ndarray)-> tuple:
+    """
+    Gather the values of rows of a compressed sparse rows structure.
+
+    Args:
+        ptr (np.ndarray): The pointers of the rows.
+        values (np.ndarray): The values.
+        rows (np.ndarray): The rows to gather.
+
+    Returns:
+        tuple: The values of the rows (in the order of `rows`) and the position in `rows`
+        of each value.
+    """
+    counts = ptr[rows + 1] - ptr[rows]
+    owner = np.repeat(np.arange(rows.size, dtype=np.int64), counts)
+    shift = np.repeat(ptr[rows] - np.cumsum(counts) + counts, counts)
+    return values[np.arange(owner.size, dtype=np.int64) + shift], owner
+
+
+def getRCMOrder(nbNodes: int, elements: list, offset: int=0)-> np.ndarray:
+    """
+    Get the reverse Cuthill-McKee ordering of the nodes.
+
+    The graph of the nodes is traversed through the elements (two nodes are neighbors if
+    they belong to the same element) level by level from a pseudo-peripheral node; the
+    nodes of a level are sorted by the rank of their parent and their degree (number of
+    elements). Nodes not used by the elements are put at the end.
+
+    Args:
+        nbNodes (int): The number of nodes.
+        elements (list): The element blocks.
+        offset (int, optional): The index of the first node in the connectivity (0 or 1).
+            Defaults to 0.
+
+    Returns:
+        np.ndarray: The order of the nodes (new index -> old index).
+    """
+    elemPtr, elemNodes, nodePtr, nodeElems = buildIncidence(nbNodes, elements, offset)
+    degree = np.diff(nodePtr)
+    visitedNodes = np.zeros(nbNodes, dtype=bool)
+    visitedElems = np.zeros(elemPtr.size - 1, dtype=bool)
+
+    def traverse(start: int, visited: np.ndarray, done: np.ndarray)-> list:
+        # breadth-first traversal: levels of nodes sorted by parent rank and degree
+        visited[start] = True
+        frontier = np.array([start], dtype=np.int64)
+        result = [frontier]
+        while True:
+            elems, parent = gatherRows(nodePtr, nodeElems, frontier)
+            # first frontier node reaching each element
+            elems, first = np.unique(elems, return_index=True)
+            parent = parent[first]
+            new = ~done[elems]
+            elems, parent = elems[new], parent[new]
+            done[elems] = True
+            nodes, owner = gatherRows(elemPtr, elemNodes, elems)
+            parent = parent[owner]
+            new = ~visited[nodes]
+            nodes, parent = nodes[new], parent[new]
+            # sort by parent rank and degree, keep the first occurrence of each node
+            sort = np.lexsort((degree[nodes], parent))
+            nodes, first = np.unique(nodes[sort], return_index=True)
+            frontier = nodes[np.argsort(first)]
+            if not frontier.size:
+                return result
+            visited[frontier] = True
+            result.append(frontier)
+
+    order = []
+    candidates = np.argsort(degree, kind='stable')
+    candidates = candidates[degree[candidates] > 0]
+    while True:
+        # one connected component per iteration
+        candidates = candidates[~visitedNodes[candidates]]
+        if not candidates.size:
+            break
+        start = candidates[0]
+        # pseudo-peripheral node: node of minimal degree of the last level (two sweeps)
+        for _ in range(2):
+            last = traverse(int(start), visitedNodes.copy(), visitedElems.copy())[-1]
+            start = last[np.argmin(degree[last])]
+        order.extend(traverse(int(start), visitedNodes, visitedElems))
+    rcm = np.concatenate(order)[::-1] if order else np.zeros(0, dtype=np.int64)
+    # nodes not used by the elements at the end
+    return np.concatenate((rcm, np.flatnonzero(~visitedNodes)))
+
+
+def getCurveKeys(points: np.ndarray, method: str='hilbert', bits: int=DFLT_CURVE_BITS)-> np.ndarray:
+    """
+    Get the keys of points along a space-filling curve (Morton or Hilbert).
+
+    Args:
+        points (np.ndarray): The coordinates of the points (one row per point).
+        method (str, optional): The curve ('morton' or 'hilbert'). Defaults to 'hilbert'.
+        bits (int, optional): The number of bits per coordinate. Defaults to DFLT_CURVE_BITS.
+
+    Returns:
+        np.ndarray: The keys (uint64).
+    """
+    points = np.asarray(points, dtype=float)
+    points = points.reshape(points.shape[0], -1)
+    nbDim = points.shape[1]
+    bits = min(bits, 64 // max(nbDim, 1))
+    # quantized coordinates
+    low = points.min(axis=0) if points.size else np.zeros(nbDim)
+    extent = np.ptp(points, axis=0) if points.size else np.zeros(nbDim)
+    extent[extent == 0] = 1.0
+    scale = float((1 << bits) - 1)
+    coords = [np.rint((points[:, i] - low[i]) / extent[i] * scale).astype(np.uint64) for i in range(nbDim)]
+    if method == 'hilbert':
+        coords = transposeHilbert(coords, bits)
+    # interleave the bits (first coordinate as most significant bit)
+    keys = np.zeros(points.shape[0], dtype=np.uint64)
+    for bit in range(bits - 1, -1, -1):
+        for c in coords:
+            keys = (keys << np.uint64(1)) | ((c >> np.uint64(bit)) & np.uint64(1))
+    return keys
+
+
+def transposeHilbert(coords: list, bits: int)-> list:
+    """
+    Convert quantized coordinates to the transposed Hilbert index (J. Skilling, Programming
+    the Hilbert curve, AIP Conference Proceedings 707, 2004), vectorized on the points.
+
+    Args:
+        coords (list): The quantized coordinates (one uint64 array per dimension).
+        bits (int): The number of bits per coordinate.
+
+    Returns:
+        list: The transposed Hilbert index (one uint64 array per dimension).
+    """
+    x = [c.copy() for c in coords]
+    n = len(x)
+    q = np.uint64(1 << (bits - 1))
+    while q > 1:
+        p = q - np.uint64(1)
+        for i in range(n):
+            high = (x[i] & q) != 0
+            # invert the low bits of x[0] or exchange the low bits of x[0] and x[i]
+            t = np.where(high, np.uint64(0), (x[0] ^ x[i]) & p)
+            x[0] = np.where(high, x[0] ^ p, x[0] ^ t)
+            if i:
+                x[i] = x[i] ^ t
+        q >>= np.uint64(1)
+    # Gray encode
+    for i in range(1, n):
+        x[i] ^= x[i - 1]
+    t = np.zeros_like(x[0])
+    q = np.uint64(1 << (bits - 1))
+    while q > 1:
+        t = np.where((x[n - 1] & q) != 0, t ^ (q - np.uint64(1)), t)
+        q >>= np.uint64(1)
+    return [xi ^ t for xi in x]
+
+
+def getNodeOrder(nodes: np.ndarray,
+                 elements: Union[list, dict, None]=None,
+                 method: str='rcm',
+                 offset: int=0)-> np.ndarray:
+    """
+    Get a new order of the nodes improving the locality of the data.
+
+    Args:
+        nodes (np.ndarray): The coordinates of the nodes.
+        elements (Union[list, dict, None], optional): The element blocks (required for
+            'rcm'). Defaults to None.
+        method (str, optional): 'rcm' (reverse Cuthill-McKee), 'morton' or 'hilbert'.
+            Defaults to 'rcm'.
+        offset (int, optional): The index of the first node in the connectivity (0 or 1).
+            Defaults to 0.
+
+    Returns:
+        np.ndarray: The order of the nodes (new index -> old index).
+
+    Raises:
+        ValueError: If the method is not supported.
+    """
+    nodes = np.asarray(nodes)
+    if method == 'rcm':
+        return getRCMOrder(nodes.shape[0], getBlocks(elements), offset)
+    if method in ('morton', 'hilbert'):
+        return np.argsort(getCurveKeys(nodes, method), kind='stable')
+    raise ValueError(f'Reordering method {method} not supported (ALLOWED: {" ".join(DFLT_REORDER_METHODS)})')
+
+
+def getElementOrder(nodes: np.ndarray, connectivity: np.ndarray, method: str='rcm', offset: int=0)-> np.ndarray:
+    """
+    Get a new order of the elements of a block: by smallest node index ('rcm', to be
+    applied after the renumbering of the nodes) or along the space-filling curve of the
+    centroids ('morton', 'hilbert').
+
+    Args:
+        nodes (np.ndarray): The coordinates of the nodes.
+        connectivity (np.ndarray): The connectivity of the elements.
+        method (str, optional): 'rcm', 'morton' or 'hilbert'. Defaults to 'rcm'.
+        offset (int, optional): The index of the first node in the connectivity (0 or 1).
+            Defaults to 0.
+
+    Returns:
+        np.ndarray: The order of the elements (new index -> old index).
+    """
+    connectivity = np.asarray(connectivity, dtype=np.int64)
+    connectivity = connectivity.reshape(connectivity.shape[0], -1)
+    if connectivity.shape[0] < 2:
+        return np.arange(connectivity.shape[0], dtype=np.int64)
+    if method == 'rcm':
+        return np.argsort(connectivity.min(axis=1), kind='stable')
+    centroids = np.asarray(nodes, dtype=float)[connectivity - offset].mean(axis=1)
+    return np.argsort(getCurveKeys(centroids, method), kind='stable')
+
+
+def isTemporal(field: dict)-> bool:
+    """
+    Check if a field is defined on several steps (list of arrays, one per step).
+
+    Args:
+        field (dict): The field.
+
+    Returns:
+        bool: True if the field is defined on several steps.
+    """
+    return any(field.get(k) is not None for k in (configMESH.DFLT_FIELD_NBSTEPS, configMESH.DFLT_FIELD_STEPS,
+                                                  'timesteps'))
+
+
+def permuteValues(values: Union[list, np.ndarray], order: np.ndarray, temporal: bool=False)-> Union[list, np.ndarray]:
+    """
+    Permute (or select) the rows of the data of a field.
+
+    Args:
+        values (Union[list, np.ndarray]): The data of the field.
+        order (np.ndarray): The rows to keep (new index -> old index).
+        temporal (bool, optional): The data is a list of arrays (one per step). Defaults to False.
+
+    Returns:
+        Union[list, np.ndarray]: The permuted data.
+    """
+    if temporal:
+        return [np.asarray(v)[order] for v in values]
+    return np.asarray(values)[order]
+
+
+def permuteFields(fields: Union[list, dict, None],
+                  nodeOrder: Optional[np.ndarray]=None,
+                  elemOrder: Optional[np.ndarray]=None)-> Union[list, dict, None]:
+    """
+    Permute (or select) the rows of the nodal and elemental fields (the input fields are
+    not modified).
+
+    Args:
+        fields (Union[list, dict, None]): The fields (see the writers).
+        nodeOrder (Optional[np.ndarray], optional): The rows of the nodal fields (None to keep
+            them). Defaults to None.
+        elemOrder (Optional[np.ndarray], optional): The rows of the elemental fields (None to
+            keep them). Defaults to None.
+
+    Returns:
+        Union[list, dict, None]: The fields.
+    """
+    if fields is None:
+        return None
+    newFields = []
+    for f in [fields] if isinstance(fields, dict) else fields:
+        field = dict(f)
+        order = nodeOrder if f.get(configMESH.DFLT_FIELD_TYPE) == configMESH.DFLT_FIELD_TYPE_NODAL else elemOrder
+        if f.get(configMESH.DFLT_FIELD_DATA) is not None and order is not None:
+            field[configMESH.DFLT_FIELD_DATA] = permuteValues(f[configMESH.DFLT_FIELD_DATA], order, isTemporal(f))
+        newFields.append(field)
+    return newFields[0] if isinstance(fields, dict) else newFields
+
+
+def reorderMesh(nodes: np.ndarray,
+                elements: Union[list, dict],
+                fields: Union[list, dict, None]=None,
+                method: str='rcm',
+                offset: int=0,
+                reorderElements: bool=True)-> tuple:
+    """
+    Renumber the nodes and the elements of a mesh to improve the locality of the data
+    (compression ratio of the files and cache behavior of the solvers).
+
+    The nodes, the connectivity, the per-element physical groups and the nodal and
+    elemental fields are permuted consistently; the input data are not modified.
+
+    Args:
+        nodes (np.ndarray): The coordinates of the nodes.
+        elements (Union[list, dict]): The element blocks (dictionaries with the keys
+            'connectivity', 'type' and optionally 'physgrp').
+        fields (Union[list, dict, None], optional): The fields (see the writers). Defaults to None.
+        method (str, optional): 'rcm' (reverse Cuthill-McKee), 'morton' or 'hilbert'.
+            Defaults to 'rcm'.
+        offset (int, optional): The index of the first node in the connectivity (0 for
+            the VTK writers, 1 for the MSH writers). Defaults to 0.
+        reorderElements (bool, optional): Also reorder the elements of each block. Defaults to True.
+
+    Returns:
+        tuple: The nodes, the element blocks, the fields and the permutations (dictionary
+        with the keys 'nodes' and 'elements': new index -> old index; the elements are
+        numbered along the blocks). Apply `invertPermutation` to map back results.
+    """
+    nodes = np.asarray(nodes)
+    blocks = getBlocks(elements)
+    nodeOrder = getNodeOrder(nodes, blocks, method, offset)
+    inverse = invertPermutation(nodeOrder)
+    newNodes = nodes[nodeOrder]
+    newBlocks = []
+    elemOrders = []
+    start = 0
+    for e in blocks:
+        conn = np.asarray(e[configMESH.DFLT_MESH], dtype=np.int64)
+        conn = inverse[conn - offset] + offset
+        nbElems = conn.shape[0] if conn.ndim > 1 else int(conn.size > 0)
+        order = getElementOrder(newNodes, conn, method, offset) if reorderElements \
+            else np.arange(nbElems, dtype=np.int64)
+        block = dict(e)
+        block[configMESH.DFLT_MESH] = conn[order] if conn.ndim > 1 else conn
+        physgrp = e.get(configMESH.DFLT_PHYS_GRP)
+        if physgrp is not None and np.size(physgrp) == nbElems and nbElems > 1:
+            block[configMESH.DFLT_PHYS_GRP] = np.asarray(physgrp)[order]
+        newBlocks.append(block)
+        elemOrders.append(order + start)
+        start += nbElems
+    elemOrder = np.concatenate(elemOrders) if elemOrders else np.zeros(0, dtype=np.int64)
+    newFields = permuteFields(fields, nodeOrder, elemOrder)
+    Logger.debug(f'Mesh reordered ({method}): {nodes.shape[0]} nodes, {start} elements')
+    return newNodes, newBlocks if not isinstance(elements, dict) else newBlocks[0], newFields, \
+        {'nodes': nodeOrder, 'elements': elemOrder}
+
+
+def uniqueRows(values: np.ndarray)-> np.ndarray:
+    """
+    Remove the duplicated rows of an array keeping the order of their first occurrence.
+
+    The rows are inserted in a hash table (open addressing on `mixHash(hashCells)`, linear probing)
+    filled by rounds without sorting: at each round, the pending rows claim the free slots
+    they point to (the row of smallest index wins, i.e. the first occurrence), the rows equal
+    to the owner of their slot are resolved and the others (collisions) move to the next slot.
+
+    Args:
+        values (np.ndarray): The array (e.g. connectivity).
+
+    Returns:
+        np.ndarray: The rows kept (indexes of the first occurrences).
+    """
+    values = np.ascontiguousarray(values)
+    if values.ndim < 2 or values.shape[0] < 2:
+        return np.arange(values.shape[0] if values.ndim else 0, dtype=np.int64)
+    nbRows = values.shape[0]
+    # at least twice as many slots as rows (power of 2)
+    mask = (1 << (2 * nbRows - 1).bit_length()) - 1
+    table = np.full(mask + 1, nbRows, dtype=np.int64)
+    first = np.empty(nbRows, dtype=np.int64)
+    pending = np.arange(nbRows, dtype=np.int64)
+    slots = (mixHash(hashCells(values)) & np.uint64(mask)).astype(np.int64)
+    while pending.size:
+        free = table[slots] == nbRows
+        np.minimum.at(table, slots[free], pending[free])
+        owners = table[slots]
+        same = (values[owners] == values[pending]).all(axis=1)
+        first[pending[same]] = owners[same]
+        pending = pending[~same]
+        slots = (slots[~same] + 1) & mask
+    return np.flatnonzero(first == np.arange(nbRows))
+
+
+def getBandwidth(elements: Union[list, dict])-> int:
+    """
+    Get the bandwidth of the connectivity (largest difference between the indexes of two
+    nodes of an element).
+
+    Args:
+        elements (Union[list, dict]): The element blocks.
+
+    Returns:
+        int: The bandwidth.
+    """
+    bandwidth = 0
+    for e in getBlocks(elements):
+        conn = np.asarray(e[configMESH.DFLT_MESH], dtype=np.int64)
+        if conn.size:
+            conn = conn.reshape(conn.shape[0], -1)
+            bandwidth = max(bandwidth, int((conn.max(axis=1) - conn.min(axis=1)).max()))
+    return bandwidth
+
+
+def hashCells(cells: np.ndarray)-> np.ndarray:
+    """
+    Hash the integer coordinates of cells of a grid (collisions are possible).
+
+    Args:
+        cells (np.ndarray): The coordinates of the cells (one row per cell).
+
+    Returns:
+        np.ndarray: The hashes.
+    """
+    cells = cells.astype(np.int64).view(np.uint64)
+    h = np.zeros(cells.shape[0], dtype=np.uint64)
+    for i in range(cells.shape[1]):
+        h ^= cells[:, i] * HASH_PRIMES[i % HASH_PRIMES.size]
+    return h
+
+
+def mixHash(h: np.ndarray)-> np.ndarray:
+    """
+    Mix the bits of hashes (finalizer of splitmix64): each bit of the result depends on all
+    the bits of the hash, so that the low bits can be used as slots of a hash table (the low
+    bits of `hashCells` only depend on the low bits of the coordinates).
+
+    Args:
+        h (np.ndarray): The hashes (uint64).
+
+    Returns:
+        np.ndarray: The mixed hashes.
+    """
+    h = h ^ (h >> np.uint64(30))
+    h *= HASH_MIX[0]
+    h ^= h >> np.uint64(27)
+    h *= HASH_MIX[1]
+    h ^= h >> np.uint64(31)
+    return h
+
+
+def expandRanges(start: np.ndarray, counts: np.ndarray)-> np.ndarray:
+    """
+    Concatenate the ranges start[i]:start[i]+counts[i].
+
+    Args:
+        start (np.ndarray): The first values of the ranges.
+        counts (np.ndarray): The lengths of the ranges.
+
+    Returns:
+        np.ndarray: The values of the ranges.
+    """
+    total = int(counts.sum())
+    shift = np.repeat(start - np.cumsum(counts) + counts, counts)
+    return shift + np.arange(total, dtype=np.int64)
+
+
+def getCoincidentPairs(nodes: np.ndarray, tol: float=DFLT_MERGE_TOL)-> tuple:
+    """
+    Get the pairs of nodes closer than a tolerance. The nodes are hashed on a grid of
+    cells of size `4 tol`: the nodes of a cell are compared and only the nodes closer than
+    `tol` to the faces of their cell are compared to the nodes of the neighboring cells.
+
+    Args:
+        nodes (np.ndarray): The coordinates of the nodes.
+        tol (float, optional): The tolerance (0 for exact duplicates). Defaults to DFLT_MERGE_TOL.
+
+    Returns:
+        tuple: The first and second nodes of the pairs (first < second).
+    """
+    nodes = np.asarray(nodes, dtype=np.float64)
+    if nodes.shape[0] == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    nodes = nodes.reshape(len(nodes), -1)
+    nbNodes, dim = nodes.shape
+    if tol > 0:
+        size = 4 * tol
+        # grid shifted by half a cell (nodes on regular or planar layouts are at the
+        # centers of the cells instead of on their faces)
+        scaled = (nodes - nodes.min(axis=0)) / size + 0.5
+        cells = np.floor(scaled)
+        # distance to the lower faces of the cells
+        frac = (scaled - cells) * size
+        side = np.where(frac < size / 2, -1, 1)
+        near = np.minimum(frac, size - frac) <= tol
+        cells = cells.astype(np.int64)
+    else:
+        # exact duplicates: hash of the bits of the coordinates (-0.0 -> 0.0)
+        cells = (nodes + 0.0).view(np.int64)
+    hashes = hashCells(cells)
+    order = np.argsort(hashes, kind='stable')
+    keys, start, counts = np.unique(hashes[order], return_index=True, return_counts=True)
+    cellIds = np.empty(nbNodes, dtype=np.int64)
+    cellIds[order] = np.repeat(np.arange(keys.size, dtype=np.int64), counts)
+    # lookups: own cell of the nodes (cells with several nodes) then neighboring cells of
+    # the nodes close to the faces
+    ids = np.flatnonzero(counts[cellIds] > 1)
+    lookups = [(ids, cellIds[ids])]
+    if tol > 0:
+        for shift in np.stack(np.meshgrid(*[[0, 1]] * dim, indexing='ij'), -1).reshape(-1, dim)[1:]:
+            dims = shift.astype(bool)
+            ids = np.flatnonzero(np.all(near[:, dims], axis=1))
+            h = hashCells(cells[ids] + shift * side[ids])
+            k = np.minimum(np.searchsorted(keys, h), keys.size - 1)
+            found = keys[k] == h
+            lookups.append((ids[found], k[found]))
+    first = []
+    second = []
+    for ids, k in lookups:
+        # candidates: all the nodes of the cell
+        i = np.repeat(ids, counts[k])
+        j = order[expandRanges(start[k], counts[k])]
+        keep = i != j
+        i, j = np.minimum(i[keep], j[keep]), np.maximum(i[keep], j[keep])
+        # actual distances (the hashes may collide)
+        keep = np.sum((nodes[i] - nodes[j]) ** 2, axis=1) <= tol ** 2
+        first.append(i[keep])
+        second.append(j[keep])
+    # remove the pairs found several times
+    pairs = np.unique(np.concatenate(first) * nbNodes + np.concatenate(second))
+    return pairs // nbNodes, pairs % nbNodes
+
+
+def getMergeMap(nbNodes: int, first: np.ndarray, second: np.ndarray)-> np.ndarray:
+    """
+    Get the connected components of the pairs of coincident nodes (each node is mapped
+    to the smallest node of its component).
+
+    Args:
+        nbNodes (int): The number of nodes.
+        first (np.ndarray): The first nodes of the pairs.
+        second (np.ndarray): The second nodes of the pairs.
+
+    Returns:
+        np.ndarray: The representative of each node.
+    """
+    labels = np.arange(nbNodes, dtype=np.int64)
+    while True:
+        previous = labels.copy()
+        np.minimum.at(labels, first, labels[second])
+        np.minimum.at(labels, second, labels[first])
+        # pointer jumping
+        labels = labels[labels]
+        if np.array_equal(labels, previous):
+            return labels
+
+
+def mergeNodes(nodes: np.ndarray,
+               elements: Union[list, dict, None]=None,
+               fields: Union[list, dict, None]=None,
+               tol: float=DFLT_MERGE_TOL,
+               offset: int=0)-> tuple:
+    """
+    Merge the coincident nodes (closer than `tol`, e.g. at the interfaces of meshes
+    assembled from several parts) and rewrite the connectivity and the nodal fields.
+
+    The merged nodes keep the coordinates and the nodal values of the first node of their
+    group (groups are built transitively); the input data are not modified.
+
+    Args:
+        nodes (np.ndarray): The coordinates of the nodes.
+        elements (Union[list, dict, None], optional): The element blocks. Defaults to None.
+        fields (Union[list, dict, None], optional): The fields (see the writers). Defaults to None.
+        tol (float, optional): The tolerance (0 for exact duplicates). Defaults to DFLT_MERGE_TOL.
+        offset (int, optional): The index of the first node in the connectivity (0 for
+            the VTK writers, 1 for the MSH writers). Defaults to 0.
+
+    Returns:
+        tuple: The nodes, the element blocks, the fields and the merge map (old index ->
+        new index of each node).
+    """
+    nodes = np.asarray(nodes)
+    first, second = getCoincidentPairs(nodes, tol)
+    labels = getMergeMap(nodes.shape[0], first, second)
+    kept = np.flatnonzero(labels == np.arange(nodes.shape[0]))
+    newIndex = np.full(nodes.shape[0], -1, dtype=np.int64)
+    newIndex[kept] = np.arange(kept.size, dtype=np.int64)
+    mergeMap = newIndex[labels]
+    newBlocks = []
+    for e in getBlocks(elements):
+        block = dict(e)
+        conn = np.asarray(e[configMESH.DFLT_MESH], dtype=np.int64)
+        block[configMESH.DFLT_MESH] = mergeMap[conn - offset] + offset
+        newBlocks.append(block)
+    newFields = permuteFields(fields, kept)
+    Logger.debug(f'Nodes merged (tol={tol}): {nodes.shape[0]} -> {kept.size} nodes')
+    newElements = newBlocks[0] if isinstance(elements, dict) else newBlocks
+    return nodes[kept], newElements if elements is not None else None, newFields, mergeMap
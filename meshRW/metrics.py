@@ -0,0 +1,345 @@
+"""
+This file is part of the meshRW package
+---
+Performance metrics of the readers and writers: spans of the sections (header, nodes,
+elements, fields, flush...) with durations, bytes and numbers of items.
+----
+Luc Laurent - luc.laurent@lecnam.net -- 2021
+"""
+
+import functools
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Optional, Union
+
+from loguru import logger as Logger
+
+# metrics recorded by default (environment variable MESHRW_METRICS=1 or `setEnabled`)
+DFLT_ENABLED: bool = os.environ.get('MESHRW_METRICS', '') not in ('', '0')
+# formats of the exported metrics
+FORMATS: tuple = ('json', 'chrome')
+
+
+def setEnabled(flag: bool=True)-> None:
+    """
+    Enable or disable the recording of the metrics by default (readers and writers
+    without the option 'metrics').
+
+    Args:
+        flag (bool, optional): True to record the metrics. Defaults to True.
+    """
+    global DFLT_ENABLED
+    DFLT_ENABLED = flag
+
+
+class Span:
+    """
+    A section of work (e.g. the nodes written in a file).
+
+    Attributes:
+        name (str): The name of the section ('header', 'nodes', 'elements', 'field', 'flush'...).
+        start (float): The start time (s, relative to the creation of the metrics).
+        duration (float): The duration (s).
+        bytes (int): The number of bytes written or read.
+        items (int): The number of items (nodes, elements, values...).
+        meta (dict): Additional information (e.g. name and step of a field).
+    """
+
+    __slots__ = ('bytes', 'depth', 'duration', 'items', 'meta', 'name', 'start', 'startBytes', 'stream', 'tic')
+
+    def __init__(self, name: str, stream: Optional[object]=None, items: int=0, **meta: object)-> None:
+        """
+        Initialize the span.
+
+        Args:
+            name (str): The name of the section.
+            stream (Optional[object], optional): The file handler (`fileio.FileHandler`) used to
+                count the bytes written during the section. Defaults to None.
+            items (int, optional): The number of items. Defaults to 0.
+            **meta: Additional information.
+        """
+        self.name = name
+        self.start = 0.0
+        self.duration = 0.0
+        self.bytes = 0
+        self.items = items
+        self.meta = meta
+        self.depth = 0
+        self.stream = stream
+        self.startBytes = 0
+        self.tic = 0.0
+
+    def toDict(self)-> dict:
+        """
+        Export the span.
+
+        Returns:
+            dict: The span with keys 'name', 'start', 'duration', 'bytes', 'items', 'depth' and 'meta'.
+        """
+        return {'name': self.name, 'start': self.start, 'duration': self.duration, 'bytes': self.bytes,
+                'items': self.items, 'depth': self.depth, 'meta': self.meta}
+
+
+class NullSpan:
+    """
+    Span returned when the metrics are disabled (no recording).
+    """
+
+    __slots__ = ('bytes', 'items', 'meta')
+
+    def __init__(self)-> None:
+        self.bytes = 0
+        self.items = 0
+        self.meta = {}
+
+    def __enter__(self)-> 'NullSpan':
+        return self
+
+    def __exit__(self, *args: object)-> None:
+        return None
+
+
+NULL_SPAN = NullSpan()
+
+
+class SpanContext:
+    """
+    Context manager recording a span in the metrics.
+    """
+
+    __slots__ = ('metrics', 'span')
+
+    def __init__(self, metrics: 'Metrics', span: Span)-> None:
+        self.metrics = metrics
+        self.span = span
+
+    def __enter__(self)-> Span:
+        span = self.span
+        span.depth = self.metrics.depth
+        self.metrics.depth += 1
+        if span.stream is not None:
+            span.startBytes = getattr(span.stream, 'nbBytes', 0)
+        span.tic = time.perf_counter()
+        return span
+
+    def __exit__(self, *args: object)-> None:
+        span = self.span
+        toc = time.perf_counter()
+        span.start = span.tic - self.metrics.origin
+        span.duration = toc - span.tic
+        if span.stream is not None:
+            span.bytes += getattr(span.stream, 'nbBytes', 0) - span.startBytes
+            span.stream = None
+        self.metrics.depth -= 1
+        self.metrics.spans.append(span)
+
+
+class Metrics:
+    """
+    Performance metrics of a reader or a writer.
+
+    The sections are recorded with `span` (context manager) or the `section` decorator;
+    when the metrics are disabled, `span` returns a shared object doing nothing.
+
+    Attributes:
+        enabled (bool): True if the spans are recorded.
+        name (str): The name of the reader/writer (e.g. the name of the file).
+        spans (list): The recorded spans (in the order of their end).
+        filename (Optional[Path]): The file in which the metrics are exported by `close`.
+        format (str): The format of the exported file ('json' or 'chrome').
+    """
+
+    def __init__(self,
+                 enabled: Union[bool, str, Path, None]=None,
+                 name: str='',
+                 format: str='json')-> None:
+        """
+        Initialize the metrics.
+
+        Args:
+            enabled (Union[bool, str, Path, None], optional): True to record the metrics, a
+                filename to record and export them (see `close`) or None to use DFLT_ENABLED.
+                Defaults to None.
+            name (str, optional): The name of the reader/writer. Defaults to ''.
+            format (str, optional): The format of the exported file ('json' or 'chrome').
+                Defaults to 'json'.
+
+        Raises:
+            ValueError: If the format is not supported.
+        """
+        if format not in FORMATS:
+            raise ValueError(f'Format of metrics {format} not supported (ALLOWED: {" ".join(FORMATS)})')
+        self.filename = None
+        if isinstance(enabled, (str, Path)):
+            self.filename = Path(enabled)
+            enabled = True
+        self.enabled = DFLT_ENABLED if enabled is None else bool(enabled)
+        self.name = name
+        self.format = format
+        self.spans = []
+        self.depth = 0
+        self.origin = time.perf_counter()
+
+    def span(self, name: str, stream: Optional[object]=None, items: int=0, **meta: object)-> object:
+        """
+        Record a section (context manager returning the span, whose `items`, `bytes` and
+        `meta` can be updated in the section).
+
+        Args:
+            name (str): The name of the section.
+            stream (Optional[object], optional): The file handler counting the bytes written.
+                Defaults to None.
+            items (int, optional): The number of items. Defaults to 0.
+            **meta: Additional information.
+
+        Returns:
+            object: The context manager.
+        """
+        if not self.enabled:
+            return NULL_SPAN
+        return SpanContext(self, Span(name, stream, items, **meta))
+
+    def getSpans(self, name: Optional[str]=None)-> list:
+        """
+        Get the recorded spans (sorted by start time).
+
+        Args:
+            name (Optional[str], optional): Keep only the spans of this section. Defaults to None.
+
+        Returns:
+            list: The spans.
+        """
+        return sorted((s for s in self.spans if name is None or s.name == name), key=lambda s: s.start)
+
+    def report(self)-> dict:
+        """
+        Build the structured report of the metrics.
+
+        Returns:
+            dict: The report with keys 'name', 'spans' (list of dictionaries, see `Span.toDict`),
+            'sections' (totals per name of section: 'count', 'duration', 'bytes', 'items' and
+            'MBs') and 'total' (duration, bytes and items of the top-level spans).
+        """
+        spans = self.getSpans()
+        sections = {}
+        for span in spans:
+            sec = sections.setdefault(span.name, {'count': 0, 'duration': 0.0, 'bytes': 0, 'items': 0})
+            sec['count'] += 1
+            sec['duration'] += span.duration
+            sec['bytes'] += span.bytes
+            sec['items'] += span.items
+        for sec in sections.values():
+            sec['MBs'] = sec['bytes'] / 1024**2 / sec['duration'] if sec['duration'] > 0 else 0.0
+        top = [s for s in spans if s.depth == 0]
+        total = {'duration': sum(s.duration for s in top), 'bytes': sum(s.bytes for s in top),
+                 'items': sum(s.items for s in top)}
+        return {'name': self.name, 'spans': [s.toDict() for s in spans], 'sections': sections, 'total': total}
+
+    def toChromeTrace(self)-> dict:
+        """
+        Export the spans in the Chrome trace format (chrome://tracing, Perfetto).
+
+        Returns:
+            dict: The trace (complete events 'X', times in microseconds).
+        """
+        pid = os.getpid()
+        tid = threading.get_ident()
+        events = [{'name': s.name, 'cat': self.name or 'meshRW', 'ph': 'X', 'ts': s.start * 1e6,
+                   'dur': s.duration * 1e6, 'pid': pid, 'tid': tid,
+                   'args': {'bytes': s.bytes, 'items': s.items, **s.meta}} for s in self.getSpans()]
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def export(self, filename: Union[str, Path], format: Optional[str]=None)-> None:
+        """
+        Export the metrics in a JSON file.
+
+        Args:
+            filename (Union[str, Path]): The path to the file.
+            format (Optional[str], optional): 'json' (report, see `report`) or 'chrome' (see
+                `toChromeTrace`). Defaults to the format of the metrics.
+        """
+        format = format or self.format
+        data = self.toChromeTrace() if format == 'chrome' else self.report()
+        Path(filename).write_text(json.dumps(data, indent=1, default=str))
+        Logger.info(f'Metrics exported in {filename}')
+
+    def close(self)-> None:
+        """
+        Export the metrics in `filename` (if provided).
+        """
+        if self.enabled and self.filename is not None:
+            self.export(self.filename)
+
+
+def getMetrics(obj: object)-> Metrics:
+    """
+    Get the metrics of a reader/writer (created if missing).
+
+    Args:
+        obj (object): The reader/writer.
+
+    Returns:
+        Metrics: The metrics.
+    """
+    metrics = getattr(obj, 'metrics', None)
+    if metrics is None:
+        metrics = Metrics()
+        obj.metrics = metrics  # type: ignore[attr-defined]
+    return metrics
+
+
+def closeStream(metrics: Metrics, fileHandler: object)-> None:
+    """
+    Close a file handler (`fileio.FileHandler`), recorded as the section 'flush' (final
+    flush and compression of the buffered data) with the size of the file and the codec.
+
+    Args:
+        metrics (Metrics): The metrics.
+        fileHandler (object): The file handler.
+    """
+    with metrics.span('flush', compression=getattr(fileHandler, 'compress', None)) as span:
+        fileHandler.close()  # type: ignore[attr-defined]
+    filename = getattr(fileHandler, 'filename', None)
+    if metrics.enabled and filename is not None and Path(filename).exists():
+        span.bytes = Path(filename).stat().st_size
+        span.meta['written'] = getattr(fileHandler, 'nbBytes', 0)
+
+
+def section(name: str, txt: Optional[str]=None, items: Optional[str]=None)-> Callable:
+    """
+    Decorator recording a method of a reader/writer as a section of its metrics.
+
+    The elapsed time is also logged (debug level) as with `various.timeit`. The bytes are
+    counted on the file handler returned by the method `getStream` of the object (if any).
+
+    Args:
+        name (str): The name of the section.
+        txt (Optional[str], optional): The text of the log message. Defaults to None.
+        items (Optional[str], optional): The attribute of the object giving the number of
+            items at the end of the section (e.g. 'nbNodes'). Defaults to None.
+
+    Returns:
+        Callable: The decorator.
+    """
+    def decorator(func: Callable)-> Callable:
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            metrics = getMetrics(self)
+            tic = time.perf_counter()
+            if not metrics.enabled:
+                result = func(self, *args, **kwargs)
+            else:
+                stream = self.getStream() if hasattr(self, 'getStream') else None
+                with metrics.span(name, stream=stream) as span:
+                    result = func(self, *args, **kwargs)
+                    if items is not None:
+                        span.items = int(getattr(self, items, 0))
+            Logger.debug(f'{txt or name} - {time.perf_counter() - tic:.4f} s')
+            return result
+
+        return wrapper
+
+    return decorator
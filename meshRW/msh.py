@@ -9,13 +9,18 @@ Luc Laurent - luc.laurent@lecnam.net -- 2021
 """
 
 from pathlib import Path
-from typing import IO, Optional, Union, cast, Iterable
+from typing import IO, Callable, Optional, Union, cast, Iterable, Iterator
 
 import numpy as np
 from loguru import logger as Logger
 
-from . import configMESH, dbmsh, fileio, various, writerClass
+from . import configMESH, dbelem, dbmsh, fileio, meshdata, meshtools, metrics, precision, writerClass
 
+# type of the fields depending on the opening tag of their sections
+DFLT_FIELD_TYPES = {
+    dbmsh.DFLT_FIELDS_NODES_OPEN_CLOSE['open']: configMESH.DFLT_FIELD_TYPE_NODAL,
+    dbmsh.DFLT_FIELDS_ELEMS_OPEN_CLOSE['open']: configMESH.DFLT_FIELD_TYPE_ELEMENT,
+}
 
 
 class MSHWriter(writerClass.Writer):
@@ -59,6 +64,7 @@ class MSHWriter(writerClass.Writer):
         title: str|None = None,
         verbose: bool = False,
         opts: dict|None = None,
+        mesh: Optional[meshdata.Mesh] = None,
     )-> None:
         """
         Initialize the legacy Gmsh writer.
@@ -90,6 +96,14 @@ class MSHWriter(writerClass.Writer):
             Defaults to False.
             opts (dict, optional): Additional options for the writer. 
             Defaults: {'createPath': True},.
+                - 'compression': name of the codec (see `fileio.listCodecs`), detected
+                  from the extension if not provided.
+                - 'compressionLevel': level of compression (codec default if not provided).
+                - 'bufferSize': size of the buffer (in bytes) on top of the compressed stream.
+                - 'precision': precision policy of the floating point values ('legacy',
+                  'repr', 'float32' or number of significant digits, see `precision.getPolicy`).
+            mesh (meshdata.Mesh, optional): Mesh container replacing the nodes, elements and
+            fields (inputs adapted and analysed once). Defaults to None.
 
         Raises:
             Exception: If any error occurs during file handling or writing.
@@ -106,9 +120,20 @@ class MSHWriter(writerClass.Writer):
         Logger.info('Start writing msh file')
         _ = verbose
         # adapt inputs
-        nodesOk, elementsOk, fieldsOk = writerClass.adaptInputs(nodes, elements, fields)
+        nodesOk, elementsOk, fieldsOk = writerClass.getInputs(nodes, elements, fields, mesh, offset=1)
+        # merging of the coincident nodes (option 'merge')
+        nodesOk, elementsOk, fieldsOk, mergeMap = writerClass.mergeInputs(nodesOk, elementsOk, fieldsOk,
+                                                                          opts, offset=1)
+        # renumbering of the nodes and elements (option 'reorder')
+        nodesOk, elementsOk, fieldsOk, permutation = writerClass.reorderInputs(nodesOk, elementsOk, fieldsOk,
+                                                                               opts, offset=1)
+        # derived data of the mesh container not valid for merged or renumbered inputs
+        if mergeMap is not None or permutation is not None:
+            mesh = None
         # initialization
-        super().__init__(filename, nodesOk, elementsOk, fieldsOk, append, title, opts)
+        super().__init__(filename, nodesOk, elementsOk, fieldsOk, append, title, opts, mesh)
+        self.permutation = permutation
+        self.mergeMap = mergeMap
 
         # load specific configuration
         self.db = dbmsh
@@ -117,17 +142,20 @@ class MSHWriter(writerClass.Writer):
         self.nbElems = 0
         # depending on the case
         Logger.info(f'Initialize writing {self.basename}')
-        if fields is not None and self.append and self.filename.exists():
-            self.fhandle = fileio.fileHandler(filename=filename, right='a', safeMode=False)
-        else:
-            self.fhandle = fileio.fileHandler(filename=filename, right='w', safeMode=False)
+        compressOpts = fileio.compressionOptions(self.opts)
+        appendFields = fieldsOk is not None and self.append and self.filename.exists()
+        self.fhandle = fileio.fileHandler(filename=filename,
+                                          right=self.getRight(appendFields),
+                                          safeMode=False,
+                                          **compressOpts)
 
         # write contents
         self.writeContents(nodesOk, elementsOk, fieldsOk)
 
         # close file
-        self.fhandle.close()
+        metrics.closeStream(self.metrics, self.fhandle)
         self.fhandle = None
+        self.metrics.close()
 
     def setOptions(self, opts: dict)-> None:
         """
@@ -144,6 +172,18 @@ class MSHWriter(writerClass.Writer):
         """
         self.opts = opts
 
+    def getRight(self, append: bool)-> str:
+        """
+        Get the mode used to open the file.
+
+        Args:
+            append (bool): True to append fields to an existing file.
+
+        Returns:
+            str: The mode ('a' or 'w').
+        """
+        return 'a' if append else 'w'
+
     def writeContents(self,
                       nodes: Union[list, np.ndarray, None],
                       elements: Union[list, np.ndarray, None],
@@ -169,11 +209,12 @@ class MSHWriter(writerClass.Writer):
         handle = self.fhandle
         if not self.getAppend():
             # write header
-            txt = dbmsh.DFLT_FILE_OPEN_CLOSE['open']
-            handle.write(f'{txt}\n')
-            handle.write(f'{dbmsh.DFLT_FILE_VERSION}\n')
-            txt = dbmsh.DFLT_FILE_OPEN_CLOSE['close']
-            handle.write(f'{txt}\n')
+            with self.metrics.span('header', stream=handle):
+                txt = dbmsh.DFLT_FILE_OPEN_CLOSE['open']
+                handle.write(f'{txt}\n')
+                handle.write(f'{dbmsh.DFLT_FILE_VERSION}\n')
+                txt = dbmsh.DFLT_FILE_OPEN_CLOSE['close']
+                handle.write(f'{txt}\n')
             # write nodes
             self.writeNodes(nodes)
             # write elements
@@ -199,7 +240,7 @@ class MSHWriter(writerClass.Writer):
         self.append = bool(getattr(self.fhandle, 'append', False))
         return self.append
 
-    @various.timeit('Nodes written')
+    @metrics.section('nodes', 'Nodes written', items='nbNodes')
     def writeNodes(self, nodes: Union[list, np.ndarray, None])-> None:
         """
         Writes the coordinates of nodes to a file in a specific format.
@@ -220,6 +261,8 @@ class MSHWriter(writerClass.Writer):
         - The method writes the nodes in a specific format, including an opening
           and closing tag defined in `dbmsh.DFLT_NODES_OPEN_CLOSE`.
         - Node indices in the output file start from 1.
+        - The text of the section is shared with the other writers of the mesh container
+          (see `writerClass.Writer.writeEncoded`).
         """
         if self.fhandle is None:
             Logger.error('File handle is not initialized. Cannot write nodes.')
@@ -238,30 +281,23 @@ class MSHWriter(writerClass.Writer):
         Logger.debug(f'Write {self.nbNodes} nodes')
         #
         txt = dbmsh.DFLT_NODES_OPEN_CLOSE['open']
+        self.fhandle.openSection(txt)
         handle.write(f'{txt}\n')
         handle.write(f'{self.nbNodes}\n')
         #
         self.dimPb = nodes.shape[1]
 
-        # (2d)
-        if self.dimPb == 2:
-            #
-            formatSpec = '{:d} {:9.4g} {:9.4g} 0.0\n'
-            # write
-            for i in range(self.nbNodes):
-                handle.write(formatSpec.format(i + 1, *nodes[i, :], 0.0))
-
-        # (3d)
-        if self.dimPb == 3:
-            #
-            formatSpec = '{:d} {:9.4g} {:9.4g} {:9.4g}\n'
-            # write
-            for i in range(self.nbNodes):
-                handle.write(formatSpec.format(i + 1, *nodes[i, :]))
+        policy = precision.getPolicy(self.opts.get('precision'), 'nodes')
+        # 2d: z coordinate set to 0
+        if self.dimPb in (2, 3):
+            suffix = ' 0.0' if self.dimPb == 2 else ''
+            self.writeEncoded(handle, ('msh', 'nodes', policy['name']),
+                              lambda: precision.formatRows(nodes, policy, start=1, suffix=suffix))
         txt = dbmsh.DFLT_NODES_OPEN_CLOSE['close']
         handle.write(f'{txt}\n')
+        self.fhandle.closeSection()
 
-    @various.timeit('Elements written')
+    @metrics.section('elements', 'Elements written', items='nbElems')
     def writeElements(self, elements: Union[list, np.ndarray, None])-> None:
         """
         Writes elements to a file in the GMSH format.
@@ -292,6 +328,9 @@ class MSHWriter(writerClass.Writer):
             - The GMSH element type is determined using `dbmsh.getMSHElemType`.
             - Physical group identifiers are adjusted to ensure they are in the correct format 
             (list of integers).
+            - The rows of each block are built in one integer array and formatted in bulk (see
+            `precision.formatRows`); the text of the section is shared with the other writers
+            of the mesh container (see `writerClass.Writer.writeEncoded`).
         """
         if self.fhandle is None:
             Logger.error('File handle is not initialized. Cannot write elements.')
@@ -344,41 +383,58 @@ class MSHWriter(writerClass.Writer):
         # write all meshes
         Logger.debug(f'Start writing {self.nbElems} elements')
         txt = dbmsh.DFLT_ELEMS_OPEN_CLOSE['open']
+        self.fhandle.openSection(txt)
         handle.write(f'{txt}\n')
         handle.write(f'{self.nbElems}\n')
-        itElem = 0  # iterator for elements
-        for iD in elemsRun:
-            phys_grp_list = cast(list[int], iD.get(configMESH.DFLT_PHYS_GRP))
-            nbNodes = int(iD.get('nbNodes', 0))
-            nbElems = int(iD.get('nbElems', 0))
-            mesh_array = cast(np.ndarray, iD.get(configMESH.DFLT_MESH))
-            msh_type = int(iD.get('eltypeGMSH', 0))
-            # create format specifier for element
-            # 1: number of element
-            # 2: type of the element (see gmsh documentation)
-            # 3: number of tags (minimum number=2)
-            # 4: physical entity
-            # 5: elementary entity
-            # 6+: nodes of the elements
-            formatSpec = ' '.join('{:d}' for i in range(3 + \
-                len(phys_grp_list) + nbNodes)) + '\n'
-            # write
-            for e in range(nbElems):
-                itElem += 1
-                # write in file
-                handle.write(
-                    formatSpec.format(
-                        itElem,
-                        msh_type,
-                        len(phys_grp_list),
-                        *phys_grp_list,
-                        *mesh_array[e],
-                    )
-                )
+
+        def encode()-> Iterator[str]:
+            itElem = 0  # iterator for elements
+            for iD in elemsRun:
+                phys_grp_list = cast(list[int], iD.get(configMESH.DFLT_PHYS_GRP))
+                nbTags = len(phys_grp_list)
+                nbNodes = int(iD.get('nbNodes', 0))
+                nbElems = int(iD.get('nbElems', 0))
+                # columns of the rows
+                # 1: number of element
+                # 2: type of the element (see gmsh documentation)
+                # 3: number of tags (minimum number=2)
+                # 4: physical entity
+                # 5: elementary entity
+                # 6+: nodes of the elements
+                rows = np.empty((nbElems, 3 + nbTags + nbNodes), dtype=np.int64)
+                rows[:, 0] = np.arange(itElem + 1, itElem + nbElems + 1)
+                rows[:, 1] = int(iD.get('eltypeGMSH', 0))
+                rows[:, 2] = nbTags
+                rows[:, 3:3 + nbTags] = phys_grp_list
+                rows[:, 3 + nbTags:] = cast(np.ndarray, iD.get(configMESH.DFLT_MESH))
+                itElem += nbElems
+                yield from precision.formatRows(rows, precision.getPolicy())
+
+        self.writeEncoded(handle, ('msh', 'elements'), encode)
         txt = dbmsh.DFLT_ELEMS_OPEN_CLOSE['close']
         handle.write(f'{txt}\n')
+        self.fhandle.closeSection()
+
+    def writeText(self, txt: str)-> None:
+        """
+        Write text in the file.
+
+        Args:
+            txt (str): The text.
+        """
+        cast(fileio.fileHandler, self.fhandle).write(txt)
+
+    def writeFieldValues(self, values: np.ndarray, policy: dict)-> None:
+        """
+        Write the values of a field (one line per node/cell starting with its tag).
 
-    @various.timeit('Fields written')
+        Args:
+            values (np.ndarray): The values (one row per node/cell).
+            policy (dict): The precision policy (see `precision.getPolicy`).
+        """
+        precision.writeRows(self.fhandle, values, policy, start=1)
+
+    @metrics.section('fields', 'Fields written')
     def writeFields(self,
                     fields: Optional[Union[list, np.ndarray, dict]] = None,
                     numStep: Optional[int] = None)-> None:
@@ -434,7 +490,6 @@ class MSHWriter(writerClass.Writer):
         if self.fhandle is None:
             Logger.error('File handle is not initialized. Cannot write fields.')
             return
-        handle = self.fhandle
         if fields is None:
             return
         if isinstance(fields, dict):
@@ -448,28 +503,10 @@ class MSHWriter(writerClass.Writer):
         Logger.debug('Start writing fields')
         for field in fieldRun:
             iF = cast(dict, field)
-            nameField = iF[configMESH.DFLT_FIELD_NAME]
-            # number of data per nodes/cells
-            nbPerEntity = iF[configMESH.DFLT_FIELD_DIM]
-            if configMESH.DFLT_FIELD_STEPS in iF:
-                listSteps = iF[configMESH.DFLT_FIELD_STEPS]
-                nbSteps = len(listSteps)
-            elif configMESH.DFLT_FIELD_NBSTEPS in iF:
-                nbSteps = iF[configMESH.DFLT_FIELD_NBSTEPS]
-                listSteps = range(nbSteps)
-            else:
-                nbSteps = 1
-                listSteps = [0.0]
-            txt = f'Field: {nameField}, number of steps: {nbSteps}'
-            txt += f', dimension per node/cell: {nbPerEntity}'
-            Logger.debug(txt)
-            # reformat values as list of arrays
-            if len(iF[configMESH.DFLT_FIELD_DATA]) > 1 and nbSteps == 1:
-                values = [iF[configMESH.DFLT_FIELD_DATA]]
-            else:
-                values = iF[configMESH.DFLT_FIELD_DATA]
-            # format specifier to write fields
-            formatSpec = '{:d} ' + ' '.join('{:9.4f}' for i in range(nbPerEntity)) + '\n'
+            nameField, nbPerEntity, listSteps, values = getFieldSteps(iF)
+            nbSteps = len(listSteps)
+            # format of the values
+            policy = precision.getPolicy(self.opts.get('precision'), 'fields')
             # along steps
             for iS in range(nbSteps):
                 if nbSteps > 1:
@@ -480,25 +517,29 @@ class MSHWriter(writerClass.Writer):
                     typeData = dbmsh.DFLT_FIELDS_ELEMS_OPEN_CLOSE
                 else:
                     raise ValueError(f"Unknown field type {iF[configMESH.DFLT_FIELD_TYPE]}")
-                txt = typeData['open']
-                handle.write(f'{txt}\n')
-                handle.write('1\n')  # one string tag
-                # the name of the view
-                handle.write(f'"{nameField}"\n')
-                handle.write('1\n')  # one real tag
-                handle.write(f'{listSteps[iS]:9.4f}\n')  # the time value
-                handle.write('3\n')  # three integer tags
-                handle.write(f'{iS:d}\n')  # time step value
-                # number of components per nodes
-                handle.write(f'{nbPerEntity:d}\n')
-                # number of nodal values
-                handle.write(f'{values[iS].shape[0]:d}\n')
-                #
-                for i in range(values[iS].shape[0]):
-                    handle.write(formatSpec.format(i + 1, *values[iS][i, :]))
-
-                txt = typeData['close']
-                handle.write(f'{txt}\n')
+                with self.metrics.span('field', stream=self.fhandle, items=values[iS].shape[0],
+                                       field=nameField, step=iS):
+                    txt = typeData['open']
+                    # section stored in the index of seekable files (random access to the steps)
+                    self.fhandle.openSection(txt, field=nameField, step=iS, time=float(listSteps[iS]))
+                    self.writeText(f'{txt}\n')
+                    self.writeText('1\n')  # one string tag
+                    # the name of the view
+                    self.writeText(f'"{nameField}"\n')
+                    self.writeText('1\n')  # one real tag
+                    self.writeText(f'{precision.formatValue(listSteps[iS], policy)}\n')  # the time value
+                    self.writeText('3\n')  # three integer tags
+                    self.writeText(f'{iS:d}\n')  # time step value
+                    # number of components per nodes
+                    self.writeText(f'{nbPerEntity:d}\n')
+                    # number of nodal values
+                    self.writeText(f'{values[iS].shape[0]:d}\n')
+                    #
+                    self.writeFieldValues(np.asarray(values[iS], dtype=float), policy)
+
+                    txt = typeData['close']
+                    self.writeText(f'{txt}\n')
+                    self.fhandle.closeSection()
 
 
 class MSHReader:
@@ -546,22 +587,29 @@ class MSHReader:
         _finalizeElems():
             Finalizes the element data by converting lists to numpy arrays.
 
-        _readElementsLine(arraystr):
-            Reads a single line of element data and processes it.
+        _readElementsLines(lines):
+            Reads the lines of element data and processes them at once.
             Args:
-                arraystr (list of str): Content of a line for an element.
+                lines (list of str): Content of the lines of the elements.
 
         getNodes(tag=None):
             Returns the array of node coordinates.
             Args:
                 tag (int, optional): Tag to filter nodes by.
 
-        getElements(type=None, typeElem=None, tag=None, dict_format=True):
+        getElements(type=None, typeElem=None, tag=None, dict_format=True, unique=True):
             Returns the list of elements.
             Args:
                 type (str, optional): Type of elements to filter by.
                 tag (int, optional): Tag to filter elements by.
                 dict_format (bool, optional): Whether to return elements in dictionary format.
+                unique (bool, optional): Whether to remove the duplicated elements (file order kept).
+
+        getSubmesh(tags=None, types=None, offset=1):
+            Returns the compacted nodes and renumbered element blocks of a subset of the mesh.
+
+        getMesh(tags=None, types=None, offset=1):
+            Returns a subset of the mesh as a mesh container for the writers.
 
         getTags():
             Returns the list of tags as integers.
@@ -601,25 +649,271 @@ class MSHReader:
         _ = typeMSH
         self.initContent()
         Logger.debug(f'Open file {filename}')
-        # open file and get handle
-        self.objFile = fileio.fileHandler(filename=filename, right='r', safeMode=False)
-        self.fhandle = cast(IO[str], self.objFile.getHandler())
+        self.filename = filename
+        self.metrics = metrics.getMetrics(self)
+        # seekable compressed file: read only the sections of the nodes and elements
+        index = fileio.loadIndex(filename) if filename is not None else None
+        if index is not None and index['sections']:
+            self.sections = index['sections']
+            self.readIndexed(dim)
+            return
+        # open file (binary mode to track the offsets of the fields) and get handle
+        self.objFile = fileio.fileHandler(filename=filename, right='rb', safeMode=False)
+        self.fhandle = cast(IO[bytes], self.objFile.getHandler())
         # read file line by line
-        for line in cast(Iterable[str], self.fhandle):
-            if not self.read_data:
-                self.read_data = catchTag(line)
-            elif self.read_data == 'nodes':
-                # read nodes
-                self.readNodes(dim, line)
-            elif self.read_data == 'elems':
-                # read elements
-                self.readElements(line)
+        offset = 0
+        with self.metrics.span('read') as span:
+            for line in cast(Iterable[bytes], self.fhandle):
+                offset += len(line)
+                if self.read_data == 'fieldValues':
+                    # values of fields are only indexed (loaded by getField)
+                    if line.startswith(b'$'):
+                        self.fields[-1]['end'] = offset - len(line)
+                        self.read_data = None
+                    continue
+                self._readLine(line.decode('utf-8'), dim, offset)
+            span.bytes = offset
         # finalize data
-        self._finalizeElems()
+        with self.metrics.span('elements') as span:
+            self._finalizeElems()
+            span.items = sum(len(e) for e in self.elems.values())
 
         # close file
         self.objFile.close()
 
+    def _readLine(self, line: str, dim: Optional[int]=None, offset: int=0)-> None:
+        """
+        Dispatch a line of the file to the reader of the current section.
+
+        Args:
+            line (str): The line.
+            dim (Optional[int], optional): The dimension of the nodes. Defaults to None.
+            offset (int, optional): The offset of the end of the line in the file. Defaults to 0.
+        """
+        if not self.read_data:
+            self.read_data = catchTag(line)
+            if self.read_data is None and line.strip() in DFLT_FIELD_TYPES:
+                self.read_data = 'fieldHeader'
+                self.fieldHeader = {'type': DFLT_FIELD_TYPES[line.strip()], 'lines': []}
+        elif self.read_data == 'nodes':
+            # read nodes
+            self.readNodes(dim, line)
+        elif self.read_data == 'elems':
+            # read elements
+            self.readElements(line)
+        elif self.read_data == 'fieldHeader':
+            self.readFieldHeader(line, offset)
+
+    def readFieldHeader(self, line: str, offset: int)-> None:
+        """
+        Read a line of the header of a `$NodeData`/`$ElementData` section and index the
+        field when the header is complete.
+
+        Args:
+            line (str): The line.
+            offset (int): The offset of the end of the line in the file.
+        """
+        self.fieldHeader['lines'].append(line.strip())
+        info = parseFieldHeader(self.fieldHeader['lines'])
+        if info is None:
+            return
+        info.update({'type': self.fieldHeader['type'], 'offset': offset, 'end': None})
+        self.fields.append(info)
+        Logger.debug(f"Field {info['name']} ({info['type']}): step {info['step']}, time {info['time']}")
+        self.read_data = 'fieldValues'
+
+    def readIndexed(self, dim: Optional[int]=None)-> None:
+        """
+        Read the nodes and the elements of a seekable compressed file (codec 'bgzf').
+
+        Only the blocks of the '$Nodes' and '$Elements' sections are decompressed: the
+        fields are skipped (see `readSection` to access them).
+
+        Args:
+            dim (Optional[int], optional): The dimension of the nodes. Defaults to None.
+        """
+        Logger.debug(f'Read sections of {Path(cast(str, self.filename)).name} using its index')
+        stream = fileio.BGZFReader(cast(str, self.filename))
+        try:
+            for name in (dbmsh.DFLT_NODES_OPEN_CLOSE['open'], dbmsh.DFLT_ELEMS_OPEN_CLOSE['open']):
+                for section in stream.getSections(name):
+                    with self.metrics.span('read', section=name) as span:
+                        content = stream.readSection(section)
+                        span.bytes = len(content)
+                        for line in content.decode('utf-8').splitlines():
+                            self._readLine(line, dim)
+            # index the fields (only the header of each step is decompressed)
+            for section in stream.sections:
+                if section['name'] not in DFLT_FIELD_TYPES:
+                    continue
+                head = stream.readRange(section['offset'], min(section['end'], section['offset'] + 4096))
+                lines = head.decode('utf-8').splitlines(keepends=True)
+                info = parseFieldHeader([ln.strip() for ln in lines[1:]])
+                if info is None:
+                    continue
+                nbBytes = sum(len(ln.encode('utf-8')) for ln in lines[:info['nbHeaderLines'] + 1])
+                info.update({'type': DFLT_FIELD_TYPES[section['name']],
+                             'offset': section['offset'] + nbBytes,
+                             'end': section['end']})
+                self.fields.append(info)
+        finally:
+            stream.close()
+        with self.metrics.span('elements') as span:
+            self._finalizeElems()
+            span.items = sum(len(e) for e in self.elems.values())
+
+    def getFields(self)-> list:
+        """
+        Get the names of the fields available in the file.
+
+        Returns:
+            list: The names of the fields (order of appearance in the file).
+        """
+        return list(dict.fromkeys(f['name'] for f in self.fields))
+
+    def getFieldInfo(self, name: Optional[str]=None)-> list:
+        """
+        Get the index of the steps of the fields (built during the reading of the file).
+
+        Args:
+            name (Optional[str], optional): Keep only the steps of this field. Defaults to None.
+
+        Returns:
+            list: One dictionary per step with keys 'name', 'type' ('nodal' or 'elemental'),
+            'time', 'step', 'nbComp', 'nbValues', 'offset' and 'end' (position of the values
+            in the file).
+        """
+        return [f for f in self.fields if name is None or f['name'] == name]
+
+    def getField(self,
+                 name: str,
+                 step: Optional[int]=None,
+                 time: Optional[float]=None,
+                 withTags: bool=False)-> Union[np.ndarray, tuple]:
+        """
+        Load the values of a step of a field.
+
+        Only the values of the requested step are read (the file is accessed at the
+        offset stored in the index) and converted at once.
+
+        Args:
+            name (str): The name of the field.
+            step (Optional[int], optional): The step number. Defaults to None.
+            time (Optional[float], optional): The time value (used if `step` is None).
+                Defaults to None (first step).
+            withTags (bool, optional): If True, the tags of the nodes/elements are also
+                returned. Defaults to False.
+
+        Returns:
+            Union[np.ndarray, tuple]: The values (one row per node/element) or the tags and
+            the values if `withTags` is True.
+
+        Raises:
+            ValueError: If the field or the step does not exist.
+        """
+        steps = self.getFieldInfo(name)
+        if step is not None:
+            steps = [f for f in steps if f['step'] == step]
+        elif time is not None:
+            steps = [f for f in steps if np.isclose(f['time'], time)]
+        if not steps:
+            raise ValueError(f'Field {name} (step {step}, time {time}) not available')
+        info = steps[0]
+        nbValues, nbComp = info['nbValues'], info['nbComp']
+        with self.metrics.span('field', items=nbValues, field=name, step=info['step']) as span:
+            data = self.readFieldData(info)
+            span.bytes = len(data)
+            if info.get('binary'):
+                dtype = np.dtype([('tag', info['endian'] + 'i4'), ('values', info['endian'] + 'f8', (nbComp,))])
+                array = np.frombuffer(data, dtype, nbValues)
+                tags = array['tag'].astype(np.int64)
+                values = array['values'].reshape(nbValues, nbComp)
+            else:
+                array = np.fromstring(data.decode('ascii'), sep=' ').reshape(nbValues, 1 + nbComp)
+                tags = array[:, 0].astype(np.int64)
+                values = array[:, 1:]
+        if withTags:
+            return tags, values
+        return values
+
+    def readFieldData(self, info: dict)-> bytes:
+        """
+        Read the raw values of a step of a field.
+
+        Args:
+            info (dict): The index of the step (see `getFieldInfo`).
+
+        Returns:
+            bytes: The raw values.
+        """
+        start = info['offset']
+        if self.sections:
+            stream = fileio.BGZFReader(cast(str, self.filename))
+            try:
+                data = stream.readRange(start, info['end'])
+            finally:
+                stream.close()
+        else:
+            objFile = fileio.fileHandler(filename=self.filename, right='rb', safeMode=False)
+            handle = cast(IO[bytes], objFile.getHandler())
+            handle.seek(start)
+            data = handle.read(info['end'] - start if info['end'] is not None else -1)
+            objFile.close()
+        # remove the closing tag
+        if not info.get('binary'):
+            end = data.find(b'$')
+            if end >= 0:
+                data = data[:end]
+        return data
+
+    def getSections(self, name: Optional[str]=None, **meta: object)-> list:
+        """
+        Get the sections stored in the index of a seekable compressed file.
+
+        Args:
+            name (Optional[str], optional): Keep only the sections with this name
+                (e.g. '$NodeData'). Defaults to None.
+            **meta: Keep only the sections with this information (e.g. field='T', step=2).
+
+        Returns:
+            list: The sections (dictionaries with 'name', 'offset', 'end' and, for the
+            fields, 'field', 'step' and 'time'). Empty for files without index.
+        """
+        return [
+            section
+            for section in self.sections
+            if (name is None or section['name'] == name)
+            and all(section.get(k) == v for k, v in meta.items())
+        ]
+
+    def readSection(self, name: str, occurrence: int=0, **meta: object)-> str:
+        """
+        Read the raw content of a section of a seekable compressed file.
+
+        Only the blocks containing the section are decompressed, which gives random
+        access to any step of a field.
+
+        Args:
+            name (str): The name of the section (e.g. '$NodeData').
+            occurrence (int, optional): The occurrence among the matching sections. Defaults to 0.
+            **meta: Information used to select the section (e.g. field='T', step=2).
+
+        Returns:
+            str: The content of the section (including the opening and closing tags).
+
+        Raises:
+            ValueError: If the section does not exist.
+        """
+        sections = self.getSections(name, **meta)
+        if len(sections) <= occurrence:
+            raise ValueError(f'Section {name} {meta} not available in the index')
+        stream = fileio.BGZFReader(cast(str, self.filename))
+        try:
+            data = stream.readSection(sections[occurrence])
+        finally:
+            stream.close()
+        return data.decode('utf-8')
+
     def initContent(self)-> None:
         """
         Initializes the content attributes of the mesh object.
@@ -628,22 +922,35 @@ class MSHReader:
         - `nodes`: An array to store the coordinates of the nodes (initially None).
         - `dim`: The dimension of the mesh (2D or 3D) (initially None).
         - `nbNodes`: The number of nodes in the mesh (initially None).
+        - `nodeTags`: The tags (ids) of the nodes in the file, sorted (initially empty). The
+          writers do not take them: the nodes are written with tags 1..n in the order of the
+          array, so a file with gaps in its numbering is renumbered when written back.
         - `elems`: A dictionary to store elements, where keys are the names of the elements.
         - `tagsList`: A dictionary to store tags and their associated elements.
         - `fhandle`: A file handle for file operations (initially None).
         - `obj_file`: An object representing the file (initially None).
         - `read_data`: Data read from the file (initially None).
         - `curIt`: An integer representing the current iteration (initially 0).
+        - `filename`: The name of the file (initially None).
+        - `sections`: The sections listed in the index of seekable compressed files.
+        - `fields`: The index of the steps of the fields (see `getFieldInfo`).
+        - `queryCache`: The results of the queries (see `clearCache`).
         """
         self.nodes = None  # array of nodes coordinates
         self.dim = None  # dimension of the mesh (2/3)
         self.nbNodes = None  # number of nodes
+        self.nodeTags = np.zeros(0, dtype=np.int64)  # tags of the nodes (sorted)
         self.elems = {}  # dictionary of elements (keys are name of the element)
         self.tagsList = {}  # list of tags and associated elements
         self.fhandle = None
         self.objFile = None
         self.read_data = None
         self.curIt = 0
+        self.filename = None
+        self.sections = []  # sections of seekable compressed files
+        self.fields = []  # index of the steps of the fields
+        self.fieldHeader = {}
+        self.queryCache = {}  # results of getNodes/getElements/getTags
 
     def __del__(self)-> None:
         """
@@ -661,6 +968,34 @@ class MSHReader:
         """
         self.initContent()
 
+    def clearCache(self)-> None:
+        """
+        Clear the results of the queries (`getNodes`, `getElements` and `getTags`) kept by
+        the reader. Called when the content is read; to be called after a modification of
+        `nodes`, `elems` or `tagsList`.
+        """
+        self.queryCache = {}
+
+    def cachedQuery(self, key: tuple, query: Callable)-> object:
+        """
+        Get the result of a query from the cache (computed on the first call). The arrays
+        are returned as read-only views and the containers as copies, so the results kept
+        by the reader cannot be modified.
+
+        Args:
+            key (tuple): The key of the query (name and arguments).
+            query (Callable): The function computing the result.
+
+        Returns:
+            object: The result of the query.
+        """
+        if key not in self.queryCache:
+            self.queryCache[key] = readOnly(query())
+        result = self.queryCache[key]
+        if isinstance(result, (dict, list)):
+            return type(result)(result)
+        return result
+
     def readNodes(self, dim: Optional[int]=None, lineStr: Optional[str]=None)-> None:
         """
         Reads node data from a line in an `.msh` file.
@@ -676,14 +1011,15 @@ class MSHReader:
         Behavior:
             - On the first call (`curIt == 0`), it reads the number of nodes (`nbNodes`)
               and initializes the dimension (`dim`).
-            - On subsequent calls, it processes the node coordinates and stores them
-              in a NumPy array (`nodes`).
-            - Once all nodes are read, it resets the reading state (`read_data` and `curIt`).
+            - On subsequent calls, it stores the lines of the nodes.
+            - Once all nodes are read, the lines are converted at once (see `_readNodesLines`)
+              and it resets the reading state (`read_data` and `curIt`).
 
         Attributes:
             nbNodes (int): The total number of nodes to be read.
             dim (int): The dimension of the nodes (e.g., 2D or 3D).
             nodes (np.ndarray): A NumPy array storing the coordinates of the nodes.
+            nodeTags (np.ndarray): The tags (ids) of the nodes in the file.
             curIt (int): The current iteration or line being processed.
             read_data (None): A flag indicating the end of the node reading process.
 
@@ -694,35 +1030,52 @@ class MSHReader:
         """
         if lineStr is None:
             return
-        contentLine = lineStr.split()
         # first read: access to the number of nodes
         if self.curIt == 0:
             # read number of nodes
-            self.nbNodes = int(contentLine[0])
+            self.nbNodes = int(lineStr.split()[0])
+            self.nodeLines = []
             self.curIt += 1
             self.dim = dim
             Logger.debug(f'Start read {self.nbNodes} nodes')
         else:
-            if self.curIt == 1:
-                if not dim:
-                    # extract dimension
-                    self.dim = len(contentLine) - 1
-                if self.nbNodes is None or self.dim is None:
-                    return
-                # create array to store nodes coordinates
-                self.nodes = np.zeros((self.nbNodes, self.dim))
-            if self.nodes is None or self.dim is None:
-                return
-            # store nodes
-            assert self.nodes is not None and self.dim is not None
-            self.nodes[self.curIt - 1, :] = np.array(contentLine[1 : self.dim + 1], dtype=float)
+            # store the lines (converted at once at the end of the section)
+            self.nodeLines.append(lineStr)
             self.curIt += 1
             # stop read nodes
             if self.curIt - 1 == self.nbNodes:
+                self._readNodesLines(self.nodeLines, dim)
+                self.nodeLines = []
                 self.read_data = None
                 self.curIt = 0
                 Logger.debug(f'Nodes read: {self.nbNodes}, dimension: {self.dim}')
 
+    def _readNodesLines(self, lines: list, dim: Optional[int]=None)-> None:
+        """
+        Reads and processes the lines of node data of a mesh file.
+
+        The nodes are stored by increasing tags (ids): the original tags are kept in
+        `nodeTags` and the connectivity of the elements is converted to the positions of
+        the nodes (see `getNodeIndexes`), so that files with gaps in the numbering of the
+        nodes are read correctly. The original tags are not written back by the MSH writers
+        (nodes numbered from 1 in the order of the array).
+
+        Args:
+            lines (list): The lines of the nodes (tag and coordinates of each node).
+            dim (Optional[int], optional): The dimension of the nodes to keep (inferred from
+                the data if not provided). Defaults to None.
+        """
+        values = np.fromstring(' '.join(lines), sep=' ', dtype=np.float64).reshape(len(lines), -1)
+        self.dim = dim or values.shape[1] - 1
+        tags = values[:, 0].astype(np.int64)
+        order = np.argsort(tags, kind='stable')
+        if np.all(order == np.arange(tags.size)):
+            self.nodeTags = tags
+            self.nodes = np.ascontiguousarray(values[:, 1:self.dim + 1])
+        else:
+            self.nodeTags = tags[order]
+            self.nodes = np.ascontiguousarray(values[order, 1:self.dim + 1])
+
     def readElements(self, lineStr: Optional[str]=None)-> None:
         """
         Reads and processes elements from a given line of input.
@@ -739,7 +1092,7 @@ class MSHReader:
         Behavior:
             - On the first call (self.curIt == 0), it reads the total number of elements
               from the input line and initializes the reading process.
-            - On subsequent calls, it processes the element connectivity data line by line.
+            - On subsequent calls, it stores the lines of the element connectivity data.
             - Once all elements have been read, it finalizes the data, resets internal
               state variables, and logs the results.
 
@@ -749,25 +1102,27 @@ class MSHReader:
             - Logs the tags associated with the elements.
 
         Note:
-            This method relies on helper methods `_readElementsLine` and `_finalizeElems`
-            to process individual lines and finalize the data, respectively.
+            This method relies on helper methods `_readElementsLines` and `_finalizeElems`
+            to convert the lines of the section at once and finalize the data, respectively.
         """
         if lineStr is None:
             return
-        contentLine = lineStr.split()
         # first read: access to the number of elements
         if self.curIt == 0:
             # read number of elements
-            self.nbElems = int(contentLine[0])
+            self.nbElems = int(lineStr.split()[0])
+            self.elemLines = []
             self.curIt += 1
             Logger.debug(f'Start read {self.nbElems} elements')
         else:
-            # store elements connectivity
-            self._readElementsLine(contentLine)
+            # store the lines (converted at once at the end of the section)
+            self.elemLines.append(lineStr)
             self.curIt += 1
             # stop read elements
             if self.curIt - 1 == self.nbElems:
-                #  finalize data
+                # convert the lines and finalize data
+                self._readElementsLines(self.elemLines)
+                self.elemLines = []
                 self._finalizeElems()
                 # reset
                 self.read_data = None
@@ -784,72 +1139,62 @@ class MSHReader:
 
     def _finalizeElems(self)-> None:
         """
-        Finalizes the element data by converting each element in the `elems` dictionary
-        to a NumPy array. This ensures that the data structure is consistent and
-        optimized for numerical operations.
+        Finalizes the element data by concatenating the blocks of each type of element in
+        the `elems` dictionary into a NumPy array. This ensures that the data structure is
+        consistent and optimized for numerical operations.
 
         Returns:
             None
         """
+        self.clearCache()
         for it in self.elems:
-            self.elems[it] = np.array(self.elems[it])
+            if isinstance(self.elems[it], list):
+                self.elems[it] = np.concatenate(self.elems[it]) if self.elems[it] else np.empty((0, 0), dtype=int)
 
-    def _readElementsLine(self, arraystr: list)-> None:
+    def _readElementsLines(self, lines: list)-> None:
         """
-        Reads and processes a line of element data from a mesh file.
+        Reads and processes the lines of element data of a mesh file.
 
         Args:
-            arraystr (list): A list of strings representing the content of a line
-                             for an element in the mesh file.
+            lines (list): The lines of the elements (number, Gmsh type, number of tags,
+                          tags and nodes of each element).
 
         Functionality:
-            - Converts the input line to an integer array.
-            - Extracts the element ID and determines its type using the 
-            `dbmsh.get_elemType_from_msh` function.
-            - Retrieves the number of tags and the associated tags from the line.
-            - Extracts the nodes associated with the element.
-            - Stores the element nodes in the `self.elems` dictionary, categorized by element type.
-            - Updates the `self.tagsList` dictionary to associate tags with their corresponding elements
-              and element types.
+            - Converts all the lines to an integer array at once.
+            - Splits the elements by runs of the same type and number of tags (see
+              `splitElements`): the type is resolved once per run with the registry of
+              the types of elements (`dbelem`), not for each element.
+            - Stores the blocks of element nodes in the `self.elems` dictionary, categorized
+              by element type.
+            - Updates the `self.tagsList` dictionary to associate tags with their corresponding
+              elements and element types.
 
         Notes:
             - The `self.elems` dictionary organizes elements by their type, with each type containing
-              a list of node arrays.
+              a list of blocks of nodes (concatenated by `_finalizeElems`).
             - The `self.tagsList` dictionary maps tags (as strings) to a nested structure of element
-              types and their corresponding indices in `self.elems`.
+              types and their corresponding indices in `self.elems` (in the order of the file).
 
         Raises:
-            ValueError: If the input line does not conform to the expected format or contains 
-            invalid data.
-        """
-        # convert to int
-        arrayint = np.array(arraystr, dtype=int)
-        # get element id
-        elementID = arrayint[1]
-        elemType = dbmsh.getElemTypeFromMSH(elementID)
-        # get number of tags
-        nbTags = arrayint[2]
-        tags = arrayint[3 : 3 + nbTags]
-        # element nodes
-        elementNodes = arrayint[3 + nbTags :]
-        # check if element can be stored
-        if elemType not in self.elems:
-            self.elems[elemType] = list()
-        # store it
-        self.elems[elemType].append(elementNodes)
-        # get the item of the element
-        ix = len(self.elems[elemType]) - 1
-        # create the list for each tag
-        for it in tags:
-            itS = str(it)
-            # check if the tag already exists
-            if itS not in self.tagsList:
-                self.tagsList[itS] = dict()
-            # check if the element type has been already created
-            if elemType not in self.tagsList[itS]:
-                self.tagsList[itS][elemType] = list()
-            # store the elements
-            self.tagsList[itS][elemType].append(ix)
+            ValueError: If a type of element is not supported.
+        """
+        values = np.fromstring(' '.join(lines), sep=' ', dtype=np.int64)
+        sizes = {k: sum(len(b) for b in v) for k, v in self.elems.items()}
+        for elemType, nbTags, block in splitElements(values):
+            self.elems.setdefault(elemType, []).append(getNodeIndexes(self.nodeTags, block[:, 3 + nbTags:]))
+            start = sizes.get(elemType, 0)
+            sizes[elemType] = start + block.shape[0]
+            if nbTags == 0:
+                continue
+            # elements of each tag (order of first appearance of the tags, elements in file order)
+            tags = block[:, 3:3 + nbTags].ravel()
+            rows = np.repeat(np.arange(start, start + block.shape[0]), nbTags)
+            order = np.argsort(tags, kind='stable')
+            uniqueTags, first, counts = np.unique(tags[order], return_index=True, return_counts=True)
+            for it in np.argsort(order[first]):
+                ix = rows[order[first[it]:first[it] + counts[it]]]
+                tagElems = self.tagsList.setdefault(str(uniqueTags[it]), {})
+                tagElems.setdefault(elemType, []).extend(ix.tolist())
 
     def getNodes(self, tag: Optional[int]=None)-> np.ndarray:
         """
@@ -867,13 +1212,20 @@ class MSHReader:
             A NumPy array containing the coordinates of the nodes. If a tag is
             specified, only the coordinates of the nodes associated with the
             elements of that tag are returned. Otherwise, all node coordinates
-            are returned.
+            are returned. The result is cached (see `clearCache`) and read-only.
+        """
+        return cast(np.ndarray, self.cachedQuery(('nodes', str(tag) if tag is not None else None),
+                                                 lambda: self._queryNodes(tag)))
+
+    def _queryNodes(self, tag: Optional[int]=None)-> np.ndarray:
+        """
+        Compute the result of `getNodes` (see `getNodes`).
         """
         if self.nodes is None:
             return np.array([])
         if tag is not None:
             # get elements
-            elts = self.getElements(tag=tag, dictFormat=False)
+            elts = self.getElements(tag=tag, dictFormat=False, unique=False)
             if isinstance(elts, dict):
                 return np.array([])
             return self.nodes[np.unique(elts.flatten())-1,:]
@@ -883,7 +1235,8 @@ class MSHReader:
                     type: str|None=None, # backward compatibility (depreciated)
                     typeElem: str|None=None,
                     tag: int|None=None,
-                    dictFormat: bool=True)-> Union[np.ndarray, dict]:
+                    dictFormat: bool=True,
+                    unique: bool=True)-> Union[np.ndarray, dict]:
         """
         Retrieve elements from the mesh based on specified criteria.
 
@@ -897,6 +1250,10 @@ class MSHReader:
             dictFormat (bool, optional): Determines the format of the returned data.
                 If True, the elements will be returned as a dictionary. If False, the elements
                 will be returned as a NumPy array. Defaults to True.
+            unique (bool, optional): Remove the duplicated elements (same nodes), keeping the
+                order of the file. If False, the elements are returned in the order of the file
+                without comparison of the rows (fast path; without tag, the arrays of the
+                elements are returned without copy). Defaults to True.
 
         Returns:
             Union[np.ndarray, dict]: The retrieved elements. The format depends on the
@@ -911,49 +1268,149 @@ class MSHReader:
             - If `tag` is specified, only elements associated with the given tag are retrieved.
             - If `dictFormat` is False and multiple element types are present, only the first
               type is exported, and a warning is logged.
+            - The result is cached (see `clearCache`): the arrays are read-only.
         """
-        elemsTag = dict()
-        # filter by tag
-        if tag:
-            if str(tag) in self.tagsList:
-                elemsTag = self.tagsList[str(tag)]
-        else:
-            # copy all meshes associated to all tags
-            # along tags
-            for _, vT in self.tagsList.items():
-                # along meshes in tag
-                for iM in vT.keys():
-                    # check if element type already exists
-                    if iM not in elemsTag:
-                        elemsTag[iM] = list()
-                    elemsTag[iM].extend(vT[iM])
         # filter by type
         if type is not None:
             typeElem = type
-        if typeElem:
-            elemsExportUnique = np.array([])
-            if typeElem in elemsTag.keys():
-                elemsExport = self.elems[typeElem][elemsTag[typeElem], :]
-                elemsExportUnique = np.unique(elemsExport, axis=0)
+        key = ('elements', str(tag) if tag else None, typeElem or None, dictFormat, unique)
+        return cast(Union[np.ndarray, dict],
+                    self.cachedQuery(key, lambda: self._queryElements(typeElem, tag, dictFormat, unique)))
+
+    def _queryElements(self,
+                       typeElem: Optional[str]=None,
+                       tag: Optional[int]=None,
+                       dictFormat: bool=True,
+                       unique: bool=True)-> Union[np.ndarray, dict]:
+        """
+        Compute the result of `getElements` (see `getElements`).
+        """
+        # indexes of the elements of each type (None: all the elements)
+        if tag:
+            elemsTag = self.tagsList.get(str(tag), {})
         else:
-            elemsExport = dict()
-            elemsExportUnique = dict()
-            for key,val in elemsTag.items():
-                elemsExport[key] = self.elems[key][val, :]
-                elemsExportUnique[key] = np.unique(elemsExport[key], axis=0)
+            elemsTag = dict.fromkeys(self.elems)
+        elemsExport = dict()
+        for key, val in elemsTag.items():
+            if typeElem and key != typeElem:
+                continue
+            if val is None:
+                elems = self.elems[key]
+            else:
+                # file order (the indexes of a tag may be repeated)
+                ix = np.asarray(val, dtype=np.int64)
+                elems = self.elems[key][np.unique(ix) if unique else ix, :]
+            if unique:
+                elems = elems[meshtools.uniqueRows(elems)]
+            elemsExport[key] = elems
+        if typeElem:
+            return elemsExport.get(typeElem, np.array([]))
 
         # specific export
-        if not dictFormat and not typeElem:
+        if not dictFormat:
             if len(elemsExport) > 1:
                 Logger.warning('Elements exported without the dictionary format: some data are not exported')
             if len(elemsExport) == 0:
                 Logger.warning('No element to export')
                 return np.array([])
-            idElems = list(elemsExport)[0]
-            elemsExport = elemsExport[idElems]
-            elemsExportUnique = elemsExportUnique[idElems]
+            return elemsExport[list(elemsExport)[0]]
+
+        return elemsExport
 
-        return cast(Union[np.ndarray, dict], elemsExportUnique)
+    def getSubmesh(self,
+                   tags: Union[int, str, list, None]=None,
+                   types: Union[str, list, None]=None,
+                   offset: int=1)-> tuple:
+        """
+        Extract a subset of the mesh with compact numbering of the nodes, ready to be
+        given to the writers.
+
+        Args:
+            tags (Union[int, str, list, None], optional): The tag(s) of the elements to keep
+                (all the elements if None). Defaults to None.
+            types (Union[str, list, None], optional): The type(s) of elements to keep (all the
+                types if None). Defaults to None.
+            offset (int, optional): The index of the first node in the connectivity (1 for
+                the MSH writers, 0 for the VTK writers). Defaults to 1.
+
+        Returns:
+            tuple: The nodes, the element blocks (one per type, elements in file order, with
+            the key 'physgrp' giving the first requested tag of each element, 0 if none) and
+            the maps old index -> new index (-1 if not kept) of the nodes ('nodes') and of the
+            elements of each type ('elements').
+        """
+        if isinstance(tags, (int, np.integer, str)):
+            tags = [tags]
+        if isinstance(types, str):
+            types = [types]
+        listTags = [str(t) for t in tags] if tags is not None else list(self.tagsList)
+        nodes = self.nodes if self.nodes is not None else np.zeros((0, self.dim or 3))
+        used = np.zeros(nodes.shape[0], dtype=bool)
+        elements = []
+        elemMaps = {}
+        for typeElem in types if types is not None else list(self.elems):
+            if typeElem not in self.elems:
+                continue
+            nbElems = self.elems[typeElem].shape[0]
+            ids = [np.asarray(self.tagsList.get(t, {}).get(typeElem, []), dtype=np.int64) for t in listTags]
+            grps = [np.full(ix.size, int(t), dtype=np.int64) for ix, t in zip(ids, listTags)]
+            if tags is None:
+                # elements without tag
+                ids.append(np.arange(nbElems, dtype=np.int64))
+                grps.append(np.zeros(nbElems, dtype=np.int64))
+            if not ids:
+                continue
+            # elements in file order with their first tag
+            ids, first = np.unique(np.concatenate(ids), return_index=True)
+            if ids.size == 0:
+                continue
+            elemMap = np.full(nbElems, -1, dtype=np.int64)
+            elemMap[ids] = np.arange(ids.size, dtype=np.int64)
+            elemMaps[typeElem] = elemMap
+            conn = self.elems[typeElem][ids]
+            used[conn.ravel() - 1] = True
+            elements.append({configMESH.DFLT_MESH: conn,
+                             'type': typeElem,
+                             configMESH.DFLT_PHYS_GRP: np.concatenate(grps)[first]})
+        # compact numbering of the nodes (order of the nodes preserved)
+        nodeMap = np.where(used, np.cumsum(used) - 1, -1)
+        for e in elements:
+            e[configMESH.DFLT_MESH] = nodeMap[e[configMESH.DFLT_MESH] - 1] + offset
+        nbElems = sum(e[configMESH.DFLT_MESH].shape[0] for e in elements)
+        Logger.debug(f'Submesh: {int(used.sum())} nodes, {nbElems} elements')
+        return nodes[used], elements, {'nodes': nodeMap, 'elements': elemMaps}
+
+    def getMesh(self,
+                tags: Union[int, str, list, None]=None,
+                types: Union[str, list, None]=None,
+                offset: int=1)-> meshdata.Mesh:
+        """
+        Get the mesh (or a subset, see `getSubmesh`) as a mesh container ready to be given to
+        the writers (argument `mesh`). The container is cached (see `clearCache`) so its
+        derived data are computed once. The fields are not included (see `getField`).
+
+        Args:
+            tags (Union[int, str, list, None], optional): The tag(s) of the elements to keep
+                (all the elements if None). Defaults to None.
+            types (Union[str, list, None], optional): The type(s) of elements to keep (all the
+                types if None). Defaults to None.
+            offset (int, optional): The index of the first node in the connectivity.
+                Defaults to 1.
+
+        Returns:
+            meshdata.Mesh: The nodes used by the elements and the element blocks (one per type).
+        """
+        listTags = [tags] if isinstance(tags, (int, np.integer, str)) else tags
+        listTypes = [types] if isinstance(types, str) else types
+        key = ('mesh',
+               tuple(str(t) for t in listTags) if listTags is not None else None,
+               tuple(listTypes) if listTypes is not None else None,
+               offset)
+
+        def query()-> meshdata.Mesh:
+            nodes, elements, _ = self.getSubmesh(listTags, listTypes, offset)
+            return meshdata.Mesh(nodes, elements, offset=offset)
+        return cast(meshdata.Mesh, self.cachedQuery(key, query))
 
     def getTags(self)-> list:
         """
@@ -967,14 +1424,7 @@ class MSHReader:
             list: A list of integer tags. If `tagsList` is empty or not set, an empty 
             list is returned.
         """
-        listTags = list()
-        listExport = list()
-        if self.tagsList:
-            listTags = self.tagsList.keys()
-            # convert to integer
-            for il in listTags:
-                listExport.append(int(il))
-        return listExport
+        return cast(list, self.cachedQuery(('tags',), lambda: [int(il) for il in self.tagsList]))
 
     def getTypes(self)-> list:
         """
@@ -990,6 +1440,162 @@ class MSHReader:
         return listTypes
 
 
+def readOnly(value: object)-> object:
+    """
+    Get read-only views of the arrays of a result (arrays, or dictionaries/lists of arrays).
+
+    Args:
+        value (object): The result.
+
+    Returns:
+        object: The result with read-only views of the arrays.
+    """
+    if isinstance(value, np.ndarray):
+        value = value.view()
+        value.flags.writeable = False
+    elif isinstance(value, dict):
+        value = {k: readOnly(v) for k, v in value.items()}
+    elif isinstance(value, list):
+        value = [readOnly(v) for v in value]
+    return value
+
+
+def getNodeIndexes(nodeTags: np.ndarray, ids: np.ndarray)-> np.ndarray:
+    """
+    Convert tags (ids) of nodes to the positions of the nodes (from 1) in the array of
+    the nodes sorted by tags. The tags are returned as is if they are contiguous (1..n);
+    otherwise a dense lookup array is used (or a binary search for sparse tags).
+
+    Args:
+        nodeTags (np.ndarray): The tags of the nodes (sorted).
+        ids (np.ndarray): The tags to convert (e.g. connectivity).
+
+    Returns:
+        np.ndarray: The positions of the nodes (from 1).
+
+    Raises:
+        ValueError: If some tags are not tags of nodes.
+    """
+    if nodeTags.size == 0 or (nodeTags[0] == 1 and nodeTags[-1] == nodeTags.size):
+        return ids
+    if nodeTags[-1] <= 4 * nodeTags.size:
+        # dense lookup (0: unknown tags)
+        lookup = np.zeros(nodeTags[-1] + 2, dtype=np.int64)
+        lookup[nodeTags] = np.arange(1, nodeTags.size + 1)
+        positions = lookup[np.clip(ids, 0, nodeTags[-1] + 1)]
+        valid = positions > 0
+    else:
+        positions = np.searchsorted(nodeTags, ids)
+        valid = nodeTags[np.minimum(positions, nodeTags.size - 1)] == ids
+        positions += 1
+    if not np.all(valid):
+        raise ValueError(f'Unknown node tags in the connectivity: {np.unique(ids[~valid])[:10]}')
+    return positions
+
+
+def splitElements(values: np.ndarray)-> Iterator[tuple]:
+    """
+    Split the values of lines of elements (format 2.2: number, Gmsh type, number of tags,
+    tags and nodes of each element) by runs of elements of the same type and number of
+    tags. The type is resolved once per run.
+
+    Args:
+        values (np.ndarray): The values of the lines.
+
+    Yields:
+        tuple: The type of the elements, the number of tags and the block of values (one
+        row per element).
+
+    Raises:
+        ValueError: If a type of element is not supported or if the last element is incomplete.
+    """
+    pos = 0
+    while pos < values.size:
+        mshType, nbTags = int(values[pos + 1]), int(values[pos + 2])
+        elemType = dbelem.MSH_TO_TYPE.get(mshType)
+        nbNodes = int(dbelem.getNumberNodesFromMSH(mshType)) if elemType is not None else 0
+        if not nbNodes:
+            raise ValueError(f'Element type {mshType} not supported')
+        nbCols = 3 + nbTags + nbNodes
+        nbRows = (values.size - pos) // nbCols
+        if not nbRows:
+            raise ValueError(f'Incomplete element ({values.size - pos} values, {nbCols} expected)')
+        block = values[pos:pos + nbRows * nbCols].reshape(nbRows, nbCols)
+        same = (block[:, 1] == mshType) & (block[:, 2] == nbTags)
+        nbRun = nbRows if same.all() else int(np.argmin(same))
+        pos += nbRun * nbCols
+        yield elemType, nbTags, block[:nbRun]
+
+
+def getFieldSteps(field: dict)-> tuple:
+    """
+    Get the steps of a field declared for the writers.
+
+    Args:
+        field (dict): The field (keys 'data', 'type', 'dim', 'name' and optionally
+            'steps' or 'nbsteps').
+
+    Returns:
+        tuple: The name of the field, the number of values per node/cell, the list of
+        steps (time values) and the list of the arrays of values (one per step).
+    """
+    nameField = field[configMESH.DFLT_FIELD_NAME]
+    # number of data per nodes/cells
+    nbPerEntity = field[configMESH.DFLT_FIELD_DIM]
+    if configMESH.DFLT_FIELD_STEPS in field:
+        listSteps = field[configMESH.DFLT_FIELD_STEPS]
+        nbSteps = len(listSteps)
+    elif configMESH.DFLT_FIELD_NBSTEPS in field:
+        nbSteps = field[configMESH.DFLT_FIELD_NBSTEPS]
+        listSteps = range(nbSteps)
+    else:
+        nbSteps = 1
+        listSteps = [0.0]
+    txt = f'Field: {nameField}, number of steps: {nbSteps}'
+    txt += f', dimension per node/cell: {nbPerEntity}'
+    Logger.debug(txt)
+    # reformat values as list of arrays
+    if len(field[configMESH.DFLT_FIELD_DATA]) > 1 and nbSteps == 1:
+        values = [field[configMESH.DFLT_FIELD_DATA]]
+    else:
+        values = field[configMESH.DFLT_FIELD_DATA]
+    return nameField, nbPerEntity, listSteps, values
+
+
+def parseFieldHeader(lines: list)-> Optional[dict]:
+    """
+    Parse the header of a `$NodeData`/`$ElementData` section (string, real and integer tags).
+
+    Args:
+        lines (list): The lines of the header (without the opening tag).
+
+    Returns:
+        Optional[dict]: The name, time, step, number of components ('nbComp'), number of
+        values ('nbValues') and number of lines of the header ('nbHeaderLines'), or None if
+        the header is incomplete.
+    """
+    it = 0
+    tags = []
+    for _ in range(3):
+        if len(lines) <= it:
+            return None
+        nb = int(lines[it])
+        if len(lines) < it + 1 + nb:
+            return None
+        tags.append(lines[it + 1:it + 1 + nb])
+        it += 1 + nb
+    strings, reals, ints = tags
+    ints = [int(v) for v in ints]
+    return {
+        'name': strings[0].strip('"') if strings else '',
+        'time': float(reals[0]) if reals else 0.0,
+        'step': ints[0] if ints else 0,
+        'nbComp': ints[1] if len(ints) > 1 else 1,
+        'nbValues': ints[2] if len(ints) > 2 else 0,
+        'nbHeaderLines': it,
+    }
+
+
 def catchTag(content: Optional[str] = None)-> Optional[str]:
     """
     Determines the type of tag present in the given content.
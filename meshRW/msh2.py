@@ -10,11 +10,13 @@ import time
 from pathlib import Path
 from typing import Union, Optional, cast
 
-import gmsh
 import numpy as np
 from loguru import logger as Logger
 
-from . import dbmsh, various, writerClass
+from . import dbmsh, meshdata, metrics, various, writerClass
+
+# gmsh API imported on first use
+gmsh = various.LazyModule('gmsh')
 
 
 def getViewName(viewTag: int) -> str:
@@ -66,6 +68,7 @@ class MSHWriter(writerClass.Writer):
         title: str|None = None,
         verbose: bool = False,
         opts: dict|None = None,
+        mesh: Optional[meshdata.Mesh] = None,
     )-> None:
         """
         Initialize the mesh writer object using the Gmsh API.
@@ -84,6 +87,8 @@ class MSHWriter(writerClass.Writer):
             verbose (bool, optional): Enable verbose logging. Defaults to False.
             opts (dict, optional): Additional options for the mesh. Defaults to
                       {'version': 2.2, 'binary': False, 'nodesReclassify': True, 'createPath': True}.
+            mesh (meshdata.Mesh, optional): Mesh container replacing the nodes, elements and
+            fields (inputs adapted and analysed once). Defaults to None.
 
         Attributes:
             itName (int): Iterator for naming fields.
@@ -108,11 +113,20 @@ class MSHWriter(writerClass.Writer):
         self.nbNodes = 0
         self.nbElems = 0
         # adapt inputs
-        nodes, elements, fieldsOk = writerClass.adaptInputs(nodes, elements, fields)
+        nodes, elements, fieldsOk = writerClass.getInputs(nodes, elements, fields, mesh, offset=1)
+        # merging of the coincident nodes (option 'merge')
+        nodes, elements, fieldsOk, mergeMap = writerClass.mergeInputs(nodes, elements, fieldsOk, opts, offset=1)
+        # renumbering of the nodes and elements (option 'reorder')
+        nodes, elements, fieldsOk, permutation = writerClass.reorderInputs(nodes, elements, fieldsOk, opts, offset=1)
+        # derived data of the mesh container not valid for merged or renumbered inputs
+        if mergeMap is not None or permutation is not None:
+            mesh = None
         # initialization
         if opts is None:
             opts = {'version': 2.2, 'binary': False, 'nodesReclassify': True, 'createPath': True}
-        super().__init__(filename, nodes, elements, fields, append, title, opts)
+        super().__init__(filename, nodes, elements, fieldsOk, append, title, opts, mesh)
+        self.permutation = permutation
+        self.mergeMap = mergeMap
         # load specific configuration
         self.db = dbmsh
         self.nameGrp: dict = {}  # Initialize nameGrp attribute
@@ -123,6 +137,7 @@ class MSHWriter(writerClass.Writer):
 
         # write contents
         self.writeContents(nodes, elements, fieldsOk)
+        self.metrics.close()
 
     def getAppend(self)-> bool:
         """
@@ -215,7 +230,7 @@ class MSHWriter(writerClass.Writer):
         # clean gmsh
         gmsh.finalize()
 
-    @various.timeit('Nodes declared')
+    @metrics.section('nodes', 'Nodes declared', items='nbNodes')
     def writeNodes(self, nodes: Union[list, np.ndarray])-> None:
         """
         Writes the coordinates of nodes to the mesh.
@@ -252,9 +267,9 @@ class MSHWriter(writerClass.Writer):
         nodes_num = np.arange(1, len(nodes) + 1)
         num_fgrp = self.listPhysGrp[0]
         # add nodes to first volume entity
-        gmsh.model.mesh.addNodes(3, self.entities[num_fgrp][-1], nodes_num, nodes.flatten())
+        gmsh.model.mesh.addNodes(3, self.entities[num_fgrp][-1], nodes_num, writerClass.getNodes3D(nodes).ravel())
 
-    @various.timeit('Elements declared')
+    @metrics.section('elements', 'Elements declared', items='nbElems')
     def writeElements(self, elements: Union[list, dict])-> None:
         """
         Writes elements to the mesh model.
@@ -323,7 +338,7 @@ class MSHWriter(writerClass.Writer):
                                                       [],
                                                       connectivity.flatten())
 
-    @various.timeit('Fields declared')
+    @metrics.section('fields', 'Fields declared')
     def writeFields(self,
                     fields: Optional[Union[list, dict, None]] = None,
                     numStep: Optional[int|None] = None) -> None:
@@ -479,7 +494,7 @@ class MSHWriter(writerClass.Writer):
             # numComponents=dim,
             # partition=0)
 
-    @various.timeit('File(s) written')
+    @metrics.section('write', 'File(s) written')
     def writeFiles(self)-> None:
         """
         Writes mesh and field data to files with advanced options for binary format
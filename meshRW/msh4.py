@@ -0,0 +1,726 @@
+"""
+This file is part of the meshRW package
+---
+This class will write and read msh v4.1 files (ASCII or binary) without the gmsh API.
+Documentation available here:
+https://gmsh.info/doc/texinfo/gmsh.html#MSH-file-format
+----
+Luc Laurent - luc.laurent@lecnam.net -- 2021
+"""
+
+from pathlib import Path
+from typing import IO, Optional, Union, cast
+
+import numpy as np
+from loguru import logger as Logger
+
+from . import configMESH, dbmsh, fileio, metrics, msh, precision, writerClass
+
+# names of the sections of the metrics of the reader (by tag of the file)
+DFLT_SECTION_NAMES: dict = {
+    dbmsh.DFLT_ENTITIES_OPEN_CLOSE['open']: 'entities',
+    dbmsh.DFLT_NODES_OPEN_CLOSE['open']: 'nodeBlocks',
+    dbmsh.DFLT_ELEMS_OPEN_CLOSE['open']: 'elementBlocks',
+    dbmsh.DFLT_FIELDS_NODES_OPEN_CLOSE['open']: 'fieldIndex',
+    dbmsh.DFLT_FIELDS_ELEMS_OPEN_CLOSE['open']: 'fieldIndex',
+}
+
+
+class MSHWriter(msh.MSHWriter):
+    """
+    Write Gmsh v4.1 mesh files (ASCII or binary) without the gmsh API.
+
+    The blocks of elements and their physical groups are mapped onto the entities of
+    the `$Entities` section: one entity per dimension and set of physical groups (blocks
+    with one physical group per element are split). Nodes and elements are then written
+    by entity blocks directly from the arrays, without per-element tags.
+
+    Tags of the nodes are their index in the array of nodes (starting from 1) and tags
+    of the elements are their position in the list of the blocks of elements (starting
+    from 1), as in the msh v2 writer, so that fields can be appended in the same way.
+
+    Attributes:
+        binary (bool): True to write a binary file.
+        entities (list): The entities (dictionaries with keys 'dim', 'tag', 'physical',
+            'blocks' and 'nodes').
+    """
+
+    def setOptions(self, opts: dict)-> None:
+        """
+        Store writer options.
+
+        Args:
+            opts (dict): A dictionary containing configuration options. In addition to
+                the options of the msh v2 writer, 'binary' (bool) selects the binary format.
+        """
+        self.opts = opts
+        self.binary = bool(opts.get('binary', False))
+        self.entities = []
+
+    def getRight(self, append: bool)-> str:
+        """
+        Get the mode used to open the file.
+
+        Args:
+            append (bool): True to append fields to an existing file.
+
+        Returns:
+            str: The mode ('a', 'w', 'ab' or 'wb').
+        """
+        return super().getRight(append) + ('b' if self.binary else '')
+
+    def writeText(self, txt: str)-> None:
+        """
+        Write text in the file (encoded in binary mode).
+
+        Args:
+            txt (str): The text.
+        """
+        if self.binary:
+            cast(fileio.fileHandler, self.fhandle).write(txt.encode('utf-8'))
+        else:
+            cast(fileio.fileHandler, self.fhandle).write(txt)
+
+    def writeArray(self, array: np.ndarray)-> None:
+        """
+        Write an array in binary mode (little endian).
+
+        Args:
+            array (np.ndarray): The array.
+        """
+        cast(fileio.fileHandler, self.fhandle).write(np.ascontiguousarray(array).tobytes())
+
+    def writeContents(self,
+                      nodes: Union[list, np.ndarray, None],
+                      elements: Union[list, np.ndarray, None],
+                      fields: Optional[list] = None,
+                      numStep: Optional[int] = None)-> None:
+        """
+        Write the contents of a mesh file: header, entities, nodes, elements and fields.
+
+        Parameters:
+            nodes (Union[list, np.ndarray]): The list or array of nodes to be written to the file.
+            elements (Union[list, np.ndarray]): The list or array of elements to be written to the file.
+            fields (Optional[list], optional): A list of fields to be written to the file. Defaults to None.
+            numStep (Optional[int], optional): Unused placeholder kept for API compatibility with the
+                abstract base class.
+        """
+        _ = numStep
+        if self.fhandle is None:
+            Logger.error('File handle is not initialized. Cannot write contents.')
+            return
+        if not self.getAppend():
+            # write header
+            with self.metrics.span('header', stream=self.fhandle):
+                self.writeText(f"{dbmsh.DFLT_FILE_OPEN_CLOSE['open']}\n")
+                self.writeText(f'{dbmsh.DFLT_FILE_VERSION_4} {int(self.binary):d} 8\n')
+                if self.binary:
+                    # integer 1 written in binary mode to detect the endianness
+                    self.writeArray(np.array([1], dtype='<i4'))
+                    self.writeText('\n')
+                self.writeText(f"{dbmsh.DFLT_FILE_OPEN_CLOSE['close']}\n")
+            if nodes is None or elements is None:
+                Logger.warning('No nodes or elements to write')
+            else:
+                nodesArray = np.asarray(nodes, dtype=float)
+                with self.metrics.span('entities', stream=self.fhandle) as span:
+                    self.buildEntities(nodesArray, elements)
+                    self.writeEntities(nodesArray)
+                    span.items = len(self.entities)
+                self.writeNodes(nodesArray)
+                self.writeElements(elements)
+
+        # write fields
+        if fields is not None:
+            self.writeFields(fields)
+
+    def buildEntities(self,
+                      nodes: np.ndarray,
+                      elements: Union[list, np.ndarray, dict])-> list:
+        """
+        Map the blocks of elements and their physical groups onto entities.
+
+        One entity is created per dimension and set of physical groups. A block declaring
+        one physical group per element is split into one entity per physical group. Each
+        node is associated with the entity of highest dimension using it (nodes used by
+        no element are associated with the first entity).
+
+        Args:
+            nodes (np.ndarray): The coordinates of the nodes.
+            elements (Union[list, np.ndarray, dict]): The blocks of elements.
+
+        Returns:
+            list: The entities (dictionaries with keys 'dim', 'tag', 'physical', 'blocks'
+            (list of (type of element, tags of elements, connectivity)) and 'nodes'
+            (indexes of the nodes)).
+        """
+        if isinstance(elements, dict):
+            elements = [elements]
+        entities = {}
+        itElem = 0
+        for iD in elements:
+            mesh = np.asarray(iD.get(configMESH.DFLT_MESH), dtype=np.int64)
+            nbElems = mesh.shape[0]
+            mshType = dbmsh.getMSHElemType(iD.get(configMESH.DFLT_TYPE_ELEM))
+            dim = dbmsh.getDim(cast(str, dbmsh.getElemTypeFromMSH(mshType)))
+            tags = np.arange(itElem + 1, itElem + nbElems + 1, dtype=np.int64)
+            itElem += nbElems
+            physGrp = np.atleast_1d(np.asarray(iD.get(configMESH.DFLT_PHYS_GRP, []), dtype=int)).ravel()
+            if physGrp.size == nbElems and nbElems > 1:
+                # one physical group per element: split the block
+                listGrp, inverse = np.unique(physGrp, return_inverse=True)
+                for iG, grp in enumerate(listGrp):
+                    mask = inverse == iG
+                    key = (dim, (int(grp),))
+                    entities.setdefault(key, []).append((mshType, tags[mask], mesh[mask]))
+            else:
+                key = (dim, tuple(dict.fromkeys(int(p) for p in physGrp)))
+                entities.setdefault(key, []).append((mshType, tags, mesh))
+        # number entities per dimension
+        self.entities = []
+        nbPerDim = {}
+        for (dim, physical), blocks in entities.items():
+            nbPerDim[dim] = nbPerDim.get(dim, 0) + 1
+            self.entities.append({'dim': dim,
+                                  'tag': nbPerDim[dim],
+                                  'physical': list(physical),
+                                  'blocks': blocks,
+                                  'nodes': np.zeros(0, dtype=np.int64)})
+        if not self.entities:
+            self.entities.append({'dim': 0, 'tag': 1, 'physical': [], 'blocks': [],
+                                  'nodes': np.zeros(0, dtype=np.int64)})
+        # associate nodes to entities (highest dimension first)
+        owner = np.full(nodes.shape[0], -1, dtype=np.int64)
+        order = sorted(range(len(self.entities)), key=lambda i: -self.entities[i]['dim'])
+        for iE in order:
+            for _, _, mesh in self.entities[iE]['blocks']:
+                ixNodes = mesh.ravel() - 1
+                free = ixNodes[owner[ixNodes] < 0]
+                owner[free] = iE
+        owner[owner < 0] = order[0]
+        sortedNodes = np.argsort(owner, kind='stable')
+        bounds = np.searchsorted(owner[sortedNodes], np.arange(len(self.entities) + 1))
+        for iE, entity in enumerate(self.entities):
+            entity['nodes'] = sortedNodes[bounds[iE]:bounds[iE + 1]]
+        Logger.debug(f'{len(self.entities)} entities')
+        return self.entities
+
+    def writeEntities(self, nodes: np.ndarray)-> None:
+        """
+        Write the `$Entities` section (bounding boxes computed from the nodes).
+
+        Args:
+            nodes (np.ndarray): The coordinates of the nodes.
+        """
+        self.writeText(f"{dbmsh.DFLT_ENTITIES_OPEN_CLOSE['open']}\n")
+        nbPerDim = [sum(e['dim'] == d for e in self.entities) for d in range(4)]
+        if self.binary:
+            self.writeArray(np.array(nbPerDim, dtype='<u8'))
+        else:
+            self.writeText(' '.join(str(n) for n in nbPerDim) + '\n')
+        policy = precision.getPolicy('repr')
+        for dim in range(4):
+            for entity in self.entities:
+                if entity['dim'] != dim:
+                    continue
+                ixNodes = np.unique(np.concatenate([m.ravel() - 1 for _, _, m in entity['blocks']]
+                                                   or [entity['nodes']]))
+                coor = writerClass.getNodes3D(nodes[ixNodes]) if ixNodes.size > 0 else np.zeros((1, 3))
+                if dim == 0:
+                    box = coor[0]
+                else:
+                    box = np.concatenate((coor.min(axis=0), coor.max(axis=0)))
+                physical = entity['physical']
+                if self.binary:
+                    self.writeArray(np.array([entity['tag']], dtype='<i4'))
+                    self.writeArray(box.astype('<f8'))
+                    self.writeArray(np.array([len(physical)], dtype='<u8'))
+                    self.writeArray(np.array(physical, dtype='<i4'))
+                    if dim > 0:
+                        # no bounding entities
+                        self.writeArray(np.array([0], dtype='<u8'))
+                else:
+                    txt = f"{entity['tag']:d} " + ' '.join(precision.formatValue(v, policy) for v in box)
+                    txt += f' {len(physical):d}' + ''.join(f' {p:d}' for p in physical)
+                    if dim > 0:
+                        txt += ' 0'
+                    self.writeText(txt + '\n')
+        if self.binary:
+            self.writeText('\n')
+        self.writeText(f"{dbmsh.DFLT_ENTITIES_OPEN_CLOSE['close']}\n")
+
+    @metrics.section('nodes', 'Nodes written', items='nbNodes')
+    def writeNodes(self, nodes: Union[list, np.ndarray, None])-> None:
+        """
+        Write the nodes by entity blocks (tags then coordinates of the nodes of each entity).
+
+        Args:
+            nodes (Union[list, np.ndarray, None]): The coordinates of the nodes.
+        """
+        if nodes is None:
+            Logger.warning('No nodes to write')
+            return
+        nodes = np.asarray(nodes, dtype=float)
+        self.nbNodes = nodes.shape[0]
+        self.dimPb = nodes.shape[1]
+        Logger.debug(f'Write {self.nbNodes} nodes')
+        txt = dbmsh.DFLT_NODES_OPEN_CLOSE['open']
+        cast(fileio.fileHandler, self.fhandle).openSection(txt)
+        self.writeText(f'{txt}\n')
+        header = [len(self.entities), self.nbNodes, min(1, self.nbNodes), self.nbNodes]
+        policy = precision.getPolicy(self.opts.get('precision'), 'nodes')
+        if self.binary:
+            self.writeArray(np.array(header, dtype='<u8'))
+        else:
+            self.writeText(' '.join(str(v) for v in header) + '\n')
+        for entity in self.entities:
+            ixNodes = entity['nodes']
+            if self.binary:
+                self.writeArray(np.array([entity['dim'], entity['tag'], 0], dtype='<i4'))
+                self.writeArray(np.array([ixNodes.size], dtype='<u8'))
+                self.writeArray((ixNodes + 1).astype('<u8'))
+                self.writeArray(writerClass.getNodes3D(nodes[ixNodes]).astype('<f8'))
+            else:
+                self.writeText(f"{entity['dim']:d} {entity['tag']:d} 0 {ixNodes.size:d}\n")
+                precision.writeRows(self.fhandle, ixNodes + 1, policy)
+                precision.writeRows(self.fhandle, nodes[ixNodes], policy, suffix=' 0.0' if self.dimPb == 2 else '')
+        if self.binary:
+            self.writeText('\n')
+        self.writeText(f"{dbmsh.DFLT_NODES_OPEN_CLOSE['close']}\n")
+        cast(fileio.fileHandler, self.fhandle).closeSection()
+
+    @metrics.section('elements', 'Elements written', items='nbElems')
+    def writeElements(self, elements: Union[list, np.ndarray, None])-> None:
+        """
+        Write the elements by entity blocks (one block per entity and type of elements).
+
+        Args:
+            elements (Union[list, np.ndarray, None]): Unused (the blocks are built by
+                `buildEntities`), kept for API compatibility.
+        """
+        _ = elements
+        blocks = [(entity, block) for entity in self.entities for block in entity['blocks']]
+        self.nbElems = sum(block[1].size for _, block in blocks)
+        Logger.debug(f'Write {self.nbElems} elements in {len(blocks)} blocks')
+        txt = dbmsh.DFLT_ELEMS_OPEN_CLOSE['open']
+        cast(fileio.fileHandler, self.fhandle).openSection(txt)
+        self.writeText(f'{txt}\n')
+        header = [len(blocks), self.nbElems, min(1, self.nbElems), self.nbElems]
+        if self.binary:
+            self.writeArray(np.array(header, dtype='<u8'))
+        else:
+            self.writeText(' '.join(str(v) for v in header) + '\n')
+        for entity, (mshType, tags, mesh) in blocks:
+            # element tag followed by the tags of its nodes
+            data = np.column_stack((tags, mesh))
+            if self.binary:
+                self.writeArray(np.array([entity['dim'], entity['tag'], mshType], dtype='<i4'))
+                self.writeArray(np.array([tags.size], dtype='<u8'))
+                self.writeArray(data.astype('<u8'))
+            else:
+                self.writeText(f"{entity['dim']:d} {entity['tag']:d} {mshType:d} {tags.size:d}\n")
+                precision.writeRows(self.fhandle, data, precision.getPolicy())
+        if self.binary:
+            self.writeText('\n')
+        self.writeText(f"{dbmsh.DFLT_ELEMS_OPEN_CLOSE['close']}\n")
+        cast(fileio.fileHandler, self.fhandle).closeSection()
+
+    def writeFieldValues(self, values: np.ndarray, policy: dict)-> None:
+        """
+        Write the values of a field (tag of the node/cell followed by its values).
+
+        Args:
+            values (np.ndarray): The values (one row per node/cell).
+            policy (dict): The precision policy (used in ASCII mode).
+        """
+        if not self.binary:
+            super().writeFieldValues(values, policy)
+            return
+        values = values.reshape(values.shape[0], -1)
+        data = np.empty(values.shape[0], dtype=[('tag', '<i4'), ('values', '<f8', (values.shape[1],))])
+        data['tag'] = np.arange(1, values.shape[0] + 1)
+        data['values'] = values
+        self.writeArray(data)
+        self.writeText('\n')
+
+
+class MSHReader(msh.MSHReader):
+    """
+    Read Gmsh v4.1 mesh files (ASCII or binary) without the gmsh API.
+
+    The `$Entities`, `$Nodes` and `$Elements` sections are parsed by blocks of entities:
+    the values of each section are converted at once with NumPy (`np.fromstring` in ASCII
+    mode, `np.frombuffer` in binary mode). Files in the v2 format are read with the v2
+    reader. The data are exposed through the API of `msh.MSHReader` (`getNodes`,
+    `getElements`, `getTags`, `getTypes`): the tags of an element are the physical
+    tags of its entity. The tags of the entities are numbered independently of the
+    physical tags (and per dimension): the elements of an entity are given by
+    `getEntityElements`.
+
+    Attributes:
+        version (str): The version of the file format.
+        binary (bool): True for a binary file.
+        entities (dict): The physical tags of the entities (keys are (dim, tag)).
+        entityElems (dict): The indexes of the elements of each entity per type (keys are
+            (dim, tag)).
+        nodeTags (np.ndarray): The tags of the nodes (sorted) in the file (not written back
+            by the writers, which number the nodes from 1 in the order of the array).
+    """
+
+    def __init__(self,
+                 filename: Union[str, Path, None]=None,
+                 typeMSH: str='mshv4',
+                 dim: int=3)->None:
+        """
+        Initializes the mesh reader object and reads the file.
+
+        Args:
+            filename (Union[str, Path], optional): The path to the mesh file to be read.
+            Defaults to None.
+            typeMSH (str, optional): Unused (the version is read in the file). Defaults to 'mshv4'.
+            dim (int, optional): The dimension of the nodes to keep (2 or 3). Defaults to 3.
+
+        Raises:
+            ValueError: If the file is not a valid MSH file.
+        """
+        _ = typeMSH
+        self.initContent()
+        self.filename = filename
+        self.version = ''
+        self.binary = False
+        self.endian = '<'
+        self.entities = {}
+        self.entityElems = {}
+        self.metrics = metrics.getMetrics(self)
+        Logger.debug(f'Open file {filename}')
+        with self.metrics.span('read') as span:
+            self.objFile = fileio.fileHandler(filename=filename, right='rb', safeMode=False)
+            content = cast(bytes, cast(IO[bytes], self.objFile.getHandler()).read())
+            self.objFile.close()
+            span.bytes = len(content)
+        pos = self.readHeader(content)
+        if not self.version.startswith('4'):
+            Logger.debug(f'MSH file version {self.version}: use the v2 reader')
+            msh.MSHReader.__init__(self, filename, dim=dim)
+            return
+        self.readContent(content, pos, dim)
+
+    def readHeader(self, content: bytes)-> int:
+        """
+        Read the `$MeshFormat` section.
+
+        Args:
+            content (bytes): The content of the file.
+
+        Returns:
+            int: The position of the end of the section.
+
+        Raises:
+            ValueError: If the section is missing.
+        """
+        tag = dbmsh.DFLT_FILE_OPEN_CLOSE['open'].encode()
+        start = content.find(tag)
+        if start < 0:
+            raise ValueError(f'{dbmsh.DFLT_FILE_OPEN_CLOSE["open"]} section not found')
+        eol = content.find(b'\n', start + len(tag) + 1)
+        version, fileType, _ = content[start + len(tag):eol].split()
+        self.version = version.decode()
+        self.binary = int(fileType) == 1
+        pos = eol + 1
+        if self.binary:
+            # integer 1 written in binary mode to detect the endianness
+            self.endian = '<' if np.frombuffer(content, '<i4', 1, pos)[0] == 1 else '>'
+            pos += 4
+        end = content.find(dbmsh.DFLT_FILE_OPEN_CLOSE['close'].encode(), pos)
+        return end + len(dbmsh.DFLT_FILE_OPEN_CLOSE['close'])
+
+    def readContent(self, content: bytes, pos: int, dim: Optional[int]=3)-> None:
+        """
+        Read the sections of the file (the unsupported sections are skipped).
+
+        Args:
+            content (bytes): The content of the file.
+            pos (int): The position of the first section.
+            dim (Optional[int], optional): The dimension of the nodes to keep. Defaults to 3.
+        """
+        nodesBlocks = []
+        elemsBlocks = []
+        while True:
+            start = content.find(b'$', pos)
+            if start < 0:
+                break
+            eol = content.find(b'\n', start)
+            name = content[start:eol].strip().decode()
+            closeTag = ('$End' + name[1:]).encode()
+            end = content.find(closeTag, eol + 1)
+            if end < 0:
+                raise ValueError(f'Section {name} not closed')
+            body = content[eol + 1:end]
+            with self.metrics.span(DFLT_SECTION_NAMES.get(name, 'skip'), section=name) as span:
+                span.bytes = len(body)
+                if name == dbmsh.DFLT_ENTITIES_OPEN_CLOSE['open']:
+                    self.readEntities(body)
+                elif name == dbmsh.DFLT_NODES_OPEN_CLOSE['open']:
+                    nodesBlocks = self.readNodeBlocks(body)
+                elif name == dbmsh.DFLT_ELEMS_OPEN_CLOSE['open']:
+                    elemsBlocks = self.readElementBlocks(body)
+                elif name in msh.DFLT_FIELD_TYPES:
+                    self.indexField(name, content, eol + 1, end)
+                else:
+                    Logger.debug(f'Skip section {name}')
+            pos = end + len(closeTag)
+        with self.metrics.span('nodes') as span:
+            self.storeNodes(nodesBlocks, dim)
+            span.items = self.nbNodes
+        with self.metrics.span('elements') as span:
+            self.storeElements(elemsBlocks)
+            span.items = sum(len(e) for e in self.elems.values())
+
+    def indexField(self, name: str, content: bytes, start: int, end: int)-> None:
+        """
+        Index a step of a field (`$NodeData`/`$ElementData` section): only the header
+        is parsed, the values are loaded by `getField`.
+
+        Args:
+            name (str): The opening tag of the section.
+            content (bytes): The content of the file.
+            start (int): The position of the header of the section.
+            end (int): The position of the closing tag of the section.
+
+        Raises:
+            ValueError: If the header is not complete.
+        """
+        lines = []
+        pos = start
+        info = None
+        while info is None:
+            eol = content.find(b'\n', pos, end)
+            if eol < 0:
+                raise ValueError(f'Header of section {name} not complete')
+            lines.append(content[pos:eol].decode('utf-8').strip())
+            pos = eol + 1
+            info = msh.parseFieldHeader(lines)
+        info.update({'type': msh.DFLT_FIELD_TYPES[name],
+                     'offset': pos,
+                     'end': end,
+                     'binary': self.binary,
+                     'endian': self.endian})
+        if self.binary:
+            info['end'] = pos + info['nbValues'] * (4 + 8 * info['nbComp'])
+        self.fields.append(info)
+
+    def getValues(self, body: bytes)-> np.ndarray:
+        """
+        Convert the content of an ASCII section to an array of values.
+
+        Args:
+            body (bytes): The content of the section.
+
+        Returns:
+            np.ndarray: The values (float, exact for integers up to 2**53).
+        """
+        return np.fromstring(body.decode('ascii'), sep=' ')
+
+    def readEntities(self, body: bytes)-> None:
+        """
+        Read the `$Entities` section: physical tags of each entity.
+
+        Args:
+            body (bytes): The content of the section.
+        """
+        self.entities = {}
+        if not self.binary:
+            values = self.getValues(body)
+            nbPerDim = values[:4].astype(int)
+            it = 4
+            for dimE in range(4):
+                for _ in range(nbPerDim[dimE]):
+                    tag = int(values[it])
+                    it += 4 if dimE == 0 else 7
+                    nbPhys = int(values[it])
+                    self.entities[(dimE, tag)] = values[it + 1:it + 1 + nbPhys].astype(int).tolist()
+                    it += 1 + nbPhys
+                    if dimE > 0:
+                        it += 1 + int(values[it])
+            return
+        sizeT = np.dtype(self.endian + 'u8')
+        intT = np.dtype(self.endian + 'i4')
+        nbPerDim = np.frombuffer(body, sizeT, 4, 0).astype(int)
+        off = 32
+        for dimE in range(4):
+            for _ in range(nbPerDim[dimE]):
+                tag = int(np.frombuffer(body, intT, 1, off)[0])
+                off += 4 + 8 * (3 if dimE == 0 else 6)
+                nbPhys = int(np.frombuffer(body, sizeT, 1, off)[0])
+                self.entities[(dimE, tag)] = np.frombuffer(body, intT, nbPhys, off + 8).astype(int).tolist()
+                off += 8 + 4 * nbPhys
+                if dimE > 0:
+                    nbBound = int(np.frombuffer(body, sizeT, 1, off)[0])
+                    off += 8 + 4 * nbBound
+
+    def readNodeBlocks(self, body: bytes)-> list:
+        """
+        Read the `$Nodes` section by entity blocks.
+
+        Args:
+            body (bytes): The content of the section.
+
+        Returns:
+            list: The blocks as (tags of the nodes, coordinates).
+        """
+        blocks = []
+        if not self.binary:
+            values = self.getValues(body)
+            nbBlocks = int(values[0])
+            it = 4
+            for _ in range(nbBlocks):
+                dimE, _, param, nb = values[it:it + 4].astype(int)
+                it += 4
+                tags = values[it:it + nb].astype(np.int64)
+                it += nb
+                nbCoor = 3 + (dimE if param else 0)
+                coor = values[it:it + nb * nbCoor].reshape(nb, nbCoor)[:, :3]
+                it += nb * nbCoor
+                blocks.append((tags, coor))
+            return blocks
+        sizeT = np.dtype(self.endian + 'u8')
+        intT = np.dtype(self.endian + 'i4')
+        realT = np.dtype(self.endian + 'f8')
+        nbBlocks = int(np.frombuffer(body, sizeT, 1, 0)[0])
+        off = 32
+        for _ in range(nbBlocks):
+            dimE, _, param = np.frombuffer(body, intT, 3, off)
+            nb = int(np.frombuffer(body, sizeT, 1, off + 12)[0])
+            off += 20
+            tags = np.frombuffer(body, sizeT, nb, off).astype(np.int64)
+            off += 8 * nb
+            nbCoor = 3 + (int(dimE) if param else 0)
+            coor = np.frombuffer(body, realT, nb * nbCoor, off).reshape(nb, nbCoor)[:, :3]
+            off += 8 * nb * nbCoor
+            blocks.append((tags, coor))
+        return blocks
+
+    def readElementBlocks(self, body: bytes)-> list:
+        """
+        Read the `$Elements` section by entity blocks.
+
+        Args:
+            body (bytes): The content of the section.
+
+        Returns:
+            list: The blocks as (dimension of the entity, tag of the entity, type of the
+            elements (name), connectivity (tags of the nodes)).
+
+        Raises:
+            ValueError: If a type of element is not supported.
+        """
+        blocks = []
+        values = None if self.binary else self.getValues(body)
+        sizeT = np.dtype(self.endian + 'u8')
+        intT = np.dtype(self.endian + 'i4')
+        if values is not None:
+            nbBlocks = int(values[0])
+        else:
+            nbBlocks = int(np.frombuffer(body, sizeT, 1, 0)[0])
+        it = 4
+        off = 32
+        for _ in range(nbBlocks):
+            if values is not None:
+                dimE, tagE, mshType, nb = values[it:it + 4].astype(int)
+                it += 4
+            else:
+                dimE, tagE, mshType = np.frombuffer(body, intT, 3, off).astype(int)
+                nb = int(np.frombuffer(body, sizeT, 1, off + 12)[0])
+                off += 20
+            elemType = dbmsh.getElemTypeFromMSH(int(mshType))
+            nbNodes = dbmsh.getNumberNodes(elemType)
+            if not nbNodes:
+                raise ValueError(f'Element type {mshType} not supported')
+            if values is not None:
+                data = values[it:it + nb * (1 + nbNodes)].reshape(nb, 1 + nbNodes).astype(np.int64)
+                it += nb * (1 + nbNodes)
+            else:
+                data = np.frombuffer(body, sizeT, nb * (1 + nbNodes), off).reshape(nb, 1 + nbNodes)
+                data = data.astype(np.int64)
+                off += 8 * nb * (1 + nbNodes)
+            blocks.append((int(dimE), int(tagE), elemType, data[:, 1:]))
+        return blocks
+
+    def storeNodes(self, blocks: list, dim: Optional[int]=3)-> None:
+        """
+        Store the coordinates of the nodes ordered by tags.
+
+        Args:
+            blocks (list): The blocks of nodes (see `readNodeBlocks`).
+            dim (Optional[int], optional): The dimension of the nodes to keep. Defaults to 3.
+        """
+        if not blocks:
+            return
+        tags = np.concatenate([b[0] for b in blocks])
+        coor = np.concatenate([b[1] for b in blocks])
+        self.nbNodes = tags.size
+        self.dim = dim or 3
+        order = np.argsort(tags, kind='stable')
+        self.nodeTags = tags[order]
+        self.nodes = np.ascontiguousarray(coor[order, :self.dim])
+        self.clearCache()
+        Logger.debug(f'Nodes read: {self.nbNodes}, dimension: {self.dim}')
+
+    def storeElements(self, blocks: list)-> None:
+        """
+        Store the elements by type and the indexes of the elements associated with each
+        physical tag (`tagsList`) and with each entity (`entityElems`).
+
+        The tags of the nodes in the connectivity are replaced by the position of the nodes
+        in the array of nodes (starting from 1) if the tags are not contiguous.
+
+        Args:
+            blocks (list): The blocks of elements (see `readElementBlocks`).
+        """
+        elems = {}
+        tagsList = {}
+        entityElems = {}
+        nbPerType = {}
+        for dimE, tagE, elemType, mesh in blocks:
+            mesh = msh.getNodeIndexes(self.nodeTags, mesh)
+            elems.setdefault(elemType, []).append(mesh)
+            start = nbPerType.get(elemType, 0)
+            nbPerType[elemType] = start + mesh.shape[0]
+            ix = np.arange(start, start + mesh.shape[0])
+            for tag in self.entities.get((dimE, tagE), []):
+                tagsList.setdefault(str(tag), {}).setdefault(elemType, []).append(ix)
+            entityElems.setdefault((dimE, tagE), {}).setdefault(elemType, []).append(ix)
+        self.clearCache()
+        self.elems = {k: np.concatenate(v) for k, v in elems.items()}
+        self.tagsList = {t: {k: np.concatenate(v) for k, v in d.items()} for t, d in tagsList.items()}
+        self.entityElems = {t: {k: np.concatenate(v) for k, v in d.items()} for t, d in entityElems.items()}
+        self.nbElems = sum(nbPerType.values())
+        Logger.debug(f'Elements read: {self.nbElems}')
+        for key, val in self.elems.items():
+            Logger.debug(f' > {val.shape[0]} {key}')
+
+
+    def getEntityElements(self, dim: int, tag: int, typeElem: Optional[str]=None)-> Union[np.ndarray, dict]:
+        """
+        Get the elements of an entity (geometric tag of `$Entities`, independent of the
+        physical tags used by `getElements`).
+
+        Args:
+            dim (int): The dimension of the entity.
+            tag (int): The tag of the entity.
+            typeElem (Optional[str], optional): The type of elements (all the types if None).
+                Defaults to None.
+
+        Returns:
+            Union[np.ndarray, dict]: The elements of the entity (file order) per type, or the
+            elements of the type `typeElem`.
+        """
+        elems = {k: self.elems[k][ix] for k, ix in self.entityElems.get((dim, tag), {}).items()}
+        if typeElem is not None:
+            return elems.get(typeElem, np.array([]))
+        return elems
+
+writer = MSHWriter
+reader = MSHReader
+mshWriter = MSHWriter
+mshReader = MSHReader
@@ -0,0 +1,207 @@
+"""
+This file is part of the meshRW package
+---
+Fan-out writer: the same mesh and fields written to several files/formats (e.g. `.msh`
+for the solvers and `.vtu` for ParaView) from one adapted input, the data derived from the
+mesh and the encoded sections being computed once and reused by all the targets.
+"""
+
+import importlib
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Optional, Union
+
+import numpy as np
+from loguru import logger as Logger
+
+from . import meshdata, writerClass
+
+# default writer depending on the extension of the file
+DFLT_WRITERS = {'.msh': 'msh', '.vtk': 'vtk', '.vtu': 'vtk2', '.pvd': 'vtk2'}
+# index of the first node in the connectivity expected by the writers
+DFLT_WRITER_OFFSETS = {'msh': 1, 'msh2': 1, 'msh4': 1, 'vtk': 0, 'vtk2': 0}
+# writers relying on a global state (gmsh API): run one after the other in the calling thread
+DFLT_SERIAL_WRITERS = ('msh2',)
+
+
+def getTarget(target: Union[str, Path, dict], opts: Optional[dict]=None)-> dict:
+    """
+    Get the description of an output file.
+
+    Args:
+        target (Union[str, Path, dict]): The path to the file (writer chosen from the
+            extension, see `DFLT_WRITERS`) or a dictionary with keys 'filename', 'writer'
+            (optional: 'msh', 'msh2', 'msh4', 'vtk' or 'vtk2') and 'opts' (optional).
+        opts (Optional[dict], optional): The options shared by all the writers (completed
+            or overwritten by the options of the target). Defaults to None.
+
+    Returns:
+        dict: The target with keys 'filename', 'writer' and 'opts'.
+
+    Raises:
+        ValueError: If the writer is unknown or cannot be chosen from the extension.
+    """
+    if not isinstance(target, dict):
+        target = {'filename': target}
+    filename = Path(target['filename'])
+    writer = target.get('writer')
+    if writer is None:
+        # last known extension (compressed files: .msh.gz, .vtk.xz...)
+        suffixes = [s.lower() for s in filename.suffixes if s.lower() in DFLT_WRITERS]
+        if not suffixes:
+            raise ValueError(f'Extension of {filename} not supported ({", ".join(DFLT_WRITERS)})')
+        writer = DFLT_WRITERS[suffixes[-1]]
+    if writer not in DFLT_WRITER_OFFSETS:
+        raise ValueError(f'Unknown writer {writer} ({", ".join(DFLT_WRITER_OFFSETS)})')
+    targetOpts = dict(opts or {})
+    targetOpts.update(target.get('opts') or {})
+    return {'filename': filename, 'writer': writer, 'opts': targetOpts or None}
+
+
+class MultiWriter:
+    """
+    Write the same mesh and fields to several files (formats).
+
+    The inputs are adapted and analysed once (`meshdata.Mesh`) and the data shared by the
+    writers (statistics of the elements, physical group field, connectivity numbered from 0
+    and from 1, cells of the VTK writers) are computed before the writing. During the writing
+    the mesh container keeps the encoded sections of the text writers (`keepEncoded`, see
+    `meshdata.Mesh.getEncoded`): the nodes and elements are encoded once per encoding and
+    the text is reused by the targets with the same encoding (e.g. `.msh` and `.msh.gz`,
+    legacy `.vtk` and `.vtk.gz`). See `benchmark.benchmarkMulti` for the measures.
+
+    Attributes:
+        mesh (meshdata.Mesh): The mesh container given to all the writers.
+        targets (list): The output files [{'filename': Path, 'writer': 'vtk2', 'opts': {...}}, ...].
+        writers (list): The writers of the targets (same order).
+        elapsed (float): The duration of the writing (s).
+    """
+
+    def __init__(
+        self,
+        targets: list,
+        nodes: Optional[Union[list, np.ndarray]] = None,
+        elements: Optional[Union[list, dict]] = None,
+        fields: Optional[Union[list, dict]] = None,
+        offset: int = 0,
+        append: bool = False,
+        title: Optional[str] = None,
+        opts: Optional[dict] = None,
+        mesh: Optional[meshdata.Mesh] = None,
+        jobs: Optional[int] = 1,
+    )-> None:
+        """
+        Initialize the fan-out writer and write the files.
+
+        Args:
+            targets (list): The output files (see `getTarget`).
+            nodes (Optional[Union[list, np.ndarray]], optional): The coordinates of the nodes.
+                Defaults to None.
+            elements (Optional[Union[list, dict]], optional): The element blocks. Defaults to None.
+            fields (Optional[Union[list, dict]], optional): The fields. Defaults to None.
+            offset (int, optional): The index of the first node in the connectivity of
+                `elements` (converted for each format). Defaults to 0.
+            append (bool, optional): Whether to append to existing files. Defaults to False.
+            title (Optional[str], optional): The title of the files. Defaults to None.
+            opts (Optional[dict], optional): The options shared by all the writers.
+                Defaults to None.
+            mesh (Optional[meshdata.Mesh], optional): The mesh container (replaces the nodes,
+                elements, fields and offset). Defaults to None.
+            jobs (Optional[int], optional): The number of writers running in threads (one
+                per target if None, 1 to write the files one after the other). The encoding
+                holds the GIL: threads only overlap the parts releasing it (compression,
+                libvtk). Defaults to 1.
+
+        Raises:
+            ValueError: If a target is not supported or if the nodes or elements are missing.
+        """
+        self.targets = [getTarget(t, opts) for t in targets]
+        if mesh is None:
+            mesh = meshdata.Mesh(nodes, elements, fields, offset)
+        self.mesh = mesh
+        self.append = append
+        self.title = title
+        self.writers = []
+        self.elapsed = 0.0
+        Logger.info(f'Write {len(self.targets)} files: {", ".join(t["filename"].name for t in self.targets)}')
+        self.prepare()
+        self.write(jobs)
+
+    def prepare(self)-> None:
+        """
+        Compute the data of the mesh shared by the writers before the writing.
+        """
+        writers = {t['writer'] for t in self.targets}
+        self.mesh.getAnalysis()
+        for offset in {DFLT_WRITER_OFFSETS[w] for w in writers}:
+            self.mesh.getElements(offset)
+        if writers & {'vtk', 'vtk2'}:
+            self.mesh.getPhysGrpData()
+        if 'vtk2' in writers:
+            self.mesh.getCellArrays()
+
+    def writeTarget(self, target: dict)-> writerClass.Writer:
+        """
+        Write one output file.
+
+        Args:
+            target (dict): The target (see `getTarget`).
+
+        Returns:
+            writerClass.Writer: The writer (file written).
+        """
+        module = importlib.import_module(f'.{target["writer"]}', __package__)
+        return module.writer(filename=target['filename'],
+                             append=self.append,
+                             title=self.title,
+                             opts=target['opts'],
+                             mesh=self.mesh)
+
+    def write(self, jobs: Optional[int]=1)-> None:
+        """
+        Write all the output files (encoded sections kept by the mesh container during the
+        writing and released afterwards).
+
+        Args:
+            jobs (Optional[int], optional): The number of writers running in threads (one
+                per target if None, 1 to write the files one after the other). Defaults to 1.
+        """
+        tic = time.perf_counter()
+        serial = [t for t in self.targets if t['writer'] in DFLT_SERIAL_WRITERS or jobs == 1]
+        concurrent = [t for t in self.targets if t not in serial]
+        writers = {}
+        keepEncoded = self.mesh.keepEncoded
+        self.mesh.keepEncoded = True
+        try:
+            if concurrent:
+                with ThreadPoolExecutor(max_workers=jobs or len(concurrent)) as pool:
+                    futures = {id(t): pool.submit(self.writeTarget, t) for t in concurrent}
+                    # writers relying on a global state while the others are running
+                    for target in serial:
+                        writers[id(target)] = self.writeTarget(target)
+                    for target in concurrent:
+                        writers[id(target)] = futures[id(target)].result()
+            else:
+                for target in serial:
+                    writers[id(target)] = self.writeTarget(target)
+        finally:
+            self.mesh.keepEncoded = keepEncoded
+            if not keepEncoded:
+                self.mesh.clearEncoded()
+        self.writers = [writers[id(t)] for t in self.targets]
+        self.elapsed = time.perf_counter() - tic
+        Logger.info(f'{len(self.targets)} files written in {self.elapsed:.4f} s')
+
+    def getReport(self)-> dict:
+        """
+        Get the performance metrics of the writers (see `writerClass.Writer.getReport`).
+
+        Returns:
+            dict: The reports by output file.
+        """
+        return {str(t['filename']): w.getReport() for t, w in zip(self.targets, self.writers)}
+
+
+writer = MultiWriter
+multiWriter = MultiWriter
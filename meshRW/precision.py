@@ -0,0 +1,183 @@
+"""
+This file is part of the meshRW package
+---
+Numeric precision policies and bulk formatters used by the text writers.
+----
+Luc Laurent - luc.laurent@lecnam.net -- 2021
+"""
+
+import time
+from typing import Iterator, Optional, Union
+
+import numpy as np
+
+# default policy (historical formats of the writers)
+DFLT_PRECISION: str = 'legacy'
+# number of rows formatted at once by the bulk formatters
+DFLT_CHUNK_ROWS: int = 50000
+# formats of the legacy policy depending on the kind of values
+DFLT_LEGACY_FORMATS: dict = {'nodes': '%9.4g', 'fields': '%9.4f'}
+# available named policies
+POLICIES: tuple = ('legacy', 'repr', 'float32')
+
+
+def getPolicy(precision: Union[str, int, None] = None, kind: str = 'nodes')-> dict:
+    """
+    Get the formatting policy of floating point values.
+
+    Args:
+        precision (Union[str, int, None], optional): The precision policy:
+            - 'legacy' (default): historical formats ('%9.4g' for coordinates, '%9.4f' for fields),
+            - 'repr': shortest representation giving an exact round trip of float64 values,
+            - 'float32': values rounded to float32 and written with 9 significant digits
+              (exact round trip of float32 values),
+            - int: fixed number of significant digits (1-17).
+        kind (str, optional): The kind of values ('nodes' or 'fields'). Defaults to 'nodes'.
+
+    Returns:
+        dict: The policy with keys 'name', 'format' (printf-style format of a value) and
+        'dtype' (type used to round the values before writing, None to keep them).
+
+    Raises:
+        ValueError: If the policy is unknown.
+    """
+    if precision is None:
+        precision = DFLT_PRECISION
+    if isinstance(precision, (int, np.integer)) and not isinstance(precision, bool):
+        if not 1 <= precision <= 17:
+            raise ValueError(f'Number of significant digits must be in [1, 17] (not {precision})')
+        return {'name': f'{precision:d}g', 'format': f'%.{precision:d}g', 'dtype': None}
+    if precision == 'legacy':
+        return {'name': 'legacy', 'format': DFLT_LEGACY_FORMATS.get(kind, '%9.4g'), 'dtype': None}
+    if precision == 'repr':
+        return {'name': 'repr', 'format': '%r', 'dtype': None}
+    if precision == 'float32':
+        return {'name': 'float32', 'format': '%.9g', 'dtype': np.float32}
+    raise ValueError(f'Unknown precision policy {precision} (available: {", ".join(POLICIES)} or int)')
+
+
+def formatValue(value: float, policy: dict)-> str:
+    """
+    Format a single floating point value.
+
+    Args:
+        value (float): The value.
+        policy (dict): The policy (see `getPolicy`).
+
+    Returns:
+        str: The formatted value.
+    """
+    if policy['dtype'] is not None:
+        value = float(policy['dtype'](value))
+    return policy['format'] % float(value)
+
+
+def formatRows(values: np.ndarray,
+               policy: dict,
+               start: Optional[int] = None,
+               suffix: str = '',
+               chunkRows: int = DFLT_CHUNK_ROWS)-> Iterator[str]:
+    """
+    Format an array row by row, by chunks of rows.
+
+    Each chunk is formatted with a single printf-style operation (the format of a row is
+    repeated for all the rows of the chunk), which avoids a call to `str.format` per row.
+
+    Args:
+        values (np.ndarray): The array (1D arrays are written as one value per row).
+        policy (dict): The policy (see `getPolicy`). Integer arrays are written with '%d'.
+        start (Optional[int], optional): If provided, each row starts with its index
+            (starting from `start`). Defaults to None.
+        suffix (str, optional): Text added at the end of each row (before the line break).
+            Defaults to ''.
+        chunkRows (int, optional): Number of rows per chunk. Defaults to DFLT_CHUNK_ROWS.
+
+    Yields:
+        str: The formatted chunks.
+    """
+    values = np.asarray(values)
+    if values.ndim == 1:
+        values = values.reshape(-1, 1)
+    nbRows, nbCols = values.shape
+    if issubclass(values.dtype.type, np.integer):
+        valueFormat = '%d'
+    else:
+        valueFormat = policy['format']
+        if policy['dtype'] is not None:
+            values = values.astype(policy['dtype'])
+    rowFormat = ' '.join([valueFormat] * nbCols) + suffix + '\n'
+    if start is not None:
+        # index stored as float (exact up to 2**53)
+        rowFormat = '%d ' + rowFormat
+    for i0 in range(0, nbRows, chunkRows):
+        block = values[i0:i0 + chunkRows]
+        nb = block.shape[0]
+        if start is not None:
+            index = np.arange(start + i0, start + i0 + nb, dtype=float)
+            block = np.column_stack((index, block.astype(float)))
+        yield (rowFormat * nb) % tuple(block.ravel().tolist())
+
+
+def writeRows(fileHandle: object,
+              values: np.ndarray,
+              policy: dict,
+              start: Optional[int] = None,
+              suffix: str = '')-> None:
+    """
+    Write an array row by row using the bulk formatter (see `formatRows`).
+
+    Args:
+        fileHandle (object): The file handler (any object with a `write` method).
+        values (np.ndarray): The array.
+        policy (dict): The policy (see `getPolicy`).
+        start (Optional[int], optional): Index of the first row (no index if None). Defaults to None.
+        suffix (str, optional): Text added at the end of each row. Defaults to ''.
+    """
+    for chunk in formatRows(values, policy, start=start, suffix=suffix):
+        fileHandle.write(chunk)  # type: ignore[attr-defined]
+
+
+def benchmarkPrecision(values: np.ndarray,
+                       policies: Optional[list] = None,
+                       kind: str = 'nodes',
+                       repeat: int = 1)-> list:
+    """
+    Compare the precision policies on an array: size of the text, formatting speed and error.
+
+    Args:
+        values (np.ndarray): The array of floating point values.
+        policies (Optional[list], optional): The policies to compare. Defaults to None
+            (named policies and 6/9 significant digits).
+        kind (str, optional): The kind of values ('nodes' or 'fields'). Defaults to 'nodes'.
+        repeat (int, optional): Number of repetitions (the best time is kept). Defaults to 1.
+
+    Returns:
+        list: One dictionary per policy with keys 'precision', 'size' (bytes), 'bytesPerValue',
+        'formatMBs' (MB/s of text), 'maxAbsError', 'maxRelError' and 'roundTrip' (exact
+        round trip of the values).
+    """
+    values = np.asarray(values, dtype=float)
+    if policies is None:
+        policies = [*POLICIES, 6, 9]
+    report = []
+    for precision in policies:
+        policy = getPolicy(precision, kind)
+        best = float('inf')
+        text = ''
+        for _ in range(max(1, repeat)):
+            t0 = time.perf_counter()
+            text = ''.join(formatRows(values, policy))
+            best = min(best, time.perf_counter() - t0)
+        readValues = np.fromstring(text, sep=' ').reshape(values.shape)
+        error = np.abs(readValues - values)
+        scale = np.maximum(np.abs(values), np.finfo(float).tiny)
+        report.append({
+            'precision': precision,
+            'size': len(text),
+            'bytesPerValue': len(text) / max(values.size, 1),
+            'formatMBs': len(text) / 1e6 / best if best > 0 else float('inf'),
+            'maxAbsError': float(error.max()) if error.size else 0.0,
+            'maxRelError': float((error / scale).max()) if error.size else 0.0,
+            'roundTrip': bool(np.array_equal(readValues, values)),
+        })
+    return report
@@ -0,0 +1,62 @@
+from pathlib import Path
+
+import numpy
+import pytest
+
+from meshRW import benchmark
+
+# load current path
+CurrentPath = Path(__file__).parent
+# artifacts directory
+ArtifactsPath = CurrentPath / Path('artifacts')
+ArtifactsPath.mkdir(exist_ok=True)
+
+
+@pytest.mark.parametrize('kind', ['TET4', 'HEX8', 'mixed'])
+def test_structuredMesh(kind):
+    nodes, elements = benchmark.structuredMesh(1000, kind)
+    nbCells = sum(e['connectivity'].shape[0] for e in elements)
+    assert 500 < nbCells < 2000
+    assert [e['type'] for e in elements] == {'TET4': ['TET4'], 'HEX8': ['HEX8'], 'mixed': ['HEX8', 'TET4']}[kind]
+    # all the nodes are used
+    used = numpy.unique(numpy.concatenate([e['connectivity'].ravel() for e in elements]))
+    assert numpy.array_equal(used, numpy.arange(nodes.shape[0]))
+
+
+def test_benchmark():
+    cases = ['msh.MSHWriter', 'vtk.VTKWriter', 'msh.MSHReader']
+    results = benchmark.runBenchmark(cases=cases, sizes=[1000], kinds=['TET4'], nbSteps=2)
+    assert [res['case'] for res in results['results']] == cases
+    for res in results['results']:
+        assert res['size'] > 0
+        assert res['time'] > 0
+        assert res['peakMemory'] > 0
+        assert res['steps'] == 2
+    outputfile = ArtifactsPath / Path('build-benchmark.json')
+    benchmark.saveResults(results, outputfile)
+    reference = benchmark.loadResults(outputfile)
+    assert reference['meta']['version'] == results['meta']['version']
+    # twice slower
+    for res in reference['results']:
+        res['time'] /= 2
+    comparison = benchmark.compareResults(reference, results)
+    assert len(comparison) == 3
+    assert all(res['regression'] for res in comparison)
+    assert not any(res['regression'] for res in benchmark.compareResults(results, results))
+
+
+def test_benchmarkMulti():
+    res = benchmark.benchmarkMulti(1000, targets=['bench.msh', 'bench.vtk'])
+    assert res['targets'] == ['bench.msh', 'bench.vtk']
+    assert res['separate'] > 0
+    assert res['multi'] > 0
+    assert res['speedup'] == res['separate'] / res['multi']
+
+
+def test_imports():
+    # the heavy backends (gmsh, libvtk, lxml) are imported on first use only
+    results = benchmark.benchmarkImports(['meshRW.msh', 'meshRW.vtk', 'meshRW.msh2', 'meshRW.vtk2'], repeat=1)
+    assert [res['module'] for res in results] == ['meshRW.msh', 'meshRW.vtk', 'meshRW.msh2', 'meshRW.vtk2']
+    for res in results:
+        assert res['time'] > 0
+        assert res['backends'] == []
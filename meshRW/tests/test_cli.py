@@ -0,0 +1,90 @@
+import os
+import shutil
+from pathlib import Path
+
+import numpy
+import pytest
+
+from meshRW import cli, msh4, vtk
+
+# load current path
+CurrentPath = Path(__file__).parent
+DataPath = CurrentPath / Path('test_data')
+# artifacts directory
+ArtifactsPath = CurrentPath / Path('artifacts')
+ArtifactsPath.mkdir(exist_ok=True)
+
+
+def test_CLIconvert(capsys):
+    sourceDir = ArtifactsPath / Path('cli-sources')
+    outputDir = ArtifactsPath / Path('cli-outputs')
+    shutil.rmtree(sourceDir, ignore_errors=True)
+    shutil.rmtree(outputDir, ignore_errors=True)
+    (sourceDir / 'sub').mkdir(parents=True)
+    shutil.copy(DataPath / Path('mesh2Dref.msh'), sourceDir / 'a.msh')
+    shutil.copy(DataPath / Path('mesh2Dref.msh'), sourceDir / 'sub' / 'b.msh')
+    assert cli.main(['convert', str(sourceDir), '-o', str(outputDir), '-j', '2']) == 0
+    assert (outputDir / 'a.vtu').exists()
+    assert (outputDir / 'sub' / 'b.vtu').exists()
+    assert '2 converted, 0 skipped, 0 failed' in capsys.readouterr().out
+    # outputs are up to date
+    assert cli.main(['convert', str(sourceDir / '**' / '*.msh'), '-o', str(outputDir), '-j', '1']) == 0
+    assert '0 converted, 2 skipped' in capsys.readouterr().out
+    # modified source (same contents with the hash check)
+    os.utime(sourceDir / 'a.msh')
+    assert cli.main(['convert', str(sourceDir), '-o', str(outputDir), '-j', '1', '--check', 'hash']) == 0
+    assert '2 converted' in capsys.readouterr().out
+    os.utime(sourceDir / 'a.msh')
+    assert cli.main(['convert', str(sourceDir), '-o', str(outputDir), '-j', '1', '--check', 'hash']) == 0
+    assert '0 converted, 2 skipped' in capsys.readouterr().out
+    # failed conversion
+    (sourceDir / 'bad.msh').write_text('not a mesh')
+    assert cli.main(['convert', str(sourceDir / 'bad.msh'), '-o', str(outputDir), '-j', '1']) == 1
+    assert '1 failed' in capsys.readouterr().out
+
+
+def test_CLIconvertFailed(capsys):
+    sourceDir = ArtifactsPath / Path('cli-truncated')
+    shutil.rmtree(sourceDir, ignore_errors=True)
+    sourceDir.mkdir(parents=True)
+    # truncated in the $Elements section
+    content = (DataPath / Path('mesh2Dref.msh')).read_bytes()
+    (sourceDir / 'trunc.msh').write_bytes(content[:len(content) * 9 // 10])
+    for _ in range(2):
+        assert cli.main(['convert', str(sourceDir / 'trunc.msh'), '-f', 'vtk', '-j', '1']) == 1
+        assert '0 skipped, 1 failed' in capsys.readouterr().out
+        # no partial target (seen as up to date by the next run)
+        assert sorted(p.name for p in sourceDir.iterdir()) == ['trunc.msh']
+
+
+def test_CLIconvertPrecision(capsys):
+    outputDir = ArtifactsPath / Path('cli-precision')
+    shutil.rmtree(outputDir, ignore_errors=True)
+    source = DataPath / Path('mesh2Dref.msh')
+    nodes = msh4.mshReader(filename=source, dim=3).getNodes()
+    # exact coordinates by default
+    assert cli.main(['convert', str(source), '-o', str(outputDir), '-f', 'vtk', '-j', '1']) == 0
+    assert numpy.array_equal(vtk.vtkReader(filename=outputDir / 'mesh2Dref.vtk').getNodes(), nodes)
+    assert cli.main(['convert', str(source), '-o', str(outputDir), '-f', 'vtk', '-j', '1',
+                     '--precision', 'legacy', '--force']) == 0
+    assert not numpy.array_equal(vtk.vtkReader(filename=outputDir / 'mesh2Dref.vtk').getNodes(), nodes)
+    capsys.readouterr()
+    with pytest.raises(SystemExit):
+        cli.main(['convert', str(source), '--precision', 'half'])
+    assert 'Unknown precision policy' in capsys.readouterr().err
+
+
+def test_CLIinfo(capsys):
+    assert cli.main(['info', str(DataPath / Path('mesh2Dref.msh'))]) == 0
+    out = capsys.readouterr().out
+    assert '7480 nodes, 15124 elements' in out
+    assert 'TRI3: 15072' in out
+
+
+def test_CLIinfoErrors(capsys):
+    badFile = ArtifactsPath / Path('cli-bad.vtk')
+    badFile.write_text('not a mesh')
+    # the other files are displayed
+    assert cli.main(['info', str(badFile), str(DataPath / Path('mesh2Dref.msh'))]) == 1
+    assert '7480 nodes, 15124 elements' in capsys.readouterr().out
+    assert cli.main(['info', str(ArtifactsPath / Path('cli-missing.msh'))]) == 1
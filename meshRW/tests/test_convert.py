@@ -0,0 +1,76 @@
+import pickle
+from pathlib import Path
+
+import numpy
+import pytest
+
+from meshRW import convert, msh4, vtk, vtu
+
+# load current path
+CurrentPath = Path(__file__).parent
+DataPath = CurrentPath / Path('test_data')
+# data file for testing
+datafile = DataPath / Path('debug.h5')
+# artifacts directory
+ArtifactsPath = CurrentPath / Path('artifacts')
+ArtifactsPath.mkdir(exist_ok=True)
+
+
+def loadData():
+    hf = open(datafile, 'rb')
+    data = pickle.load(hf)
+    hf.close()
+    return data['n'], data['e']
+
+
+@pytest.mark.parametrize('target', ['ascii.vtk', 'binary.vtk', 'raw.vtu'])
+@pytest.mark.parametrize('binary', [False, True])
+def test_convert(binary, target):
+    nodes, elemsData = loadData()
+    physTET4 = numpy.where(numpy.arange(elemsData['TET4'].shape[0]) % 2 == 0, 5, 7)
+    inputfile = ArtifactsPath / Path(f'build-convert{"b" if binary else ""}.msh')
+    msh4.mshWriter(
+        filename=inputfile,
+        nodes=nodes,
+        elements=[
+            {'connectivity': elemsData['TET4'], 'type': 'TET4', 'physgrp': physTET4},
+            {'connectivity': elemsData['PRI6'], 'type': 'PRI6', 'physgrp': [6, 6]},
+        ],
+        opts={'binary': binary},
+    )
+    outputfile = ArtifactsPath / Path(f'build-convert{"b" if binary else ""}-{target}')
+    # small chunks to exercise the streaming
+    stats = convert.convert(inputfile, outputfile, chunkSize=1000, opts={'binary': target.startswith('binary')})
+    assert stats['nbNodes'] == nodes.shape[0]
+    assert stats['types'] == {'TET4': elemsData['TET4'].shape[0], 'PRI6': elemsData['PRI6'].shape[0]}
+    reader = vtu.vtuReader if outputfile.suffix == '.vtu' else vtk.vtkReader
+    mesh = reader(filename=outputfile)
+    assert mesh.getTypes() == ['TET4', 'PRI6']
+    # points follow the order of the msh file: compare element coordinates
+    for elems, etype in zip(mesh.getElements(), ('TET4', 'PRI6')):
+        coorRef = nodes[elemsData[etype] - 1]
+        coorOut = mesh.getNodes()[elems['connectivity']]
+        if binary:
+            # exact coordinates in the source: exact in all outputs (ASCII with precision 'repr')
+            assert numpy.array_equal(numpy.sort(coorRef, axis=0), numpy.sort(coorOut, axis=0))
+        else:
+            assert numpy.allclose(numpy.sort(coorRef, axis=0), numpy.sort(coorOut, axis=0), atol=1e-3)
+    assert numpy.array_equal(numpy.unique(mesh.getElements()[0]['physgrp']), [5, 7])
+    assert numpy.all(mesh.getElements()[1]['physgrp'] == 6)
+
+
+def test_convertGmsh():
+    # mesh written by gmsh (format 2.2, lines and triangles)
+    outputfile = ArtifactsPath / Path('build-convert-gmsh.vtu')
+    stats = convert.convert(DataPath / Path('mesh2Dref.msh'), outputfile, chunkSize=500)
+    mesh = vtu.vtuReader(filename=outputfile)
+    assert mesh.getNodes().shape[0] == stats['nbNodes']
+    assert mesh.getTypes() == list(stats['types'])
+    assert sum(e['connectivity'].shape[0] for e in mesh.getElements()) == stats['nbElems']
+
+
+def test_NodeMap():
+    nodeMap = convert.NodeMap()
+    nodeMap.add(numpy.array([10, 4, 7]))
+    nodeMap.add(numpy.array([100]))
+    assert numpy.array_equal(nodeMap.index(numpy.array([[4, 100], [10, 7]])), [[1, 3], [0, 2]])
@@ -0,0 +1,28 @@
+import numpy
+
+from meshRW import dbelem, dbmsh, dbvtk
+
+
+def test_registry():
+    # registry consistent with the dictionaries of the formats
+    for name, v in dbmsh.loadElementDict().items():
+        if v is not None:
+            assert dbelem.getTypesFromMSH(v['code']) == name
+            assert dbelem.getNumberNodesFromMSH(v['code']) == v['nodes']
+            assert dbelem.getDimFromMSH(v['code']) == v['dim']
+    for name, v in dbvtk.loadElementDict().items():
+        if v is not None:
+            assert dbelem.getTypesFromVTK(v['code']) == name
+            assert dbelem.getNumberNodesFromVTK(v['code']) == v['nodes']
+            assert dbelem.getDimFromVTK(v['code']) == v['dim']
+
+
+def test_vectorized():
+    codes = numpy.array([4, 5, 4, 99, -1, 11])
+    assert dbelem.getTypesFromMSH(codes).tolist() == ['TET4', 'HEX8', 'TET4', None, None, 'TET10']
+    assert dbelem.getNumberNodesFromMSH(codes).tolist() == [4, 8, 4, 0, 0, 10]
+    assert dbelem.getDimFromMSH(codes).tolist() == [3, 3, 3, -1, -1, 3]
+    # gmsh <-> VTK codes
+    assert dbelem.convertMSHToVTK(codes).tolist() == [10, 12, 10, -1, -1, 24]
+    assert dbelem.convertVTKToMSH([10, 12, 24, 7]).tolist() == [4, 5, 11, -1]
+    assert dbelem.getNumberNodesFromVTK([5, 7, 100]).tolist() == [3, -1, 0]
@@ -14,7 +14,7 @@ def test_loadElementDict():
     assert element_dict['LIN2']['code'] == 3
     assert element_dict['LIN2']['nodes'] == 2
     assert element_dict['LIN2']['dim'] == 1
-    assert element_dict['LIN2']['vtkobj'] is not None
+    assert element_dict['LIN2']['vtkclass'] == 'vtkLine'
 
 def test_getVTKtoElem():
     vtk_to_elem = getVTKtoElem()
@@ -59,3 +59,8 @@ def test_getNumberNodesFromNum():
 
     num_nodes = getNumberNodesFromNum(12)
     assert num_nodes == 8
+
+def test_getVTKQuad():
+    elem_type, num_nodes = getVTKElemType('VTK_QUAD')
+    assert elem_type == 9
+    assert num_nodes == 4
@@ -1,8 +1,11 @@
 
 import pytest
-from meshRW.fileio import fileHandler
+from meshRW.fileio import fileHandler, listCodecs, getCodec, getCodecFromExtension, benchmarkCodecs
+from meshRW.fileio import BGZFReader, loadIndex, scanBlocks
 import gzip
+import types
 import bz2
+import lzma
 
 @pytest.fixture
 def temp_file(tmp_path):
@@ -81,3 +84,107 @@ def test_fileHandler_close(temp_file):
     handler.write("Some content")
     handler.close()
     assert handler.fhandle is None
+
+@pytest.mark.parametrize('codec', listCodecs())
+def test_fileHandler_codecs(tmp_path, codec):
+    """Test writing/reading through all registered codecs selected by name."""
+    filename = tmp_path / "test_file.txt"
+    handler = fileHandler(filename=filename, right='w', compression=codec, level=getCodec(codec)['level'])
+    handler.write("Compressed content")
+    handler.close()
+    # the extension of the codec is appended
+    assert handler.filename.suffix == getCodec(codec)['extensions'][0]
+    # blocked gzip files are read as standard gzip files
+    expected = 'gz' if codec == 'bgzf' else codec
+    assert getCodecFromExtension(handler.filename) == expected
+    # read back (codec detected from the extension)
+    handler = fileHandler(filename=handler.filename, right='r')
+    assert handler.compress == expected
+    assert handler.getHandler().read() == "Compressed content"
+    handler.close()
+
+def test_zstdDefaultLevel(monkeypatch):
+    """Test the default level of zstd used when no level is given."""
+    from meshRW import fileio
+    levels = []
+    backend = types.SimpleNamespace(compress=lambda data, level: levels.append(level) or data,
+                                    open=lambda filename, mode, level=None: levels.append(level))
+    monkeypatch.setattr(fileio, 'zstdlib', backend)
+    fileio._compressZstd(b'content', None)
+    fileio._openZstd('test_file.txt.zst', 'wb', None)
+    fileio._compressZstd(b'content', 10)
+    assert levels == [fileio.DFLT_ZSTD_LEVEL, fileio.DFLT_ZSTD_LEVEL, 10]
+
+def test_fileHandler_compression_xz(tmp_path):
+    """Test writing to a xz-compressed file detected from the extension."""
+    xz_file = tmp_path / "test_file.txt.xz"
+    handler = fileHandler(filename=xz_file, right='wt', level=1, bufferSize=16)
+    handler.write("Compressed content " * 10)
+    handler.close()
+
+    with lzma.open(xz_file, 'rt') as f:
+        content = f.read()
+    assert content == "Compressed content " * 10
+
+def test_fileHandler_bad_level(tmp_path):
+    """Test the check of the compression level."""
+    with pytest.raises(ValueError):
+        fileHandler(filename=tmp_path / "test_file.txt.gz", right='w', level=12)
+    with pytest.raises(ValueError):
+        fileHandler(filename=tmp_path / "test_file.txt", right='w', compression='unknown')
+
+def test_benchmarkCodecs():
+    """Test the benchmark of the codecs."""
+    data = b"1 0.5 0.25 0.125\n" * 1000
+    report = benchmarkCodecs(data, codecs=['gz', 'bz2'], levels={'gz': [1, 9]})
+    assert [(r['codec'], r['level']) for r in report] == [('gz', 1), ('gz', 9), ('bz2', 9)]
+    for r in report:
+        assert r['size'] == len(data)
+        assert r['ratio'] > 1
+        assert r['compressMBs'] > 0
+
+def test_fileHandler_bgzf_sections(tmp_path):
+    """Test the seekable blocked gzip files and the index of the sections."""
+    bgzf_file = tmp_path / "test_file.txt.gz"
+    handler = fileHandler(filename=bgzf_file, right='w', compression='bgzf', level=1)
+    handler.write("header\n")
+    for step in range(3):
+        handler.openSection('$Step', step=step)
+        handler.write(f"step {step}\n" + "0.5 " * 40000 + "\n")
+        handler.closeSection()
+    handler.close()
+    # readable by gzip
+    with gzip.open(bgzf_file, 'rt') as f:
+        content = f.read()
+    assert content.startswith("header\nstep 0\n")
+    # index
+    index = loadIndex(bgzf_file)
+    assert index is not None
+    assert index['size'] == len(content)
+    assert index['blocks'] == scanBlocks(bgzf_file)[0]
+    assert len(index['blocks']) > 3
+    # random access
+    stream = BGZFReader(bgzf_file)
+    section = stream.getSections('$Step', step=2)[0]
+    assert stream.readSection(section).decode().startswith("step 2\n")
+    stream.seek(len("header\n"))
+    assert stream.read(6) == b"step 0"
+    stream.close()
+
+def test_fileHandler_bgzf_append(tmp_path):
+    """Test appending to a blocked gzip file (with and without index)."""
+    bgzf_file = tmp_path / "test_file.txt.gz"
+    for it in range(2):
+        handler = fileHandler(filename=bgzf_file, append=it > 0, compression='bgzf')
+        handler.openSection('$Part', part=it)
+        handler.write(f"part {it}\n")
+        handler.closeSection()
+        handler.close()
+    with gzip.open(bgzf_file, 'rt') as f:
+        assert f.read() == "part 0\npart 1\n"
+    assert len(loadIndex(bgzf_file)['sections']) == 2
+    # outdated index (file overwritten by another codec) is ignored
+    handler = fileHandler(filename=bgzf_file, right='w', compression='gz')
+    handler.write("plain gzip\n")
+    handler.close()
+    assert loadIndex(bgzf_file) is None
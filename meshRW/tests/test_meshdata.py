@@ -0,0 +1,102 @@
+import pickle
+from pathlib import Path
+
+import numpy
+import pytest
+
+from meshRW import meshdata, msh4, vtk, vtk2, vtu, writerClass
+
+# load current path
+CurrentPath = Path(__file__).parent
+DataPath = CurrentPath / Path('test_data')
+# data file for testing
+datafile = DataPath / Path('debug.h5')
+# artifacts directory
+ArtifactsPath = CurrentPath / Path('artifacts')
+ArtifactsPath.mkdir(exist_ok=True)
+
+
+def loadMesh():
+    hf = open(datafile, 'rb')
+    data = pickle.load(hf)
+    hf.close()
+    nodes = data['n']
+    elemsData = data['e']
+    dataNodes = numpy.random.rand(nodes.shape[0], 3)
+    elements = [
+        {'connectivity': elemsData['TET4'], 'type': 'TET4', 'physgrp': [5, 5]},
+        {'connectivity': elemsData['PRI6'], 'type': 'PRI6', 'physgrp': [6, 6]},
+    ]
+    fields = [{'data': dataNodes, 'type': 'nodal', 'dim': 3, 'name': 'nodal3'}]
+    return meshdata.Mesh(nodes, elements, fields, offset=1)
+
+
+def test_meshCache():
+    mesh = loadMesh()
+    analysis = mesh.getAnalysis()
+    assert analysis == writerClass.analyseElements(mesh.elements)
+    assert mesh.getAnalysis() is analysis
+    assert mesh.nbElems == mesh.getBlockOffsets()[-1]
+    assert mesh.getTypes() == ['TET4', 'PRI6']
+    # shifted connectivity cached, blocks of the mesh not modified
+    elements = mesh.getElements(offset=0)
+    assert numpy.array_equal(elements[0]['connectivity'], mesh.elements[0]['connectivity'] - 1)
+    assert mesh.getElements(offset=0)[0]['connectivity'] is elements[0]['connectivity']
+    assert mesh.getElements()[0]['connectivity'] is mesh.elements[0]['connectivity']
+    # cells of the VTK writers (connectivity from 0)
+    _, offsets, connectivity = mesh.getCellArrays()
+    assert mesh.getCellArrays()[2] is connectivity
+    assert numpy.array_equal(connectivity[:offsets[1]], elements[0]['connectivity'][0])
+    # encoded sections kept only if requested
+    assert list(mesh.getEncoded(('test',), lambda: iter(['a', 'b']))) == ['a', 'b']
+    assert ('encoded', 'test') not in mesh.cache
+    mesh.keepEncoded = True
+    chunks = mesh.getEncoded(('test',), lambda: iter(['a', 'b']))
+    assert chunks == ['a', 'b']
+    assert mesh.getEncoded(('test',), list) is chunks
+    mesh.clearEncoded()
+    assert ('encoded', 'test') not in mesh.cache
+    assert ('cellArrays',) in mesh.cache
+    mesh.clearCache()
+    assert not mesh.cache
+    with pytest.raises(ValueError):
+        meshdata.Mesh(None, mesh.elements)
+
+
+def test_meshWriters():
+    mesh = loadMesh()
+    outputVTU = ArtifactsPath / Path('build-mesh.vtu')
+    outputVTK = ArtifactsPath / Path('build-mesh.vtk')
+    outputMSH = ArtifactsPath / Path('build-mesh.msh')
+    writer = vtk2.vtkWriter(filename=outputVTU, mesh=mesh)
+    analysis = mesh.getAnalysis()
+    assert writer.physGrpData is mesh.getPhysGrpData()
+    vtk.vtkWriter(filename=outputVTK, mesh=mesh, opts={'precision': 'repr'})
+    writer = msh4.mshWriter(filename=outputMSH, mesh=mesh)
+    # analysis not computed again
+    assert mesh.getAnalysis() is analysis
+    assert writer.nbElems == mesh.nbElems
+    # same content in the files
+    for reader in (vtu.vtuReader(filename=outputVTU), vtk.vtkReader(filename=outputVTK)):
+        assert numpy.allclose(reader.getNodes(), mesh.nodes)
+        assert numpy.array_equal(reader.getElements()[0]['connectivity'], mesh.elements[0]['connectivity'] - 1)
+        assert numpy.allclose(reader.getFields()[0]['data'], mesh.fields[0]['data'])
+    meshMSH = msh4.mshReader(filename=outputMSH).getMesh()
+    assert meshMSH.nbElems == mesh.nbElems
+    assert meshMSH.getAnalysis()['elemPerGrp'] == mesh.getAnalysis()['elemPerGrp']
+
+
+def test_meshReaders():
+    mesh = loadMesh()
+    outputfile = ArtifactsPath / Path('build-mesh-reader.vtu')
+    vtk2.vtkWriter(filename=outputfile, mesh=mesh)
+    reader = vtu.vtuReader(filename=outputfile)
+    meshVTU = reader.getMesh()
+    assert reader.getMesh() is meshVTU
+    assert meshVTU.offset == 0
+    assert meshVTU.getAnalysis()['elemPerType'] == mesh.getAnalysis()['elemPerType']
+    # renumbering of the nodes: mesh container not used for the analysis
+    outputfile = ArtifactsPath / Path('build-mesh-reorder.vtu')
+    writer = vtk2.vtkWriter(filename=outputfile, mesh=meshVTU, opts={'reorder': 'rcm'})
+    assert writer.permutation is not None
+    assert writer.nbElems == meshVTU.nbElems
@@ -0,0 +1,190 @@
+import pickle
+from pathlib import Path
+
+import numpy
+import pytest
+
+from meshRW import meshtools, vtk2, vtu
+
+# load current path
+CurrentPath = Path(__file__).parent
+DataPath = CurrentPath / Path('test_data')
+# data file for testing
+datafile = DataPath / Path('debug.h5')
+# artifacts directory
+ArtifactsPath = CurrentPath / Path('artifacts')
+ArtifactsPath.mkdir(exist_ok=True)
+
+
+def buildGrid(nx, ny, shuffle=True):
+    # structured grid of QUA4 (0-based) with randomly numbered nodes
+    x, y = numpy.meshgrid(numpy.arange(nx + 1), numpy.arange(ny + 1), indexing='ij')
+    nodes = numpy.column_stack((x.ravel(), y.ravel(), numpy.zeros(x.size))).astype(float)
+    ids = numpy.arange(nodes.shape[0]).reshape(nx + 1, ny + 1)
+    conn = numpy.column_stack((ids[:-1, :-1].ravel(), ids[1:, :-1].ravel(),
+                               ids[1:, 1:].ravel(), ids[:-1, 1:].ravel()))
+    if shuffle:
+        rng = numpy.random.default_rng(0)
+        perm = rng.permutation(nodes.shape[0])
+        nodes = nodes[perm]
+        conn = meshtools.invertPermutation(perm)[conn]
+        conn = conn[rng.permutation(conn.shape[0])]
+    return nodes, conn
+
+
+@pytest.mark.parametrize('method', meshtools.DFLT_REORDER_METHODS)
+def test_reorderMesh(method):
+    nodes, conn = buildGrid(30, 20)
+    physgrp = numpy.arange(conn.shape[0])
+    dataNodes = numpy.random.rand(nodes.shape[0], 3)
+    dataElem = [numpy.random.rand(conn.shape[0]) for _ in range(2)]
+    elements = [{'connectivity': conn, 'type': 'QUA4', 'physgrp': physgrp}]
+    fields = [
+        {'data': dataNodes, 'type': 'nodal', 'dim': 3, 'name': 'nodal'},
+        {'data': dataElem, 'type': 'elemental', 'dim': 1, 'name': 'elem', 'nbsteps': 2},
+    ]
+    newNodes, newElements, newFields, perm = meshtools.reorderMesh(nodes, elements, fields, method)
+    # valid permutations
+    assert numpy.array_equal(numpy.sort(perm['nodes']), numpy.arange(nodes.shape[0]))
+    assert numpy.array_equal(numpy.sort(perm['elements']), numpy.arange(conn.shape[0]))
+    # same geometry of the elements
+    newConn = newElements[0]['connectivity']
+    assert numpy.allclose(newNodes[newConn], nodes[conn[perm['elements']]])
+    # data permuted consistently
+    assert numpy.array_equal(newElements[0]['physgrp'], physgrp[perm['elements']])
+    assert numpy.allclose(newFields[0]['data'], dataNodes[perm['nodes']])
+    assert numpy.allclose(newFields[1]['data'][1], dataElem[1][perm['elements']])
+    # inputs not modified
+    assert elements[0]['connectivity'] is conn
+    assert fields[0]['data'] is dataNodes
+    # better locality
+    assert meshtools.getBandwidth(newElements) < meshtools.getBandwidth(elements)
+
+
+def test_RCMBandwidth():
+    nodes, conn = buildGrid(40, 10)
+    _, newElements, _, _ = meshtools.reorderMesh(nodes, {'connectivity': conn + 1, 'type': 'QUA4'}, offset=1)
+    # bandwidth of the ordering along the small side of the grid
+    assert meshtools.getBandwidth(newElements) <= 2 * 11 + 1
+    assert newElements['connectivity'].min() == 1
+
+
+def test_reorderUnknown():
+    nodes, conn = buildGrid(2, 2)
+    with pytest.raises(ValueError):
+        meshtools.reorderMesh(nodes, [{'connectivity': conn, 'type': 'QUA4'}], method='metis')
+
+
+def test_writerReorder():
+    hf = open(datafile, 'rb')
+    data = pickle.load(hf)
+    hf.close()
+    nodes = data['n']
+    elemsData = data['e']
+    nbTet = elemsData['TET4'].shape[0]
+    dataNodes = numpy.random.rand(nodes.shape[0], 3)
+    outputfile = ArtifactsPath / Path('build-reorder.vtu')
+    writer = vtk2.vtkWriter(
+        filename=outputfile,
+        nodes=nodes,
+        elements=[
+            {'connectivity': elemsData['TET4'] - 1, 'type': 'TET4', 'physgrp': [5, 5]},
+            {'connectivity': elemsData['PRI6'] - 1, 'type': 'PRI6', 'physgrp': [6, 6]},
+        ],
+        fields=[{'data': dataNodes, 'type': 'nodal', 'dim': 3, 'name': 'nodal3'}],
+        opts={'reorder': 'rcm'},
+    )
+    perm = writer.permutation
+    mesh = vtu.vtuReader(filename=outputfile)
+    assert numpy.allclose(mesh.getNodes(), nodes[perm['nodes']])
+    conn = mesh.getElements()[0]['connectivity']
+    assert numpy.allclose(mesh.getNodes()[conn], nodes[elemsData['TET4'][perm['elements'][:nbTet]] - 1])
+    fields = {f['name']: f for f in mesh.getFields()}
+    assert numpy.allclose(fields['nodal3']['data'], dataNodes[perm['nodes']])
+
+
+def test_mergeNodes():
+    # two grids sharing an interface (perturbed nodes)
+    nodes1, conn1 = buildGrid(10, 5, shuffle=False)
+    nodes2, conn2 = buildGrid(10, 5, shuffle=False)
+    nodes2[:, 0] += 10 + 1e-10
+    nodes = numpy.vstack((nodes1, nodes2))
+    elements = [
+        {'connectivity': conn1 + 1, 'type': 'QUA4', 'physgrp': [1]},
+        {'connectivity': conn2 + 1 + nodes1.shape[0], 'type': 'QUA4', 'physgrp': [2]},
+    ]
+    dataNodes = [numpy.random.rand(nodes.shape[0], 2) for _ in range(3)]
+    fields = [{'data': dataNodes, 'type': 'nodal', 'dim': 2, 'name': 'nodal', 'nbsteps': 3}]
+    newNodes, newElements, newFields, mergeMap = meshtools.mergeNodes(nodes, elements, fields, tol=1e-8, offset=1)
+    assert newNodes.shape[0] == nodes.shape[0] - 6
+    assert mergeMap.shape[0] == nodes.shape[0]
+    # interface nodes of the second grid mapped to the nodes of the first grid
+    assert numpy.all(mergeMap[nodes1.shape[0]:nodes1.shape[0] + 6] == numpy.arange(60, 66))
+    for e, eNew in zip(elements, newElements):
+        assert numpy.allclose(newNodes[eNew['connectivity'] - 1], nodes[e['connectivity'] - 1], atol=1e-8)
+    assert numpy.allclose(newFields[0]['data'][2], dataNodes[2][numpy.unique(mergeMap, return_index=True)[1]])
+    # exact duplicates only
+    assert meshtools.mergeNodes(nodes, elements, tol=0, offset=1)[0].shape[0] == nodes.shape[0]
+    # empty mesh returned unchanged
+    for tol in (0, 1e-8):
+        first, second = meshtools.getCoincidentPairs(numpy.zeros((0, 3)), tol)
+        assert first.size == 0 and second.size == 0
+        emptyNodes, emptyElements, _, emptyMap = meshtools.mergeNodes(
+            numpy.zeros((0, 3)), [{'connectivity': numpy.zeros((0, 4), dtype=int), 'type': 'QUA4'}], tol=tol)
+        assert emptyNodes.shape == (0, 3)
+        assert emptyElements[0]['connectivity'].shape == (0, 4)
+        assert emptyMap.size == 0
+
+
+def test_coincidentPairs():
+    # same pairs as the brute force comparison
+    rng = numpy.random.default_rng(1)
+    points = rng.random((1000, 3))
+    points = numpy.vstack((points, points[:200] + rng.normal(0, 3e-3, (200, 3))))
+    first, second = meshtools.getCoincidentPairs(points, 5e-3)
+    dist = numpy.linalg.norm(points[:, None] - points[None], axis=2)
+    refFirst, refSecond = numpy.nonzero(numpy.triu(dist <= 5e-3, 1))
+    assert numpy.array_equal(first, refFirst)
+    assert numpy.array_equal(second, refSecond)
+
+
+def test_uniqueRows():
+    # first occurrences in the order of the array (many collisions in a small table)
+    rng = numpy.random.default_rng(2)
+    values = rng.integers(0, 6, (2000, 3))
+    kept = meshtools.uniqueRows(values)
+    _, first = numpy.unique(values, axis=0, return_index=True)
+    assert numpy.array_equal(kept, numpy.sort(first))
+    assert meshtools.uniqueRows(values[:1]).tolist() == [0]
+    assert meshtools.uniqueRows(numpy.zeros((0, 3), dtype=int)).size == 0
+
+
+def test_uniqueRowsLowBits():
+    # ids sharing their low bits: same slot without mixing (quadratic probing)
+    values = numpy.arange(16000 * 4, dtype=numpy.int64).reshape(-1, 4) << 20
+    mask = numpy.uint64((1 << 15) - 1)
+    assert numpy.unique(meshtools.hashCells(values) & mask).size == 1
+    assert numpy.unique(meshtools.mixHash(meshtools.hashCells(values)) & mask).size > values.shape[0] // 2
+    values = numpy.vstack((values, values[::3]))
+    kept = meshtools.uniqueRows(values)
+    assert numpy.array_equal(kept, numpy.arange(16000))
+
+
+def test_writerMerge():
+    nodes, conn = buildGrid(4, 4, shuffle=False)
+    nodes = numpy.vstack((nodes, nodes))
+    outputfile = ArtifactsPath / Path('build-merge.vtu')
+    writer = vtk2.vtkWriter(
+        filename=outputfile,
+        nodes=nodes,
+        elements=[
+            {'connectivity': conn, 'type': 'QUA4', 'physgrp': [1]},
+            {'connectivity': conn + 25, 'type': 'QUA4', 'physgrp': [2]},
+        ],
+        opts={'merge': True},
+    )
+    assert numpy.array_equal(writer.mergeMap, numpy.tile(numpy.arange(25), 2))
+    mesh = vtu.vtuReader(filename=outputfile)
+    assert mesh.getNodes().shape[0] == 25
+    # blocks of the same type read as one block
+    assert numpy.array_equal(mesh.getElements()[0]['connectivity'], numpy.vstack((conn, conn)))
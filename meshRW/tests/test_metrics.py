@@ -0,0 +1,84 @@
+import json
+import pickle
+from pathlib import Path
+
+import numpy
+
+from meshRW import metrics, msh, msh4, vtk
+
+# load current path
+CurrentPath = Path(__file__).parent
+DataPath = CurrentPath / Path('test_data')
+# data file for testing
+datafile = DataPath / Path('debug.h5')
+# artifacts directory
+ArtifactsPath = CurrentPath / Path('artifacts')
+ArtifactsPath.mkdir(exist_ok=True)
+
+
+def loadData():
+    hf = open(datafile, 'rb')
+    data = pickle.load(hf)
+    hf.close()
+    return data['n'], data['e']
+
+
+def test_metricsWriter():
+    nodes, elemsData = loadData()
+    outputfile = ArtifactsPath / Path('build-metrics.msh.gz')
+    writer = msh.mshWriter(
+        filename=outputfile,
+        nodes=nodes,
+        elements=[{'connectivity': elemsData['TET4'], 'type': 'TET4', 'physgrp': [5, 5]}],
+        fields=[{'data': [numpy.random.rand(nodes.shape[0], 1) for i in range(3)], 'type': 'nodal', 'dim': 1,
+                 'name': 'T', 'nbsteps': 3}],
+        opts={'metrics': ArtifactsPath / Path('build-metrics.json')},
+    )
+    report = writer.getReport()
+    sections = report['sections']
+    assert list(sections) == ['header', 'nodes', 'elements', 'fields', 'field', 'flush']
+    assert sections['nodes']['items'] == nodes.shape[0]
+    assert sections['elements']['items'] == elemsData['TET4'].shape[0]
+    assert sections['field']['count'] == 3
+    assert [s['meta']['step'] for s in report['spans'] if s['name'] == 'field'] == [0, 1, 2]
+    # bytes written before compression, size of the compressed file
+    assert sections['flush']['bytes'] == outputfile.stat().st_size
+    assert sections['flush']['bytes'] < sum(sections[s]['bytes'] for s in ('header', 'nodes', 'elements', 'fields'))
+    # exported report
+    assert json.loads((ArtifactsPath / Path('build-metrics.json')).read_text())['sections'].keys() == sections.keys()
+    # chrome trace
+    trace = writer.metrics.toChromeTrace()
+    assert len(trace['traceEvents']) == len(report['spans'])
+    assert all(e['ph'] == 'X' for e in trace['traceEvents'])
+
+
+def test_metricsDisabled():
+    nodes, elemsData = loadData()
+    writer = vtk.vtkWriter(
+        filename=ArtifactsPath / Path('build-metrics.vtk'),
+        nodes=nodes,
+        elements=[{'connectivity': elemsData['TET4'] - 1, 'type': 'TET4'}],
+    )
+    assert not writer.metrics.enabled
+    assert writer.getReport()['spans'] == []
+    assert writer.metrics.span('nodes') is metrics.NULL_SPAN
+
+
+def test_metricsReader():
+    nodes, elemsData = loadData()
+    outputfile = ArtifactsPath / Path('build-metrics.msh')
+    msh4.mshWriter(
+        filename=outputfile,
+        nodes=nodes,
+        elements=[{'connectivity': elemsData['TET4'], 'type': 'TET4', 'physgrp': [5, 5]}],
+        opts={'binary': True},
+    )
+    metrics.setEnabled(True)
+    try:
+        mesh = msh4.mshReader(filename=outputfile)
+    finally:
+        metrics.setEnabled(False)
+    sections = mesh.metrics.report()['sections']
+    assert sections['read']['bytes'] == outputfile.stat().st_size
+    assert sections['nodes']['items'] == nodes.shape[0]
+    assert sections['elements']['items'] == elemsData['TET4'].shape[0]
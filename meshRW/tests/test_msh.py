@@ -277,6 +277,176 @@ def test_MSHreader2D():
     assert len(mesh.getElements(tag=27, typeElem='LIN2')) == 0
 
 
+def test_MSHreaderSeekable():
+    # open data
+    hf = open(datafile, 'rb')
+    #
+    data = pickle.load(hf)
+    hf.close()
+    nodes = data['n']
+    elemsData = data['e']
+    dataElemStep = [numpy.random.rand(elemsData['TET4'].shape[0] + elemsData['PRI6'].shape[0], 1) for i in range(3)]
+    # write seekable compressed msh file
+    outputfile = ArtifactsPath / Path('build-seek.msh.gz')
+    msh.mshWriter(
+        filename=outputfile,
+        nodes=nodes,
+        elements=[
+            {'connectivity': elemsData['TET4'], 'type': 'TET4', 'physgrp': [5, 5]},
+            {'connectivity': elemsData['PRI6'], 'type': 'PRI6', 'physgrp': [6, 6]},
+        ],
+        fields=[{'data': dataElemStep, 'type': 'elemental', 'dim': 1, 'name': 'alongsteps', 'nbsteps': 3}],
+        opts={'compression': 'bgzf'},
+    )
+    assert outputfile.exists()
+    # read nodes/elements only and access to a step
+    mesh = msh.mshReader(filename=outputfile)
+    assert mesh.getNodes().shape == nodes.shape
+    assert mesh.getElements(typeElem='PRI6').shape == elemsData['PRI6'].shape
+    assert len(mesh.getSections('$ElementData')) == 3
+    assert mesh.readSection('$ElementData', field='alongsteps', step=2).startswith('$ElementData')
+    # fields are indexed and loaded step by step
+    assert [f['step'] for f in mesh.getFieldInfo('alongsteps')] == [0, 1, 2]
+    assert numpy.allclose(mesh.getField('alongsteps', step=2), dataElemStep[2], atol=1e-4)
+
+
+@pytest.mark.parametrize('compression', [None, 'gz'])
+def test_MSHreaderFields(compression):
+    # open data
+    hf = open(datafile, 'rb')
+    data = pickle.load(hf)
+    hf.close()
+    nodes = data['n']
+    elemsData = data['e']
+    dataNodes = numpy.random.rand(nodes.shape[0], 3)
+    dataElemStep = [numpy.random.rand(elemsData['TET4'].shape[0] + elemsData['PRI6'].shape[0], 1) for i in range(3)]
+    outputfile = ArtifactsPath / Path(f'build-fields.msh{"." + compression if compression else ""}')
+    msh.mshWriter(
+        filename=outputfile,
+        nodes=nodes,
+        elements=[
+            {'connectivity': elemsData['TET4'], 'type': 'TET4', 'physgrp': [5, 5]},
+            {'connectivity': elemsData['PRI6'], 'type': 'PRI6', 'physgrp': [6, 6]},
+        ],
+        fields=[
+            {'data': dataNodes, 'type': 'nodal', 'dim': 3, 'name': 'nodal3'},
+            {'data': dataElemStep, 'type': 'elemental', 'dim': 1, 'name': 'alongsteps', 'nbsteps': 3},
+        ],
+        opts={'precision': 'repr'},
+    )
+    mesh = msh.mshReader(filename=outputfile)
+    assert mesh.getFields() == ['nodal3', 'alongsteps']
+    info = mesh.getFieldInfo('nodal3')[0]
+    assert (info['type'], info['nbComp'], info['nbValues']) == ('nodal', 3, nodes.shape[0])
+    assert numpy.array_equal(mesh.getField('nodal3'), dataNodes)
+    tags, values = mesh.getField('alongsteps', step=1, withTags=True)
+    assert numpy.array_equal(tags, numpy.arange(1, dataElemStep[1].shape[0] + 1))
+    assert numpy.array_equal(values, dataElemStep[1])
+    with pytest.raises(ValueError):
+        mesh.getField('alongsteps', step=5)
+
+
+def test_MSHreaderSubmesh():
+    hf = open(datafile, 'rb')
+    data = pickle.load(hf)
+    hf.close()
+    nodes = data['n']
+    elemsData = data['e']
+    # tetrahedra split in two physical groups
+    tet5 = elemsData['TET4'][::2]
+    tet7 = elemsData['TET4'][1::2]
+    outputfile = ArtifactsPath / Path('build-submesh.msh')
+    msh.mshWriter(
+        filename=outputfile,
+        nodes=nodes,
+        elements=[
+            {'connectivity': tet5, 'type': 'TET4', 'physgrp': [5, 5]},
+            {'connectivity': tet7, 'type': 'TET4', 'physgrp': [7, 7]},
+            {'connectivity': elemsData['PRI6'], 'type': 'PRI6', 'physgrp': [6, 6]},
+        ],
+        opts={'precision': 'repr'},
+    )
+    mesh = msh.mshReader(filename=outputfile)
+    subNodes, subElems, maps = mesh.getSubmesh(tags=[5, 6], offset=0)
+    assert [e['type'] for e in subElems] == ['TET4', 'PRI6']
+    # compact numbering, same geometry and file order of the elements
+    assert subNodes.shape[0] == numpy.unique(numpy.concatenate((tet5.ravel(), elemsData['PRI6'].ravel()))).size
+    assert numpy.array_equal(subNodes[subElems[0]['connectivity']], nodes[tet5 - 1])
+    assert numpy.all(subElems[0]['physgrp'] == 5)
+    assert numpy.all(subElems[1]['physgrp'] == 6)
+    assert numpy.array_equal(maps['nodes'][tet5 - 1], subElems[0]['connectivity'])
+    kept = maps['elements']['TET4'] >= 0
+    assert numpy.array_equal(maps['elements']['TET4'][kept], numpy.arange(tet5.shape[0]))
+    assert numpy.array_equal(mesh.elems['TET4'][kept], tet5)
+    # same nodes as getNodes(tag=...)
+    subNodes, subElems, _ = mesh.getSubmesh(tags=7, types='TET4')
+    assert numpy.array_equal(subNodes, mesh.getNodes(tag=7))
+    assert subElems[0]['connectivity'].min() == 1
+    assert subElems[0]['connectivity'].max() == subNodes.shape[0]
+
+
+def test_MSHreaderUnique():
+    mesh = msh.mshReader(filename=DataPath / Path('mesh2Dref.msh'))
+    # duplicated elements in the file
+    elems = mesh.getElements(typeElem='TRI3', unique=False)
+    assert numpy.shares_memory(elems, mesh.elems['TRI3'])
+    assert elems.shape == (15072, 3)
+    # order-preserving removal of the duplicates
+    uniqueElems = mesh.getElements(typeElem='TRI3')
+    assert numpy.array_equal(uniqueElems, numpy.unique(elems, axis=0)[numpy.argsort(
+        numpy.unique(elems, axis=0, return_index=True)[1])])
+    assert numpy.array_equal(uniqueElems[:10], elems[:10])
+    assert numpy.array_equal(mesh.getElements(tag=1, dictFormat=False), uniqueElems)
+
+
+def test_MSHreaderCache():
+    mesh = msh.mshReader(filename=DataPath / Path('mesh2Dref.msh'))
+    elems = mesh.getElements(tag=1)
+    # same arrays on the next calls (read-only)
+    assert mesh.getElements(tag=1)['TRI3'] is elems['TRI3']
+    assert not elems['TRI3'].flags.writeable
+    with pytest.raises(ValueError):
+        mesh.getNodes(tag=1)[0, 0] = 1.0
+    # containers returned as copies
+    elems.pop('TRI3')
+    assert 'TRI3' in mesh.getElements(tag=1)
+    tags = mesh.getTags()
+    tags.append(100)
+    assert 100 not in mesh.getTags()
+    # invalidation after a modification of the content
+    assert mesh.getElements(typeElem='TRI3', unique=False).shape[0] == 15072
+    mesh.elems['TRI3'] = mesh.elems['TRI3'][:10]
+    assert mesh.getElements(typeElem='TRI3', unique=False).shape[0] == 15072
+    mesh.clearCache()
+    assert mesh.getElements(typeElem='TRI3', unique=False).shape[0] == 10
+
+
+@pytest.mark.parametrize('maxTag', [40, 4000000])
+def test_MSHreaderSparseTags(tmp_path, maxTag):
+    # v2 file with gaps in the numbering of the nodes (nodes not sorted)
+    content = '\n'.join([
+        '$MeshFormat', '2.2 0 8', '$EndMeshFormat',
+        '$Nodes', '4', f'{maxTag} 0 1 0', '10 0 0 0', '30 1 1 0', '20 1 0 0', '$EndNodes',
+        '$Elements', '3', '1 2 2 8 2 10 20 30', f'2 2 2 8 2 10 30 {maxTag}', '3 1 2 4 3 10 20',
+        '$EndElements', ''])
+    inputfile = tmp_path / 'sparse-v2.msh'
+    inputfile.write_text(content)
+    mesh = msh.mshReader(filename=inputfile)
+    assert numpy.array_equal(mesh.nodeTags, [10, 20, 30, maxTag])
+    assert numpy.array_equal(mesh.getNodes(), [[0, 0, 0], [1, 0, 0], [1, 1, 0], [0, 1, 0]])
+    assert numpy.array_equal(mesh.elems['TRI3'], [[1, 2, 3], [1, 3, 4]])
+    assert mesh.getElements(tag=4, typeElem='LIN2').tolist() == [[1, 2]]
+    # original tags not written back: nodes renumbered from 1
+    outputfile = tmp_path / 'sparse-v2-out.msh'
+    msh.mshWriter(filename=outputfile, nodes=mesh.getNodes(),
+                  elements={'connectivity': mesh.elems['TRI3'], 'type': 'TRI3'})
+    assert numpy.array_equal(msh.mshReader(filename=outputfile).nodeTags, [1, 2, 3, 4])
+    # unknown tag of node
+    inputfile.write_text(content.replace('3 1 2 4 3 10 20', '3 1 2 4 3 10 25'))
+    with pytest.raises(ValueError):
+        msh.mshReader(filename=inputfile)
+
+
 # # if __name__ == "__main_":
 
 # CurrentPath = os.path.dirname(__file__)
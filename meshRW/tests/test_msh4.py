@@ -0,0 +1,231 @@
+import pickle
+from pathlib import Path
+
+import numpy
+import pytest
+
+from meshRW import msh4
+
+# load current path
+CurrentPath = Path(__file__).parent
+DataPath = CurrentPath / Path('test_data')
+# data file for testing
+datafile = DataPath / Path('debug.h5')
+# artifacts directory
+ArtifactsPath = CurrentPath / Path('artifacts')
+ArtifactsPath.mkdir(exist_ok=True)
+
+
+def loadData():
+    hf = open(datafile, 'rb')
+    data = pickle.load(hf)
+    hf.close()
+    return data['n'], data['e']
+
+
+@pytest.mark.parametrize('binary', [False, True])
+def test_MSH4writer(binary):
+    nodes, elemsData = loadData()
+    nbElems = elemsData['TET4'].shape[0] + elemsData['PRI6'].shape[0]
+    # one physical group per element for the tetrahedra
+    physTET4 = numpy.where(numpy.arange(elemsData['TET4'].shape[0]) % 2 == 0, 5, 7)
+    outputfile = ArtifactsPath / Path(f'build-v4{"b" if binary else ""}.msh')
+    msh4.mshWriter(
+        filename=outputfile,
+        nodes=nodes,
+        elements=[
+            {'connectivity': elemsData['TET4'], 'type': 'TET4', 'physgrp': physTET4},
+            {'connectivity': elemsData['PRI6'], 'type': 'PRI6', 'physgrp': [6, 6]},
+        ],
+        fields=[
+            {'data': numpy.random.rand(nodes.shape[0], 3), 'type': 'nodal', 'dim': 3, 'name': 'nodal3'},
+            {'data': [numpy.random.rand(nbElems, 1) for i in range(2)], 'type': 'elemental', 'dim': 1,
+             'name': 'alongsteps', 'nbsteps': 2},
+        ],
+        opts={'binary': binary},
+    )
+    assert outputfile.exists()
+    content = outputfile.read_bytes()
+    assert content.startswith(f'$MeshFormat\n4.1 {int(binary)} 8\n'.encode())
+    for tag in (b'$Entities', b'$Nodes', b'$Elements', b'$NodeData', b'$ElementData'):
+        assert tag in content
+    if not binary:
+        lines = content.decode().splitlines()
+        # three volume entities (physical groups 5, 7 and 6)
+        assert lines[lines.index('$Entities') + 1] == '0 0 0 3'
+        assert lines[lines.index('$Nodes') + 1] == f'3 {nodes.shape[0]} 1 {nodes.shape[0]}'
+        assert lines[lines.index('$Elements') + 1] == f'3 {nbElems} 1 {nbElems}'
+
+
+def test_MSH4writerEntities():
+    nodes = numpy.array([[0, 0, 0], [1, 0, 0], [1, 1, 0], [0, 1, 0], [2, 0, 0]], dtype=float)
+    writer = msh4.mshWriter(
+        filename=ArtifactsPath / Path('build-v4-entities.msh'),
+        nodes=nodes,
+        elements=[
+            {'connectivity': [[1, 2, 3], [1, 3, 4], [2, 5, 3]], 'type': 'TRI3', 'physgrp': numpy.array([1, 2, 2])},
+            {'connectivity': [[1, 2], [2, 5]], 'type': 'LIN2', 'physgrp': [7]},
+        ],
+    )
+    entities = [(e['dim'], e['tag'], e['physical']) for e in writer.entities]
+    assert entities == [(2, 1, [1]), (2, 2, [2]), (1, 1, [7])]
+    # each node belongs to one entity (highest dimension first)
+    allNodes = numpy.sort(numpy.concatenate([e['nodes'] for e in writer.entities]))
+    assert numpy.array_equal(allNodes, numpy.arange(5))
+    assert writer.entities[2]['nodes'].size == 0
+    # tags of the elements follow the declaration order
+    assert writer.entities[1]['blocks'][0][1].tolist() == [2, 3]
+
+
+@pytest.mark.parametrize('binary', [False, True])
+def test_MSH4reader(binary):
+    nodes, elemsData = loadData()
+    physTET4 = numpy.where(numpy.arange(elemsData['TET4'].shape[0]) % 2 == 0, 5, 7)
+    outputfile = ArtifactsPath / Path(f'build-v4-read{"b" if binary else ""}.msh')
+    msh4.mshWriter(
+        filename=outputfile,
+        nodes=nodes,
+        elements=[
+            {'connectivity': elemsData['TET4'], 'type': 'TET4', 'physgrp': physTET4},
+            {'connectivity': elemsData['PRI6'], 'type': 'PRI6', 'physgrp': [6, 6]},
+        ],
+        opts={'binary': binary, 'precision': 'repr'},
+    )
+    mesh = msh4.mshReader(filename=outputfile)
+    assert mesh.version == '4.1'
+    assert numpy.array_equal(mesh.getNodes(), nodes)
+    assert mesh.getTypes() == ['TET4', 'PRI6']
+    assert sorted(mesh.getTags()) == [5, 6, 7]
+    # entities (tags 1 to 3) not mixed with the physical tags
+    assert sorted(mesh.entityElems) == [(3, 1), (3, 2), (3, 3)]
+    assert mesh.getElements(typeElem='PRI6').shape == elemsData['PRI6'].shape
+    assert numpy.array_equal(mesh.elems['PRI6'], elemsData['PRI6'])
+    assert mesh.getElements(tag=5, typeElem='TET4').shape == (numpy.sum(physTET4 == 5), 4)
+    assert mesh.getElements(tag=6).get('TET4') is None
+
+
+@pytest.mark.parametrize('binary', [False, True])
+def test_MSH4readerFields(binary):
+    nodes, elemsData = loadData()
+    nbElems = elemsData['TET4'].shape[0] + elemsData['PRI6'].shape[0]
+    dataNodes = numpy.random.rand(nodes.shape[0], 3)
+    dataElemStep = [numpy.random.rand(nbElems, 1) for i in range(2)]
+    outputfile = ArtifactsPath / Path(f'build-v4-fields{"b" if binary else ""}.msh')
+    msh4.mshWriter(
+        filename=outputfile,
+        nodes=nodes,
+        elements=[{'connectivity': elemsData['TET4'], 'type': 'TET4', 'physgrp': [5, 5]},
+                  {'connectivity': elemsData['PRI6'], 'type': 'PRI6', 'physgrp': [6, 6]}],
+        fields=[
+            {'data': dataNodes, 'type': 'nodal', 'dim': 3, 'name': 'nodal3'},
+            {'data': dataElemStep, 'type': 'elemental', 'dim': 1, 'name': 'alongsteps', 'nbsteps': 2},
+        ],
+        opts={'binary': binary, 'precision': 'repr'},
+    )
+    mesh = msh4.mshReader(filename=outputfile)
+    assert mesh.getFields() == ['nodal3', 'alongsteps']
+    assert [f['type'] for f in mesh.getFieldInfo()] == ['nodal', 'elemental', 'elemental']
+    assert numpy.array_equal(mesh.getField('nodal3'), dataNodes)
+    tags, values = mesh.getField('alongsteps', time=1.0, withTags=True)
+    assert numpy.array_equal(tags, numpy.arange(1, nbElems + 1))
+    assert numpy.array_equal(values, dataElemStep[1])
+
+
+def test_MSH4readerSparseTags(tmp_path):
+    # nodes with non contiguous tags declared in two entities
+    content = '\n'.join([
+        '$MeshFormat', '4.1 0 8', '$EndMeshFormat',
+        '$Entities', '0 1 1 0',
+        '3 0 0 0 1 0 0 1 4 0',
+        '8 0 0 0 1 1 0 2 2 3 0',
+        '$EndEntities',
+        '$Nodes', '2 4 10 40',
+        '2 8 0 3', '10', '30', '40', '0 0 0', '1 1 0', '0 1 0',
+        '1 3 0 1', '20', '1 0 0',
+        '$EndNodes',
+        '$Elements', '2 3 1 3',
+        '2 8 2 2', '1 10 20 30', '2 10 30 40',
+        '1 3 1 1', '3 10 20',
+        '$EndElements', ''])
+    inputfile = tmp_path / 'sparse.msh'
+    inputfile.write_text(content)
+    mesh = msh4.mshReader(filename=inputfile)
+    assert numpy.array_equal(mesh.nodeTags, [10, 20, 30, 40])
+    assert numpy.array_equal(mesh.getNodes(), [[0, 0, 0], [1, 0, 0], [1, 1, 0], [0, 1, 0]])
+    assert numpy.array_equal(mesh.elems['TRI3'], [[1, 2, 3], [1, 3, 4]])
+    assert mesh.getTags() == [2, 3, 4]
+    assert mesh.getElements(tag=4, typeElem='LIN2').tolist() == [[1, 2]]
+    assert mesh.getNodes(tag=4).shape == (2, 3)
+    assert mesh.getEntityElements(2, 8, 'TRI3').tolist() == [[1, 2, 3], [1, 3, 4]]
+
+
+def test_MSH4readerEntityTags(tmp_path):
+    # physical tags equal to the tags of other entities
+    content = '\n'.join([
+        '$MeshFormat', '4.1 0 8', '$EndMeshFormat',
+        '$Entities', '0 0 2 0',
+        '1 0 0 0 1 1 0 1 2 0',
+        '2 1 0 0 2 1 0 1 1 0',
+        '$EndEntities',
+        '$Nodes', '1 6 1 6',
+        '2 1 0 6', '1', '2', '3', '4', '5', '6',
+        '0 0 0', '1 0 0', '1 1 0', '0 1 0', '2 0 0', '2 1 0',
+        '$EndNodes',
+        '$Elements', '2 4 1 4',
+        '2 1 2 2', '1 1 2 3', '2 1 3 4',
+        '2 2 2 2', '3 2 5 6', '4 2 6 3',
+        '$EndElements', ''])
+    inputfile = tmp_path / 'entities.msh'
+    inputfile.write_text(content)
+    mesh = msh4.mshReader(filename=inputfile)
+    assert sorted(mesh.getTags()) == [1, 2]
+    assert mesh.getElements(tag=1, typeElem='TRI3').tolist() == [[2, 5, 6], [2, 6, 3]]
+    assert mesh.getElements(tag=2, typeElem='TRI3').tolist() == [[1, 2, 3], [1, 3, 4]]
+    assert mesh.getNodes(tag=1).shape == (4, 3)
+    assert mesh.getEntityElements(2, 1, 'TRI3').tolist() == [[1, 2, 3], [1, 3, 4]]
+    assert mesh.getEntityElements(2, 2)['TRI3'].tolist() == [[2, 5, 6], [2, 6, 3]]
+    assert mesh.getEntityElements(1, 1) == {}
+
+
+def test_MSH4readerV2():
+    # files in the v2 format are read with the v2 reader
+    mesh = msh4.mshReader(filename=DataPath / Path('mesh2Dref.msh'))
+    assert mesh.getNodes().shape == (7480, 3)
+    assert mesh.getElements(typeElem='TRI3').shape == (14614, 3)
+
+
+def test_MSH4readerSubmesh():
+    nodes, elemsData = loadData()
+    physTET4 = numpy.where(numpy.arange(elemsData['TET4'].shape[0]) % 2 == 0, 5, 7)
+    outputfile = ArtifactsPath / Path('build-v4-submesh.msh')
+    msh4.mshWriter(
+        filename=outputfile,
+        nodes=nodes,
+        elements=[
+            {'connectivity': elemsData['TET4'], 'type': 'TET4', 'physgrp': physTET4},
+            {'connectivity': elemsData['PRI6'], 'type': 'PRI6', 'physgrp': [6, 6]},
+        ],
+        opts={'precision': 'repr'},
+    )
+    mesh = msh4.mshReader(filename=outputfile)
+    subNodes, subElems, maps = mesh.getSubmesh(tags=[5, 6], offset=0)
+    assert [e['type'] for e in subElems] == ['TET4', 'PRI6']
+    tet = elemsData['TET4'][physTET4 == 5]
+    # compact numbering, same geometry and file order of the elements
+    assert subNodes.shape[0] == numpy.unique(numpy.concatenate((tet.ravel(), elemsData['PRI6'].ravel()))).size
+    assert numpy.array_equal(subNodes[subElems[0]['connectivity']], nodes[tet - 1])
+    assert numpy.all(subElems[0]['physgrp'] == 5)
+    assert numpy.all(subElems[1]['physgrp'] == 6)
+    assert numpy.array_equal(maps['nodes'][tet - 1], subElems[0]['connectivity'])
+    kept = maps['elements']['TET4'] >= 0
+    assert numpy.array_equal(maps['elements']['TET4'][kept], numpy.arange(tet.shape[0]))
+    assert numpy.array_equal(mesh.elems['TET4'][kept], tet)
+    # same nodes as getNodes(tag=...)
+    subNodes, subElems, _ = mesh.getSubmesh(tags=7, types='TET4')
+    assert numpy.array_equal(subNodes, mesh.getNodes(tag=7))
+    assert subElems[0]['connectivity'].min() == 1
+    assert subElems[0]['connectivity'].max() == subNodes.shape[0]
+    # whole mesh
+    subNodes, subElems, _ = mesh.getSubmesh()
+    assert numpy.array_equal(subNodes, nodes)
+    assert numpy.array_equal(subElems[1]['connectivity'], elemsData['PRI6'])
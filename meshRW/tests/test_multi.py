@@ -0,0 +1,105 @@
+import pickle
+from pathlib import Path
+
+import numpy
+import pytest
+
+from meshRW import msh, msh4, multi, precision, vtk, vtu
+
+# load current path
+CurrentPath = Path(__file__).parent
+DataPath = CurrentPath / Path('test_data')
+# data file for testing
+datafile = DataPath / Path('debug.h5')
+# artifacts directory
+ArtifactsPath = CurrentPath / Path('artifacts')
+ArtifactsPath.mkdir(exist_ok=True)
+
+
+@pytest.mark.parametrize('jobs', [None, 1])
+def test_multiWriter(jobs):
+    hf = open(datafile, 'rb')
+    data = pickle.load(hf)
+    hf.close()
+    nodes = data['n']
+    elemsData = data['e']
+    dataNodes = numpy.random.rand(nodes.shape[0], 3)
+    targets = [
+        ArtifactsPath / Path(f'build-multi-{jobs}.msh'),
+        ArtifactsPath / Path(f'build-multi-{jobs}.vtu'),
+        {'filename': ArtifactsPath / Path(f'build-multi-{jobs}.vtk.gz'), 'opts': {'precision': 'repr'}},
+        {'filename': ArtifactsPath / Path(f'build-multi-{jobs}-v4.msh'), 'writer': 'msh4'},
+    ]
+    writer = multi.multiWriter(
+        targets,
+        nodes=nodes,
+        elements=[
+            {'connectivity': elemsData['TET4'], 'type': 'TET4', 'physgrp': [5, 5]},
+            {'connectivity': elemsData['PRI6'], 'type': 'PRI6', 'physgrp': [6, 6]},
+        ],
+        fields=[{'data': dataNodes, 'type': 'nodal', 'dim': 3, 'name': 'nodal3'}],
+        offset=1,
+        opts={'precision': 'repr'},
+        jobs=jobs,
+    )
+    assert [w.__module__ for w in writer.writers] == ['meshRW.msh', 'meshRW.vtk2', 'meshRW.vtk', 'meshRW.msh4']
+    assert len(writer.getReport()) == 4
+    # same mesh in all the files (connectivity from 0 for the VTK files)
+    tet = elemsData['TET4'] - 1
+    for reader in (vtu.vtuReader(filename=writer.targets[1]['filename']),
+                   vtk.vtkReader(filename=writer.targets[2]['filename'])):
+        assert numpy.allclose(reader.getNodes(), nodes)
+        assert numpy.array_equal(reader.getElements()[0]['connectivity'], tet)
+        assert numpy.allclose(reader.getFields()[0]['data'], dataNodes)
+    for reader in (msh.mshReader(filename=writer.targets[0]['filename']),
+                   msh4.mshReader(filename=writer.targets[3]['filename'])):
+        assert numpy.allclose(reader.getNodes(), nodes)
+        assert numpy.array_equal(reader.getElements(typeElem='TET4', unique=False), elemsData['TET4'])
+
+
+def test_multiWriterShared(monkeypatch):
+    hf = open(datafile, 'rb')
+    data = pickle.load(hf)
+    hf.close()
+    nodes = data['n']
+    elemsData = data['e']
+    calls = []
+    formatRows = precision.formatRows
+
+    def countRows(*args, **kwargs):
+        calls.append(args[0].shape)
+        return formatRows(*args, **kwargs)
+
+    monkeypatch.setattr(precision, 'formatRows', countRows)
+
+    def write(targets):
+        calls.clear()
+        return multi.multiWriter(targets, nodes=nodes,
+                                 elements={'connectivity': elemsData['TET4'], 'type': 'TET4', 'physgrp': [5, 5]},
+                                 offset=1)
+
+    write([ArtifactsPath / Path('build-multi-shared.msh')])
+    nbCalls = len(calls)
+    # nodes and elements encoded once for the two files
+    writer = write([ArtifactsPath / Path('build-multi-shared.msh'), ArtifactsPath / Path('build-multi-shared.msh.gz')])
+    assert len(calls) == nbCalls
+    # encoded sections released after the writing
+    assert not writer.mesh.keepEncoded
+    assert not [key for key in writer.mesh.cache if key[0] == 'encoded']
+    for target in writer.targets:
+        reader = msh.mshReader(filename=target['filename'])
+        assert numpy.array_equal(reader.getElements(typeElem='TET4', unique=False), elemsData['TET4'])
+
+
+def test_getTarget():
+    target = multi.getTarget('out/result.msh.gz', {'precision': 'repr', 'binary': True})
+    assert target['writer'] == 'msh'
+    assert target['opts'] == {'precision': 'repr', 'binary': True}
+    target = multi.getTarget({'filename': 'result.vtu', 'opts': {'binary': False}}, {'binary': True})
+    assert target['writer'] == 'vtk2'
+    assert target['opts'] == {'binary': False}
+    assert multi.getTarget('result.pvd')['opts'] is None
+    with pytest.raises(ValueError):
+        multi.getTarget('result.stl')
+    with pytest.raises(ValueError):
+        multi.getTarget({'filename': 'result.msh', 'writer': 'stl'})
@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+from meshRW.precision import getPolicy, formatValue, formatRows, benchmarkPrecision
+
+def test_getPolicy():
+    assert getPolicy()['format'] == '%9.4g'
+    assert getPolicy('legacy', 'fields')['format'] == '%9.4f'
+    assert getPolicy(6)['format'] == '%.6g'
+    assert getPolicy('float32')['dtype'] is np.float32
+    with pytest.raises(ValueError):
+        getPolicy('unknown')
+    with pytest.raises(ValueError):
+        getPolicy(25)
+
+def test_formatRows_legacy():
+    """The legacy policy gives the historical formats."""
+    values = np.array([[1.5, -0.25, 1e-7], [1234567.0, 0.0, 2.0]])
+    txt = ''.join(formatRows(values, getPolicy('legacy'), start=1, chunkRows=1))
+    expected = ''.join('{:d} {:9.4g} {:9.4g} {:9.4g}\n'.format(i + 1, *v) for i, v in enumerate(values))
+    assert txt == expected
+    txt = ''.join(formatRows(values[:, 0], getPolicy('legacy', 'fields'), suffix=' 0.0'))
+    assert txt == '   1.5000 0.0\n1234567.0000 0.0\n'
+    assert formatValue(2.0, getPolicy('legacy', 'fields')) == '   2.0000'
+
+def test_formatRows_roundtrip():
+    """The repr policy gives an exact round trip, float32 the float32 values."""
+    values = np.random.default_rng(0).random((100, 3)) * 1e3
+    txt = ''.join(formatRows(values, getPolicy('repr'), chunkRows=7))
+    assert np.array_equal(np.fromstring(txt, sep=' ').reshape(values.shape), values)
+    txt = ''.join(formatRows(values, getPolicy('float32')))
+    readValues = np.fromstring(txt, sep=' ').reshape(values.shape)
+    assert np.array_equal(readValues.astype(np.float32), values.astype(np.float32))
+    # integers are written as integers
+    assert ''.join(formatRows(np.array([[1, 2]]), getPolicy('repr'), start=0)) == '0 1 2\n'
+
+def test_benchmarkPrecision():
+    values = np.random.default_rng(0).random((50, 3))
+    report = benchmarkPrecision(values, policies=['legacy', 'repr', 3])
+    assert [r['precision'] for r in report] == ['legacy', 'repr', 3]
+    assert report[1]['roundTrip']
+    assert report[2]['size'] < report[1]['size']
+    assert report[2]['maxRelError'] < 1e-2
@@ -2,6 +2,7 @@ import pickle
 from pathlib import Path
 
 import numpy
+import pytest
 
 from meshRW import vtk, vtk2
 
@@ -138,6 +139,86 @@ def test_VTKwriterStatic():
     assert outputfile.exists()
 
 
+@pytest.mark.parametrize('binary', [False, True])
+def test_VTKreader(binary):
+    # open data
+    hf = open(datafile, 'rb')
+    data = pickle.load(hf)
+    hf.close()
+    nodes = data['n']
+    elemsData = data['e']
+    nbElems = elemsData['TET4'].shape[0] + elemsData['PRI6'].shape[0]
+    dataNodes = numpy.random.rand(nodes.shape[0], 3)
+    dataElem = numpy.random.rand(nbElems, 2)
+    outputfile = ArtifactsPath / Path('build-read.vtk')
+    vtk.vtkWriter(
+        filename=outputfile,
+        nodes=nodes,
+        elements=[
+            {'connectivity': elemsData['TET4'] - 1, 'type': 'TET4', 'physgrp': [5, 5]},
+            {'connectivity': elemsData['PRI6'] - 1, 'type': 'PRI6', 'physgrp': [6, 6]},
+        ],
+        fields=[
+            {'data': dataNodes, 'type': 'nodal', 'dim': 3, 'name': 'nodal3'},
+            {'data': dataElem, 'type': 'elemental', 'dim': 2, 'name': 'name_2'},
+        ],
+        opts={'version': 'v2', 'precision': 'repr'},
+    )
+    if binary:
+        # convert to binary with libvtk
+        import vtk as libvtk
+
+        vtkReader = libvtk.vtkUnstructuredGridReader()
+        vtkReader.SetFileName(str(outputfile))
+        vtkReader.ReadAllFieldsOn()
+        vtkReader.Update()
+        outputfile = ArtifactsPath / Path('build-read-bin.vtk')
+        vtkWriter = libvtk.vtkUnstructuredGridWriter()
+        vtkWriter.SetFileName(str(outputfile))
+        vtkWriter.SetInputData(vtkReader.GetOutput())
+        vtkWriter.SetFileTypeToBinary()
+        vtkWriter.Write()
+    mesh = vtk.vtkReader(filename=outputfile)
+    assert mesh.binary == binary
+    assert numpy.array_equal(mesh.getNodes(), nodes)
+    assert mesh.getTypes() == ['TET4', 'PRI6']
+    assert numpy.array_equal(mesh.getElements()[0]['connectivity'], elemsData['TET4'] - 1)
+    assert numpy.array_equal(mesh.getElements()[1]['connectivity'], elemsData['PRI6'] - 1)
+    assert numpy.all(mesh.getElements()[1]['physgrp'] == 6)
+    fields = {f['name']: f for f in mesh.getFields()}
+    assert sorted(fields) == ['name_2', 'nodal3']
+    assert fields['nodal3']['type'] == 'nodal'
+    assert numpy.array_equal(fields['nodal3']['data'], dataNodes)
+    assert numpy.array_equal(fields['name_2']['data'], dataElem)
+
+
+def test_VTKreaderNonFinite():
+    # open data
+    hf = open(datafile, 'rb')
+    data = pickle.load(hf)
+    hf.close()
+    nodes = data['n']
+    elemsData = data['e']
+    # rows starting with nan/inf (not keywords)
+    dataNodes = numpy.random.rand(nodes.shape[0], 3)
+    dataNodes[0, 0] = numpy.nan
+    dataNodes[1, 0] = numpy.inf
+    dataNodes[2, 0] = -numpy.inf
+    dataNodes[3, 1] = numpy.nan
+    outputfile = ArtifactsPath / Path('build-read-nonfinite.vtk')
+    vtk.vtkWriter(
+        filename=outputfile,
+        nodes=nodes,
+        elements=[{'connectivity': elemsData['TET4'] - 1, 'type': 'TET4', 'physgrp': [5, 5]}],
+        fields=[{'data': dataNodes, 'type': 'nodal', 'dim': 3, 'name': 'nodal3'}],
+        opts={'version': 'v2', 'precision': 'repr'},
+    )
+    mesh = vtk.vtkReader(filename=outputfile)
+    assert numpy.array_equal(mesh.getNodes(), nodes)
+    fields = {f['name']: f for f in mesh.getFields()}
+    assert numpy.array_equal(fields['nodal3']['data'], dataNodes, equal_nan=True)
+
+
 def test_VTK2writerTemporal():
     # open data
     hf = open(datafile, 'rb')
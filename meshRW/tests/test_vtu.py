@@ -0,0 +1,112 @@
+import pickle
+from pathlib import Path
+
+import numpy
+import pytest
+
+from meshRW import vtk2, vtu
+
+# load current path
+CurrentPath = Path(__file__).parent
+DataPath = CurrentPath / Path('test_data')
+# data file for testing
+datafile = DataPath / Path('debug.h5')
+# artifacts directory
+ArtifactsPath = CurrentPath / Path('artifacts')
+ArtifactsPath.mkdir(exist_ok=True)
+
+
+def loadData():
+    hf = open(datafile, 'rb')
+    data = pickle.load(hf)
+    hf.close()
+    return data['n'], data['e']
+
+
+@pytest.mark.parametrize('mode', ['default', 'binary', 'ascii'])
+def test_VTUreader(mode):
+    nodes, elemsData = loadData()
+    nbElems = elemsData['TET4'].shape[0] + elemsData['PRI6'].shape[0]
+    dataNodes = numpy.random.rand(nodes.shape[0], 3)
+    dataElem = numpy.random.rand(nbElems, 2)
+    outputfile = ArtifactsPath / Path(f'build-read-{mode}.vtu')
+    vtk2.vtkWriter(
+        filename=outputfile,
+        nodes=nodes,
+        elements=[
+            {'connectivity': elemsData['TET4'] - 1, 'type': 'TET4', 'physgrp': [5, 5]},
+            {'connectivity': elemsData['PRI6'] - 1, 'type': 'PRI6', 'physgrp': [6, 6]},
+        ],
+        fields=[
+            {'data': dataNodes, 'type': 'nodal', 'dim': 3, 'name': 'nodal3'},
+            {'data': dataElem, 'type': 'elemental', 'dim': 2, 'name': 'name_2'},
+        ],
+        opts={mode: True},
+    )
+    mesh = vtu.vtuReader(filename=outputfile)
+    assert numpy.allclose(mesh.getNodes(), nodes)
+    assert mesh.getTypes() == ['TET4', 'PRI6']
+    assert numpy.array_equal(mesh.getElements()[0]['connectivity'], elemsData['TET4'] - 1)
+    assert numpy.array_equal(mesh.getElements()[1]['connectivity'], elemsData['PRI6'] - 1)
+    assert numpy.all(mesh.getElements()[0]['physgrp'] == 5)
+    fields = {f['name']: f for f in mesh.getFields()}
+    assert sorted(fields) == ['name_2', 'nodal3']
+    assert numpy.allclose(fields['nodal3']['data'], dataNodes)
+    assert numpy.allclose(fields['name_2']['data'], dataElem)
+
+
+def test_VTUreaderMmap():
+    # raw appended data (uncompressed) written with libvtk
+    import vtk as libvtk
+
+    nodes, elemsData = loadData()
+    inputfile = ArtifactsPath / Path('build-read-default.vtu')
+    if not inputfile.exists():
+        test_VTUreader('default')
+    vtkReader = libvtk.vtkXMLUnstructuredGridReader()
+    vtkReader.SetFileName(str(inputfile))
+    vtkReader.Update()
+    outputfile = ArtifactsPath / Path('build-read-raw.vtu')
+    vtkWriter = libvtk.vtkXMLUnstructuredGridWriter()
+    vtkWriter.SetFileName(str(outputfile))
+    vtkWriter.SetInputData(vtkReader.GetOutput())
+    vtkWriter.SetDataModeToAppended()
+    vtkWriter.EncodeAppendedDataOff()
+    vtkWriter.SetCompressorTypeToNone()
+    vtkWriter.Write()
+    mesh = vtu.vtuReader(filename=outputfile, mmap=True)
+    assert mesh.compressor is None
+    assert numpy.allclose(mesh.getNodes(), nodes)
+    # coordinates are read from the file without copy
+    assert not mesh.getNodes().flags['OWNDATA']
+    assert numpy.array_equal(mesh.getElements()[1]['connectivity'], elemsData['PRI6'] - 1)
+
+
+def test_PVDreader():
+    nodes, elemsData = loadData()
+    dataNodesStep = [numpy.random.rand(nodes.shape[0], 3) for i in range(4)]
+    outputfile = ArtifactsPath / Path('build-read-series.vtu')
+    vtk2.vtkWriter(
+        filename=outputfile,
+        nodes=nodes,
+        elements=[{'connectivity': elemsData['TET4'] - 1, 'type': 'TET4'}],
+        fields=[{'data': dataNodesStep, 'type': 'nodal', 'dim': 3, 'name': 'U', 'nbsteps': 4}],
+    )
+    series = vtu.pvdReader(outputfile.with_suffix('.pvd'), cacheSize=2)
+    assert numpy.array_equal(series.getTimes(), [0, 1, 2, 3])
+    # steps are read on demand and kept in the cache
+    mesh = series.getStepAtTime(2.2)
+    assert series.getStep(2) is mesh
+    assert mesh.getTypes() == ['TET4']
+    assert numpy.allclose(mesh.getFields()[0]['data'], dataNodesStep[2])
+    series.getStep(0)
+    series.getStep(1)
+    assert len(series.cache) == 2
+    assert series.getStep(2) is not mesh
+    # history of the field on some nodes
+    times, values = series.probe('U', [0, 10, 20])
+    assert numpy.array_equal(times, series.getTimes())
+    assert values.shape == (4, 3, 3)
+    assert numpy.allclose(values[3], dataNodesStep[3][[0, 10, 20]])
+    with pytest.raises(ValueError):
+        series.probe('V', [0])
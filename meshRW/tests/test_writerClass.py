@@ -0,0 +1,66 @@
+import numpy
+import pytest
+
+from meshRW import writerClass
+
+
+def test_adaptInputs():
+    nodes = numpy.random.rand(10, 2)
+    conn = numpy.arange(12).reshape(4, 3) % 10
+    elements = {'connectivity': conn, 'type': 'TRI3'}
+    data = [numpy.random.rand(10) for _ in range(3)]
+    fields = {'data': data, 'type': 'nodal', 'dim': 1, 'name': 'T', 'nbsteps': 3}
+    nodesOk, elementsOk, fieldsOk = writerClass.adaptInputs(nodes, elements, fields)
+    # no copy of the arrays
+    assert nodesOk is nodes
+    assert elementsOk[0]['connectivity'] is conn
+    assert all(a is b for a, b in zip(fieldsOk[0]['data'], data))
+    # new physical group without modification of the inputs
+    assert elementsOk[0]['physgrp'] == [writerClass.configMESH.DFLT_NEW_PHYSGRP_NUM]
+    assert 'physgrp' not in elements
+    assert fields['data'] is data
+    # conversion of the lists
+    nodesOk, elementsOk, fieldsOk = writerClass.adaptInputs(nodes.tolist(), [{'connectivity': conn.tolist(),
+                                                                              'physgrp': [1, 2]}],
+                                                            [{'data': [[1.0], [2.0]], 'type': 'nodal'}])
+    assert isinstance(nodesOk, numpy.ndarray)
+    assert isinstance(elementsOk[0]['connectivity'], numpy.ndarray)
+    assert fieldsOk[0]['data'].shape == (2, 1)
+    # invalid nodes
+    with pytest.raises(ValueError):
+        writerClass.adaptInputs(numpy.random.rand(10, 4), elements)
+
+
+def test_getNodes3D():
+    nodes = numpy.random.rand(5, 3)
+    assert writerClass.getNodes3D(nodes) is nodes
+    nodes3D = writerClass.getNodes3D(nodes[:, :2])
+    assert numpy.array_equal(nodes3D[:, :2], nodes[:, :2])
+    assert numpy.all(nodes3D[:, 2] == 0)
+
+
+def test_getPhysGrpData():
+    elements = [
+        {'connectivity': numpy.zeros((3, 3), dtype=int), 'type': 'TRI3', 'physgrp': [4, 5, 6]},
+        {'connectivity': numpy.zeros((2, 4), dtype=int), 'type': 'QUA4', 'physgrp': 7},
+        {'connectivity': numpy.zeros((2, 2), dtype=int), 'type': 'LIN2'},
+    ]
+    data = writerClass.getPhysGrpData(elements)
+    assert data.dtype == numpy.int32
+    assert numpy.array_equal(data, [4, 5, 6, 7, 7, -1, -1])
+    assert writerClass.getPhysGrpData(elements[2]) is None
+    assert writerClass.getPhysGrpData(None) is None
+
+
+def test_getCellArrays():
+    elements = [
+        {'connectivity': numpy.array([[0, 1, 2], [1, 2, 3]]), 'type': 'TRI3'},
+        {'connectivity': numpy.array([[0, 1, 2, 3]]), 'type': 'QUA4'},
+    ]
+    types, offsets, connectivity = writerClass.getCellArrays(elements)
+    assert types.dtype == numpy.uint8
+    assert types.tolist() == [5, 5, 9]
+    assert offsets.tolist() == [0, 3, 6, 10]
+    assert connectivity.tolist() == [0, 1, 2, 1, 2, 3, 0, 1, 2, 3]
+    types, offsets, connectivity = writerClass.getCellArrays(None)
+    assert (types.size, offsets.tolist(), connectivity.size) == (0, [0], 0)
@@ -6,7 +6,9 @@ Various useful tools
 Luc Laurent - luc.laurent@lecnam.net -- 2021
 """
 
+import importlib
 import time
+from types import ModuleType
 from typing import Union, Optional, Callable
 
 import numpy
@@ -84,3 +86,53 @@ def timeit(txt: Optional[str] = None)-> Callable:
         return timeit_wrapper
 
     return decorator
+
+
+class LazyModule:
+    """
+    Module imported on the first access to one of its attributes.
+
+    Used for the heavy backends (gmsh, libvtk, lxml) so that importing a module of meshRW
+    does not load them until they are actually needed.
+
+    Attributes:
+        moduleName (str): The name of the module (e.g. 'lxml.etree').
+        module (Optional[ModuleType]): The module once imported.
+    """
+
+    def __init__(self, name: str)-> None:
+        """
+        Initialize the lazy module.
+
+        Args:
+            name (str): The name of the module.
+        """
+        self.moduleName = name
+        self.module = None
+
+    def load(self)-> ModuleType:
+        """
+        Import the module (if not already imported).
+
+        Returns:
+            ModuleType: The module.
+
+        Raises:
+            ImportError: If the module cannot be imported.
+        """
+        if self.module is None:
+            Logger.debug(f'Import {self.moduleName}')
+            self.module = importlib.import_module(self.moduleName)
+        return self.module
+
+    def isLoaded(self)-> bool:
+        """
+        Check if the module has been imported.
+
+        Returns:
+            bool: True if the module has been imported.
+        """
+        return self.module is not None
+
+    def __getattr__(self, attr: str)-> object:
+        return getattr(self.load(), attr)
@@ -6,13 +6,18 @@ This class is a part of the SILEX library and will write results in legacy VTK f
 Luc Laurent - luc.laurent@lecnam.net -- 2021
 """
 
+import re
 from pathlib import Path
-from typing import Union, Optional
+from typing import Iterator, Optional, Union
 
 import numpy as np
 from loguru import logger as Logger
 
-from . import configMESH, dbvtk, fileio, various, writerClass
+from . import configMESH, dbelem, dbvtk, fileio, meshdata, metrics, precision, writerClass
+
+# start of the lines of keywords (or names of arrays) in ASCII legacy VTK files: lines of
+# values may also start with a letter (nan, inf, infinity in any case)
+REGEX_KEYWORD = re.compile(rb'^[ \t]*(?!(?i:nan|inf|infinity)(?:\s|$))[A-Za-z_]', re.MULTILINE)
 
 
 class VTKWriter(writerClass.Writer):
@@ -44,6 +49,7 @@ class VTKWriter(writerClass.Writer):
         title: Optional[str] = None,
         verbose: bool = False,
         opts: Optional[dict] = None,
+        mesh: Optional[meshdata.Mesh] = None,
     ):
         """
         Initialize the VTK writer class.
@@ -56,7 +62,12 @@ class VTKWriter(writerClass.Writer):
             title (str, optional): Title of the VTK file. Defaults to None.
             verbose (bool, optional): Enable verbose logging if True. Defaults to False.
             opts (dict, optional): Additional options for the writer, such as version.
-            Defaults to {'version': 'v2', 'createPath': True}.
+            Defaults to {'version': 'v2', 'createPath': True}. Compression is controlled with
+            'compression', 'compressionLevel' and 'bufferSize' (see `fileio.compressionOptions`).
+            The format of the floating point values is controlled with 'precision' ('legacy',
+            'repr', 'float32' or number of significant digits, see `precision.getPolicy`).
+            mesh (meshdata.Mesh, optional): Mesh container replacing the nodes, elements and fields
+                (inputs adapted and analysed once). Defaults to None.
         Notes:
             - Adapts verbosity of the logger based on the `verbose` flag.
             - Prepares new fields from physical groups if applicable.
@@ -74,9 +85,16 @@ class VTKWriter(writerClass.Writer):
         self.nbElems = 0
         Logger.info('Start writing vtk file')
         # adapt inputs
-        nodes, elements, fields = writerClass.adaptInputs(nodes, elements, fields)
+        nodes, elements, fields = writerClass.getInputs(nodes, elements, fields, mesh, offset=0)
+        # merging of the coincident nodes (option 'merge')
+        nodes, elements, fields, mergeMap = writerClass.mergeInputs(nodes, elements, fields, opts, offset=0)
+        # renumbering of the nodes and elements (option 'reorder')
+        nodes, elements, fields, permutation = writerClass.reorderInputs(nodes, elements, fields, opts, offset=0)
+        # derived data of the mesh container not valid for merged or renumbered inputs
+        if mergeMap is not None or permutation is not None:
+            mesh = None
         # prepare new fields (from physical groups for instance)
-        newFields = self.createNewFields(elements)
+        newFields = self.createNewFields(elements, mesh)
         if newFields:
             if fields is None:
                 fields = []
@@ -94,11 +112,24 @@ class VTKWriter(writerClass.Writer):
                          fields,
                          append,
                          title,
-                         opts or {'version': 'v2', 'createPath': True})
+                         opts or {'version': 'v2', 'createPath': True},
+                         mesh)
+        self.permutation = permutation
+        self.mergeMap = mergeMap
         # load specific configuration
         self.db = dbvtk
         # write contents depending on the number of steps
         self.writeContentsSteps(nodes, elements, fields)
+        self.metrics.close()
+
+    def getStream(self)-> Optional[object]:
+        """
+        Get the file handler in use (bytes counted by the metrics).
+
+        Returns:
+            Optional[object]: The file handler of the current file.
+        """
+        return getattr(self, 'customHandler', None)
 
     def setOptions(self, opts: dict)-> None:
         """
@@ -158,19 +189,26 @@ class VTKWriter(writerClass.Writer):
                 self.title = self.adaptTitle(txt=f' step num {itS:d}', append=True)
                 # adapt the filename
                 filename = self.getFilename(suffix='.' + str(itS).zfill(len(str(self.nbSteps))))
-                self.customHandler = fileio.fileHandler(filename=filename, append=self.append, safeMode=False)
+                self.customHandler = fileio.fileHandler(filename=filename,
+                                                        append=self.append,
+                                                        safeMode=False,
+                                                        **fileio.compressionOptions(self.opts))
                 # prepare fields (only write all fields on the first step)
                 fieldsOk = list()
                 fieldsOk = fields
                 Logger.info(f'Start writing {self.customHandler.filename}')
-                self.writeContents(nodes, elements, fieldsOk, numStep=itS)
-                self.customHandler.close()
+                with self.metrics.span('step', step=itS, file=filename.name):
+                    self.writeContents(nodes, elements, fieldsOk, numStep=itS)
+                    metrics.closeStream(self.metrics, self.customHandler)
         else:
             filename = self.getFilename()
-            self.customHandler = fileio.fileHandler(filename=filename, append=self.append, safeMode=False)
+            self.customHandler = fileio.fileHandler(filename=filename,
+                                                    append=self.append,
+                                                    safeMode=False,
+                                                    **fileio.compressionOptions(self.opts))
             Logger.info(f'Start writing {self.customHandler.filename}')
             self.writeContents(nodes, elements, fields)
-            self.customHandler.close()
+            metrics.closeStream(self.metrics, self.customHandler)
 
     def writeContents(self,
                       nodes: Union[list, np.ndarray],
@@ -251,12 +289,13 @@ class VTKWriter(writerClass.Writer):
         Raises:
             AttributeError: If `self.version` is not set to a supported value.
         """
-        if self.version == 'v2':
-            headerVTKv2(self.customHandler, commentTxt=self.title)
-        elif self.version == 'xml':
-            headerVTKXML(self.customHandler)
+        with self.metrics.span('header', stream=self.customHandler):
+            if self.version == 'v2':
+                headerVTKv2(self.customHandler, commentTxt=self.title)
+            elif self.version == 'xml':
+                headerVTKXML(self.customHandler)
 
-    @various.timeit('Nodes written')
+    @metrics.section('nodes', 'Nodes written', items='nbNodes')
     def writeNodes(self, nodes: Union[list, np.ndarray]) -> None:
         """
         Writes the provided nodes to a file based on the specified version.
@@ -276,16 +315,20 @@ class VTKWriter(writerClass.Writer):
             - If `self.version` is 'v2', the `WriteNodesV2` function is used.
             - If `self.version` is 'xml', the `WriteNodesXML` function is used.
         - The file handle for writing is accessed via `self.customHandler.fhandle`.
+        - The text of the section is shared with the other writers of the mesh container
+          (see `writerClass.Writer.writeEncoded`).
         """
         # count number of nodes
-        nodes_run = np.array(nodes)
+        nodes_run = np.asarray(nodes)
         self.nbNodes = nodes_run.shape[0]
         if self.version == 'v2':
-            WriteNodesV2(self.customHandler, nodes_run)
+            policy = precision.getPolicy(self.opts.get('precision'), 'nodes')
+            self.writeEncoded(self.customHandler, ('vtk', 'nodes', policy['name']),
+                              lambda: encodeNodesV2(nodes_run, self.opts.get('precision')))
         elif self.version == 'xml':
             WriteNodesXML(self.customHandler, nodes_run)
 
-    @various.timeit('Elements written')
+    @metrics.section('elements', 'Elements written', items='nbElems')
     def writeElements(self, elements: Union[list, np.ndarray, dict]) -> None:
         """
         Writes elements to a file based on the specified version.
@@ -304,6 +347,8 @@ class VTKWriter(writerClass.Writer):
           process to the appropriate function:
             - 'v2': Uses `WriteElemsV2` to write elements.
             - 'xml': Uses `WriteElemsXML` to write elements.
+        - The text of the section is shared with the other writers of the mesh container
+          (see `writerClass.Writer.writeEncoded`).
 
         Raises:
         -------
@@ -322,11 +367,13 @@ class VTKWriter(writerClass.Writer):
             self.nbElems += e[configMESH.DFLT_MESH].shape[0]
 
         if self.version == 'v2':
-            WriteElemsV2(self.customHandler, elemsRun)
+            self.writeEncoded(self.customHandler, ('vtk', 'cells'), lambda: encodeElemsV2(elemsRun))
         elif self.version == 'xml':
             WriteElemsXML(self.customHandler, elemsRun)
 
-    def createNewFields(self, elems: Optional[Union[list, np.ndarray, dict]]) -> Optional[list]:
+    def createNewFields(self,
+                        elems: Optional[Union[list, np.ndarray, dict]],
+                        mesh: Optional[meshdata.Mesh] = None) -> Optional[list]:
         """
         Create new fields based on the provided elements data.
 
@@ -339,11 +386,13 @@ class VTKWriter(writerClass.Writer):
             elems (Union[list, np.ndarray, dict]): A collection of elements data.
                 Each element is expected to be a dictionary containing mesh data
                 and optionally a physical group identifier.
+            mesh (Optional[meshdata.Mesh]): The mesh container of the elements (cached
+                physical groups). Defaults to None.
 
         Returns:
             Optional[list]: A list of dictionaries representing the new fields if
             physical group data is found. Each dictionary contains:
-                - 'data': A NumPy array of physical group data for the elements.
+                - 'data': The int32 physical groups of the elements (also kept in `physGrpData`).
                 - 'type': The type of the field, e.g., 'elemental_scalar'.
                 - 'dim': The dimensionality of the field (e.g., 1).
                 - 'name': The name of the field, typically `configMESH.DFLT_PHYS_GRP`.
@@ -355,32 +404,14 @@ class VTKWriter(writerClass.Writer):
             elems = list(elems)
         if isinstance(elems, dict):
             elems = [elems]
-        # check if physgroup exists
-        physGrp = False
-        newFields = None
-        for itE in elems:
-            if configMESH.DFLT_PHYS_GRP in itE.keys():
-                physGrp = True
-                break
-        if physGrp:
-            newFields = list()
-            data = list()
-            for itE in elems:
-                nbElems = itE[configMESH.DFLT_MESH].shape[0]
-                if configMESH.DFLT_PHYS_GRP in itE.keys():
-                    dataPhys = np.array(itE[configMESH.DFLT_PHYS_GRP], dtype=int)
-                    if len(dataPhys) == nbElems:
-                        data = np.append(data, dataPhys)
-                    else:
-                        data = np.append(data, dataPhys[0] * np.ones(nbElems))
-                else:
-                    data = np.append(data, -np.ones(nbElems))
-            Logger.debug('Create new field for physical group')
-            newFields.extend([{'data': data, 'type': 'elemental_scalar', 'dim': 1, 'name': configMESH.DFLT_PHYS_GRP}])
-
-        return newFields
-
-    @various.timeit('Fields written')
+        # physical groups of the elements (computed once, shared by all the steps)
+        self.physGrpData = mesh.getPhysGrpData() if mesh is not None else writerClass.getPhysGrpData(elems)
+        if self.physGrpData is None:
+            return None
+        Logger.debug('Create new field for physical group')
+        return [{'data': self.physGrpData, 'type': 'elemental_scalar', 'dim': 1, 'name': configMESH.DFLT_PHYS_GRP}]
+
+    @metrics.section('fields', 'Fields written')
     def writeFields(self, fields: Optional[Union[list, np.ndarray, dict]] = None, numStep: Optional[int] = None)-> None:
         """
         Writes field data to a file based on the specified version.
@@ -401,11 +432,361 @@ class VTKWriter(writerClass.Writer):
         if isinstance(fields, np.ndarray):
             fields = list(fields)
         if self.version == 'v2':
-            WriteFieldsV2(self.customHandler, self.nbNodes, self.nbElems, fields, numStep)
+            WriteFieldsV2(self.customHandler, self.nbNodes, self.nbElems, fields, numStep,
+                          self.opts.get('precision'))
         elif self.version == 'xml':
             WriteFieldsXML(self.customHandler, self.nbNodes, self.nbElems, fields, numStep)
 
 
+class VTKReader:
+    """
+    Read legacy VTK files (unstructured grids, ASCII or binary) without libvtk.
+
+    The sections `POINTS`, `CELLS` (with `OFFSETS`/`CONNECTIVITY` for the version 5.1),
+    `CELL_TYPES`, `POINT_DATA` and `CELL_DATA` (`SCALARS`, `VECTORS`, `NORMALS`, `TENSORS`
+    and `FIELD`) are converted at once with NumPy (`np.fromstring` in ASCII mode,
+    `np.frombuffer` with big-endian types in binary mode). The cells are grouped by type
+    (order of first appearance) and the data are returned with the structures consumed by
+    the writers.
+
+    Attributes:
+        version (str): The version of the file format.
+        title (str): The title of the file.
+        binary (bool): True for a binary file.
+        nodes (np.ndarray): The coordinates of the nodes.
+        elements (list): The element blocks [{'connectivity': table, 'type': 'TRI3',
+            'physgrp': array}, ...] (0-based connectivity, 'physgrp' if available).
+        fields (list): The fields [{'data': array, 'type': 'nodal', 'dim': 3, 'name': 'U'}, ...]
+            ('nodal_scalar'/'elemental_scalar' for `SCALARS`).
+        cellOrder (np.ndarray): The index of the cells of the file in the order of the blocks.
+        mesh (Optional[meshdata.Mesh]): The mesh container of the content (built by `getMesh`).
+    """
+
+    def __init__(self,
+                 filename: Union[str, Path, None]=None,
+                 dim: int=3)-> None:
+        """
+        Initializes the VTK reader object and reads the file.
+
+        Args:
+            filename (Union[str, Path], optional): The path to the VTK file. Defaults to None.
+            dim (int, optional): The dimension of the nodes to keep (2 or 3). Defaults to 3.
+
+        Raises:
+            ValueError: If the file is not a legacy VTK file of an unstructured grid.
+        """
+        self.filename = filename
+        self.version = ''
+        self.title = ''
+        self.binary = False
+        self.nodes = np.zeros((0, 3))
+        self.elements = []
+        self.fields = []
+        self.cellOrder = np.zeros(0, dtype=np.int64)
+        self.mesh = None
+        self.content = b''
+        self.pos = 0
+        self.metrics = metrics.getMetrics(self)
+        self.readFile(dim)
+
+    def readFile(self, dim: Optional[int]=3)-> None:
+        """
+        Read the content of the file (compressed files are decompressed on the fly).
+
+        Args:
+            dim (Optional[int], optional): The dimension of the nodes to keep. Defaults to 3.
+        """
+        Logger.debug(f'Open file {self.filename}')
+        with self.metrics.span('read') as span:
+            objFile = fileio.fileHandler(filename=self.filename, right='rb', safeMode=False)
+            content = objFile.getHandler().read()
+            objFile.close()
+            span.bytes = len(content)
+        with self.metrics.span('parse'):
+            self.readContent(content, dim)
+
+    def readLine(self)-> Optional[str]:
+        """
+        Read the next line of the file.
+
+        Returns:
+            Optional[str]: The line (without line break) or None at the end of the file.
+        """
+        if self.pos >= len(self.content):
+            return None
+        eol = self.content.find(b'\n', self.pos)
+        if eol < 0:
+            eol = len(self.content)
+        line = self.content[self.pos:eol].decode('utf-8', errors='replace').rstrip('\r')
+        self.pos = eol + 1
+        return line
+
+    def nextLine(self)-> Optional[str]:
+        """
+        Read the next non-empty line of the file.
+
+        Returns:
+            Optional[str]: The stripped line or None at the end of the file.
+        """
+        while True:
+            line = self.readLine()
+            if line is None or line.strip():
+                return line if line is None else line.strip()
+
+    def readArray(self, count: int, dataType: str)-> np.ndarray:
+        """
+        Read an array of values at the current position.
+
+        Args:
+            count (int): The number of values.
+            dataType (str): The VTK type of the values (e.g. 'double', 'int').
+
+        Returns:
+            np.ndarray: The values (1D array).
+
+        Raises:
+            ValueError: If the type is not supported or if the number of values is wrong.
+        """
+        dtype = dbvtk.DFLT_DATA_TYPES.get(dataType.lower())
+        if dtype is None:
+            raise ValueError(f'Data type {dataType} not supported')
+        if self.binary:
+            values = np.frombuffer(self.content, dtype, count, self.pos)
+            self.pos += count * values.itemsize
+            return values.astype(np.dtype(dtype).newbyteorder('='))
+        # ASCII values end at the next line starting with a keyword (not with nan/inf)
+        match = REGEX_KEYWORD.search(self.content, self.pos)
+        end = match.start() if match else len(self.content)
+        values = np.fromstring(self.content[self.pos:end].decode('ascii'), sep=' ')
+        if values.size != count:
+            raise ValueError(f'{count} values expected ({values.size} read)')
+        self.pos = end
+        return values.astype(np.dtype(dtype).newbyteorder('='))
+
+    def readContent(self, content: bytes, dim: Optional[int]=3)-> None:
+        """
+        Read the content of the file.
+
+        Args:
+            content (bytes): The content of the file.
+            dim (Optional[int], optional): The dimension of the nodes to keep. Defaults to 3.
+
+        Raises:
+            ValueError: If the file is not a legacy VTK file of an unstructured grid or if
+            a section is not supported.
+        """
+        self.content = content
+        self.pos = 0
+        header = self.readLine() or ''
+        if not header.startswith('# vtk DataFile'):
+            raise ValueError(f'File {self.filename} is not a legacy VTK file')
+        self.version = header.split()[-1]
+        self.title = self.readLine() or ''
+        self.binary = (self.nextLine() or '').upper() == dbvtk.DFLT_TYPE_BINARY
+        dataset = self.nextLine() or ''
+        if dataset.upper().split() != dbvtk.DFLT_TYPE_MESH.split():
+            raise ValueError(f'Dataset {dataset} not supported (only {dbvtk.DFLT_TYPE_MESH})')
+        cells = offsets = types = None
+        location = configMESH.DFLT_FIELD_TYPE_NODAL
+        nbValues = 0
+        while (line := self.nextLine()) is not None:
+            words = line.split()
+            key = words[0].upper()
+            if key == dbvtk.DFLT_NODES:
+                self.nodes = self.readArray(3 * int(words[1]), words[2]).reshape(-1, 3)[:, :dim]
+            elif key == dbvtk.DFLT_ELEMS and float(self.version) < 5:
+                cells = self.readArray(int(words[2]), 'int')
+            elif key == dbvtk.DFLT_ELEMS:
+                # version 5.1: offsets and connectivity are declared in the next sections
+                nbOffsets, nbConnectivity = int(words[1]), int(words[2])
+            elif key == dbvtk.DFLT_ELEMS_OFFSETS:
+                offsets = self.readArray(nbOffsets, words[1])
+            elif key == dbvtk.DFLT_ELEMS_CONNECTIVITY:
+                cells = self.readArray(nbConnectivity, words[1])
+            elif key == dbvtk.DFLT_ELEMS_TYPE:
+                types = self.readArray(int(words[1]), 'int')
+            elif key in (dbvtk.DFLT_NODES_DATA, dbvtk.DFLT_ELEMS_DATA):
+                location = configMESH.DFLT_FIELD_TYPE_NODAL
+                if key == dbvtk.DFLT_ELEMS_DATA:
+                    location = configMESH.DFLT_FIELD_TYPE_ELEMENT
+                nbValues = int(words[1])
+            elif key == dbvtk.DFLT_SCALARS:
+                nbComp = int(words[3]) if len(words) > 3 else 1
+                # lookup table declaration
+                pos = self.pos
+                if not (self.nextLine() or '').upper().startswith(dbvtk.DFLT_TABLE):
+                    self.pos = pos
+                data = self.readArray(nbValues * nbComp, words[2]).reshape(nbValues, nbComp)
+                self.addField(words[1], data, location + '_scalar')
+            elif key in (dbvtk.DFLT_VECTORS, dbvtk.DFLT_NORMALS, dbvtk.DFLT_TENSORS):
+                nbComp = 9 if key == dbvtk.DFLT_TENSORS else 3
+                data = self.readArray(nbValues * nbComp, words[2]).reshape(nbValues, nbComp)
+                self.addField(words[1], data, location)
+            elif key == dbvtk.DFLT_FIELD:
+                for _ in range(int(words[2])):
+                    name, nbComp, nbTuples, dataType = (self.nextLine() or '').split()[:4]
+                    data = self.readArray(int(nbComp) * int(nbTuples), dataType)
+                    self.addField(name, data.reshape(int(nbTuples), int(nbComp)), location)
+            elif key == dbvtk.DFLT_METADATA:
+                # metadata end with an empty line
+                while (line := self.readLine()) is not None and line.strip():
+                    pass
+            elif key == dbvtk.DFLT_TABLE:
+                # lookup table of colors (RGBA)
+                self.readArray(4 * int(words[2]), 'unsigned_char' if self.binary else 'float')
+            else:
+                raise ValueError(f'Section {key} not supported')
+        if cells is not None and types is not None:
+            with self.metrics.span('elements', items=types.size):
+                self.buildElements(cells, offsets, types)
+        self.content = b''
+
+    def addField(self, name: str, data: np.ndarray, typeField: str)-> None:
+        """
+        Add a field read in the file.
+
+        Args:
+            name (str): The name of the field.
+            data (np.ndarray): The values (one row per node/cell in the order of the file).
+            typeField (str): The type of the field ('nodal', 'elemental', 'nodal_scalar'
+                or 'elemental_scalar').
+        """
+        self.fields.append({
+            configMESH.DFLT_FIELD_DATA: data,
+            configMESH.DFLT_FIELD_TYPE: typeField,
+            configMESH.DFLT_FIELD_DIM: data.shape[1],
+            configMESH.DFLT_FIELD_NAME: name,
+        })
+
+    def buildElements(self,
+                      cells: np.ndarray,
+                      offsets: Optional[np.ndarray],
+                      types: np.ndarray)-> None:
+        """
+        Build the element blocks (one block per type of cells) and reorder the cell fields.
+
+        Args:
+            cells (np.ndarray): The cells: number of nodes followed by the nodes of each
+                cell, or the connectivity if `offsets` is provided (version 5.1).
+            offsets (Optional[np.ndarray]): The offsets of the cells in the connectivity
+                (version 5.1).
+            types (np.ndarray): The VTK types of the cells.
+
+        Raises:
+            ValueError: If the cells are not consistent with their types.
+        """
+        codes, first = np.unique(types, return_index=True)
+        codes = codes[np.argsort(first)]
+        nbNodes = dict(zip(codes.tolist(), dbelem.getNumberNodesFromVTK(codes).tolist()))
+        # position of the first node of each cell
+        if offsets is not None:
+            starts = offsets[:-1]
+            sizes = np.diff(offsets)
+        elif all(n > 0 for n in nbNodes.values()):
+            sizes = dbelem.getNumberNodesFromVTK(types)
+            starts = np.cumsum(sizes + 1) - sizes
+            if starts.size and (starts[-1] + sizes[-1] > cells.size
+                                or not np.array_equal(cells[starts - 1], sizes)):
+                raise ValueError('Cells not consistent with their types')
+        else:
+            # cells with a variable number of nodes
+            starts = np.zeros(types.shape[0], dtype=np.int64)
+            sizes = np.zeros(types.shape[0], dtype=np.int64)
+            pos = 0
+            for i in range(types.shape[0]):
+                sizes[i] = cells[pos]
+                starts[i] = pos + 1
+                pos += sizes[i] + 1
+        cellOrder = []
+        for code in codes:
+            nbNodesCell = nbNodes[int(code)]
+            typeElem = dbelem.VTK_TO_TYPE.get(int(code))
+            if typeElem is None or nbNodesCell <= 0:
+                Logger.warning(f'Cells of type {code} ignored (not supported)')
+                continue
+            index = np.flatnonzero(types == code)
+            if not np.all(sizes[index] == nbNodesCell):
+                raise ValueError(f'Cells of type {typeElem} not consistent')
+            connectivity = cells[starts[index, None] + np.arange(nbNodesCell)].astype(np.int64)
+            self.elements.append({configMESH.DFLT_MESH: connectivity, configMESH.DFLT_TYPE_ELEM: typeElem})
+            cellOrder.append(index)
+        self.cellOrder = np.concatenate(cellOrder) if cellOrder else np.zeros(0, dtype=np.int64)
+        # reorder the cell fields and extract the physical groups
+        fields = []
+        for field in self.fields:
+            if field[configMESH.DFLT_FIELD_TYPE].startswith(configMESH.DFLT_FIELD_TYPE_ELEMENT):
+                field[configMESH.DFLT_FIELD_DATA] = field[configMESH.DFLT_FIELD_DATA][self.cellOrder]
+                if field[configMESH.DFLT_FIELD_NAME] == configMESH.DFLT_PHYS_GRP:
+                    self.setPhysGrp(field[configMESH.DFLT_FIELD_DATA][:, 0])
+                    continue
+            fields.append(field)
+        self.fields = fields
+
+    def setPhysGrp(self, physgrp: np.ndarray)-> None:
+        """
+        Set the physical groups of the element blocks (field written by the writers).
+
+        Args:
+            physgrp (np.ndarray): The physical group of each cell (order of the blocks,
+                -1 without physical group).
+        """
+        start = 0
+        for elem in self.elements:
+            nbElems = elem[configMESH.DFLT_MESH].shape[0]
+            values = physgrp[start:start + nbElems].astype(int)
+            if np.any(values >= 0):
+                elem[configMESH.DFLT_PHYS_GRP] = values
+            start += nbElems
+
+    def getNodes(self)-> np.ndarray:
+        """
+        Get the coordinates of the nodes.
+
+        Returns:
+            np.ndarray: The coordinates of the nodes.
+        """
+        return self.nodes
+
+    def getElements(self)-> list:
+        """
+        Get the element blocks.
+
+        Returns:
+            list: The element blocks (see the `elements` attribute).
+        """
+        return self.elements
+
+    def getTypes(self)-> list:
+        """
+        Get the types of the elements.
+
+        Returns:
+            list: The types of the element blocks.
+        """
+        return [e[configMESH.DFLT_TYPE_ELEM] for e in self.elements]
+
+    def getFields(self)-> list:
+        """
+        Get the fields.
+
+        Returns:
+            list: The fields (see the `fields` attribute).
+        """
+        return self.fields
+
+    def getMesh(self)-> meshdata.Mesh:
+        """
+        Get the content as a mesh container (built on the first call), ready to be given to
+        the writers (argument `mesh`).
+
+        Returns:
+            meshdata.Mesh: The nodes, element blocks and fields (0-based connectivity).
+        """
+        if self.mesh is None:
+            self.mesh = meshdata.Mesh(self.nodes, self.elements, self.fields or None, offset=0)
+        return self.mesh
+
+
 # classical function to write contents
 # write header in VTK file
 def headerVTKv2(fileHandle: fileio.fileHandler, commentTxt: str ='')-> None:
@@ -442,43 +823,58 @@ def headerVTKXML(fileHandle, commentTxt=''):
 
 
 def WriteNodesV2(fileHandle: fileio.fileHandler,
-                 nodes: np.ndarray) -> None:
+                 nodes: np.ndarray,
+                 precisionPolicy: Union[str, int, None] = None) -> None:
     """
-    Write the coordinates of nodes for an unstructured grid to a file.
+    Write the coordinates of nodes for an unstructured grid to a file (see `encodeNodesV2`).
 
     Args:
         fileHandle (fileio.fileHandler): A file handler object used to write data to a file.
+        nodes (np.ndarray): A 2D NumPy array containing the coordinates of the nodes.
+        precisionPolicy (Union[str, int, None], optional): The precision policy of the
+                            coordinates (see `precision.getPolicy`). Defaults to None ('legacy').
+
+    Raises:
+        ValueError: If the number of spatial dimensions in the `nodes` array is not 2 or 3.
+    """
+    for chunk in encodeNodesV2(nodes, precisionPolicy):
+        fileHandle.write(chunk)
+
+
+def encodeNodesV2(nodes: np.ndarray,
+                  precisionPolicy: Union[str, int, None] = None) -> Iterator[str]:
+    """
+    Encode the coordinates of nodes for an unstructured grid.
+
+    Args:
         nodes (np.ndarray): A 2D NumPy array containing the coordinates of the nodes.
                             Each row represents a node, and the columns represent the
                             spatial dimensions (e.g., x, y, z).
+        precisionPolicy (Union[str, int, None], optional): The precision policy of the
+                            coordinates (see `precision.getPolicy`). Defaults to None ('legacy').
+
+    Yields:
+        str: The chunks of text of the section (declaration then coordinates).
 
     Raises:
         ValueError: If the number of spatial dimensions in the `nodes` array is not 2 or 3.
 
     Notes:
-        - The function writes the number of nodes and their coordinates to the file in a
-          specific format.
         - The format of the coordinates depends on the spatial dimensions of the problem:
-          - 2D: Writes x and y coordinates.
+          - 2D: Writes x and y coordinates (z coordinate set to 0).
           - 3D: Writes x, y, and z coordinates.
     """
     nbNodes = nodes.shape[0]
     Logger.debug(f'Write {nbNodes} nodes')
-    fileHandle.write(f'\n{dbvtk.DFLT_NODES} {nbNodes:d} {dbvtk.DFLT_DOUBLE}\n')
     #
     dimPb = nodes.shape[1]
 
-    # declare format specification
-    formatSpec = None
-    if dimPb == 2:
-        formatSpec = '{:9.4g} {:9.4g}\n'
-    elif dimPb == 3:
-        formatSpec = '{:9.4g} {:9.4g} {:9.4g}\n'
-    if formatSpec is None:
+    if dimPb not in (2, 3):
         raise ValueError('Unsupported node dimension')
-    # write coordinates
-    for i in range(nbNodes):
-        fileHandle.write(formatSpec.format(*nodes[i, :]))
+    yield f'\n{dbvtk.DFLT_NODES} {nbNodes:d} {dbvtk.DFLT_DOUBLE}\n'
+    # coordinates (2d: z coordinate set to 0)
+    yield from precision.formatRows(nodes, precision.getPolicy(precisionPolicy, 'nodes'),
+                                    suffix=' 0.0' if dimPb == 2 else '')
 
 
 def WriteNodesXML(fileHandle, nodes):
@@ -489,25 +885,40 @@ def WriteNodesXML(fileHandle, nodes):
 
 def WriteElemsV2(fileHandle: fileio.fileHandler, elements: list) -> None:
     """
-    Write elements for an unstructured grid to a file.
-
-    This function writes the connectivity and type information of elements
-    in an unstructured grid format to the provided file handle.
+    Write elements for an unstructured grid to a file (see `encodeElemsV2`).
 
     Args:
         fileHandle (fileio.fileHandler): A file handler object used to write data to a file.
         elements (list): A list of element data, where each element is a dictionary-like
                          structure containing mesh and field type information.
+    """
+    for chunk in encodeElemsV2(elements):
+        fileHandle.write(chunk)
+
+
+def encodeElemsV2(elements: list) -> Iterator[str]:
+    """
+    Encode elements for an unstructured grid.
+
+    This function encodes the connectivity and type information of elements
+    in an unstructured grid format.
+
+    Args:
+        elements (list): A list of element data, where each element is a dictionary-like
+                         structure containing mesh and field type information.
+
+    Yields:
+        str: The chunks of text of the sections `CELLS` and `CELL_TYPES`.
 
     The function performs the following steps:
         1. Counts the total number of elements and the total number of integers required
            to represent the connectivity of the elements.
-        2. Writes the size declaration for the elements and their connectivity.
-        3. Iterates over the element types to write the connectivity of each element
-           to the file.
-        4. Writes the declaration of cell types for the elements.
-        5. Iterates over the element types again to write the VTK element type for each
-           element to the file.
+        2. Yields the size declaration for the elements and their connectivity.
+        3. Iterates over the element types to encode the connectivity of the elements
+           (number of nodes then nodes of each element, rows formatted in bulk).
+        4. Yields the declaration of cell types for the elements.
+        5. Iterates over the element types again to encode the VTK element type of the
+           elements.
 
     Notes:
         - The function assumes that `configMESH.DFLT_MESH` and `configMESH.DFLT_FIELD_TYPE`
@@ -516,13 +927,6 @@ def WriteElemsV2(fileHandle: fileio.fileHandler, elements: list) -> None:
           per element based on the field type.
         - The `dbvtk.getVTKElemType` function is used to determine the VTK element type
           for each field type.
-
-    Raises:
-        Any exceptions raised by the file handler or the utility functions used
-        within this function.
-
-    Returns:
-        None
     """
     # count data
     nbElems = 0
@@ -533,27 +937,27 @@ def WriteElemsV2(fileHandle: fileio.fileHandler, elements: list) -> None:
         Logger.debug(f'{itE[configMESH.DFLT_MESH].shape[0]} {itE[configMESH.DFLT_FIELD_TYPE]}')
 
     # initialize size declaration
-    fileHandle.write(f'\n{dbvtk.DFLT_ELEMS} {nbElems:d} {nbInt+nbElems:d}\n')
+    yield f'\n{dbvtk.DFLT_ELEMS} {nbElems:d} {nbInt+nbElems:d}\n'
     Logger.debug(f'Start writing {nbElems} {dbvtk.DFLT_ELEMS}')
+    policy = precision.getPolicy()
     # along the element types
     for itE in elements:
-        # get the numbering the the element and the number of nodes per element
+        # number of nodes per element followed by the nodes
         nbNodesPerCell = dbvtk.getNumberNodes(itE[configMESH.DFLT_FIELD_TYPE])
-        formatSpec = '{:d} '
-        formatSpec += ' '.join('{:d}' for _ in range(nbNodesPerCell))
-        formatSpec += '\n'
-        # write cells
-        for e in itE[configMESH.DFLT_MESH]:
-            fileHandle.write(formatSpec.format(nbNodesPerCell, *e))
+        mesh = itE[configMESH.DFLT_MESH]
+        rows = np.empty((mesh.shape[0], 1 + nbNodesPerCell), dtype=np.int64)
+        rows[:, 0] = nbNodesPerCell
+        rows[:, 1:] = mesh
+        yield from precision.formatRows(rows, policy)
 
     # declaration of cell types
-    fileHandle.write(f'\n{dbvtk.DFLT_ELEMS_TYPE} {nbElems:d}\n')
+    yield f'\n{dbvtk.DFLT_ELEMS_TYPE} {nbElems:d}\n'
     Logger.debug(f'Start writing {nbElems} {dbvtk.DFLT_ELEMS_TYPE}')
     # along the element types
     for itE in elements:
         numElemVTK, _ = dbvtk.getVTKElemType(itE[configMESH.DFLT_FIELD_TYPE])
-        for _ in range(itE[configMESH.DFLT_MESH].shape[0]):
-            fileHandle.write(f'{numElemVTK:d}\n')
+        yield from precision.formatRows(np.full(itE[configMESH.DFLT_MESH].shape[0], numElemVTK,
+                                                dtype=np.int64), policy)
 
 
 def WriteElemsXML(fileHandle, elements):
@@ -566,7 +970,8 @@ def WriteFieldsV2(fileHandle: fileio.fileHandler,
                   nbNodes: int,
                   nbElems: int,
                   fields: list,
-                  numStep: Optional[int] = None)-> None:
+                  numStep: Optional[int] = None,
+                  precisionPolicy: Union[str, int, None] = None)-> None:
     """
     Writes nodal and elemental field data to a file in a specific format.
 
@@ -584,6 +989,8 @@ def WriteFieldsV2(fileHandle: fileio.fileHandler,
             - 'steps' (optional): A list of steps used to declare fields.
             - 'nbsteps' (optional): The number of steps used to declare fields.
         numStep (int, optional): The specific time step for which data is being written. Defaults to None.
+        precisionPolicy (Union[str, int, None], optional): The precision policy of the values
+            (see `precision.getPolicy`). Defaults to None ('legacy').
 
     Field Types:
         - Nodal fields: Data associated with nodes.
@@ -666,7 +1073,7 @@ def WriteFieldsV2(fileHandle: fileio.fileHandler,
             for iX in iXElementalScalar:
                 # get array of data
                 data = getData(fields[iX], numStep)
-                writeScalarsDataV2(fileHandle, data, fields[iX]['name'])
+                writeScalarsDataV2(fileHandle, data, fields[iX]['name'], precisionPolicy)
         # write fields
         if len(iXElementalField) > 0:
             Logger.debug(f'Start writing {len(iXElementalField)} {dbvtk.DFLT_FIELD}')
@@ -675,7 +1082,7 @@ def WriteFieldsV2(fileHandle: fileio.fileHandler,
             for iX in iXElementalField:
                 # get array of data
                 data = getData(fields[iX], numStep)
-                writeFieldsDataV2(fileHandle, data, fields[iX]['name'])
+                writeFieldsDataV2(fileHandle, data, fields[iX]['name'], precisionPolicy)
 
     # write POINT_DATA
     if len(iXNodalField) + len(iXNodalScalar) > 0:
@@ -686,7 +1093,7 @@ def WriteFieldsV2(fileHandle: fileio.fileHandler,
             for iX in iXNodalScalar:
                 # get array of data
                 data = getData(fields[iX], numStep)
-                writeScalarsDataV2(fileHandle, data, fields[iX]['name'])
+                writeScalarsDataV2(fileHandle, data, fields[iX]['name'], precisionPolicy)
         # write fields
         if len(iXNodalField) > 0:
             Logger.debug(f'Start writing {len(iXNodalField)} {dbvtk.DFLT_FIELD}')
@@ -695,7 +1102,7 @@ def WriteFieldsV2(fileHandle: fileio.fileHandler,
             for iX in iXNodalField:
                 # get array of data
                 data = getData(fields[iX], numStep)
-                writeFieldsDataV2(fileHandle, data, fields[iX]['name'])
+                writeFieldsDataV2(fileHandle, data, fields[iX]['name'], precisionPolicy)
 
 
 def getData(data: dict, num: Optional[int]) -> np.ndarray:
@@ -733,10 +1140,13 @@ def getData(data: dict, num: Optional[int]) -> np.ndarray:
     elif configMESH.DFLT_FIELD_NBSTEPS in data.keys():
         if data[configMESH.DFLT_FIELD_NBSTEPS] > 0 and num is not None:
             dataOut = data[configMESH.DFLT_FIELD_DATA][num]
-    return np.array(dataOut)
+    return np.asarray(dataOut)
 
 
-def writeScalarsDataV2(fileHandle: fileio.fileHandler, data: np.ndarray, name: str) -> None:
+def writeScalarsDataV2(fileHandle: fileio.fileHandler,
+                       data: np.ndarray,
+                       name: str,
+                       precisionPolicy: Union[str, int, None] = None) -> None:
     """
     Writes scalar data to a file using the SCALARS format.
 
@@ -750,6 +1160,8 @@ def writeScalarsDataV2(fileHandle: fileio.fileHandler, data: np.ndarray, name: s
         data (np.ndarray): A NumPy array containing the scalar or vector data to be written.
                            If the array is 2D, each row is treated as a vector.
         name (str): The name of the scalar data to be written.
+        precisionPolicy (Union[str, int, None], optional): The precision policy of the
+                           floating point values (see `precision.getPolicy`). Defaults to None.
 
     Raises:
         ValueError: If the data type of the input array is not supported.
@@ -757,7 +1169,8 @@ def writeScalarsDataV2(fileHandle: fileio.fileHandler, data: np.ndarray, name: s
     Notes:
         - The function writes the data type (`int` or `double`) and the number of components
           (1 for scalars, >1 for vectors) to the file.
-        - The data is formatted with a precision of 4 decimal places for floating-point numbers.
+        - The floating-point numbers are formatted following the precision policy
+          (4 decimal places with the 'legacy' policy).
         - The function uses a logger to record the start of the writing process.
     """
     if len(data.shape) > 1:
@@ -766,23 +1179,18 @@ def writeScalarsDataV2(fileHandle: fileio.fileHandler, data: np.ndarray, name: s
         nbComp = 1
     # dataType
     dataType = 'double'
-    formatSpec = ' '.join('{:9.4f}' for _ in range(nbComp)) + '\n'
     if issubclass(data.dtype.type, np.integer):
         dataType = 'int'
-        formatSpec = ' '.join('{:d}' for _ in range(nbComp)) + '\n'
-    elif issubclass(data.dtype.type, np.floating):
-        dataType = 'double'
-        formatSpec = ' '.join('{:9.4f}' for _ in range(nbComp)) + '\n'
     Logger.debug(f'Start writing {dbvtk.DFLT_SCALARS} {name}')
     fileHandle.write(f'{dbvtk.DFLT_SCALARS} {name} {dataType} {nbComp:d}\n')
     fileHandle.write(f'{dbvtk.DFLT_TABLE} {dbvtk.DFLT_TABLE_DEFAULT}\n')
-    for d in data:
-        fileHandle.write(formatSpec.format(d))
+    precision.writeRows(fileHandle, data, precision.getPolicy(precisionPolicy, 'fields'))
 
 
 def writeFieldsDataV2(fileHandle: fileio.fileHandler,
                       data: np.ndarray,
-                      name: str) -> None:
+                      name: str,
+                      precisionPolicy: Union[str, int, None] = None) -> None:
     """
     Writes a 2D NumPy array to a file using a custom FIELD format.
 
@@ -795,6 +1203,9 @@ def writeFieldsDataV2(fileHandle: fileio.fileHandler,
         a data point, and each column represents a component of the data.
     name : str
         The name of the field to be written.
+    precisionPolicy : Union[str, int, None], optional
+        The precision policy of the floating point values (see `precision.getPolicy`).
+        Defaults to None ('legacy').
 
     Notes:
     ------
@@ -803,7 +1214,7 @@ def writeFieldsDataV2(fileHandle: fileio.fileHandler,
     - The FIELD format includes the field name, the number of components per data
       point, the number of data points, and the data type.
     - Each row of the array is written in a formatted style, with floating-point
-      numbers formatted to 4 decimal places.
+      numbers formatted following the precision policy (4 decimal places by default).
 
     Example:
     --------
@@ -817,18 +1228,12 @@ def writeFieldsDataV2(fileHandle: fileio.fileHandler,
     nbComp = data.shape[1]
     # dataType
     dataType = 'double'
-    formatSpec = ' '.join('{:9.4f}' for _ in range(nbComp)) + '\n'
     if issubclass(data.dtype.type, np.integer):
         dataType = 'int'
-        formatSpec = ' '.join('{:d}' for _ in range(nbComp)) + '\n'
-    elif issubclass(data.dtype.type, np.floating):
-        dataType = 'double'
-        formatSpec = ' '.join('{:9.4f}' for _ in range(nbComp)) + '\n'
     # start writing
     Logger.debug(f'Start writing {dbvtk.DFLT_FIELD} {name}')
     fileHandle.write(f'{name} {nbComp:d} {data.shape[0]:d} {dataType}\n')
-    for d in data:
-        fileHandle.write(formatSpec.format(*d))
+    precision.writeRows(fileHandle, data, precision.getPolicy(precisionPolicy, 'fields'))
 
 
 def WriteFieldsXML(fileHandle, nbNodes, nbElems, fields, numStep=None):
@@ -839,3 +1244,5 @@ def WriteFieldsXML(fileHandle, nbNodes, nbElems, fields, numStep=None):
 
 writer = VTKWriter
 vtkWriter = VTKWriter
+reader = VTKReader
+vtkReader = VTKReader
@@ -12,14 +12,14 @@ from typing import Union, Optional
 import time
 
 import numpy as np
-# pylint: disable=no-member
-import vtk
-import vtkmodules.util.numpy_support as ns
 from loguru import logger as Logger
-# pylint: disable=c-extension-no-member, no-member
-import lxml.etree as etree
 
-from . import configMESH, dbvtk, various, writerClass
+from . import configMESH, dbvtk, meshdata, metrics, various, writerClass
+
+# heavy backends imported on first use (libvtk to write the files, lxml for the PVD files)
+vtk = various.LazyModule('vtk')
+ns = various.LazyModule('vtkmodules.util.numpy_support')
+etree = various.LazyModule('lxml.etree')
 
 
 class VTKWriter(writerClass.Writer):
@@ -49,6 +49,7 @@ class VTKWriter(writerClass.Writer):
         title: str|None = None,
         verbose: bool = False,
         opts: dict|None = None,
+        mesh: Optional[meshdata.Mesh] = None,
     )-> None:
         """
         Initialize the VTK writer class.
@@ -63,6 +64,8 @@ class VTKWriter(writerClass.Writer):
             verbose (bool, optional): Whether to enable verbose logging. Defaults to False.
             opts (dict, optional): Options for file writing, such as binary or ASCII mode.
                 Defaults to {'binary': False, 'ascii': True}.
+            mesh (meshdata.Mesh, optional): Mesh container replacing the nodes, elements and
+            fields (inputs adapted and analysed once). Defaults to None.
 
         Notes:
             - This method initializes the VTK writer, adapts inputs, prepares new fields,
@@ -78,9 +81,18 @@ class VTKWriter(writerClass.Writer):
         #
         Logger.info('Start writing vtk/vtu file using libvtk')
         # adapt inputs
-        nodesOk, elementsOk, fieldsOk = writerClass.adaptInputs(nodes, elements, fields)
+        nodesOk, elementsOk, fieldsOk = writerClass.getInputs(nodes, elements, fields, mesh, offset=0)
+        # merging of the coincident nodes (option 'merge')
+        nodesOk, elementsOk, fieldsOk, mergeMap = writerClass.mergeInputs(nodesOk, elementsOk, fieldsOk,
+                                                                          opts, offset=0)
+        # renumbering of the nodes and elements (option 'reorder')
+        nodesOk, elementsOk, fieldsOk, permutation = writerClass.reorderInputs(nodesOk, elementsOk, fieldsOk,
+                                                                               opts, offset=0)
+        # derived data of the mesh container not valid for merged or renumbered inputs
+        if mergeMap is not None or permutation is not None:
+            mesh = None
         # prepare new fields (from physical groups for instance)
-        newFields = self.createNewFields(elementsOk)
+        newFields = self.createNewFields(elementsOk, mesh)
         if newFields:
             if not fieldsOk:
                 fieldsOk = list()
@@ -88,7 +100,9 @@ class VTKWriter(writerClass.Writer):
         # initialization
         if opts is None:
             opts = {'binary': False, 'ascii': True}
-        super().__init__(filename, nodesOk, elementsOk, fieldsOk, append, title, opts)
+        super().__init__(filename, nodesOk, elementsOk, fieldsOk, append, title, opts, mesh)
+        self.permutation = permutation
+        self.mergeMap = mergeMap
         # vtk data
         self.ugrid = None
         self.writer = None
@@ -96,6 +110,7 @@ class VTKWriter(writerClass.Writer):
         self.db = dbvtk
         # write contents depending on the number of steps
         self.writeContentsSteps(nodesOk, elementsOk, fieldsOk)
+        self.metrics.close()
 
     def getAppend(self)-> bool:
         """
@@ -231,15 +246,15 @@ class VTKWriter(writerClass.Writer):
 
         # write in file
         starttime = time.perf_counter()
-        with open(filename, 'wb') as f:
-            f.write(xml_str)
+        with self.metrics.span('pvd', items=len(dataPVD)) as span, open(filename, 'wb') as f:
+            span.bytes = f.write(xml_str)
 
         txt = f'PVD file written {filename} ({various.convert_size(filename.stat().st_size)}) '
         txt += f'- Elapsed {(time.perf_counter()-starttime):.4f} s'
         Logger.info(txt)
 
 
-    @various.timeit('Fields declared')
+    @metrics.section('fields', 'Fields declared')
     def writeContents(self,
                       nodes: Optional[Union[list, np.ndarray]] = None,
                       elements: Optional[Union[list, np.ndarray, dict]] = None,
@@ -312,19 +327,18 @@ class VTKWriter(writerClass.Writer):
                 else:
                     Logger.error(f'Field type {typedata} not recognized')
 
-    @various.timeit('Nodes declared')
+    @metrics.section('nodes', 'Nodes declared', items='nbNodes')
     def writeNodes(self, nodes: Union[list, np.ndarray])-> None:
         """
         Writes the given nodes to the VTK unstructured grid.
 
         This method takes a list or numpy array of nodes and adds them as points
-        to the VTK unstructured grid (`ugrid`). Each node is expected to be a
-        3D coordinate.
+        to the VTK unstructured grid (`ugrid`). 2D nodes get a zero z-coordinate.
 
         Args:
-            nodes (Union[list, np.ndarray]): A list or numpy array of shape (N, 3),
-            where N is the number of nodes, and each node is represented by
-            its 3D coordinates (x, y, z).
+            nodes (Union[list, np.ndarray]): A list or numpy array of shape (N, 3)
+            or (N, 2), where N is the number of nodes, and each node is represented by
+            its coordinates (x, y[, z]).
 
         Returns:
             None
@@ -333,12 +347,11 @@ class VTKWriter(writerClass.Writer):
             Logger.error('Unstructured grid is not initialized. Cannot write nodes.')
             return
         points = vtk.vtkPoints()
-        nodes_run = np.asarray(nodes)
-        for i in range(len(nodes_run)):
-            points.InsertNextPoint(*nodes_run[i, :])
+        # bulk copy of the coordinates (z-coordinate added to 2D nodes)
+        points.SetData(ns.numpy_to_vtk(np.ascontiguousarray(writerClass.getNodes3D(nodes)), deep=True))
         self.ugrid.SetPoints(points)
 
-    @various.timeit('Elements declared')
+    @metrics.section('elements', 'Elements declared', items='nbElems')
     def writeElements(self, elements: Union[list, np.ndarray, dict])-> None:
         """
         Writes elements to the unstructured grid (ugrid) based on the provided input.
@@ -354,32 +367,31 @@ class VTKWriter(writerClass.Writer):
             KeyError: If required keys ('type' or 'connectivity') are missing in an element.
 
         Notes:
-            - The method uses the `dbvtk.getVTKObj` function to retrieve the VTK cell object
-              and the number of nodes for the given element type.
-            - Each element's connectivity is used to set the point IDs for the VTK cell,
-              which is then inserted into the unstructured grid.
+            - The cells of all the blocks are set at once from the arrays of the VTK types,
+              offsets and connectivity (see `writerClass.getCellArrays`), built once per mesh
+              container and shared with its other writers.
             - Debug logs are generated to indicate the number and type of elements being processed.
 
         """
         if self.ugrid is None:
             Logger.error('Unstructured grid is not initialized. Cannot write elements.')
             return
+        if isinstance(elements, dict):
+            elements = [elements]
         for m in elements:
-            # get connectivity data
-            typeElem = m.get('type')
-            connectivity = m.get('connectivity')
-            _ = m.get('physgrp', None)
-            # load element's vtk class
-            cell, nbNodes = dbvtk.getVTKObj(typeElem)
-            Logger.debug(f'Set {len(connectivity)} elements of type {typeElem}')
-            #
-            for t in connectivity:
-                for i in range(nbNodes):
-                    cell.GetPointIds().SetId(i, t[i])
-                self.ugrid.InsertNextCell(cell.GetCellType(), cell.GetPointIds())
+            Logger.debug(f'Set {len(m.get("connectivity"))} elements of type {m.get("type")}')
+        if self.mesh is not None:
+            types, offsets, connectivity = self.mesh.getCellArrays()
+        else:
+            types, offsets, connectivity = writerClass.getCellArrays(elements)
+        cells = vtk.vtkCellArray()
+        cells.SetData(ns.numpy_to_vtk(offsets, deep=True, array_type=vtk.VTK_TYPE_INT64),
+                      ns.numpy_to_vtk(connectivity, deep=True, array_type=vtk.VTK_TYPE_INT64))
+        self.ugrid.SetCells(ns.numpy_to_vtk(types, deep=True, array_type=vtk.VTK_UNSIGNED_CHAR), cells)
 
     def createNewFields(self,
-                        elems: Union[list, np.ndarray, dict])-> Optional[list]:
+                        elems: Union[list, np.ndarray, dict],
+                        mesh: Optional[meshdata.Mesh] = None)-> Optional[list]:
         """
         Create new fields based on the provided elements data.
 
@@ -391,11 +403,13 @@ class VTKWriter(writerClass.Writer):
             elems (Union[list, np.ndarray, dict]): A dictionary or collection of element data. Each
                 element is expected to be a dictionary containing mesh and optionally
                 physical group information.
+            mesh (Optional[meshdata.Mesh]): The mesh container of the elements (cached
+                physical groups). Defaults to None.
 
         Returns:
             Optional[list]: A list of dictionaries representing the new fields if a
             physical group is found. Each dictionary contains:
-                - 'data': A NumPy array of physical group data for the elements.
+                - 'data': The int32 physical groups of the elements (also kept in `physGrpData`).
                 - 'type': The type of the field, which is 'elemental'.
                 - 'dim': The dimensionality of the field, which is 1.
                 - 'name': The name of the field, corresponding to the physical group key.
@@ -407,30 +421,12 @@ class VTKWriter(writerClass.Writer):
             - If no physical group data is found, the method assigns a default value
               of -1 to the field data.
         """
-        # check if physgroup exists
-        physGrp = False
-        newFields = None
-        for itE in elems:
-            if configMESH.DFLT_PHYS_GRP in itE.keys():
-                physGrp = True
-                break
-        if physGrp:
-            newFields = list()
-            data = list()
-            for itE in elems:
-                nbElems = itE[configMESH.DFLT_MESH].shape[0]
-                if configMESH.DFLT_PHYS_GRP in itE.keys():
-                    dataPhys = np.array(itE[configMESH.DFLT_PHYS_GRP], dtype=int)
-                    if len(dataPhys) == nbElems:
-                        data = np.append(data, dataPhys)
-                    else:
-                        data = np.append(data, dataPhys[0] * np.ones(nbElems))
-                else:
-                    data = np.append(data, -np.ones(nbElems))
-            Logger.debug('Create new field for physical group')
-            newFields.extend([{'data': data, 'type': 'elemental', 'dim': 1, 'name': configMESH.DFLT_PHYS_GRP}])
-
-        return newFields
+        # physical groups of the elements (computed once, shared by all the steps)
+        self.physGrpData = mesh.getPhysGrpData() if mesh is not None else writerClass.getPhysGrpData(elems)
+        if self.physGrpData is None:
+            return None
+        Logger.debug('Create new field for physical group')
+        return [{'data': self.physGrpData, 'type': 'elemental', 'dim': 1, 'name': configMESH.DFLT_PHYS_GRP}]
 
     def setField(self,
                  field: dict,
@@ -480,9 +476,9 @@ class VTKWriter(writerClass.Writer):
             if nbsteps is None:
                 nbsteps = 1
             #
-            if not steps and nbsteps>1:
+            if steps is None and nbsteps>1:
                 steps = np.arange(nbsteps, dtype=int)
-            if not timesteps and nbsteps>1:
+            if timesteps is None and nbsteps>1:
                 timesteps = np.zeros(nbsteps)
 
             if data is not None and (nbsteps > 1 or steps is not None):
@@ -514,7 +510,7 @@ class VTKWriter(writerClass.Writer):
         return dataVtk, typeField
 
     def write(self,
-              ugrid: Optional[vtk.vtkUnstructuredGrid]=None,
+              ugrid: Optional['vtk.vtkUnstructuredGrid']=None,
               filename: Optional[str|Path]=None)-> None:
         """
         Write a VTK unstructured grid to disk.
@@ -559,8 +555,11 @@ class VTKWriter(writerClass.Writer):
         # self.writer.SetWriteTimeValue(True)
 
         starttime = time.perf_counter()
-        vtk_writer.Write()
         filename = Path(filename)
+        with self.metrics.span('write', file=filename.name) as span:
+            vtk_writer.Write()
+        if self.metrics.enabled:
+            span.bytes = filename.stat().st_size
         txt = f'Data save in {filename} ({various.convert_size(filename.stat().st_size)}) '
         txt += f'- Elapsed {(time.perf_counter()-starttime):.4f} s'
         Logger.info(txt)
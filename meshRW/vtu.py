@@ -0,0 +1,484 @@
+"""
+This file is part of the meshRW package
+---
+This class will read XML VTK files of unstructured grids (.vtu) without libvtk.
+Documentation available here:
+https://docs.vtk.org/en/latest/design_documents/VTKFileFormats.html#xml-file-formats
+----
+Luc Laurent - luc.laurent@lecnam.net -- 2021
+"""
+
+import base64
+import lzma
+import mmap
+import re
+import zlib
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Union
+from xml.etree import ElementTree
+
+import numpy as np
+from loguru import logger as Logger
+
+from . import configMESH, dbvtk, fileio, vtk
+
+# tags of the XML file (before the appended data)
+REGEX_TAG = re.compile(rb'<(/?)([A-Za-z]+)([^>]*?)(/?)>')
+# attributes of a tag
+REGEX_ATTRIBUTE = re.compile(rb'([A-Za-z_]+)\s*=\s*"([^"]*)"')
+# default number of steps kept in the cache of the PVD reader
+DFLT_CACHE_SIZE: int = 4
+# decompression functions of the compressors
+DFLT_COMPRESSORS: dict = {
+    'vtkZLibDataCompressor': zlib.decompress,
+    'vtkLZMADataCompressor': lzma.decompress,
+}
+
+
+def getBase64Length(nbBytes: int)-> int:
+    """
+    Get the number of characters of a base64 encoded buffer.
+
+    Args:
+        nbBytes (int): The number of bytes of the buffer.
+
+    Returns:
+        int: The number of characters (with padding).
+    """
+    return 4 * ((nbBytes + 2) // 3)
+
+
+def getAttributes(txt: bytes)-> dict:
+    """
+    Get the attributes of a tag.
+
+    Args:
+        txt (bytes): The content of the tag after its name.
+
+    Returns:
+        dict: The attributes (names and values as str).
+    """
+    return {k.decode(): v.decode() for k, v in REGEX_ATTRIBUTE.findall(txt)}
+
+
+class VTUReader(vtk.VTKReader):
+    """
+    Read XML VTK files of unstructured grids (.vtu) without libvtk.
+
+    The `DataArray` tags are located with a scan of the XML header (the appended data
+    are not parsed as XML) and their payloads are decoded directly into NumPy arrays:
+    ASCII (`np.fromstring`), inline or appended base64 and raw appended data, compressed
+    by blocks (zlib or lzma) or not. Raw appended data of uncompressed files can be
+    memory-mapped (`mmap=True`): the arrays are then views of the file. The cells are
+    grouped in one block per type (see `vtk.VTKReader`) and the data are exposed through
+    the same API (`getNodes`, `getElements`, `getFields`).
+
+    Attributes:
+        byteOrder (str): The byte order of the binary data ('<' or '>').
+        headerType (str): The type of the headers of the binary data.
+        compressor (Optional[str]): The compressor of the binary data.
+    """
+
+    def __init__(self,
+                 filename: Union[str, Path, None]=None,
+                 dim: int=3,
+                 mmap: bool=False,
+                 fieldNames: Optional[list]=None,
+                 geometry: bool=True)-> None:
+        """
+        Initializes the VTU reader object and reads the file.
+
+        Args:
+            filename (Union[str, Path], optional): The path to the VTU file. Defaults to None.
+            dim (int, optional): The dimension of the nodes to keep (2 or 3). Defaults to 3.
+            mmap (bool, optional): If True, the file is memory-mapped and the raw appended
+                data are not copied (ignored for compressed files). Defaults to False.
+            fieldNames (Optional[list], optional): The names of the fields to read (the other
+                arrays are not decoded). Defaults to None (all the fields).
+            geometry (bool, optional): If False, the nodes and the cells are not read (the
+                elemental fields are then kept in the order of the file). Defaults to True.
+
+        Raises:
+            ValueError: If the file is not a VTU file or if a data format is not supported.
+        """
+        self.mmap = mmap
+        self.byteOrder = '<'
+        self.headerType = 'UInt32'
+        self.compressor = None
+        self.appendedStart = 0
+        self.appendedEncoding = 'raw'
+        self.fieldNames = fieldNames
+        self.geometry = geometry
+        super().__init__(filename, dim)
+
+    def readFile(self, dim: Optional[int]=3)-> None:
+        """
+        Read the content of the file (memory-mapped if requested).
+
+        Args:
+            dim (Optional[int], optional): The dimension of the nodes to keep. Defaults to 3.
+        """
+        if not self.mmap or fileio.getCodecFromExtension(self.filename) is not None:
+            super().readFile(dim)
+            return
+        Logger.debug(f'Map file {self.filename}')
+        with self.metrics.span('read', mmap=True) as span, open(self.filename, 'rb') as f:
+            content = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            span.bytes = len(content)
+        with self.metrics.span('parse'):
+            self.readContent(content, dim)
+
+    def readContent(self, content: Union[bytes, mmap.mmap], dim: Optional[int]=3)-> None:
+        """
+        Read the content of the file.
+
+        Args:
+            content (Union[bytes, mmap.mmap]): The content of the file.
+            dim (Optional[int], optional): The dimension of the nodes to keep. Defaults to 3.
+
+        Raises:
+            ValueError: If the file is not a VTU file.
+        """
+        self.content = content
+        headerEnd = content.find(b'<AppendedData')
+        if headerEnd >= 0:
+            tagEnd = content.find(b'>', headerEnd)
+            self.appendedEncoding = getAttributes(content[headerEnd:tagEnd]).get('encoding', 'raw')
+            # data start after the underscore
+            self.appendedStart = content.find(b'_', tagEnd) + 1
+        else:
+            headerEnd = len(content)
+        pieces = []
+        section = None
+        for match in REGEX_TAG.finditer(content, 0, headerEnd):
+            closing, tag, attributes = match.group(1), match.group(2).decode(), getAttributes(match.group(3))
+            if tag == 'VTKFile' and not closing:
+                if attributes.get('type') != 'UnstructuredGrid':
+                    raise ValueError(f'File {self.filename} is not a VTU file')
+                self.version = attributes.get('version', '')
+                self.byteOrder = '>' if attributes.get('byte_order') == 'BigEndian' else '<'
+                self.headerType = attributes.get('header_type', 'UInt32')
+                self.compressor = attributes.get('compressor')
+            elif tag == 'Piece' and not closing:
+                pieces.append({'points': None, 'cells': {},
+                               configMESH.DFLT_FIELD_TYPE_NODAL: [], configMESH.DFLT_FIELD_TYPE_ELEMENT: []})
+            elif tag in ('Points', 'Cells', 'PointData', 'CellData'):
+                section = None if closing else tag
+            elif tag == 'DataArray' and not closing:
+                name = attributes.get('Name', '')
+                if not self.isRequired(section, name):
+                    continue
+                data = self.readDataArray(attributes, match.end())
+                if section == 'Points':
+                    pieces[-1]['points'] = data
+                elif section == 'Cells':
+                    pieces[-1]['cells'][name] = data
+                elif section == 'PointData':
+                    pieces[-1][configMESH.DFLT_FIELD_TYPE_NODAL].append((name, data))
+                elif section == 'CellData':
+                    pieces[-1][configMESH.DFLT_FIELD_TYPE_ELEMENT].append((name, data))
+        self.storePieces(pieces, dim)
+        self.content = b''
+
+    def isRequired(self, section: Optional[str], name: str)-> bool:
+        """
+        Check if an array must be decoded.
+
+        Args:
+            section (Optional[str]): The section of the array ('Points', 'Cells', 'PointData'
+                or 'CellData').
+            name (str): The name of the array.
+
+        Returns:
+            bool: True if the array must be decoded.
+        """
+        if section in ('Points', 'Cells'):
+            return self.geometry
+        return self.fieldNames is None or name in self.fieldNames
+
+    def storePieces(self, pieces: list, dim: Optional[int]=3)-> None:
+        """
+        Store the nodes, elements and fields of the pieces (nodes of the pieces are
+        concatenated).
+
+        Args:
+            pieces (list): The arrays read in each piece.
+            dim (Optional[int], optional): The dimension of the nodes to keep. Defaults to 3.
+        """
+        nodes, connectivity, offsets, types = [], [], [np.zeros(1, dtype=np.int64)], []
+        nbNodes = nbConnectivity = 0
+        for piece in pieces:
+            if piece['points'] is None:
+                continue
+            points = piece['points'].reshape(-1, 3)
+            nodes.append(points)
+            cells = piece['cells']
+            connectivity.append(cells['connectivity'].astype(np.int64) + nbNodes)
+            offsets.append(cells['offsets'].astype(np.int64) + nbConnectivity)
+            types.append(cells['types'])
+            nbNodes += points.shape[0]
+            nbConnectivity += cells['connectivity'].size
+        if nodes:
+            self.nodes = (nodes[0] if len(nodes) == 1 else np.concatenate(nodes))[:, :dim]
+        for typeField in (configMESH.DFLT_FIELD_TYPE_NODAL, configMESH.DFLT_FIELD_TYPE_ELEMENT):
+            for i, (name, _) in enumerate(pieces[0][typeField] if pieces else []):
+                arrays = [p[typeField][i][1] for p in pieces]
+                data = arrays[0] if len(arrays) == 1 else np.concatenate(arrays)
+                self.addField(name, data.reshape(data.shape[0], -1), typeField)
+        if types:
+            with self.metrics.span('elements', items=sum(t.size for t in types)):
+                self.buildElements(np.concatenate(connectivity), np.concatenate(offsets), np.concatenate(types))
+
+    def readDataArray(self, attributes: dict, start: int)-> np.ndarray:
+        """
+        Read the values of a `DataArray`.
+
+        Args:
+            attributes (dict): The attributes of the `DataArray` tag.
+            start (int): The position of the end of the tag.
+
+        Returns:
+            np.ndarray: The values (one row per tuple if the array has several components).
+
+        Raises:
+            ValueError: If the type or the format of the data is not supported.
+        """
+        if attributes.get('type') not in dbvtk.DFLT_XML_DATA_TYPES:
+            raise ValueError(f'Data type {attributes.get("type")} not supported')
+        dtype = np.dtype(dbvtk.DFLT_XML_DATA_TYPES[attributes['type']]).newbyteorder(self.byteOrder)
+        dataFormat = attributes.get('format', 'ascii')
+        with self.metrics.span('array', array=attributes.get('Name'), format=dataFormat) as span:
+            if dataFormat == 'appended':
+                values = self.decodeBinary(self.appendedStart + int(attributes['offset']),
+                                           dtype,
+                                           self.appendedEncoding == 'base64')
+            else:
+                # inline data end at the next tag (closing tag or information keys)
+                end = self.content.find(b'<', start)
+                inline = self.content[start:end]
+                if dataFormat == 'ascii':
+                    values = np.fromstring(inline.decode('ascii'), sep=' ').astype(dtype)
+                elif dataFormat == 'binary':
+                    values = self.decodeBinary(start + len(inline) - len(inline.lstrip()), dtype, True)
+                else:
+                    raise ValueError(f'Data format {dataFormat} not supported')
+            span.bytes = values.nbytes
+        nbComp = int(attributes.get('NumberOfComponents', 1))
+        if nbComp > 1:
+            values = values.reshape(-1, nbComp)
+        return values
+
+    def decodeBinary(self, start: int, dtype: np.dtype, encoded: bool)-> np.ndarray:
+        """
+        Decode binary data (header giving the size of the data followed by the data, or by
+        the blocks of compressed data).
+
+        Args:
+            start (int): The position of the header.
+            dtype (np.dtype): The type of the values.
+            encoded (bool): True for base64 encoded data.
+
+        Returns:
+            np.ndarray: The values.
+
+        Raises:
+            ValueError: If the compressor is not supported.
+        """
+        headerType = np.dtype(dbvtk.DFLT_XML_DATA_TYPES[self.headerType]).newbyteorder(self.byteOrder)
+        size = headerType.itemsize
+        if self.compressor is None:
+            if not encoded:
+                nbBytes = int(np.frombuffer(self.content, headerType, 1, start)[0])
+                values = np.frombuffer(self.content, dtype, nbBytes // dtype.itemsize, start + size)
+                return values if self.mmap else values.copy()
+            nbChars = getBase64Length(size)
+            nbBytes = int(np.frombuffer(base64.b64decode(self.content[start:start + nbChars]), headerType, 1)[0])
+            if self.content[start + nbChars - 1:start + nbChars] == b'=':
+                # header and data encoded separately
+                data = base64.b64decode(self.content[start + nbChars:start + nbChars + getBase64Length(nbBytes)])
+            else:
+                data = base64.b64decode(self.content[start:start + getBase64Length(size + nbBytes)])[size:]
+            return np.frombuffer(data, dtype, nbBytes // dtype.itemsize)
+        decompress = DFLT_COMPRESSORS.get(self.compressor)
+        if decompress is None:
+            raise ValueError(f'Compressor {self.compressor} not supported')
+        # header: number of blocks, size of the blocks, size of the last block, compressed sizes
+        if encoded:
+            nbBlocks = int(np.frombuffer(base64.b64decode(self.content[start:start + 4 * size]), headerType, 1)[0])
+            nbChars = getBase64Length((3 + nbBlocks) * size)
+            header = np.frombuffer(base64.b64decode(self.content[start:start + nbChars]), headerType, 3 + nbBlocks)
+            compressedSizes = header[3:].astype(np.int64)
+            data = base64.b64decode(self.content[start + nbChars:
+                                                 start + nbChars + getBase64Length(int(compressedSizes.sum()))])
+            dataStart = 0
+        else:
+            nbBlocks = int(np.frombuffer(self.content, headerType, 1, start)[0])
+            header = np.frombuffer(self.content, headerType, 3 + nbBlocks, start)
+            compressedSizes = header[3:].astype(np.int64)
+            data = self.content
+            dataStart = start + (3 + nbBlocks) * size
+        bounds = dataStart + np.concatenate(([0], np.cumsum(compressedSizes)))
+        buffer = b''.join(decompress(data[bounds[i]:bounds[i + 1]]) for i in range(nbBlocks))
+        return np.frombuffer(buffer, dtype)
+
+
+class PVDReader:
+    """
+    Read the collections of VTU files (.pvd) written by `vtk2.VTKWriter` (time series).
+
+    The `.pvd` file is parsed when the object is created; the VTU file of a step is only
+    read when the step is requested and the last read steps are kept in a cache (least
+    recently used steps are removed first). `probe` extracts the history of a nodal field
+    on some nodes by decoding only this field in each VTU file.
+
+    Attributes:
+        steps (list): The datasets of the collection [{'time': t, 'part': 0, 'file': Path}, ...]
+            (sorted by time).
+        cacheSize (int): The maximum number of steps in the cache.
+    """
+
+    def __init__(self,
+                 filename: Union[str, Path],
+                 cacheSize: int=DFLT_CACHE_SIZE,
+                 mmap: bool=False)-> None:
+        """
+        Initializes the PVD reader object and reads the collection.
+
+        Args:
+            filename (Union[str, Path]): The path to the PVD file.
+            cacheSize (int, optional): The maximum number of steps in the cache.
+                Defaults to DFLT_CACHE_SIZE.
+            mmap (bool, optional): If True, the VTU files are memory-mapped (see `VTUReader`).
+                Defaults to False.
+
+        Raises:
+            ValueError: If the file is not a collection.
+        """
+        self.filename = Path(filename)
+        self.cacheSize = cacheSize
+        self.mmap = mmap
+        self.cache = OrderedDict()
+        root = ElementTree.parse(self.filename).getroot()
+        if root.get('type') != 'Collection':
+            raise ValueError(f'File {self.filename} is not a PVD file')
+        self.steps = []
+        for dataset in root.iter('DataSet'):
+            self.steps.append({
+                'time': float(dataset.get('timestep', 0.0)),
+                'part': int(dataset.get('part', 0)),
+                'file': self.filename.parent / dataset.get('file', ''),
+            })
+        self.steps.sort(key=lambda step: (step['time'], step['part']))
+        Logger.debug(f'{len(self.steps)} datasets in {self.filename}')
+
+    def getTimes(self, part: int=0)-> np.ndarray:
+        """
+        Get the time values of the steps.
+
+        Args:
+            part (int, optional): The part of the datasets. Defaults to 0.
+
+        Returns:
+            np.ndarray: The time values (sorted).
+        """
+        return np.array([s['time'] for s in self.steps if s['part'] == part])
+
+    def getFiles(self, part: int=0)-> list:
+        """
+        Get the VTU files of the steps.
+
+        Args:
+            part (int, optional): The part of the datasets. Defaults to 0.
+
+        Returns:
+            list: The paths to the VTU files (sorted by time).
+        """
+        return [s['file'] for s in self.steps if s['part'] == part]
+
+    def getStepIndex(self, time: float, part: int=0)-> int:
+        """
+        Get the index of the step the closest to a time value.
+
+        Args:
+            time (float): The time value.
+            part (int, optional): The part of the datasets. Defaults to 0.
+
+        Returns:
+            int: The index of the step.
+        """
+        return int(np.argmin(np.abs(self.getTimes(part) - time)))
+
+    def getStep(self, numStep: int, part: int=0)-> VTUReader:
+        """
+        Get the content of a step (read if it is not in the cache).
+
+        Args:
+            numStep (int): The index of the step.
+            part (int, optional): The part of the datasets. Defaults to 0.
+
+        Returns:
+            VTUReader: The reader of the VTU file of the step.
+        """
+        filename = self.getFiles(part)[numStep]
+        if filename in self.cache:
+            self.cache.move_to_end(filename)
+            return self.cache[filename]
+        mesh = VTUReader(filename, mmap=self.mmap)
+        self.cache[filename] = mesh
+        while len(self.cache) > max(self.cacheSize, 0):
+            self.cache.popitem(last=False)
+        return mesh
+
+    def getStepAtTime(self, time: float, part: int=0)-> VTUReader:
+        """
+        Get the content of the step the closest to a time value.
+
+        Args:
+            time (float): The time value.
+            part (int, optional): The part of the datasets. Defaults to 0.
+
+        Returns:
+            VTUReader: The reader of the VTU file of the step.
+        """
+        return self.getStep(self.getStepIndex(time, part), part)
+
+    def probe(self, field: str, nodeIds: Union[list, np.ndarray], part: int=0)-> tuple:
+        """
+        Extract the history of a nodal field on some nodes along the steps.
+
+        Only the array of the field is decoded in each VTU file (the steps in the cache
+        are used directly).
+
+        Args:
+            field (str): The name of the nodal field.
+            nodeIds (Union[list, np.ndarray]): The indexes of the nodes (from 0).
+            part (int, optional): The part of the datasets. Defaults to 0.
+
+        Returns:
+            tuple: The time values (nbSteps) and the values (nbSteps x nbNodes x nbComp).
+
+        Raises:
+            ValueError: If the field is not available in a step.
+        """
+        nodeIds = np.asarray(nodeIds, dtype=np.int64)
+        history = []
+        for filename in self.getFiles(part):
+            if filename in self.cache:
+                mesh = self.cache[filename]
+            else:
+                mesh = VTUReader(filename, mmap=self.mmap, fieldNames=[field], geometry=False)
+            data = None
+            for f in mesh.getFields():
+                if (f[configMESH.DFLT_FIELD_NAME] == field
+                        and f[configMESH.DFLT_FIELD_TYPE] == configMESH.DFLT_FIELD_TYPE_NODAL):
+                    data = f[configMESH.DFLT_FIELD_DATA]
+            if data is None:
+                raise ValueError(f'Nodal field {field} not available in {filename}')
+            history.append(np.array(data[nodeIds]))
+        return self.getTimes(part), np.array(history)
+
+
+reader = VTUReader
+vtuReader = VTUReader
+pvdReader = PVDReader
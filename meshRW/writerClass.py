@@ -5,12 +5,15 @@ This file is part of the meshRW package
 from abc import ABC, abstractmethod
 from datetime import datetime
 from pathlib import Path
-from typing import Union, Optional
+from typing import TYPE_CHECKING, Callable, Optional, Union
 
 import numpy as np
 from loguru import logger as Logger
 
-from . import configMESH
+from . import configMESH, dbvtk, meshtools, metrics
+
+if TYPE_CHECKING:
+    from .meshdata import Mesh
 
 class Writer(ABC):
     """
@@ -40,6 +43,13 @@ class Writer(ABC):
         nbCellFields (int): Number of cell-based fields.
         nbPointFields (int): Number of point-based fields.
         nbTemporalFields (int): Number of temporal fields.
+        metrics (metrics.Metrics): Spans of the sections written (option 'metrics').
+        permutation (Optional[dict]): Orders of the nodes and elements written (new index ->
+            old index, keys 'nodes' and 'elements') when they are renumbered (option 'reorder').
+        mergeMap (Optional[np.ndarray]): New index of each input node when the coincident nodes
+            are merged (option 'merge').
+        mesh (Optional[meshdata.Mesh]): The mesh container of the nodes and elements (derived
+            data and encoded sections shared through its cache), None if not given.
 
     Methods:
         Subclasses implement format-specific methods for options, append behavior,
@@ -55,6 +65,7 @@ class Writer(ABC):
         append: bool = False,
         title: Optional[str] = None,
         opts: Optional[dict] = None,
+        mesh: Optional['Mesh'] = None,
     )-> None:
         """
         Initialize the writer class with the provided parameters.
@@ -74,6 +85,8 @@ class Writer(ABC):
             Defaults to None.
             opts (dict, optional): Additional options for the writer. 
             Defaults to an empty dictionary.
+            mesh (meshdata.Mesh, optional): The mesh container of the nodes and elements
+            (statistics of the elements reused from its cache). Defaults to None.
 
         Attributes:
             append (bool): Indicates if the file should be appended.
@@ -100,8 +113,15 @@ class Writer(ABC):
         self.opts = {}
         # set options
         self.setOptions(opts or {})
+        # performance metrics (option 'metrics': True or filename of the exported metrics)
+        self.metrics = metrics.Metrics(self.opts.get('metrics'),
+                                       name=self.basename,
+                                       format=self.opts.get('metricsFormat', 'json'))
         #
         self.db = None
+        self.permutation = None
+        self.mergeMap = None
+        self.mesh = mesh
         #
         self.nbNodes = 0
         self.nbElems = 0
@@ -114,12 +134,48 @@ class Writer(ABC):
         self.nbPointFields = 0
         self.nbTemporalFields = 0
         # run data analysis
-        self.dataAnalysis(nodes, elements, fields)
+        self.dataAnalysis(nodes, elements, fields, mesh)
         # check path exists
         self.checkPath(self.filename.parent)
 
 
 
+    def writeEncoded(self, handle: object, key: tuple, encode: Callable)-> None:
+        """
+        Write a section encoded by chunks of text, shared with the other writers of the mesh
+        container when it keeps the encoded sections (see `meshdata.Mesh.getEncoded`).
+
+        Args:
+            handle (object): The file handler (any object with a `write` method).
+            key (tuple): The key of the section (format, section and encoding parameters).
+            encode (Callable): The function returning the chunks of text.
+        """
+        chunks = self.mesh.getEncoded(key, encode) if self.mesh is not None else encode()
+        for chunk in chunks:
+            handle.write(chunk)  # type: ignore[attr-defined]
+
+    def getStream(self)-> Optional[object]:
+        """
+        Get the file handler in use (bytes counted by the metrics).
+
+        Returns:
+            Optional[object]: The file handler (None if the file is not open).
+        """
+        return getattr(self, 'fhandle', None)
+
+    def getReport(self)-> dict:
+        """
+        Get the performance metrics of the writing (see `metrics.Metrics.report`).
+
+        The sections are recorded only if the option 'metrics' is set (or if the metrics
+        are enabled by default, see `metrics.setEnabled`).
+
+        Returns:
+            dict: The report with the spans of the sections (header, nodes, elements, fields
+            and steps, flush...) and their totals.
+        """
+        return self.metrics.report()
+
     @abstractmethod
     def setOptions(self, opts: dict)-> None:
         """
@@ -287,22 +343,18 @@ class Writer(ABC):
             None: This method does not explicitly raise exceptions but relies on
             the `self.logBadExtension()` method to handle invalid extensions.
         """
-        extension = ''
-        filename = self.filename
-        it = 0
+        path = self.filename.parent
         allowed_extensions = getattr(self.db, 'ALLOWED_EXTENSIONS', [])
-        while it < 2:
-            path = self.filename.parent
-            filename = self.filename.stem
-            ext = self.filename.suffix
-            extension += ext
+        # check the last extension and the two last ones (compressed files)
+        filename = self.filename.name
+        extension = ''
+        for _ in range(2):
+            extension = Path(filename).suffix + extension
+            filename = Path(filename).stem
             if extension in allowed_extensions:
-                it = 3
-            else:
-                it += 1
-            if it == 2:
-                self.logBadExtension()
-        return path, filename, extension
+                return path, filename, extension
+        self.logBadExtension()
+        return path, self.filename.stem, self.filename.suffix
 
     def getFilename(self,
                     prefix: Optional[str] = None,
@@ -357,7 +409,8 @@ class Writer(ABC):
     def dataAnalysis(self,
                      nodes: Optional[Union[list, np.ndarray]],
                      elems: Optional[Union[list, np.ndarray, dict]],
-                     fields: Optional[Union[list, np.ndarray, dict]] = None)-> None:
+                     fields: Optional[Union[list, np.ndarray, dict]] = None,
+                     mesh: Optional['Mesh'] = None)-> None:
         """
         Analyzes the provided mesh data, including nodes, elements, and optional fields.
         This method computes various statistics about the mesh, such as the number of nodes,
@@ -370,6 +423,8 @@ class Writer(ABC):
                 'type', 'connectivity', 'name', and 'physgrp'.
             fields (Optional[dict]): Optional dictionary or list of dictionaries containing
                 field data associated with the mesh.
+            mesh (Optional[meshdata.Mesh]): The mesh container of the elements: its cached
+                statistics are used instead of analysing the elements again.
         Attributes:
             nbNodes (int): The total number of nodes in the mesh.
             nbElems (int): The total number of elements in the mesh.
@@ -392,48 +447,14 @@ class Writer(ABC):
         """
 
         self.nbNodes = len(nodes) if nodes is not None else 0
-        self.nbElems = 0
-        #
-        self.elemPerType = {}
-        self.elemPerGrp = {}
-        self.nameGrp = {}
-        #
-        if elems is None:
-            elems = []
-        if isinstance(elems, dict):
-            elems = [elems]
-        #
-        itGrpE = 0
-        for e in elems:
-            if e.get('type') not in self.elemPerType:
-                self.elemPerType[e.get('type')] = 0
-            self.elemPerType[e.get('type')] += len(e.get('connectivity'))
-            self.nbElems += len(e.get('connectivity'))
-            name = e.get('name', f'grp-{itGrpE}')
-            itGrpE += 1
-            if e.get('physgrp') is not None:
-                if not isinstance(e.get('physgrp'), list) or not isinstance(e.get('physgrp'), list):
-                    physgrp = [e.get('physgrp')]
-                else:
-                    physgrp = e.get('physgrp')
-                for p in np.unique(physgrp):
-                    if p not in self.elemPerGrp:
-                        self.elemPerGrp[p] = 0
-                    self.elemPerGrp[p] += len(e.get('connectivity'))
-                    #
-                    if p not in self.nameGrp:
-                        self.nameGrp[p] = name
-                    else:
-                        self.nameGrp[p] += '-' + name
-        #
-        self.listPhysGrp = list(self.elemPerGrp.keys())
-        # generate global physical group
-        numinit = configMESH.DFLT_NEW_PHYSGRP_GLOBAL_NUM
-        numit = 50
-        current = numinit
-        while current in self.listPhysGrp:
-            current += numit
-        self.globPhysGrp = current
+        # statistics of the elements (cached by the mesh container)
+        stats = mesh.getAnalysis() if mesh is not None else analyseElements(elems)
+        self.nbElems = stats['nbElems']
+        self.elemPerType = dict(stats['elemPerType'])
+        self.elemPerGrp = dict(stats['elemPerGrp'])
+        self.nameGrp = dict(stats['nameGrp'])
+        self.listPhysGrp = list(stats['listPhysGrp'])
+        self.globPhysGrp = stats['globPhysGrp']
         # show stats
         Logger.debug(f'Number of nodes: {self.nbNodes}')
         Logger.debug(f'Number of elements: {self.nbElems}')
@@ -540,17 +561,80 @@ class Writer(ABC):
 
 
 
+def analyseElements(elems: Optional[Union[list, np.ndarray, dict]])-> dict:
+    """
+    Compute the statistics of the element blocks (see `Writer.dataAnalysis`).
+
+    Args:
+        elems (Optional[Union[list, np.ndarray, dict]]): The element blocks.
+
+    Returns:
+        dict: The statistics with keys 'nbElems', 'elemPerType' (number of elements per
+        type), 'elemPerGrp' (number of elements per physical group), 'nameGrp' (names of the
+        physical groups), 'listPhysGrp' and 'globPhysGrp' (new global physical group).
+    """
+    nbElems = 0
+    elemPerType = {}
+    elemPerGrp = {}
+    nameGrp = {}
+    #
+    if elems is None:
+        elems = []
+    if isinstance(elems, dict):
+        elems = [elems]
+    #
+    itGrpE = 0
+    for e in elems:
+        if e.get('type') not in elemPerType:
+            elemPerType[e.get('type')] = 0
+        elemPerType[e.get('type')] += len(e.get('connectivity'))
+        nbElems += len(e.get('connectivity'))
+        name = e.get('name', f'grp-{itGrpE}')
+        itGrpE += 1
+        if e.get('physgrp') is not None:
+            if not isinstance(e.get('physgrp'), list) or not isinstance(e.get('physgrp'), list):
+                physgrp = [e.get('physgrp')]
+            else:
+                physgrp = e.get('physgrp')
+            for p in np.unique(physgrp):
+                if p not in elemPerGrp:
+                    elemPerGrp[p] = 0
+                elemPerGrp[p] += len(e.get('connectivity'))
+                #
+                if p not in nameGrp:
+                    nameGrp[p] = name
+                else:
+                    nameGrp[p] += '-' + name
+    #
+    listPhysGrp = list(elemPerGrp.keys())
+    # generate global physical group
+    numinit = configMESH.DFLT_NEW_PHYSGRP_GLOBAL_NUM
+    numit = 50
+    current = numinit
+    while current in listPhysGrp:
+        current += numit
+    return {'nbElems': nbElems,
+            'elemPerType': elemPerType,
+            'elemPerGrp': elemPerGrp,
+            'nameGrp': nameGrp,
+            'listPhysGrp': listPhysGrp,
+            'globPhysGrp': current}
+
+
 def adaptInputs(nodes: Optional[Union[list, np.ndarray]],
                 elements: Optional[Union[list, np.ndarray, dict]],
                 fields: Optional[Union[list, np.ndarray, dict]] = None)-> tuple:
     """
     Adapt the input data for the writer by ensuring proper formatting and structure.
 
+    The arrays are used without copy when possible (`np.asarray`) and the data of the
+    caller are not modified: the dictionaries of the elements and fields are shallow copies.
+
     Parameters:
     -----------
     nodes : Union[list, np.ndarray]
-        A list or numpy array representing the nodes. If the nodes are in 2D,
-        they will be converted to 3D by appending a zero z-coordinate.
+        A list or numpy array representing the nodes (2 or 3 coordinates). 2D nodes are
+        kept as is: the z-coordinate is added by the writers (see `getNodes3D`).
     elements : Union[list, np.ndarray, dict]
         A list, numpy array, or dictionary representing the elements. If a dictionary
         is provided, it will be wrapped in a list. Physical groups will be assigned
@@ -558,13 +642,19 @@ def adaptInputs(nodes: Optional[Union[list, np.ndarray]],
     fields : Union[list, np.ndarray, dict], optional
         A list, numpy array, or dictionary representing the fields. If a dictionary
         is provided, it will be wrapped in a list. Steps and data will be converted
-        to numpy arrays if they are lists. Defaults to None.
+        to numpy arrays if they are lists (data of fields with several steps are kept as
+        lists of arrays). Defaults to None.
 
     Returns:
     --------
     tuple
         A tuple containing the adapted nodes, elements, and fields.
 
+    Raises:
+    -------
+    ValueError
+        If the array of the nodes does not have 2 or 3 columns.
+
     Notes:
     ------
     - If `nodes` is None, an error will be logged.
@@ -574,29 +664,22 @@ def adaptInputs(nodes: Optional[Union[list, np.ndarray]],
     """
     # adapt nodes
     if nodes is not None:
-        if isinstance(nodes, list):
-            nodes = np.array(nodes)
-        # fix size in case of 2D nodes array
-        if nodes.shape[1] == 2:
-            nodes = np.hstack((nodes, np.zeros((nodes.shape[0],1))))
+        nodes = np.asarray(nodes)
+        if nodes.ndim != 2 or nodes.shape[1] not in (2, 3):
+            raise ValueError(f'Nodes must be an array of 2 or 3 coordinates per node (shape {nodes.shape})')
     else:
         Logger.error('No nodes provided')
     # adapt elements
-    if isinstance(elements, dict):
-        elements = [elements]
-    # get all physical groups
-    allPhysGrp = []
-    for e in elements or []:
-        if e.get('physgrp') is not None:
-            allPhysGrp.extend(e.get('physgrp'))
-    allPhysGrp = set(allPhysGrp)
-    # adapt elements
     if elements is not None:
         if isinstance(elements, dict):
             elements = [elements]
+        elements = [dict(e) for e in elements]
+        # get all physical groups
+        allPhysGrp = [np.asarray(e.get('physgrp')).ravel() for e in elements if e.get('physgrp') is not None]
+        allPhysGrp = set(np.unique(np.concatenate(allPhysGrp)).tolist()) if allPhysGrp else set()
         for e in elements:
             if e.get('connectivity') is not None:
-                e['connectivity'] = np.array(e.get('connectivity'))
+                e['connectivity'] = np.asarray(e.get('connectivity'))
             if e.get('physgrp',None) is None:
                 # manual setting of physical group
                 idgrp = getNewPhysGrp(allPhysGrp)
@@ -608,18 +691,191 @@ def adaptInputs(nodes: Optional[Union[list, np.ndarray]],
     if fields is not None:
         if isinstance(fields, dict):
             fields = [fields]
+        fields = [dict(f) for f in fields]
         for f in fields:
             if f.get('steps') is not None:
-                f['steps'] = np.array(f.get('steps'))
-            if f.get('data') is not None:
-                if isinstance(f.get('data'), list):
-                    f['data'] = np.array(f.get('data'))
+                f['steps'] = np.asarray(f.get('steps'))
+            if isinstance(f.get('data'), (list, tuple)):
+                if meshtools.isTemporal(f):
+                    # one array per step (not stacked)
+                    f['data'] = [np.asarray(v) for v in f['data']]
+                else:
+                    f['data'] = np.asarray(f['data'])
     else:
         Logger.warning('No fields provided')
 
     return nodes, elements, fields
 
 
+def getInputs(nodes: Optional[Union[list, np.ndarray]],
+              elements: Optional[Union[list, np.ndarray, dict]],
+              fields: Optional[Union[list, np.ndarray, dict]] = None,
+              mesh: Optional['Mesh'] = None,
+              offset: int = 0)-> tuple:
+    """
+    Get the adapted inputs of a writer: from the mesh container if provided (adapted once,
+    connectivity shifted to `offset`, see `meshdata.Mesh.getInputs`), else from the nodes,
+    elements and fields (see `adaptInputs`).
+
+    Args:
+        nodes (Optional[Union[list, np.ndarray]]): The coordinates of the nodes.
+        elements (Optional[Union[list, np.ndarray, dict]]): The element blocks.
+        fields (Optional[Union[list, np.ndarray, dict]], optional): The fields. Defaults to None.
+        mesh (Optional[meshdata.Mesh], optional): The mesh container (replaces the nodes,
+            elements and fields). Defaults to None.
+        offset (int, optional): The index of the first node in the connectivity expected by
+            the writer (0 for the VTK writers, 1 for the MSH writers). Defaults to 0.
+
+    Returns:
+        tuple: The adapted nodes, elements and fields.
+    """
+    if mesh is None:
+        return adaptInputs(nodes, elements, fields)
+    if nodes is not None or elements is not None or fields is not None:
+        Logger.warning('Nodes, elements and fields ignored: data of the mesh container used')
+    return mesh.getInputs(offset)
+
+
+def getNodes3D(nodes: Union[list, np.ndarray])-> np.ndarray:
+    """
+    Get the coordinates of the nodes with 3 components (z-coordinate set to 0 for 2D
+    nodes, used by the writers at write time).
+
+    Args:
+        nodes (Union[list, np.ndarray]): The coordinates of the nodes.
+
+    Returns:
+        np.ndarray: The coordinates (the input array if it already has 3 components).
+    """
+    nodes = np.asarray(nodes, dtype=float)
+    if nodes.ndim == 2 and nodes.shape[1] < 3:
+        nodes3D = np.zeros((nodes.shape[0], 3))
+        nodes3D[:, :nodes.shape[1]] = nodes
+        return nodes3D
+    return nodes
+
+
+def mergeInputs(nodes: Optional[np.ndarray],
+                elements: Optional[list],
+                fields: Optional[list] = None,
+                opts: Optional[dict] = None,
+                offset: int = 0)-> tuple:
+    """
+    Merge the coincident nodes of the adapted inputs (see `adaptInputs`) if the option
+    'merge' is set (tolerance, True for the default tolerance, see `meshtools.mergeNodes`).
+
+    Args:
+        nodes (Optional[np.ndarray]): The coordinates of the nodes.
+        elements (Optional[list]): The element blocks.
+        fields (Optional[list], optional): The fields. Defaults to None.
+        opts (Optional[dict], optional): The options of the writer. Defaults to None.
+        offset (int, optional): The index of the first node in the connectivity (0 for
+            the VTK writers, 1 for the MSH writers). Defaults to 0.
+
+    Returns:
+        tuple: The nodes, elements and fields (merged or not) and the merge map (None if
+        the nodes are not merged).
+    """
+    tol = (opts or {}).get('merge')
+    if tol is None or tol is False or nodes is None or elements is None:
+        return nodes, elements, fields, None
+    if tol is True:
+        tol = meshtools.DFLT_MERGE_TOL
+    nodes, elements, fields, mergeMap = meshtools.mergeNodes(nodes, elements, fields, tol, offset)
+    return nodes, elements, fields, mergeMap
+
+
+def reorderInputs(nodes: Optional[np.ndarray],
+                  elements: Optional[list],
+                  fields: Optional[list] = None,
+                  opts: Optional[dict] = None,
+                  offset: int = 0)-> tuple:
+    """
+    Renumber the nodes and elements of the adapted inputs (see `adaptInputs`) if the option
+    'reorder' is set ('rcm', 'morton' or 'hilbert', see `meshtools.reorderMesh`).
+
+    Args:
+        nodes (Optional[np.ndarray]): The coordinates of the nodes.
+        elements (Optional[list]): The element blocks.
+        fields (Optional[list], optional): The fields. Defaults to None.
+        opts (Optional[dict], optional): The options of the writer. Defaults to None.
+        offset (int, optional): The index of the first node in the connectivity (0 for
+            the VTK writers, 1 for the MSH writers). Defaults to 0.
+
+    Returns:
+        tuple: The nodes, elements and fields (renumbered or not) and the permutations
+        (None if the inputs are not renumbered).
+    """
+    method = (opts or {}).get('reorder')
+    if not method or nodes is None or elements is None:
+        return nodes, elements, fields, None
+    nodes, elements, fields, permutation = meshtools.reorderMesh(nodes, elements, fields, method, offset)
+    return nodes, elements, fields, permutation
+
+
+def getPhysGrpData(elements: Union[list, dict, None])-> Optional[np.ndarray]:
+    """
+    Build the physical group of each element (cell field of the VTK writers) in one
+    preallocated array filled block by block.
+
+    Args:
+        elements (Union[list, dict, None]): The element blocks.
+
+    Returns:
+        Optional[np.ndarray]: The physical groups (int32, -1 for the blocks without physical
+        group), None if no block has a physical group.
+    """
+    blocks = [elements] if isinstance(elements, dict) else list(elements or [])
+    if not any(configMESH.DFLT_PHYS_GRP in e for e in blocks):
+        return None
+    sizes = [np.shape(e[configMESH.DFLT_MESH])[0] for e in blocks]
+    data = np.empty(sum(sizes), dtype=np.int32)
+    start = 0
+    for e, nbElems in zip(blocks, sizes):
+        physGrp = e.get(configMESH.DFLT_PHYS_GRP)
+        if physGrp is None:
+            data[start:start + nbElems] = -1
+        else:
+            physGrp = np.asarray(physGrp).ravel()
+            data[start:start + nbElems] = physGrp if physGrp.size == nbElems else physGrp[0]
+        start += nbElems
+    return data
+
+
+def getCellArrays(elements: Union[list, dict, None])-> tuple:
+    """
+    Build the cells of the VTK writers in the layout of `vtkCellArray` (preallocated arrays
+    filled block by block): the VTK type of each cell, the offsets of the cells in the
+    connectivity and the connectivity of all the cells.
+
+    Args:
+        elements (Union[list, dict, None]): The element blocks (connectivity from 0).
+
+    Returns:
+        tuple: The types (uint8), the offsets (int64, one more value than cells) and the
+        connectivity (int64).
+    """
+    blocks = [elements] if isinstance(elements, dict) else list(elements or [])
+    tables = [np.asarray(e[configMESH.DFLT_MESH]) for e in blocks]
+    tables = [t.reshape(t.shape[0], -1) for t in tables]
+    nbElems = sum(t.shape[0] for t in tables)
+    types = np.empty(nbElems, dtype=np.uint8)
+    sizes = np.empty(nbElems, dtype=np.int64)
+    connectivity = np.empty(sum(t.size for t in tables), dtype=np.int64)
+    start = 0
+    pos = 0
+    for e, table in zip(blocks, tables):
+        nbCells = table.shape[0]
+        types[start:start + nbCells] = dbvtk.getVTKElemType(e[configMESH.DFLT_TYPE_ELEM])[0]
+        sizes[start:start + nbCells] = table.shape[1]
+        connectivity[pos:pos + table.size] = table.ravel()
+        start += nbCells
+        pos += table.size
+    offsets = np.zeros(nbElems + 1, dtype=np.int64)
+    np.cumsum(sizes, out=offsets[1:])
+    return types, offsets, connectivity
+
+
 def getNewPhysGrp(existing: set)-> int:
     """
     Generate a new physical group ID that does not conflict with existing IDs.